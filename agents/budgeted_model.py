@@ -0,0 +1,160 @@
+"""
+Ollama model that fits every prompt into its agent's token budget
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from agno.models.message import Message
+from agno.models.ollama import Ollama
+from utils.cancellation import check_cancelled
+from utils.context_budget import ContextBudget, stats_for
+from utils.tool_budget import BUDGET_NOTE, ToolBudget, run_of, start_run, tool_budget_stats_for
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class BudgetedOllama(Ollama):
+    """
+    ``Ollama`` that trims the conversation before each request
+
+    The messages agno built (instructions, history, tool calls and results)
+    go through ``context_budget.fit``; only the copy sent to Ollama is
+    trimmed, the run keeps its full history. Prompt sizes are logged and
+    counted per ``context_name`` (see ``utils.context_budget.context_stats``).
+
+    With a ``tool_budget``, a run (from the user message to the answer) that
+    exceeds its tool iterations or seconds gets one last request without
+    tools, and a tool call repeated with the same arguments within a run is
+    answered from the first call's result (see ``utils.tool_budget``).
+
+    In a cancelled run (``utils.cancellation``) no further request or tool
+    call is started: ``RunCancelled`` is raised instead.
+    """
+
+    context_budget: Optional[ContextBudget] = None
+    context_name: Optional[str] = None
+    tool_budget: Optional[ToolBudget] = None
+
+    def fit_messages(self, messages: List[Message]) -> List[Message]:
+        if self.context_budget is None:
+            return messages
+        plan = self.context_budget.fit([(m.role, m.content) for m in messages])
+        name = self.context_name or self.id
+        stats_for(name).record(plan)
+        if plan.trimmed:
+            logger.info(
+                f"✂️ {name} prompt ~{plan.tokens_before} → ~{plan.tokens_after} tokens "
+                f"({plan.dropped} messages summarized, {plan.truncated} tool results shortened)"
+            )
+        else:
+            logger.info(f"📏 {name} prompt ~{plan.tokens_after} tokens")
+
+        fitted = [
+            messages[i].model_copy(update={"content": plan.replacements[i]}) if i in plan.replacements else messages[i]
+            for i in plan.keep
+        ]
+        if plan.summary:
+            # Right after the leading system messages, which are always kept
+            fitted.insert(plan.summary_at, Message(role="system", content=plan.summary))
+        return fitted
+
+    def budget_messages(self, messages: List[Message], kwargs: Dict[str, Any]) -> List[Message]:
+        """Starts a run on a user message; once the run is out of budget, drops the tools from ``kwargs``"""
+        if self.tool_budget is None or not messages:
+            return messages
+        name = self.context_name or self.id
+        stats = tool_budget_stats_for(name)
+        if messages[-1].role == "user":
+            start_run(self, self.tool_budget)
+            stats.record_run()
+            return messages
+        run = run_of(self)
+        if run is None or messages[-1].role != "tool":
+            return messages
+        already = run.exhausted
+        exhausted = run.next_iteration()
+        stats.record_iteration(run, None if already else exhausted)
+        if exhausted is None:
+            return messages
+        reason = (f"{self.tool_budget.max_iterations} itérations" if exhausted == "iterations"
+                  else f"{self.tool_budget.max_seconds:.0f}s")
+        if not already:
+            logger.warning(f"⏱️ {name}: tool budget reached ({reason}), answering without tools")
+        kwargs["tools"], kwargs["tool_choice"] = None, None
+        # A system note: a user message would open a new turn, leaving the question and tool results droppable
+        return messages + [Message(role="system", content=BUDGET_NOTE.format(reason=reason))]
+
+    def _serve_repeats(self, function_calls: List[Any]) -> Dict[str, int]:
+        """Points calls already made in this run at their previous result; returns repeats per tool"""
+        run = run_of(self) if self.tool_budget is not None else None
+        repeated: Dict[str, int] = {}
+        if run is None:
+            return repeated
+        for fc in function_calls:
+            seen, result = run.seen(fc.function.name, fc.arguments)
+            if seen:
+                logger.info(f"🔁 {self.context_name or self.id}: {fc.function.name} repeated, serving the previous result")
+                fc.function = fc.function.model_copy(update={
+                    "entrypoint": _replay(result), "tool_hooks": None, "pre_hook": None, "post_hook": None
+                })
+                repeated[fc.function.name] = repeated.get(fc.function.name, 0) + 1
+        return repeated
+
+    def _remember(self, function_calls: List[Any], repeated: Dict[str, int]):
+        run = run_of(self) if self.tool_budget is not None else None
+        if run is None:
+            return
+        for fc in function_calls:
+            if fc.error is None and isinstance(fc.result, (str, int, float, list, dict)):
+                run.remember(fc.function.name, fc.arguments, fc.result)
+        tool_budget_stats_for(self.context_name or self.id).record_calls(
+            len(function_calls) - sum(repeated.values()), repeated
+        )
+
+    def run_function_calls(self, function_calls: List[Any], *args, **kwargs) -> Any:
+        check_cancelled()
+        repeated = self._serve_repeats(function_calls)
+        for event in super().run_function_calls(function_calls, *args, **kwargs):
+            # Between tool calls: the next one does not start once the run is cancelled
+            check_cancelled()
+            yield event
+        self._remember(function_calls, repeated)
+
+    async def arun_function_calls(self, function_calls: List[Any], *args, **kwargs) -> Any:
+        check_cancelled()
+        repeated = self._serve_repeats(function_calls)
+        async for event in super().arun_function_calls(function_calls, *args, **kwargs):
+            check_cancelled()
+            yield event
+        self._remember(function_calls, repeated)
+
+    def invoke(self, messages: List[Message], *args, **kwargs) -> Any:
+        check_cancelled()
+        messages = self.budget_messages(messages, kwargs)
+        return super().invoke(self.fit_messages(messages), *args, **kwargs)
+
+    async def ainvoke(self, messages: List[Message], *args, **kwargs) -> Any:
+        check_cancelled()
+        messages = self.budget_messages(messages, kwargs)
+        return await super().ainvoke(self.fit_messages(messages), *args, **kwargs)
+
+    def invoke_stream(self, messages: List[Message], *args, **kwargs) -> Any:
+        check_cancelled()
+        messages = self.budget_messages(messages, kwargs)
+        yield from super().invoke_stream(self.fit_messages(messages), *args, **kwargs)
+
+    async def ainvoke_stream(self, messages: List[Message], *args, **kwargs) -> Any:
+        check_cancelled()
+        messages = self.budget_messages(messages, kwargs)
+        async for chunk in super().ainvoke_stream(self.fit_messages(messages), *args, **kwargs):
+            yield chunk
+
+def _replay(result: Any) -> Callable[..., Any]:
+    """Tool entrypoint returning ``result`` again, marked as a repeat"""
+    def replay(**kwargs):
+        if isinstance(result, str):
+            return f"{result}\n\n(Même appel que précédemment : résultat déjà obtenu, inutile de le relancer.)"
+        return result
+    return replay
@@ -0,0 +1,157 @@
+"""
+Vector DB wrapper that serves repeated knowledge searches from a cache
+"""
+
+from dataclasses import replace
+from typing import Any, Dict, List, Optional
+
+from agno.document import Document
+from agno.vectordb.base import VectorDb
+from utils.retrieval_cache import RetrievalCache
+from .knowledge_ingestion import delete_chunks
+
+class CachedVectorDb(VectorDb):
+    """
+    Wraps any ``VectorDb`` and caches ``search`` results in a ``RetrievalCache``
+
+    A hit skips both the query embedding and the vector search. Every write
+    going through the wrapper (insert, upsert, delete, drop) invalidates the
+    cache, so ingestion and syncs are picked up by the next search. Other
+    attributes (``search_type``, ``table``, ``embedder``...) are read from the
+    wrapped store.
+    """
+
+    def __init__(self, db: VectorDb, cache: Optional[RetrievalCache] = None):
+        self.db = db
+        self.cache = cache if cache is not None else RetrievalCache()
+
+    def __getattr__(self, name: str) -> Any:
+        db = self.__dict__.get("db")
+        if db is None:
+            raise AttributeError(name)
+        return getattr(db, name)
+
+    def __deepcopy__(self, memo):
+        # Agent copies share the store and its cache
+        return self
+
+    # Search
+
+    def _cached(self, query: str, limit: int, filters: Optional[Dict[str, Any]]) -> Optional[List[Document]]:
+        return self.cache.get(query, limit, filters)
+
+    def _store(self, query: str, limit: int, filters: Optional[Dict[str, Any]], documents: List[Document],
+               version: int):
+        # Embeddings are not needed by callers and would dominate the cache's memory
+        self.cache.put(query, limit, filters, [replace(doc, embedding=None) for doc in documents], version)
+
+    def search(self, query: str, limit: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[Document]:
+        cached = self._cached(query, limit, filters)
+        if cached is not None:
+            return cached
+        version = self.cache.version
+        documents = self.db.search(query=query, limit=limit, filters=filters)
+        self._store(query, limit, filters, documents, version)
+        return documents
+
+    async def async_search(
+        self, query: str, limit: int = 5, filters: Optional[Dict[str, Any]] = None
+    ) -> List[Document]:
+        cached = self._cached(query, limit, filters)
+        if cached is not None:
+            return cached
+        version = self.cache.version
+        try:
+            documents = await self.db.async_search(query=query, limit=limit, filters=filters)
+        except NotImplementedError:
+            documents = self.db.search(query=query, limit=limit, filters=filters)
+        self._store(query, limit, filters, documents, version)
+        return documents
+
+    # Writes (each one invalidates the cache)
+
+    def insert(self, documents: List[Document], filters: Optional[Dict[str, Any]] = None) -> None:
+        try:
+            self.db.insert(documents, filters)
+        finally:
+            self.cache.invalidate()
+
+    async def async_insert(self, documents: List[Document], filters: Optional[Dict[str, Any]] = None) -> None:
+        try:
+            await self.db.async_insert(documents, filters)
+        finally:
+            self.cache.invalidate()
+
+    def upsert_available(self) -> bool:
+        return self.db.upsert_available()
+
+    def upsert(self, documents: List[Document], filters: Optional[Dict[str, Any]] = None) -> None:
+        try:
+            self.db.upsert(documents, filters)
+        finally:
+            self.cache.invalidate()
+
+    async def async_upsert(self, documents: List[Document], filters: Optional[Dict[str, Any]] = None) -> None:
+        try:
+            await self.db.async_upsert(documents, filters)
+        finally:
+            self.cache.invalidate()
+
+    def delete_by_ids(self, ids: List[str]) -> int:
+        try:
+            return delete_chunks(self.db, ids)
+        finally:
+            self.cache.invalidate()
+
+    def delete(self) -> bool:
+        try:
+            return self.db.delete()
+        finally:
+            self.cache.invalidate()
+
+    def drop(self) -> None:
+        try:
+            self.db.drop()
+        finally:
+            self.cache.invalidate()
+
+    async def async_drop(self) -> None:
+        try:
+            await self.db.async_drop()
+        finally:
+            self.cache.invalidate()
+
+    # Pass-through
+
+    def create(self) -> None:
+        self.db.create()
+
+    async def async_create(self) -> None:
+        await self.db.async_create()
+
+    def exists(self) -> bool:
+        return self.db.exists()
+
+    async def async_exists(self) -> bool:
+        return await self.db.async_exists()
+
+    def doc_exists(self, document: Document) -> bool:
+        return self.db.doc_exists(document)
+
+    async def async_doc_exists(self, document: Document) -> bool:
+        return await self.db.async_doc_exists(document)
+
+    def name_exists(self, name: str) -> bool:
+        return self.db.name_exists(name)
+
+    async def async_name_exists(self, name: str) -> bool:  # type: ignore[override]  # agno's base declares it sync
+        return await self.db.async_name_exists(name)  # type: ignore[misc]
+
+    def id_exists(self, id: str) -> bool:
+        return self.db.id_exists(id)
+
+    def optimize(self) -> None:
+        self.db.optimize()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"store": type(self.db).__name__, **self.cache.stats()}
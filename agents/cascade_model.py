@@ -0,0 +1,117 @@
+"""
+Ollama model that lets a small model answer first and escalates on low confidence
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from agno.models.message import Message
+from agno.models.ollama import Ollama
+from utils.cascade import CascadePolicy, CascadeStats, Verdict, cascade_stats_for
+from .budgeted_model import BudgetedOllama
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class CascadeOllama(BudgetedOllama):
+    """
+    ``BudgetedOllama`` that tries ``small_model`` before itself
+
+    Only a request answering a user message is cascaded (not the follow-up
+    requests of a tool loop). ``cascade_policy`` may send it straight to the
+    large model; otherwise the small model's reply is kept if the policy
+    trusts it, else this model answers. The small model goes through this
+    model's host and client, with its ``keep_alive``. Streaming requests
+    always use this model. Outcomes and timings are counted per
+    ``context_name`` (see ``utils.cascade.cascade_stats``).
+    """
+
+    small_model: Optional[Ollama] = None
+    cascade_policy: Optional[CascadePolicy] = None
+
+    def _cascade_stats(self) -> CascadeStats:
+        return cascade_stats_for(self.context_name or self.id)
+
+    def _plan(self, messages: List[Message], tools: Optional[List[Dict[str, Any]]]) -> Tuple[Optional[str], bool]:
+        """The question to try on the small model (None to skip it) and whether the policy skipped it"""
+        if self.small_model is None or self.cascade_policy is None or not messages or messages[-1].role != "user":
+            return None, False
+        question = messages[-1].get_content_string()
+        reason = self.cascade_policy.should_skip(question, has_tools=bool(tools))
+        if reason:
+            logger.info(f"🪜 {self.context_name or self.id}: {reason}, straight to {self.id}")
+            return None, True
+        return question, False
+
+    @property
+    def _small_id(self) -> str:
+        return self.small_model.id if self.small_model is not None else "small model"
+
+    def _small(self) -> Ollama:
+        small = self.small_model
+        assert small is not None, "only called once _plan picked the small model"
+        if small.client is not self.client or small.host != self.host:
+            small.host, small.client, small.async_client = self.host, self.client, self.async_client
+        small.keep_alive = self.keep_alive
+        return small
+
+    def _keep(self, question: str, response: Any, seconds: float) -> bool:
+        assert self.cascade_policy is not None
+        message = response.get("message") or {}
+        verdict = self.cascade_policy.judge(
+            question,
+            message.get("content") or "",
+            done_reason=response.get("done_reason"),
+            tool_calls=bool(message.get("tool_calls"))
+        )
+        self._record(verdict, seconds)
+        return verdict.accept
+
+    def _record(self, verdict: Verdict, seconds: float):
+        self._cascade_stats().record_small(verdict, seconds)
+        name = self.context_name or self.id
+        if verdict.accept:
+            logger.info(f"🪜 {name}: kept {self._small_id} answer (confidence {verdict.confidence}) in {seconds:.2f}s")
+        else:
+            logger.info(f"⬆️ {name}: escalating to {self.id} ({', '.join(verdict.reasons)}) after {seconds:.2f}s")
+
+    def _small_failed(self, error: Exception, seconds: float):
+        logger.warning(f"⚠️ {self._small_id} failed: {error}")
+        self._record(Verdict(False, 0.0, ["small model error"]), seconds)
+
+    def invoke(self, messages: List[Message], response_format=None, tools=None, tool_choice=None) -> Any:
+        question, skipped = self._plan(messages, tools)
+        if question is not None:
+            started = time.perf_counter()
+            try:
+                response = self._small().invoke(messages, response_format=response_format, tools=tools,
+                                                tool_choice=tool_choice)
+                if self._keep(question, response, time.perf_counter() - started):
+                    return response
+            except Exception as e:
+                self._small_failed(e, time.perf_counter() - started)
+        started = time.perf_counter()
+        response = super().invoke(messages, response_format=response_format, tools=tools, tool_choice=tool_choice)
+        if question is not None or skipped:
+            self._cascade_stats().record_large(time.perf_counter() - started, skipped=skipped)
+        return response
+
+    async def ainvoke(self, messages: List[Message], response_format=None, tools=None, tool_choice=None) -> Any:
+        question, skipped = self._plan(messages, tools)
+        if question is not None:
+            started = time.perf_counter()
+            try:
+                response = await self._small().ainvoke(messages, response_format=response_format, tools=tools,
+                                                       tool_choice=tool_choice)
+                if self._keep(question, response, time.perf_counter() - started):
+                    return response
+            except Exception as e:
+                self._small_failed(e, time.perf_counter() - started)
+        started = time.perf_counter()
+        response = await super().ainvoke(messages, response_format=response_format, tools=tools,
+                                         tool_choice=tool_choice)
+        if question is not None or skipped:
+            self._cascade_stats().record_large(time.perf_counter() - started, skipped=skipped)
+        return response
@@ -0,0 +1,125 @@
+"""
+Fast structure-aware chunking for knowledge ingestion
+"""
+
+import re
+from bisect import bisect_left, bisect_right
+from typing import List, Tuple
+
+from agno.document import Document
+from agno.document.chunking.agentic import AgenticChunking
+from agno.document.chunking.strategy import ChunkingStrategy
+from .settings import get_model
+
+# Split points from strongest to weakest: paragraph, line, sentence, word.
+# One regex pass over the whole text finds all of them at once.
+BOUNDARY_PATTERN = re.compile(
+    r"(?P<paragraph>\n[ \t]*\n\s*)"
+    r"|(?P<line>\n\s*)"
+    r"|(?P<sentence>(?<=[.!?;:])[\"')\]]?\s+)"
+    r"|(?P<word>\s+)"
+)
+BOUNDARY_LEVELS = {"paragraph": 3, "line": 2, "sentence": 1, "word": 0}
+
+class FastChunking(ChunkingStrategy):
+    """
+    Recursive paragraph → line → sentence → word splitting with overlap
+
+    Produces chunks of at most ``chunk_size`` characters, cut at the strongest
+    boundary available in the window (a paragraph break if there is one,
+    otherwise a sentence end, otherwise a space). Consecutive chunks share
+    about ``overlap`` characters, starting on a sentence or word boundary.
+    No model calls: a 200-page PDF chunks in milliseconds.
+    """
+
+    def __init__(self, chunk_size: int = 2000, overlap: int = 200, min_chunk_size: int = 0):
+        if overlap >= chunk_size:
+            raise ValueError(f"Invalid parameters: overlap ({overlap}) must be less than chunk size ({chunk_size}).")
+        self.chunk_size = chunk_size
+        self.overlap = overlap
+        # Never cut before this many characters, so tiny fragments don't become chunks
+        self.min_chunk_size = max(min_chunk_size or chunk_size // 4, overlap + 1)
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Collapse runs of spaces but keep line and paragraph breaks"""
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+        text = re.sub(r"[ \t\f\v]+", " ", text)
+        text = re.sub(r" ?\n ?", "\n", text)
+        return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+    @staticmethod
+    def boundaries(text: str) -> Tuple[List[int], List[int]]:
+        """Positions where a chunk may start (end of each separator) and their strength"""
+        positions, levels = [], []
+        for match in BOUNDARY_PATTERN.finditer(text):
+            positions.append(match.end())
+            levels.append(BOUNDARY_LEVELS[match.lastgroup or ""])
+        return positions, levels
+
+    def spans(self, text: str) -> List[Tuple[int, int]]:
+        """(start, end) offsets of every chunk in ``text``"""
+        positions, levels = self.boundaries(text)
+        spans = []
+        start, length = 0, len(text)
+        while start < length:
+            limit = start + self.chunk_size
+            if limit >= length:
+                spans.append((start, length))
+                break
+
+            lo = bisect_right(positions, start + self.min_chunk_size)
+            hi = bisect_right(positions, limit)
+            end = limit
+            if lo < hi:
+                # Strongest boundary in the window, the latest one on ties
+                best = max(range(lo, hi), key=lambda i: (levels[i], i))
+                end = positions[best]
+            spans.append((start, end))
+
+            next_start = end
+            if self.overlap:
+                i = bisect_left(positions, end - self.overlap)
+                candidates = [j for j in range(i, bisect_left(positions, end)) if positions[j] > start]
+                if candidates:
+                    sentence_starts = [j for j in candidates if levels[j] >= 1]
+                    next_start = positions[(sentence_starts or candidates)[0]]
+            start = next_start
+        return spans
+
+    def chunk(self, document: Document) -> List[Document]:
+        text = self.normalize(document.content)
+        chunks: List[Document] = []
+        for chunk_number, (start, end) in enumerate(self.spans(text), start=1):
+            content = text[start:end].strip()
+            if not content:
+                continue
+            meta_data = document.meta_data.copy()
+            meta_data["chunk"] = chunk_number
+            meta_data["chunk_size"] = len(content)
+            chunk_id = None
+            if document.id:
+                chunk_id = f"{document.id}_{chunk_number}"
+            elif document.name:
+                chunk_id = f"{document.name}_{chunk_number}"
+            chunks.append(Document(id=chunk_id, name=document.name, meta_data=meta_data, content=content))
+        return chunks
+
+def get_chunking_strategy(name: str = "fast", chunk_size: int = 2000, overlap: int = 200) -> ChunkingStrategy:
+    """
+    Build a chunking strategy by name
+
+    Args:
+        name: ``fast`` (structure-aware, no model calls) or ``agentic``
+            (Mistral picks every breakpoint)
+        chunk_size: Maximum characters per chunk
+        overlap: Characters shared by consecutive chunks (fast only)
+
+    Returns:
+        The configured chunking strategy
+    """
+    if name == "fast":
+        return FastChunking(chunk_size=chunk_size, overlap=overlap)
+    if name == "agentic":
+        return AgenticChunking(model=get_model("mistral:latest"), max_chunk_size=chunk_size)
+    raise ValueError(f"Unknown chunking strategy '{name}' (expected 'fast' or 'agentic')")
@@ -3,13 +3,16 @@ Programming and computation agent using Python tools
 """
 
 from agno.agent import Agent
-from agno.tools.python import PythonTools
+from .python_tools import WarmPythonTools, code_workers
 from .settings import get_model
 
+# Runs code in warm worker processes; the API streams its output to /ws
+code_tools = WarmPythonTools(code_workers)
+
 code_agent = Agent(
     name="CodeAgent",
-    model=get_model("qwen2.5-coder:7b"),
-    tools=[PythonTools()],
+    model=get_model("qwen2.5-coder:7b", agent="code"),
+    tools=[code_tools],
     instructions=[
         "Tu es un expert en programmation qui DOIT utiliser Python pour résoudre les problèmes.",
         "RÈGLE ABSOLUE: Pour toute demande de code ou calcul, tu DOIS utiliser les outils Python.",
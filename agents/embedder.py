@@ -0,0 +1,104 @@
+"""
+Ollama embedder with a persistent cache and batched requests
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from agno.embedder.ollama import OllamaEmbedder
+from agno.utils.log import logger
+from utils.embedding_cache import EmbeddingCache, MicroBatcher, embedding_cache
+
+@dataclass
+class CachedOllamaEmbedder(OllamaEmbedder):
+    """
+    ``OllamaEmbedder`` that reuses vectors and sends texts in batches
+
+    Vectors are looked up by (model id, content hash) in an ``EmbeddingCache``
+    before calling Ollama, so reloading a knowledge base or repeating a query
+    does not recompute them. Misses are sent as one ``/api/embed`` request per
+    ``batch_size`` texts; concurrent single-text calls (searches from several
+    requests) are coalesced into a batch by a ``MicroBatcher``.
+    """
+    id: str = "nomic-embed-text"
+    dimensions: int = 768
+    cache: Optional[EmbeddingCache] = field(default_factory=lambda: embedding_cache)
+    batch_size: int = 32
+    batch_wait: float = 0.005
+    requests: int = field(default=0, init=False)
+    batcher: MicroBatcher = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.batcher = MicroBatcher(self._embed_and_store, max_batch=self.batch_size, max_wait=self.batch_wait)
+
+    def __deepcopy__(self, memo):
+        # Agent copies share the embedder (and its cache connection)
+        return self
+
+    def _embed_uncached(self, texts: List[str]) -> List[List[float]]:
+        kwargs: Dict[str, Any] = {}
+        if self.options is not None:
+            kwargs["options"] = self.options
+
+        vectors: List[List[float]] = []
+        for i in range(0, len(texts), self.batch_size):
+            batch = texts[i:i + self.batch_size]
+            self.requests += 1
+            try:
+                response = self.client.embed(input=batch, model=self.id, **kwargs)
+                embeddings = list(response.get("embeddings") or [])
+            except Exception as e:
+                logger.warning(e)
+                embeddings = []
+            if len(embeddings) != len(batch):
+                embeddings = [[] for _ in batch]
+            for embedding in embeddings:
+                embedding = list(embedding)
+                if embedding and len(embedding) != self.dimensions:
+                    logger.warning(f"Expected embedding dimension {self.dimensions}, but got {len(embedding)}")
+                    embedding = []
+                vectors.append(embedding)
+        return vectors
+
+    def _embed_and_store(self, texts: List[str]) -> List[List[float]]:
+        unique = list(dict.fromkeys(texts))
+        vectors = self._embed_uncached(unique)
+        if self.cache:
+            vectors = self.cache.put_many(self.id, unique, vectors)
+        computed = dict(zip(unique, vectors))
+        return [computed[text] for text in texts]
+
+    def get_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embeddings for many texts, served from the cache where possible
+
+        Args:
+            texts: Texts to embed; duplicates are embedded once
+
+        Returns:
+            One vector per text, in order (empty when embedding failed)
+        """
+        cached: List[Optional[List[float]]] = (
+            self.cache.get_many(self.id, texts) if self.cache else [None] * len(texts)
+        )
+        missing = [text for text, vector in zip(texts, cached) if vector is None]
+        computed = dict(zip(missing, self._embed_and_store(missing))) if missing else {}
+        return [vector if vector is not None else computed[text] for text, vector in zip(texts, cached)]
+
+    def get_embedding(self, text: str) -> List[float]:
+        if self.cache:
+            vector = self.cache.get(self.id, text)
+            if vector is not None:
+                return vector
+        return self.batcher.submit(text)
+
+    def get_embedding_and_usage(self, text: str) -> Tuple[List[float], Optional[Dict]]:
+        return self.get_embedding(text), None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "model": self.id,
+            "requests": self.requests,
+            "batching": self.batcher.stats(),
+            "cache": self.cache.stats() if self.cache else None
+        }
@@ -2,24 +2,34 @@
 Financial analysis agent using YFinance
 """
 
+import logging
+from typing import Callable, Optional
+
 from agno.agent import Agent
-from agno.tools.yfinance import YFinanceTools
-from .settings import get_model
+from utils.finance_fast_path import FinanceFastPath
+from utils.ollama_pool import ollama_pool
+from .market_tools import WatchlistYFinanceTools, build_prefetcher, market_store
+from .settings import FINANCE_FAST_PATH_SUMMARY, FINANCE_SUMMARY_MODEL, get_model
+
+logger = logging.getLogger(__name__)
+
+finance_tools = WatchlistYFinanceTools(
+    market_store,
+    stock_price=True,
+    analyst_recommendations=True,
+    company_info=True,
+    company_news=True
+)
 
 finance_agent = Agent(
     name="FinanceAgent",
-    model=get_model("qwen3:8b"),
-    tools=[YFinanceTools(
-        stock_price=True,
-        analyst_recommendations=True,
-        company_info=True,
-        company_news=True
-    )],
+    model=get_model("qwen3:8b", agent="finance"),
+    tools=[finance_tools],
     instructions=[
         "Tu es un analyste financier expert avec accès aux outils YFinance.",
         "Quand on te demande des informations financières, utilise TOUJOURS tes outils:",
         "- get_current_stock_price(symbol) pour obtenir le prix actuel d'une action",
-        "- get_company_info(symbol) pour obtenir les informations d'une entreprise", 
+        "- get_company_info(symbol) pour obtenir les informations d'une entreprise",
         "- get_analyst_recommendations(symbol) pour les recommandations d'analystes",
         "- get_company_news(symbol) pour les actualités d'une entreprise",
         "Utilise tes outils pour obtenir des données réelles et à jour.",
@@ -30,4 +40,34 @@ finance_agent = Agent(
     reasoning=False,
     show_tool_calls=True,
     description="Analyste financier expert"
-) 
\ No newline at end of file
+)
+
+def llm_summarizer(client, model: str) -> Callable[[str, str], Optional[str]]:
+    """Asks ``model`` for a one-sentence summary of a fast-path answer; None when it fails"""
+    def summarize(question: str, answer: str) -> Optional[str]:
+        try:
+            response = client.chat(
+                model=model,
+                messages=[
+                    {"role": "system", "content": (
+                        "Résume ces données financières en une seule phrase factuelle, sans conseil "
+                        "d'investissement et sans ajouter de chiffres."
+                    )},
+                    {"role": "user", "content": f"Question: {question}\n\n{answer}"}
+                ],
+                options={"temperature": 0, "num_predict": 80}
+            )
+            return response["message"]["content"]
+        except Exception as e:
+            logger.warning(f"⚠️ Finance summary with {model} failed: {e}")
+            return None
+    return summarize
+
+# Simple price/info/recommendation/news lookups answered without the agent loop
+finance_fast_path = FinanceFastPath(
+    finance_tools.fetch,
+    summarize=llm_summarizer(ollama_pool.client(), FINANCE_SUMMARY_MODEL) if FINANCE_FAST_PATH_SUMMARY else None
+)
+
+# Keeps the watchlist's quotes, company info and news in market_store (started with the API)
+watchlist_prefetcher = build_prefetcher(finance_tools)
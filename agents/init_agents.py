@@ -9,7 +9,9 @@ from agents.code import code_agent
 from agents.system import system_agent
 from agents.whatsapp import whatsapp_agent
 from agents.middleware import register_agent, track_agent_activity
+from api.websocket import manager
 from teams.collaborative_team import collaborative_team
+from utils.model_inventory import ModelInventory, model_inventory
 import logging
 
 logger = logging.getLogger(__name__)
@@ -85,5 +87,20 @@ def init_agents():
     
     logger.info("All agents registered with WebSocket manager")
 
+def annotate_agent_models(inventory: ModelInventory):
+    """Attach model availability from the inventory to each registered agent"""
+    for agent_id, status in manager.agent_status.items():
+        metadata = status.get("metadata") or {}
+        model_name = metadata.get("model")
+        if not model_name or model_name == "unknown":
+            continue
+        
+        info = inventory.lookup(model_name)
+        if info is None and metadata.get("model_available") is not False:
+            logger.warning(f"Model '{model_name}' for agent {agent_id} is not installed in Ollama")
+        metadata["model_available"] = info is not None
+        metadata["model_size"] = info.get("size") if info else None
+
 # Initialize agents on import
-init_agents() 
\ No newline at end of file
+init_agents()
+model_inventory.add_listener(annotate_agent_models) 
\ No newline at end of file
@@ -0,0 +1,434 @@
+"""
+Concurrent PDF ingestion pipeline for URL knowledge bases
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from dataclasses import fields
+from datetime import datetime
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+from agno.document import Document
+from agno.knowledge.pdf_url import PDFUrlKnowledgeBase
+from pypdf import PdfReader
+from utils.pipeline import PipelineStats, Stage, StagePipeline
+
+logger = logging.getLogger(__name__)
+
+class EmbeddedDocument(Document):
+    """Document whose embedding was computed by the pipeline; vector DBs won't embed it again"""
+
+    @classmethod
+    def from_document(cls, document: Document) -> "EmbeddedDocument":
+        return cls(**{f.name: getattr(document, f.name) for f in fields(document)})
+
+    def embed(self, embedder=None) -> None:
+        if not self.embedding:
+            super().embed(embedder)
+
+def parse_pdf(url: str, data: bytes, metadata: Optional[Dict[str, Any]] = None) -> List[Document]:
+    """Split a downloaded PDF into one document per page, named like PDFUrlReader does"""
+    doc_name = url.split("/")[-1].split(".")[0].replace("/", "_").replace(" ", "_")
+    documents = []
+    for page_number, page in enumerate(PdfReader(BytesIO(data)).pages, start=1):
+        documents.append(Document(
+            name=doc_name,
+            id=f"{doc_name}_{page_number}",
+            meta_data={"page": page_number, "url": url, **(metadata or {})},
+            content=page.extract_text()
+        ))
+    return documents
+
+def stored_id(document: Document, upsert: bool) -> str:
+    """Row id a PgVector-style store gives a document (upserts are keyed by content hash)"""
+    content_hash = hashlib.md5(document.content.replace("\x00", "\ufffd").encode()).hexdigest()
+    return content_hash if upsert else (document.id or content_hash)
+
+def delete_chunks(vector_db: Any, ids: List[str]) -> int:
+    """
+    Delete rows by id from a vector DB
+
+    Uses the store's own ``delete_by_ids`` when it has one, and a direct
+    ``DELETE ... WHERE id IN`` for PgVector, whose API can only drop everything.
+    """
+    if not ids:
+        return 0
+    if hasattr(vector_db, "delete_by_ids"):
+        return vector_db.delete_by_ids(ids)
+    if hasattr(vector_db, "table") and hasattr(vector_db, "Session"):
+        from sqlalchemy import delete
+
+        deleted = 0
+        with vector_db.Session() as sess:
+            for i in range(0, len(ids), 500):
+                result = sess.execute(delete(vector_db.table).where(vector_db.table.c.id.in_(ids[i:i + 500])))
+                deleted += result.rowcount or 0
+            sess.commit()
+        return deleted
+    raise NotImplementedError(f"{type(vector_db).__name__} cannot delete individual documents")
+
+class KnowledgeManifest:
+    """
+    What was ingested from each URL: validators, content hash and stored chunk ids
+
+    Kept as a small JSON file so incremental syncs can tell new, changed,
+    unchanged and removed sources apart without touching the vector DB.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.sources: Dict[str, Dict[str, Any]] = {}
+        if self.path.exists():
+            try:
+                self.sources = json.loads(self.path.read_text()).get("sources", {})
+            except (OSError, ValueError) as e:
+                logger.error(f"Ignoring unreadable knowledge manifest {self.path}: {e}")
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        return self.sources.get(url)
+
+    def set(self, url: str, entry: Dict[str, Any]):
+        self.sources[url] = entry
+
+    def remove(self, url: str):
+        self.sources.pop(url, None)
+
+    def clear(self):
+        self.sources = {}
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(json.dumps({"version": 1, "sources": self.sources}, indent=2))
+        os.replace(tmp, self.path)
+
+class KnowledgeIngestion:
+    """
+    Loads a ``PDFUrlKnowledgeBase`` through a streaming
+    download → parse → chunk → embed → upsert pipeline
+
+    ``AgentKnowledge.aload`` handles one URL at a time and one stage at a
+    time; here every stage has its own workers and bounded queue, so PDFs
+    download while earlier ones are being chunked and chunks are embedded
+    and written as soon as they exist. Blocking work (pypdf, chunking,
+    embedding, database writes) runs in worker threads.
+
+    With a ``manifest_path``, ``sync()`` refreshes the knowledge base
+    incrementally: only new or changed PDFs are re-ingested and the chunks
+    of changed or removed ones are deleted.
+    """
+
+    def __init__(
+        self,
+        knowledge_base: PDFUrlKnowledgeBase,
+        download_workers: int = 4,
+        parse_workers: int = 2,
+        chunk_workers: int = 4,
+        embed_workers: int = 4,
+        upsert_workers: int = 1,
+        embed_batch_size: int = 16,
+        upsert_batch_size: int = 64,
+        queue_size: int = 32,
+        progress_interval: float = 5.0,
+        manifest_path: Optional[str] = None,
+        max_retries: int = 3
+    ):
+        self.knowledge_base = knowledge_base
+        self.download_workers = download_workers
+        self.parse_workers = parse_workers
+        self.chunk_workers = chunk_workers
+        self.embed_workers = embed_workers
+        self.upsert_workers = upsert_workers
+        self.embed_batch_size = embed_batch_size
+        self.upsert_batch_size = upsert_batch_size
+        self.queue_size = queue_size
+        self.progress_interval = progress_interval
+        self.max_retries = max_retries
+        self.manifest = KnowledgeManifest(manifest_path) if manifest_path else None
+        self.last_stats: Optional[Dict[str, Any]] = None
+
+    def _sources(self, urls: Optional[List[Any]]) -> List[Tuple[str, Dict[str, Any]]]:
+        sources = []
+        items: List[Any] = urls if urls is not None else list(self.knowledge_base.urls or [])
+        for item in items:
+            url, metadata = (item["url"], item.get("metadata", {})) if isinstance(item, dict) else (item, {})
+            if self.knowledge_base._is_valid_url(url):
+                sources.append((url, metadata))
+        return sources
+
+    async def _fetch(self, client: httpx.AsyncClient, url: str, headers: Dict[str, str]) -> httpx.Response:
+        """GET with retries on network errors and 5xx; a 304 is returned as is"""
+        for attempt in range(self.max_retries):
+            try:
+                response = await client.get(url, headers=headers, follow_redirects=True)
+                if response.status_code < 500 or attempt == self.max_retries - 1:
+                    if response.status_code != 304:
+                        response.raise_for_status()
+                    return response
+            except httpx.RequestError:
+                if attempt == self.max_retries - 1:
+                    raise
+            await asyncio.sleep(2 ** attempt)
+        raise httpx.RequestError(f"Failed to fetch {url}")
+
+    def _build_stages(
+        self,
+        client: httpx.AsyncClient,
+        upsert: bool,
+        skip_existing: bool,
+        run: Dict[str, Any]
+    ) -> List[Stage]:
+        knowledge_base = self.knowledge_base
+        vector_db = knowledge_base.vector_db
+        if vector_db is None:
+            raise ValueError("Knowledge ingestion needs a vector_db")
+        reader = knowledge_base.reader
+        embedder = getattr(vector_db, "embedder", None)
+        use_upsert = upsert and vector_db.upsert_available()
+        incremental = run["incremental"]
+
+        async def download(source):
+            url, metadata = source
+            previous = self.manifest.get(url) if self.manifest else None
+            headers = {}
+            if incremental and previous:
+                if previous.get("etag"):
+                    headers["If-None-Match"] = previous["etag"]
+                if previous.get("last_modified"):
+                    headers["If-Modified-Since"] = previous["last_modified"]
+
+            response = await self._fetch(client, url, headers)
+            if response.status_code == 304:
+                run["unchanged"].append(url)
+                return None
+            data = response.content
+            entry = {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "content_hash": hashlib.sha256(data).hexdigest(),
+                # A full load may skip chunks that are already stored; keep owning them
+                "chunk_ids": list(previous.get("chunk_ids", [])) if previous and not incremental else []
+            }
+            if incremental and previous and previous.get("content_hash") == entry["content_hash"]:
+                # Same bytes behind new validators: keep the stored chunks
+                run["entries"][url] = {**previous, **{k: entry[k] for k in ("etag", "last_modified")}}
+                run["unchanged"].append(url)
+                return None
+            if incremental and previous:
+                run["chunks_deleted"] += await asyncio.to_thread(
+                    delete_chunks, vector_db, previous.get("chunk_ids", [])
+                )
+                run["updated"].append(url)
+            elif incremental:
+                run["added"].append(url)
+            run["entries"][url] = entry
+            return url, data, metadata
+
+        async def parse(downloaded):
+            return await asyncio.to_thread(parse_pdf, *downloaded)
+
+        def chunk_page(page: Document) -> List[Document]:
+            chunks = reader.chunk_document(page) if reader.chunk else [page]
+            for chunk in chunks:
+                knowledge_base._track_metadata_structure(chunk.meta_data)
+            return chunks
+
+        async def chunk(page):
+            return await asyncio.to_thread(chunk_page, page)
+
+        def embed_batch(documents: List[Document]) -> List[EmbeddedDocument]:
+            if skip_existing and not use_upsert:
+                documents = knowledge_base.filter_existing_documents(documents)
+            embedded = [EmbeddedDocument.from_document(doc) for doc in documents]
+            if embedder is not None and hasattr(embedder, "get_embeddings"):
+                # One request per batch instead of one per chunk
+                for doc, vector in zip(embedded, embedder.get_embeddings([doc.content for doc in embedded])):
+                    doc.embedding = vector
+            else:
+                for doc in embedded:
+                    doc.embed(embedder)
+            return embedded
+
+        async def embed(documents):
+            return await asyncio.to_thread(embed_batch, documents)
+
+        async def store(documents):
+            write = vector_db.upsert if use_upsert else vector_db.insert
+            await asyncio.to_thread(write, documents)
+            for doc in documents:
+                entry = run["entries"].get(doc.meta_data.get("url"))
+                if entry is not None:
+                    entry["chunk_ids"].append(stored_id(doc, use_upsert))
+            return documents
+
+        return [
+            Stage("download", download, workers=self.download_workers, queue_size=self.queue_size),
+            Stage("parse", parse, workers=self.parse_workers, queue_size=self.download_workers, fan_out=True),
+            Stage("chunk", chunk, workers=self.chunk_workers, queue_size=self.queue_size, fan_out=True),
+            Stage("embed", embed, workers=self.embed_workers, queue_size=self.queue_size * 4,
+                  fan_out=True, batch_size=self.embed_batch_size),
+            Stage("upsert", store, workers=self.upsert_workers, queue_size=self.queue_size * 4,
+                  fan_out=True, batch_size=self.upsert_batch_size)
+        ]
+
+    def _log_progress(self, stats: PipelineStats):
+        stages = {s.name: s for s in stats.stages}
+        rate = stats.completed / stats.elapsed if stats.elapsed else 0.0
+        logger.info(
+            f"📚 Ingestion: {stages['download'].items_out} PDFs downloaded, "
+            f"{stages['parse'].items_out} pages, {stages['chunk'].items_out} chunks, "
+            f"{stages['embed'].items_out} embedded, {stats.completed} stored ({rate:.1f} chunks/s)"
+        )
+
+    @staticmethod
+    def _failed_url(item: Any) -> Optional[str]:
+        """URL an item that failed in some stage came from"""
+        if isinstance(item, list):
+            item = item[0] if item else None
+        if isinstance(item, tuple):
+            return item[0]
+        if isinstance(item, Document):
+            return item.meta_data.get("url")
+        return None
+
+    async def _ingest(
+        self,
+        sources: List[Tuple[str, Dict[str, Any]]],
+        upsert: bool,
+        skip_existing: bool,
+        incremental: bool
+    ) -> Dict[str, Any]:
+        run: Dict[str, Any] = {
+            "incremental": incremental, "entries": {}, "added": [], "updated": [],
+            "unchanged": [], "failed": set(), "chunks_deleted": 0
+        }
+
+        def on_error(stage: str, item: Any, error: Exception):
+            url = self._failed_url(item)
+            if url:
+                run["failed"].add(url)
+
+        async with httpx.AsyncClient() as client:
+            pipeline = StagePipeline(
+                self._build_stages(client, upsert=upsert, skip_existing=skip_existing, run=run),
+                on_progress=self._log_progress,
+                progress_interval=self.progress_interval,
+                on_error=on_error
+            )
+            stats = await pipeline.run(sources)
+
+        if self.manifest is not None:
+            for url, entry in run["entries"].items():
+                if url in run["failed"]:
+                    # Forget the source so the next sync ingests it again from scratch
+                    entry = {**entry, "content_hash": None, "etag": None, "last_modified": None}
+                entry["chunk_ids"] = list(dict.fromkeys(entry["chunk_ids"]))
+                entry["chunks"] = len(entry["chunk_ids"])
+                entry["synced_at"] = datetime.now().isoformat()
+                self.manifest.set(url, entry)
+            self.manifest.save()
+
+        result = stats.to_dict()
+        result["failed"] = sorted(run["failed"])
+        if incremental:
+            result.update({
+                "added": run["added"],
+                "updated": run["updated"],
+                "unchanged": run["unchanged"],
+                "chunks_deleted": run["chunks_deleted"]
+            })
+        logger.info(f"✅ Knowledge ingestion finished: {stats.summary()} ({result['throughput_per_s']} chunks/s)")
+        return result
+
+    async def _prepare_collection(self, recreate: bool) -> bool:
+        vector_db = self.knowledge_base.vector_db
+        if vector_db is None:
+            logger.warning("No vector db provided")
+            return False
+        if recreate:
+            logger.info("🗑️ Dropping knowledge collection")
+            await vector_db.async_drop()
+            if self.manifest is not None:
+                self.manifest.clear()
+        if not await vector_db.async_exists():
+            logger.info("🆕 Creating knowledge collection")
+            await vector_db.async_create()
+        return True
+
+    async def run(
+        self,
+        urls: Optional[List[Any]] = None,
+        recreate: bool = False,
+        upsert: bool = False,
+        skip_existing: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Ingest ``urls`` (default: the knowledge base's own URLs)
+
+        Args:
+            urls: URLs or ``{"url": ..., "metadata": {...}}`` entries to load
+            recreate: Drop and recreate the vector collection first
+            upsert: Upsert instead of insert when the vector DB supports it
+            skip_existing: Skip chunks whose content is already stored (insert mode)
+
+        Returns:
+            Per-stage counts, utilization and throughput for the run
+        """
+        if not await self._prepare_collection(recreate):
+            return {}
+        sources = self._sources(urls)
+        logger.info(f"📚 Ingesting {len(sources)} PDFs")
+        self.last_stats = await self._ingest(
+            sources, upsert=upsert, skip_existing=skip_existing and not recreate, incremental=False
+        )
+        return self.last_stats
+
+    async def sync(self, urls: Optional[List[Any]] = None) -> Dict[str, Any]:
+        """
+        Bring the vector DB in line with ``urls`` at a cost proportional to the diff
+
+        Unchanged PDFs are detected with ETag / Last-Modified revalidation and,
+        failing that, by content hash. Changed PDFs have their old chunks
+        deleted before being re-ingested; chunks of URLs no longer listed are
+        deleted.
+
+        Args:
+            urls: Current source list (default: the knowledge base's own URLs)
+
+        Returns:
+            Pipeline stats plus ``added``, ``updated``, ``unchanged``,
+            ``removed`` and ``failed`` URLs and ``chunks_deleted``
+        """
+        if self.manifest is None:
+            raise ValueError("Incremental sync needs a manifest_path")
+        if not await self._prepare_collection(recreate=False):
+            return {}
+
+        vector_db = self.knowledge_base.vector_db
+        sources = self._sources(urls)
+        current = {url for url, _ in sources}
+        removed = [url for url in self.manifest.sources if url not in current]
+        removed_chunks = 0
+        for url in removed:
+            removed_chunks += await asyncio.to_thread(
+                delete_chunks, vector_db, (self.manifest.get(url) or {}).get("chunk_ids", [])
+            )
+            self.manifest.remove(url)
+
+        logger.info(f"🔄 Syncing {len(sources)} PDFs ({len(removed)} removed)")
+        result = await self._ingest(sources, upsert=False, skip_existing=False, incremental=True)
+        result["removed"] = removed
+        result["chunks_deleted"] += removed_chunks
+        logger.info(
+            f"🔄 Knowledge sync: {len(result['added'])} added, {len(result['updated'])} updated, "
+            f"{len(result['unchanged'])} unchanged, {len(removed)} removed, "
+            f"{result['chunks_deleted']} chunks deleted"
+        )
+        self.last_stats = result
+        return result
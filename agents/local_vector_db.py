@@ -0,0 +1,367 @@
+"""
+Embedded vector database for agent knowledge (no server required)
+"""
+
+import asyncio
+import hashlib
+import json
+import shutil
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from agno.document import Document
+from agno.embedder.base import Embedder
+from agno.utils.log import log_debug, log_info, logger
+from agno.vectordb.base import VectorDb
+from agno.vectordb.search import SearchType
+from utils.vector_index import BM25Index, VectorIndex
+
+class LocalVectorDb(VectorDb):
+    """
+    Drop-in ``VectorDb`` that keeps everything under ``data/<table_name>/``
+
+    Documents live in SQLite, vectors in a memory-mapped float32 matrix
+    (``VectorIndex``: exhaustive search for small sets, IVF for large ones)
+    and keywords in an in-memory BM25 index rebuilt on open. Search types and
+    the hybrid score mirror ``PgVector``: ``vector_score_weight`` times the
+    vector similarity plus the rest times the normalised keyword score.
+    """
+
+    def __init__(
+        self,
+        table_name: str,
+        embedder: Embedder,
+        path: str = "data",
+        search_type: SearchType = SearchType.vector,
+        vector_score_weight: float = 0.5,
+        prefix_match: bool = False,
+        ivf_threshold: int = 20000,
+        nprobe: int = 8
+    ):
+        if not 0 <= vector_score_weight <= 1:
+            raise ValueError("vector_score_weight must be between 0 and 1")
+        self.table_name = table_name
+        self.embedder = embedder
+        self.dimensions = embedder.dimensions
+        self.directory = Path(path) / table_name
+        self.search_type = search_type
+        self.vector_score_weight = vector_score_weight
+        self.prefix_match = prefix_match
+        self.ivf_threshold = ivf_threshold
+        self.nprobe = nprobe
+
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._vectors: Optional[VectorIndex] = None
+        self._keywords = BM25Index()
+
+    # Storage
+
+    def _open(self) -> Tuple[sqlite3.Connection, VectorIndex]:
+        """The document table and vector index, opened (and loaded) on first use"""
+        if self._conn is not None and self._vectors is not None:
+            return self._conn, self._vectors
+        with self._lock:
+            if self._conn is not None and self._vectors is not None:
+                return self._conn, self._vectors
+            if not self.dimensions:
+                raise ValueError(f"Embedder of {self.table_name} has no dimensions")
+            self.directory.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.directory / "documents.db", check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS documents ("
+                "row INTEGER PRIMARY KEY, id TEXT UNIQUE NOT NULL, name TEXT, content TEXT NOT NULL, "
+                "meta_data TEXT, usage TEXT, content_hash TEXT NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS documents_name ON documents (name)")
+            conn.execute("CREATE INDEX IF NOT EXISTS documents_hash ON documents (content_hash)")
+            conn.commit()
+
+            vectors = VectorIndex(
+                str(self.directory / "vectors.f32"),
+                dimensions=self.dimensions,
+                ivf_threshold=self.ivf_threshold,
+                nprobe=self.nprobe
+            )
+            rows = []
+            for row, content in conn.execute("SELECT row, content FROM documents"):
+                rows.append(row)
+                self._keywords.add(row, content)
+            vectors.restore(rows)
+            self._vectors = vectors
+            self._conn = conn
+            if rows:
+                log_debug(f"Loaded {len(rows)} documents from {self.directory}")
+            return conn, vectors
+
+    def create(self) -> None:
+        self._open()
+
+    async def async_create(self) -> None:
+        await asyncio.to_thread(self.create)
+
+    def exists(self) -> bool:
+        return (self.directory / "documents.db").exists()
+
+    async def async_exists(self) -> bool:
+        return self.exists()
+
+    def drop(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            self._vectors = None
+            self._keywords.clear()
+            if self.directory.exists():
+                shutil.rmtree(self.directory)
+                log_info(f"Dropped local vector store {self.directory}")
+
+    async def async_drop(self) -> None:
+        await asyncio.to_thread(self.drop)
+
+    def delete(self) -> bool:
+        conn, vectors = self._open()
+        with self._lock:
+            conn.execute("DELETE FROM documents")
+            conn.commit()
+            vectors.clear()
+            self._keywords.clear()
+        return True
+
+    def delete_by_ids(self, ids: List[str]) -> int:
+        """Delete documents by id; returns how many existed"""
+        conn, vectors = self._open()
+        deleted = 0
+        with self._lock:
+            for i in range(0, len(ids), 500):
+                part = ids[i:i + 500]
+                rows = conn.execute(
+                    f"SELECT row, content FROM documents WHERE id IN ({','.join('?' * len(part))})", part
+                ).fetchall()
+                for row, content in rows:
+                    self._keywords.remove(row, content)
+                vectors.remove([row for row, _ in rows])
+                conn.execute(f"DELETE FROM documents WHERE id IN ({','.join('?' * len(part))})", part)
+                deleted += len(rows)
+            conn.commit()
+        return deleted
+
+    def get_count(self) -> int:
+        conn, _ = self._open()
+        return conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def optimize(self) -> None:
+        """Build (or rebuild) the IVF index now instead of on the first large query"""
+        _, vectors = self._open()
+        if vectors.count >= self.ivf_threshold:
+            vectors.build_ivf()
+
+    # Lookups
+
+    @staticmethod
+    def _content_hash(content: str) -> str:
+        return hashlib.md5(content.replace("\x00", "\ufffd").encode()).hexdigest()
+
+    def _exists(self, column: str, value: str) -> bool:
+        conn, _ = self._open()
+        row = conn.execute(f"SELECT 1 FROM documents WHERE {column} = ? LIMIT 1", (value,)).fetchone()
+        return row is not None
+
+    def doc_exists(self, document: Document) -> bool:
+        return self._exists("content_hash", self._content_hash(document.content))
+
+    async def async_doc_exists(self, document: Document) -> bool:
+        return self.doc_exists(document)
+
+    def name_exists(self, name: str) -> bool:
+        return self._exists("name", name)
+
+    async def async_name_exists(self, name: str) -> bool:  # type: ignore[override]  # agno's base declares it sync
+        return self.name_exists(name)
+
+    def id_exists(self, id: str) -> bool:
+        return self._exists("id", id)
+
+    # Writes
+
+    def _write(self, documents: List[Document], filters: Optional[Dict[str, Any]], upsert: bool):
+        conn, vectors = self._open()
+        records: List[Tuple[str, Document, str, str, Dict[str, Any], List[float]]] = []
+        for doc in documents:
+            try:
+                doc.embed(embedder=self.embedder)
+            except Exception as e:
+                logger.error(f"Error embedding document '{doc.name}': {e}")
+                continue
+            if not doc.embedding or len(doc.embedding) != self.dimensions:
+                logger.error(f"Skipping document '{doc.name}': no valid embedding")
+                continue
+            content = doc.content.replace("\x00", "\ufffd")
+            content_hash = self._content_hash(doc.content)
+            meta_data = dict(doc.meta_data or {})
+            if filters:
+                meta_data.update(filters)
+            records.append((doc.id or content_hash, doc, content, content_hash, meta_data, doc.embedding))
+        if not records:
+            return
+
+        with self._lock:
+            ids = [record[0] for record in records]
+            if upsert:
+                self.delete_by_ids(ids)
+            else:
+                existing = {row[0] for row in conn.execute(
+                    f"SELECT id FROM documents WHERE id IN ({','.join('?' * len(ids))})", ids
+                )}
+                records = [record for record in records if record[0] not in existing]
+                if not records:
+                    return
+            rows = vectors.add([record[5] for record in records])
+            conn.executemany(
+                "INSERT INTO documents (row, id, name, content, meta_data, usage, content_hash) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (row, _id, doc.name, content, json.dumps(meta_data), json.dumps(doc.usage), content_hash)
+                    for row, (_id, doc, content, content_hash, meta_data, _) in zip(rows, records)
+                ]
+            )
+            conn.commit()
+            for row, (_, _, content, _, _, _) in zip(rows, records):
+                self._keywords.add(row, content)
+            vectors.flush()
+        log_info(f"{'Upserted' if upsert else 'Inserted'} {len(records)} documents into {self.table_name}")
+
+    def insert(self, documents: List[Document], filters: Optional[Dict[str, Any]] = None) -> None:
+        self._write(documents, filters, upsert=False)
+
+    async def async_insert(self, documents: List[Document], filters: Optional[Dict[str, Any]] = None) -> None:
+        await asyncio.to_thread(self.insert, documents, filters)
+
+    def upsert_available(self) -> bool:
+        return True
+
+    def upsert(self, documents: List[Document], filters: Optional[Dict[str, Any]] = None) -> None:
+        self._write(documents, filters, upsert=True)
+
+    async def async_upsert(self, documents: List[Document], filters: Optional[Dict[str, Any]] = None) -> None:
+        await asyncio.to_thread(self.upsert, documents, filters)
+
+    # Search
+
+    def _allowed_rows(self, filters: Optional[Dict[str, Any]]) -> Optional[Set[int]]:
+        if not filters:
+            return None
+        conn, _ = self._open()
+        allowed = set()
+        for row, meta_data in conn.execute("SELECT row, meta_data FROM documents"):
+            meta = json.loads(meta_data or "{}")
+            if all(meta.get(key) == value for key, value in filters.items()):
+                allowed.add(row)
+        return allowed
+
+    def _documents(self, scored: List[Tuple[int, float]]) -> List[Document]:
+        if not scored:
+            return []
+        conn, vectors = self._open()
+        rows = [row for row, _ in scored]
+        found = {
+            record[0]: record for record in conn.execute(
+                f"SELECT row, id, name, content, meta_data, usage FROM documents "
+                f"WHERE row IN ({','.join('?' * len(rows))})", rows
+            )
+        }
+        documents = []
+        for row, _ in scored:
+            record = found.get(row)
+            if record is None:
+                continue
+            _, _id, name, content, meta_data, usage = record
+            documents.append(Document(
+                id=_id,
+                name=name,
+                meta_data=json.loads(meta_data or "{}"),
+                content=content,
+                embedder=self.embedder,
+                embedding=vectors.vector(row),
+                usage=json.loads(usage) if usage else None
+            ))
+        return documents
+
+    def _embed_query(self, query: str) -> Optional[np.ndarray]:
+        embedding = self.embedder.get_embedding(query)
+        if not embedding:
+            logger.error(f"Error getting embedding for Query: {query}")
+            return None
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _vector_scores(self, embedding: np.ndarray, limit: int, allowed: Optional[Set[int]]) -> List[Tuple[int, float]]:
+        _, vectors = self._open()
+        mask = None
+        if allowed is not None:
+            mask = np.zeros(vectors.capacity, dtype=bool)
+            mask[list(allowed)] = True
+        return vectors.search(embedding, limit=limit, allowed=mask)
+
+    def vector_search(self, query: str, limit: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[Document]:
+        self._open()
+        embedding = self._embed_query(query)
+        if embedding is None:
+            return []
+        return self._documents(self._vector_scores(embedding, limit, self._allowed_rows(filters)))
+
+    def keyword_search(self, query: str, limit: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[Document]:
+        self._open()
+        scored = self._keywords.search(query, limit=limit, prefix_match=self.prefix_match,
+                                       allowed=self._allowed_rows(filters))
+        return self._documents(scored)
+
+    def hybrid_search(self, query: str, limit: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[Document]:
+        self._open()
+        embedding = self._embed_query(query)
+        if embedding is None:
+            return []
+        _, vectors = self._open()
+        allowed = self._allowed_rows(filters)
+        pool = max(limit * 4, 20)
+        vector_scores = dict(self._vector_scores(embedding, pool, allowed))
+        keyword_scores = dict(self._keywords.search(query, limit=pool, prefix_match=self.prefix_match,
+                                                    allowed=allowed))
+        top_keyword = max(keyword_scores.values(), default=0.0) or 1.0
+
+        combined = {}
+        for row in set(vector_scores) | set(keyword_scores):
+            similarity = vector_scores.get(row)
+            if similarity is None:
+                similarity = float(np.dot(vectors.vector(row), embedding))
+            # Same shape as PgVector: 1 / (1 + cosine distance)
+            vector_score = 1 / (2 - similarity)
+            keyword_score = keyword_scores.get(row, 0.0) / top_keyword
+            combined[row] = self.vector_score_weight * vector_score + (1 - self.vector_score_weight) * keyword_score
+        ranked = sorted(combined.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return self._documents(ranked)
+
+    def search(self, query: str, limit: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[Document]:
+        if self.search_type == SearchType.vector:
+            return self.vector_search(query=query, limit=limit, filters=filters)
+        if self.search_type == SearchType.keyword:
+            return self.keyword_search(query=query, limit=limit, filters=filters)
+        if self.search_type == SearchType.hybrid:
+            return self.hybrid_search(query=query, limit=limit, filters=filters)
+        logger.error(f"Invalid search type '{self.search_type}'.")
+        return []
+
+    async def async_search(
+        self, query: str, limit: int = 5, filters: Optional[Dict[str, Any]] = None
+    ) -> List[Document]:
+        return await asyncio.to_thread(self.search, query, limit, filters)
+
+    def __deepcopy__(self, memo):
+        # Agent copies share the store and its open files
+        return self
@@ -0,0 +1,113 @@
+"""
+YFinance tools served from the prefetched watchlist store
+"""
+
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from agno.tools.yfinance import YFinanceTools
+from utils.market_store import KIND_METHODS, MarketDataStore, MarketEntry, WatchlistPrefetcher
+from .settings import (
+    WATCHLIST, WATCHLIST_DB, WATCHLIST_KINDS, WATCHLIST_MAX_AGE, WATCHLIST_REFRESH_INTERVAL
+)
+
+# Freshness of the market data read while answering the current request (see ``track_market_reads``)
+market_reads: ContextVar[Optional[List[Dict[str, Any]]]] = ContextVar("market_reads", default=None)
+
+def track_market_reads() -> List[Dict[str, Any]]:
+    """Start collecting the freshness of every market data read in the current context"""
+    reads: List[Dict[str, Any]] = []
+    market_reads.set(reads)
+    return reads
+
+class WatchlistYFinanceTools(YFinanceTools):
+    """
+    ``YFinanceTools`` whose price, company info, recommendations and news
+    come from ``store`` while the stored entry is fresh, and from YFinance
+    otherwise
+
+    Answers from the store tell the model when the data was fetched. Every
+    read is recorded in ``market_reads`` with its source and age.
+    """
+
+    def __init__(self, store: MarketDataStore, **kwargs):
+        super().__init__(**kwargs)
+        self.store = store
+
+    def live(self, kind: str, symbol: str) -> str:
+        """Tool output straight from YFinance"""
+        return getattr(super(), KIND_METHODS[kind])(symbol)
+
+    def read(self, kind: str, symbol: str) -> Tuple[str, Optional[MarketEntry]]:
+        """Tool output and the store entry it came from (None when fetched live)"""
+        entry = self.store.get(symbol, kind)
+        payload = entry.payload if entry else self.live(kind, symbol)
+        reads = market_reads.get()
+        if reads is not None:
+            reads.append(entry.freshness() if entry else {"symbol": symbol.upper(), "kind": kind, "source": "live"})
+        return payload, entry
+
+    def fetch(self, kind: str, symbol: str) -> str:
+        return self.read(kind, symbol)[0]
+
+    def _answer(self, kind: str, symbol: str) -> str:
+        payload, entry = self.read(kind, symbol)
+        if entry is None:
+            return payload
+        return f"{payload}\n\n(Données de la watchlist du {entry.freshness()['fetched_at']}, il y a {entry.age:.0f}s)"
+
+    def get_current_stock_price(self, symbol: str) -> str:
+        """
+        Use this function to get the current stock price for a given symbol.
+
+        Args:
+            symbol (str): The stock symbol.
+
+        Returns:
+            str: The current stock price or error message.
+        """
+        return self._answer("price", symbol)
+
+    def get_company_info(self, symbol: str) -> str:
+        """Use this function to get company information and overview for a given stock symbol.
+
+        Args:
+            symbol (str): The stock symbol.
+
+        Returns:
+            str: JSON containing company profile and overview.
+        """
+        return self._answer("info", symbol)
+
+    def get_analyst_recommendations(self, symbol: str) -> str:
+        """Use this function to get analyst recommendations for a given stock symbol.
+
+        Args:
+            symbol (str): The stock symbol.
+
+        Returns:
+            str: JSON containing analyst recommendations.
+        """
+        return self._answer("recommendations", symbol)
+
+    def get_company_news(self, symbol: str, num_stories: int = 3) -> str:
+        """Use this function to get company news and press releases for a given stock symbol.
+
+        Args:
+            symbol (str): The stock symbol.
+            num_stories (int): The number of news stories to return. Defaults to 3.
+
+        Returns:
+            str: JSON containing company news and press releases.
+        """
+        if num_stories != 3:  # The watchlist keeps the default three stories
+            return super().get_company_news(symbol, num_stories)
+        return self._answer("news", symbol)
+
+def build_prefetcher(tools: WatchlistYFinanceTools, symbols: Sequence[str] = WATCHLIST,
+                     kinds: Sequence[str] = WATCHLIST_KINDS) -> WatchlistPrefetcher:
+    """Prefetcher keeping ``symbols`` fresh in ``tools.store``, fetching live through ``tools``"""
+    return WatchlistPrefetcher(tools.store, tools.live, symbols, kinds, interval=WATCHLIST_REFRESH_INTERVAL)
+
+# Local store of the watchlist's market data, shared by FinanceAgent and the finance fast path
+market_store = MarketDataStore(WATCHLIST_DB, max_age=WATCHLIST_MAX_AGE)
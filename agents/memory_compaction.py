@@ -0,0 +1,228 @@
+"""
+Bounded user memories: query-time ranking and periodic compaction
+"""
+
+import asyncio
+import logging
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from agno.memory.v2.memory import Memory
+from agno.memory.v2.schema import UserMemory
+from agno.models.base import Model
+from agno.models.message import Message
+from utils.memory_compaction import group_near_duplicates, rank_by_relevance, select_within_budget
+from utils.tokens import estimate_tokens, estimate_total_tokens
+
+logger = logging.getLogger(__name__)
+
+# The message being answered; set around a run so memories can be ranked against it
+current_query: ContextVar[Optional[str]] = ContextVar("current_query", default=None)
+
+def _timestamp(memory: UserMemory) -> float:
+    return memory.last_updated.timestamp() if memory.last_updated else 0.0
+
+class RankedMemory(Memory):
+    """
+    ``Memory`` that injects only the memories relevant to the current message
+
+    While ``current_query`` is set (see ``WhatsAppAgent.handle_message``),
+    ``get_user_memories`` - which the agent calls to build its system prompt -
+    returns the memories most relevant to the query that fit in
+    ``prompt_budget_tokens``, instead of all of them. Outside a run every
+    memory is returned, as before. The tokens kept out of prompts are counted.
+    """
+
+    def __init__(self, *args, prompt_budget_tokens: int = 300, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prompt_budget_tokens = prompt_budget_tokens
+        self.prompts = 0
+        self.prompt_tokens_full = 0
+        self.prompt_tokens_used = 0
+
+    def get_user_memories(self, user_id: Optional[str] = None, refresh_from_db: bool = True) -> List[UserMemory]:
+        memories = super().get_user_memories(user_id=user_id, refresh_from_db=refresh_from_db)
+        query = current_query.get()
+        if query is None or not memories:
+            return memories
+
+        texts = [memory.memory for memory in memories]
+        order = rank_by_relevance(query, texts, recency=[_timestamp(memory) for memory in memories])
+        selected = select_within_budget(order, texts, self.prompt_budget_tokens)
+        self.prompts += 1
+        self.prompt_tokens_full += estimate_total_tokens(texts)
+        self.prompt_tokens_used += estimate_total_tokens(texts[i] for i in selected)
+        return [memories[i] for i in selected]
+
+    def prompt_stats(self) -> Dict[str, Any]:
+        saved = self.prompt_tokens_full - self.prompt_tokens_used
+        return {
+            "prompts": self.prompts,
+            "prompt_budget_tokens": self.prompt_budget_tokens,
+            "memory_tokens_available": self.prompt_tokens_full,
+            "memory_tokens_injected": self.prompt_tokens_used,
+            "memory_tokens_saved": saved,
+            "saved_per_prompt": round(saved / self.prompts, 1) if self.prompts else 0.0
+        }
+
+class MemoryCompactor:
+    """
+    Keeps every user's stored memories within ``budget_tokens``
+
+    A pass first merges near-duplicate memories into the newest of each group.
+    If a user is still over budget, the newest memories filling
+    ``keep_ratio`` of the budget are kept as they are and the older ones are
+    condensed into a few facts: by ``model`` when given, otherwise by
+    concatenating them into one truncated "Earlier" memory.
+    """
+
+    def __init__(
+        self,
+        memory: Memory,
+        budget_tokens: int = 1200,
+        keep_ratio: float = 0.6,
+        duplicate_threshold: float = 0.8,
+        model: Optional[Model] = None,
+        interval: float = 3600.0
+    ):
+        self.memory = memory
+        self.budget_tokens = budget_tokens
+        self.keep_ratio = keep_ratio
+        self.duplicate_threshold = duplicate_threshold
+        self.model = model
+        self.interval = interval
+
+        self.passes = 0
+        self.users_compacted = 0
+        self.tokens_before = 0
+        self.tokens_after = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def _summarize(self, texts: List[str], budget_tokens: int) -> List[str]:
+        if self.model is not None:
+            try:
+                response = self.model.response(messages=[
+                    Message(role="system", content=(
+                        "You merge facts remembered about a user. Keep what is still useful for future "
+                        "conversations, drop duplicates and anything superseded. Answer with one short fact "
+                        f"per line, no numbering, at most {max(1, budget_tokens // 20)} lines."
+                    )),
+                    Message(role="user", content="\n".join(f"- {text}" for text in texts))
+                ])
+                facts = [line.strip(" -*•\t") for line in (response.content or "").splitlines()]
+                facts = [fact for fact in facts if fact]
+                if facts:
+                    kept = select_within_budget(range(len(facts)), facts, budget_tokens)
+                    return [facts[i] for i in kept]
+            except Exception as e:
+                logger.warning(f"Memory summarization failed, merging instead: {e}")
+        merged = "Earlier: " + "; ".join(texts)
+        limit = budget_tokens * 4
+        return [merged if len(merged) <= limit else merged[:limit - 1].rstrip() + "…"]
+
+    def compact_user(self, user_id: str) -> Dict[str, Any]:
+        """Compact one user's memories; returns counts and token estimates before and after"""
+        memories = sorted(self.memory.get_user_memories(user_id=user_id), key=_timestamp)
+        before_tokens = estimate_total_tokens(m.memory for m in memories)
+        result: Dict[str, Any] = {"user_id": user_id, "memories_before": len(memories), "tokens_before": before_tokens}
+        removed: List[UserMemory] = []
+        added: List[UserMemory] = []
+        updated: List[UserMemory] = []
+
+        # Near-duplicates collapse into their newest member (memories are sorted oldest first)
+        for group in group_near_duplicates([m.memory for m in memories], self.duplicate_threshold):
+            if len(group) > 1:
+                newest = memories[group[-1]]
+                topics = sorted({topic for i in group for topic in (memories[i].topics or [])})
+                if topics and topics != sorted(newest.topics or []):
+                    newest.topics = topics
+                    updated.append(newest)
+                removed.extend(memories[i] for i in group[:-1])
+        duplicates = len(removed)
+        remaining = [m for m in memories if m not in removed]
+
+        if estimate_total_tokens(m.memory for m in remaining) > self.budget_tokens:
+            keep_budget = int(self.budget_tokens * self.keep_ratio)
+            kept, used = [], 0
+            for memory in reversed(remaining):
+                cost = estimate_tokens(memory.memory)
+                if used + cost > keep_budget:
+                    break
+                kept.append(memory)
+                used += cost
+            older = [m for m in remaining if m not in kept]
+            if older:
+                removed.extend(older)
+                topics = sorted({topic for m in older for topic in (m.topics or [])})
+                for fact in self._summarize([m.memory for m in older], self.budget_tokens - used):
+                    added.append(UserMemory(memory=fact, topics=topics or None, last_updated=datetime.now()))
+                remaining = kept
+
+        for memory in removed:
+            if memory.memory_id is not None:
+                self.memory.delete_user_memory(memory.memory_id, user_id=user_id, refresh_from_db=False)
+        for memory in added:
+            self.memory.add_user_memory(memory, user_id=user_id, refresh_from_db=False)
+        for memory in updated:
+            if memory in remaining and memory.memory_id is not None:
+                self.memory.replace_user_memory(memory.memory_id, memory, user_id=user_id, refresh_from_db=False)
+
+        after = remaining + added
+        result.update({
+            "memories_after": len(after),
+            "tokens_after": estimate_total_tokens(m.memory for m in after),
+            "merged_duplicates": duplicates,
+            "summarized": len(added)
+        })
+        if removed:
+            self.users_compacted += 1
+            logger.info(
+                f"🗜️ Compacted memories of {user_id}: {result['memories_before']} → {result['memories_after']} "
+                f"memories, ~{before_tokens} → ~{result['tokens_after']} tokens"
+            )
+        self.tokens_before += before_tokens
+        self.tokens_after += result["tokens_after"]
+        return result
+
+    def compact_all(self) -> List[Dict[str, Any]]:
+        """One compaction pass over every user with stored memories"""
+        self.passes += 1
+        rows = self.memory.db.read_memories() if self.memory.db else []
+        user_ids = sorted({row.user_id for row in rows if row.user_id is not None})
+        results = []
+        for user_id in user_ids:
+            try:
+                results.append(self.compact_user(user_id))
+            except Exception as e:
+                logger.error(f"❌ Memory compaction failed for {user_id}: {e}")
+        return results
+
+    async def _compact_periodically(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await asyncio.to_thread(self.compact_all)
+
+    def start(self):
+        """Run a compaction pass every ``interval`` seconds on the running event loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._compact_periodically())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "passes": self.passes,
+            "users_compacted": self.users_compacted,
+            "budget_tokens": self.budget_tokens,
+            "stored_tokens_before": self.tokens_before,
+            "stored_tokens_after": self.tokens_after,
+            "stored_tokens_saved": self.tokens_before - self.tokens_after
+        }
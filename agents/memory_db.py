@@ -0,0 +1,345 @@
+"""
+SQLite user-memory store with a write-behind thread, a read pool and a per-user cache
+"""
+
+import ast
+import atexit
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from agno.memory.v2.db.base import MemoryDb
+from agno.memory.v2.db.schema import MemoryRow
+
+logger = logging.getLogger(__name__)
+
+def _timestamp() -> str:
+    # Same format and timezone as SQLite's CURRENT_TIMESTAMP (used by agno's SqliteMemoryDb)
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+def _parse_memory(value: str) -> Dict[str, Any]:
+    # Rows are written as a Python dict repr, like agno's SqliteMemoryDb, so both classes read the same file
+    try:
+        return ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return json.loads(value)
+
+class CachedSqliteMemoryDb(MemoryDb):
+    """
+    Drop-in replacement for agno's ``SqliteMemoryDb`` tuned for many short turns
+
+    - WAL journal, so readers never wait for the writer
+    - Writes return immediately and are committed by one writer thread in
+      batches of up to ``batch_size`` (one transaction per batch)
+    - Reads use a pool of ``read_connections`` connections and an index on
+      ``(user_id, created_at)``
+    - The memories of the ``cache_users`` most recently active users are kept
+      in an LRU and updated on every write, so a turn normally reads nothing
+      from disk
+
+    Reads of a user with writes still in flight wait for them to commit, so
+    callers always see their own writes. The file is opened (and the schema
+    created) on first use, not on construction. Uses the same table layout as
+    ``SqliteMemoryDb``; existing memory files keep working.
+    """
+
+    def __init__(
+        self,
+        table_name: str = "memory",
+        db_file: str = "data/memory.db",
+        read_connections: int = 4,
+        cache_users: int = 1024,
+        batch_size: int = 64,
+        batch_wait: float = 0.01
+    ):
+        self.table_name = table_name
+        self.db_file = db_file
+        self.cache_users = cache_users
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.read_connections = read_connections
+
+        self.reads = 0
+        self.cache_hits = 0
+        self.writes = 0
+        self.commits = 0
+
+        self._cache: "OrderedDict[str, Dict[str, Tuple[str, MemoryRow]]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        # Writes queued but not committed yet, and writes ever queued, per user (None: owner unknown)
+        self._dirty: Counter = Counter()
+        self._generation: Counter = Counter()
+        self._dirty_lock = threading.Lock()
+        self._writes: "queue.Queue[Any]" = queue.Queue()
+
+        self._readers: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._writer_conn: Optional[sqlite3.Connection] = None
+        self._open_lock = threading.Lock()
+
+    def _open(self) -> sqlite3.Connection:
+        """Connect, create the schema and start the writer thread on first use"""
+        if self._writer_conn is not None:
+            return self._writer_conn
+        with self._open_lock:
+            if self._writer_conn is None:
+                Path(self.db_file).parent.mkdir(parents=True, exist_ok=True)
+                conn = self._connect()
+                self._create_schema(conn)
+                for _ in range(self.read_connections):
+                    self._readers.put(self._connect())
+                self._writer = threading.Thread(
+                    target=self._write_loop, args=(conn,), name=f"memory-writer-{self.table_name}", daemon=True
+                )
+                self._writer.start()
+                atexit.register(self.close)
+                self._writer_conn = conn
+            return self._writer_conn
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_file, check_same_thread=False, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def _reader(self) -> Iterator[sqlite3.Connection]:
+        self._open()
+        conn = self._readers.get()
+        try:
+            yield conn
+        finally:
+            self._readers.put(conn)
+
+    # Schema
+
+    def create(self) -> None:
+        self._open()
+
+    def _create_schema(self, conn: sqlite3.Connection):
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.table_name} ("
+            "id VARCHAR NOT NULL PRIMARY KEY, user_id VARCHAR, memory VARCHAR, "
+            "created_at DATETIME DEFAULT (CURRENT_TIMESTAMP), updated_at DATETIME DEFAULT (CURRENT_TIMESTAMP))"
+        )
+        conn.execute(f"CREATE INDEX IF NOT EXISTS ix_{self.table_name}_user_id ON {self.table_name} (user_id)")
+        conn.execute(
+            f"CREATE INDEX IF NOT EXISTS ix_{self.table_name}_user_created ON {self.table_name} (user_id, created_at)"
+        )
+        conn.commit()
+
+    def table_exists(self) -> bool:
+        with self._reader() as conn:
+            row = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (self.table_name,)
+            ).fetchone()
+        return row is not None
+
+    def drop_table(self) -> None:
+        self._run_exclusive(f"DROP TABLE IF EXISTS {self.table_name}")
+
+    def clear(self) -> bool:
+        self._run_exclusive(f"DELETE FROM {self.table_name}")
+        return True
+
+    def _run_exclusive(self, statement: str):
+        self._open()
+        self._writes.put(("sql", None, statement))
+        self.flush()
+        with self._cache_lock:
+            self._cache.clear()
+
+    # Writer
+
+    def _mark(self, user_id: Optional[str], delta: int):
+        with self._dirty_lock:
+            if delta > 0:
+                self._generation[user_id] += 1
+            self._dirty[user_id] += delta
+            if self._dirty[user_id] <= 0:
+                del self._dirty[user_id]
+
+    def _write_loop(self, conn: sqlite3.Connection):
+        while True:
+            op = self._writes.get()
+            if op is None:
+                return
+            batch = [op]
+            deadline = time.monotonic() + self.batch_wait
+            while len(batch) < self.batch_size and not isinstance(batch[-1], threading.Event):
+                try:
+                    op = self._writes.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if op is None:
+                    self._writes.put(None)
+                    break
+                batch.append(op)
+            self._commit(conn, batch)
+
+    def _commit(self, conn: sqlite3.Connection, batch: List[Any]):
+        writes = [op for op in batch if isinstance(op, tuple)]
+        if writes:
+            try:
+                with conn:
+                    for kind, user_id, args in writes:
+                        if kind == "sql":
+                            conn.execute(args)
+                            continue
+                        if kind == "upsert":
+                            conn.execute(
+                                f"INSERT INTO {self.table_name} (id, user_id, memory, created_at, updated_at) "
+                                "VALUES (?, ?, ?, ?, ?) ON CONFLICT(id) DO UPDATE SET user_id = excluded.user_id, "
+                                "memory = excluded.memory, updated_at = excluded.updated_at",
+                                args
+                            )
+                        else:
+                            conn.execute(f"DELETE FROM {self.table_name} WHERE id = ?", args)
+                self.commits += 1
+                self.writes += len(writes)
+            except sqlite3.Error as e:
+                logger.error(f"❌ Failed to commit {len(writes)} memory writes: {e}")
+            finally:
+                for kind, user_id, _ in writes:
+                    if kind != "sql":
+                        self._mark(user_id, -1)
+        for op in batch:
+            if isinstance(op, threading.Event):
+                op.set()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until every write queued so far is committed"""
+        if self._writer is None:
+            return True
+        if not self._writer.is_alive():
+            return False
+        done = threading.Event()
+        self._writes.put(done)
+        return done.wait(timeout)
+
+    def close(self):
+        """Commit pending writes and stop the writer thread"""
+        if self._writer is not None and self._writer.is_alive():
+            self.flush()
+            self._writes.put(None)
+            self._writer.join()
+
+    # Cache
+
+    def _cached_user(self, user_id: str) -> Optional[Dict[str, Tuple[str, MemoryRow]]]:
+        with self._cache_lock:
+            entries = self._cache.get(user_id)
+            if entries is not None:
+                self._cache.move_to_end(user_id)
+            return entries
+
+    def _cache_user(self, user_id: str, entries: Dict[str, Tuple[str, MemoryRow]]):
+        with self._cache_lock:
+            self._cache[user_id] = entries
+            self._cache.move_to_end(user_id)
+            while len(self._cache) > self.cache_users:
+                self._cache.popitem(last=False)
+
+    @staticmethod
+    def _row(record: Tuple[str, str, str, str, str]) -> Tuple[str, MemoryRow]:
+        memory_id, user_id, memory, created_at, updated_at = record
+        stamp = updated_at or created_at
+        return created_at or "", MemoryRow(
+            id=memory_id,
+            user_id=user_id,
+            memory=_parse_memory(memory),
+            last_updated=datetime.fromisoformat(stamp) if stamp else None
+        )
+
+    @staticmethod
+    def _copy(row: MemoryRow) -> MemoryRow:
+        # Memory.refresh_from_db mutates the dict it is given (UserMemory.from_dict)
+        return MemoryRow(id=row.id, user_id=row.user_id, memory=dict(row.memory), last_updated=row.last_updated)
+
+    # MemoryDb API
+
+    def memory_exists(self, memory: MemoryRow) -> bool:
+        if self._dirty:
+            self.flush()
+        with self._reader() as conn:
+            row = conn.execute(f"SELECT 1 FROM {self.table_name} WHERE id = ?", (memory.id,)).fetchone()
+        return row is not None
+
+    def read_memories(
+        self, user_id: Optional[str] = None, limit: Optional[int] = None, sort: Optional[str] = None
+    ) -> List[MemoryRow]:
+        self.reads += 1
+        entries = self._cached_user(user_id) if user_id is not None else None
+        if entries is not None:
+            self.cache_hits += 1
+        else:
+            with self._dirty_lock:
+                pending = self._dirty[user_id] + self._dirty[None] if user_id is not None else sum(self._dirty.values())
+                generation = self._generation[user_id] + self._generation[None]
+            if pending:
+                self.flush()
+            columns = "id, user_id, memory, created_at, updated_at"
+            with self._reader() as conn:
+                if user_id is None:
+                    records = conn.execute(f"SELECT {columns} FROM {self.table_name}").fetchall()
+                else:
+                    records = conn.execute(
+                        f"SELECT {columns} FROM {self.table_name} WHERE user_id = ?", (user_id,)
+                    ).fetchall()
+            entries = {record[0]: self._row(record) for record in records}
+            with self._dirty_lock:
+                # A write queued while we were reading would be missing from these rows
+                unchanged = generation == self._generation[user_id] + self._generation[None]
+            if user_id is not None and unchanged:
+                self._cache_user(user_id, entries)
+
+        ordered = sorted(entries.values(), key=lambda item: item[0], reverse=sort != "asc")
+        if limit is not None:
+            ordered = ordered[:limit]
+        return [self._copy(row) for _, row in ordered]
+
+    def upsert_memory(self, memory: MemoryRow) -> Optional[MemoryRow]:
+        now = _timestamp()
+        created_at = now
+        with self._cache_lock:
+            entries = self._cache.get(memory.user_id) if memory.user_id is not None else None
+            if entries is not None and memory.id is not None:
+                previous = entries.get(memory.id)
+                created_at = previous[0] if previous else now
+                entries[memory.id] = (created_at, self._copy(memory))
+        self._open()
+        self._mark(memory.user_id, 1)
+        self._writes.put(("upsert", memory.user_id, (memory.id, memory.user_id, str(memory.memory), created_at, now)))
+        return memory
+
+    def delete_memory(self, memory_id: str) -> None:
+        owner = None
+        with self._cache_lock:
+            for user_id, entries in self._cache.items():
+                if entries.pop(memory_id, None) is not None:
+                    owner = user_id
+                    break
+        self._open()
+        self._mark(owner, 1)
+        self._writes.put(("delete", owner, (memory_id,)))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "db_file": self.db_file,
+            "cached_users": len(self._cache),
+            "reads": self.reads,
+            "cache_hits": self.cache_hits,
+            "hit_rate": round(self.cache_hits / self.reads, 3) if self.reads else 0.0,
+            "writes": self.writes,
+            "commits": self.commits,
+            "avg_batch_size": round(self.writes / self.commits, 2) if self.commits else 0.0,
+            "pending_writes": self._writes.qsize()
+        }
@@ -0,0 +1,77 @@
+"""
+Python tools for CodeAgent backed by the warm worker pool
+"""
+
+import logging
+from pathlib import Path
+from typing import Callable, Optional
+
+from agno.tools import Toolkit
+from utils.python_workers import PythonWorkerPool
+from .settings import (
+    CODE_CPU_SECONDS, CODE_MAX_OUTPUT_CHARS, CODE_MEMORY_MB, CODE_PRELOAD, CODE_TIMEOUT, CODE_WORKDIR, CODE_WORKERS
+)
+
+logger = logging.getLogger(__name__)
+
+class WarmPythonTools(Toolkit):
+    """
+    Drop-in replacement for agno's ``PythonTools`` (same tool names)
+
+    Code runs in a ``PythonWorkerPool`` process instead of the API process,
+    so imports are already warm, a crash or an endless loop only costs that
+    worker, and limits are enforced. Output is passed to ``output_handler``
+    (chunk by chunk, as it is printed) and returned to the model with the
+    requested variable or the error.
+    """
+
+    def __init__(self, pool: PythonWorkerPool, output_handler: Optional[Callable[[str], None]] = None, **kwargs):
+        self.pool = pool
+        self.output_handler = output_handler
+        super().__init__(name="python_tools", tools=[self.save_to_file_and_run, self.run_python_code], **kwargs)
+
+    def _run(self, code: str, variable_to_return: Optional[str], file_name: Optional[str] = None) -> str:
+        result = self.pool.run(code, variable_to_return=variable_to_return, file_name=file_name,
+                               on_output=self.output_handler)
+        status = "✅" if result.ok else "❌"
+        logger.info(f"{status} Python run in {result.duration:.2f}s ({len(result.output)} chars of output)")
+        return result.as_text()
+
+    def save_to_file_and_run(
+        self, file_name: str, code: str, variable_to_return: Optional[str] = None, overwrite: bool = True
+    ) -> str:
+        """This function saves Python code to a file called `file_name` and then runs it.
+        Returns what the code printed, then the value of `variable_to_return` if provided, or the error.
+
+        Make sure the file_name ends with `.py`
+
+        :param file_name: The name of the file the code will be saved to.
+        :param code: The code to save and run.
+        :param variable_to_return: The variable to return.
+        :param overwrite: Overwrite the file if it already exists.
+        :return: The printed output and the value of `variable_to_return`, or an error message.
+        """
+        if not overwrite and Path(self.pool.workdir, file_name).exists():
+            return f"File {file_name} already exists"
+        return self._run(code, variable_to_return, file_name=file_name)
+
+    def run_python_code(self, code: str, variable_to_return: Optional[str] = None) -> str:
+        """This function runs Python code (numpy and pandas are already imported and fast to import).
+        Returns what the code printed, then the value of `variable_to_return` if provided, or the error.
+
+        :param code: The code to run.
+        :param variable_to_return: The variable to return.
+        :return: The printed output and the value of `variable_to_return`, or an error message.
+        """
+        return self._run(code, variable_to_return)
+
+# Workers shared by every CodeAgent run; started at API startup or on first use
+code_workers = PythonWorkerPool(
+    size=CODE_WORKERS,
+    workdir=CODE_WORKDIR,
+    preload=CODE_PRELOAD,
+    timeout=CODE_TIMEOUT,
+    cpu_seconds=CODE_CPU_SECONDS,
+    memory_mb=CODE_MEMORY_MB,
+    max_output_chars=CODE_MAX_OUTPUT_CHARS
+)
@@ -0,0 +1,107 @@
+"""
+Intent router for /agents/auto/chat: picks a specialist agent without the team leader
+"""
+
+import logging
+from typing import Callable, Dict, List, Optional
+
+from utils.intent_router import IntentRouter
+from utils.ollama_pool import ollama_pool
+from .code import code_agent
+from .embedder import CachedOllamaEmbedder
+from .finance import finance_agent
+from .general import general_agent
+from .search import search_agent
+from .settings import (
+    OLLAMA_HOST, ROUTER_EMBED_MODEL, ROUTER_LLM_FALLBACK, ROUTER_LLM_MODEL, ROUTER_MIN_SIMILARITY
+)
+from .system import system_agent
+
+logger = logging.getLogger(__name__)
+
+ROUTED_AGENTS = {
+    "general": general_agent,
+    "search": search_agent,
+    "finance": finance_agent,
+    "code": code_agent,
+    "system": system_agent
+}
+
+# Typical requests per agent, embedded with the agent's description and first instructions
+ROUTE_EXAMPLES: Dict[str, List[str]] = {
+    "general": [
+        "Explique-moi un concept simplement",
+        "Donne-moi des conseils pour mieux dormir",
+        "Traduis cette phrase en anglais",
+        "Quelle est la capitale de l'Australie ?",
+    ],
+    "search": [
+        "Quelles sont les dernières nouvelles sur ce sujet ?",
+        "Trouve des informations récentes sur le web",
+        "Qui a gagné le match hier soir ?",
+        "What happened today in the news?",
+    ],
+    "finance": [
+        "Quel est le cours de l'action Apple ?",
+        "Compare les ratios financiers de deux entreprises",
+        "Donne-moi les recommandations des analystes pour TSLA",
+        "What is Microsoft's market cap?",
+    ],
+    "code": [
+        "Écris une fonction Python qui trie une liste",
+        "Calcule la somme des carrés de 1 à 100",
+        "Corrige ce bug dans mon script",
+        "Write a program that counts words in a text",
+    ],
+    "system": [
+        "Combien d'espace disque reste-t-il ?",
+        "Liste les fichiers du répertoire courant",
+        "Quels processus utilisent le plus de CPU ?",
+        "Show the system uptime and memory usage",
+    ],
+}
+
+def agent_profiles() -> Dict[str, List[str]]:
+    """Texts describing each routed agent"""
+    profiles = {}
+    for agent_id, agent in ROUTED_AGENTS.items():
+        instructions = agent.instructions if isinstance(agent.instructions, list) else []
+        profiles[agent_id] = [agent.description or "", " ".join(instructions[:2])] + ROUTE_EXAMPLES[agent_id]
+    return profiles
+
+def llm_classifier(client, model: str) -> Callable[[str, List[str]], Optional[str]]:
+    """Asks ``model`` for a one-word agent id; None when it fails or answers something else"""
+    def classify(message: str, agent_ids: List[str]) -> Optional[str]:
+        try:
+            response = client.chat(
+                model=model,
+                messages=[
+                    {"role": "system", "content": (
+                        f"Classe la demande de l'utilisateur. Réponds par un seul mot parmi: {', '.join(agent_ids)}. "
+                        "finance = bourse et actions, search = actualités et recherche web, code = programmation "
+                        "et calculs, system = commandes et fichiers de la machine, general = tout le reste."
+                    )},
+                    {"role": "user", "content": message}
+                ],
+                options={"temperature": 0, "num_predict": 8}
+            )
+            answer = response["message"]["content"].lower()
+        except Exception as e:
+            logger.warning(f"⚠️ Router fallback {model} failed: {e}")
+            return None
+        return next((agent_id for agent_id in agent_ids if agent_id in answer), None)
+    return classify
+
+def build_router(client=None, host: str = OLLAMA_HOST, llm_fallback: bool = ROUTER_LLM_FALLBACK) -> IntentRouter:
+    """``IntentRouter`` over the routed agents; ``client`` defaults to the shared backend pool"""
+    client = client or ollama_pool.client()
+    embedder = CachedOllamaEmbedder(id=ROUTER_EMBED_MODEL, dimensions=768, host=host, ollama_client=client)
+    return IntentRouter(
+        agent_profiles(),
+        embed=embedder.get_embeddings,
+        classify=llm_classifier(client, ROUTER_LLM_MODEL) if llm_fallback else None,
+        min_similarity=ROUTER_MIN_SIMILARITY
+    )
+
+# Router behind /agents/auto/chat
+auto_router = build_router()
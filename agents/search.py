@@ -3,19 +3,32 @@ Web search agent using Tavily
 """
 
 from agno.agent import Agent
+from agno.tools import Toolkit
 from agno.tools.tavily import TavilyTools
-from .settings import get_model
+from .search_tools import MultiSearchTools, web_searcher
+from .settings import SEARCH_MULTI_QUERY, get_model
+
+search_tools: Toolkit
+if SEARCH_MULTI_QUERY:
+    search_tools = MultiSearchTools(web_searcher)
+    search_steps = [
+        "2. Utilise web_search_many() avec 2 à 4 requêtes complémentaires en une seule fois "
+        "(reformulations, anglais et français, sous-questions) plutôt que plusieurs recherches successives",
+    ]
+else:
+    search_tools = TavilyTools()
+    search_steps = ["2. Utilise tavily_search() avec les mots-clés appropriés en anglais ou français"]
 
 search_agent = Agent(
     name="SearchAgent",
-    model=get_model("qwen3:8b"),
-    tools=[TavilyTools()],
+    model=get_model("qwen3:8b", agent="search"),
+    tools=[search_tools],
     instructions=[
         "Tu es un agent de recherche spécialisé dans la recherche d'informations actuelles.",
         "Tu utilises Tavily pour obtenir des informations récentes et fiables.",
         "Processus recommandé:",
         "1. Analyse précisément ce que demande l'utilisateur",
-        "2. Utilise tavily_search() avec les mots-clés appropriés en anglais ou français",
+        *search_steps,
         "3. Fournis des informations basées sur les résultats trouvés",
         "4. Cite les sources trouvées avec leurs URLs",
         "5. Si la recherche échoue, explique la situation et fournis ce que tu peux",
@@ -25,4 +38,4 @@ search_agent = Agent(
     reasoning=False,
     show_tool_calls=True,
     description="Expert en recherche d'informations sur le web avec Tavily"
-) 
\ No newline at end of file
+)
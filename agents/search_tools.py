@@ -0,0 +1,86 @@
+"""
+Multi-query web search tools for SearchAgent
+"""
+
+import os
+from typing import Any, Callable, Dict, List, Optional
+
+from agno.tools import Toolkit
+from tavily import TavilyClient
+from utils.multi_search import MultiSearch
+from .settings import SEARCH_DEDUP_SIMILARITY, SEARCH_MAX_CONCURRENCY, SEARCH_MAX_RESULTS
+
+def tavily_search(api_key: Optional[str] = None, search_depth: str = "advanced") -> Callable[[str, int], Dict[str, Any]]:
+    """Backend calling Tavily's search API, with the options agno's ``TavilyTools`` uses"""
+    client = TavilyClient(api_key=api_key or os.getenv("TAVILY_API_KEY"))
+
+    def search(query: str, max_results: int) -> Dict[str, Any]:
+        return client.search(query=query, search_depth=search_depth, include_answer=True, max_results=max_results)
+    return search
+
+class MultiSearchTools(Toolkit):
+    """
+    Web search tools that send several queries at once
+
+    ``web_search_many`` runs its queries concurrently through a
+    ``MultiSearch`` and returns one merged, deduplicated, ranked list;
+    ``web_search_using_tavily`` is the single-query form of agno's
+    ``TavilyTools``. Both answer in markdown, within ``max_chars``.
+    """
+
+    def __init__(self, searcher: MultiSearch, max_chars: int = 6000, **kwargs):
+        self.searcher = searcher
+        self.max_chars = max_chars
+        super().__init__(name="multi_search_tools",
+                         tools=[self.web_search_many, self.web_search_using_tavily], **kwargs)
+
+    def _markdown(self, queries: List[str], merged: Dict[str, Any]) -> str:
+        text = f"# {' | '.join(queries)}\n\n"
+        for query, answer in merged["answers"].items():
+            text += f"### Summary: {query}\n{answer}\n\n"
+        for result in merged["results"]:
+            section = f"### [{result['title']}]({result['url']})\n{result['content']}\n"
+            if len(result["queries"]) > 1:
+                section += f"(Trouvé par {len(result['queries'])} requêtes)\n"
+            if len(text) + len(section) > self.max_chars:
+                break
+            text += section + "\n"
+        for query, error in merged["errors"].items():
+            text += f"⚠️ Échec de la recherche '{query}': {error}\n"
+        if not merged["results"] and not merged["errors"]:
+            text += "No results found.\n"
+        return text
+
+    def web_search_many(self, queries: List[str], max_results: int = 5) -> str:
+        """Use this function to search the web for several queries at once (different phrasings, languages or
+        sub-questions). The queries run concurrently and the results are merged, deduplicated and ranked.
+
+        Args:
+            queries (List[str]): Queries to search for, 2 to 4 is usually best.
+            max_results (int): Maximum number of results per query. Defaults to 5.
+
+        Returns:
+            str: Merged results in markdown, best first, with their URLs.
+        """
+        return self._markdown(queries, self.searcher.search(queries, max_results))
+
+    def web_search_using_tavily(self, query: str, max_results: int = 5) -> str:
+        """Use this function to search the web for a given query.
+        This function uses the Tavily API to provide realtime online information about the query.
+
+        Args:
+            query (str): Query to search for.
+            max_results (int): Maximum number of results to return. Defaults to 5.
+
+        Returns:
+            str: Results in markdown with their URLs.
+        """
+        return self._markdown([query], self.searcher.search([query], max_results))
+
+# Web searches of SearchAgent
+web_searcher = MultiSearch(
+    tavily_search(),
+    max_concurrency=SEARCH_MAX_CONCURRENCY,
+    min_similarity=SEARCH_DEDUP_SIMILARITY,
+    max_results=SEARCH_MAX_RESULTS
+)
@@ -0,0 +1,144 @@
+"""
+Multi-turn chat sessions that reuse Ollama's cached prompt context
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextvars import Token
+from typing import Any, Dict, Optional, Tuple, Union
+
+from agno.agent import Agent
+from agno.models.ollama import Ollama
+from utils.ollama_pool import affinity_key
+from .settings import SESSION_IDLE_SECONDS, SESSION_KEEP_ALIVE, SESSION_MAX
+
+logger = logging.getLogger(__name__)
+
+class ChatSession:
+    """
+    One conversation with one agent
+
+    Holds its own copy of the agent (history included) and serializes its
+    turns. ``async with session:`` takes the turn lock and pins Ollama calls
+    to the host that served the previous turn.
+    """
+
+    def __init__(self, agent_id: str, session_id: str, agent: Agent):
+        self.agent_id = agent_id
+        self.session_id = session_id
+        self.agent = agent
+        self.lock = asyncio.Lock()
+        self.turns = 0
+        self.prompt_tokens = 0
+        self.prefill_seconds = 0.0
+        self.last_used = time.monotonic()
+        self._affinity_token: Optional[Token[Optional[str]]] = None
+
+    async def __aenter__(self) -> "ChatSession":
+        await self.lock.acquire()
+        self._affinity_token = affinity_key.set(f"{self.agent_id}:{self.session_id}")
+        return self
+
+    async def __aexit__(self, *exc):
+        if self._affinity_token is not None:
+            affinity_key.reset(self._affinity_token)
+            self._affinity_token = None
+        self.last_used = time.monotonic()
+        self.lock.release()
+
+    def record(self, response: Any) -> Tuple[int, float]:
+        """Count a finished turn; returns the prompt tokens Ollama evaluated and its prefill seconds"""
+        metrics = getattr(response, "metrics", None) or {}
+        tokens = sum(metrics.get("input_tokens") or [])
+        prefill = sum(m.get("prompt_eval_duration", 0) for m in metrics.get("additional_metrics") or []) / 1e9
+        self.turns += 1
+        self.prompt_tokens += tokens
+        self.prefill_seconds += prefill
+        return tokens, prefill
+
+class SessionManager:
+    """
+    Keeps chat sessions prefix-stable so Ollama can reuse its KV cache
+
+    Ollama skips prefill for the part of a prompt that matches the previous
+    prompt evaluated by a loaded model. Each session therefore gets its own
+    agent copy that re-sends its full history in the same order (agno puts the
+    instructions first; history is not windowed, the context budget trims it
+    in steps instead), keeps the model loaded for ``keep_alive`` between
+    turns, and sticks to one Ollama host. Sessions unused for
+    ``idle_seconds`` or beyond the ``max_sessions`` most recent are dropped.
+    """
+
+    def __init__(
+        self,
+        keep_alive: Union[str, float, None] = "30m",
+        max_sessions: int = 256,
+        idle_seconds: float = 1800.0,
+        history_runs: int = 1000
+    ):
+        self.keep_alive = keep_alive
+        self.max_sessions = max_sessions
+        self.idle_seconds = idle_seconds
+        self.history_runs = history_runs
+        self.created = 0
+        self.expired = 0
+        self._sessions: "OrderedDict[Tuple[str, str], ChatSession]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, agent_id: str, agent: Agent, session_id: str) -> ChatSession:
+        """The session ``session_id`` with ``agent``, created on first use"""
+        key = (agent_id, session_id)
+        with self._lock:
+            self._expire()
+            session = self._sessions.get(key)
+            if session is None:
+                copy = agent.deep_copy(update={
+                    "session_id": session_id,
+                    "add_history_to_messages": True,
+                    "num_history_runs": self.history_runs
+                })
+                if self.keep_alive is not None and isinstance(copy.model, Ollama):
+                    copy.model.keep_alive = self.keep_alive
+                session = self._sessions[key] = ChatSession(agent_id, session_id, copy)
+                self.created += 1
+                logger.info(f"🧵 New {agent_id} session {session_id} ({len(self._sessions)} open)")
+            self._sessions.move_to_end(key)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.expired += 1
+            return session
+
+    def end(self, agent_id: str, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop((agent_id, session_id), None) is not None
+
+    def _expire(self):
+        cutoff = time.monotonic() - self.idle_seconds
+        for key in [key for key, session in self._sessions.items() if session.last_used < cutoff]:
+            if not self._sessions[key].lock.locked():
+                del self._sessions[key]
+                self.expired += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            sessions = list(self._sessions.values())
+        turns = sum(s.turns for s in sessions)
+        return {
+            "open_sessions": len(sessions),
+            "created": self.created,
+            "expired": self.expired,
+            "keep_alive": self.keep_alive,
+            "turns": turns,
+            "avg_prompt_tokens_evaluated": round(sum(s.prompt_tokens for s in sessions) / turns, 1) if turns else 0.0,
+            "avg_prefill_seconds": round(sum(s.prefill_seconds for s in sessions) / turns, 4) if turns else 0.0
+        }
+
+# Sessions of the /agents/{agent_id}/chat endpoint
+chat_sessions = SessionManager(
+    keep_alive=SESSION_KEEP_ALIVE,
+    max_sessions=SESSION_MAX,
+    idle_seconds=SESSION_IDLE_SECONDS
+)
@@ -3,29 +3,66 @@ Agent settings and configuration
 """
 
 import os
+from typing import Optional, cast
 from agno.models.ollama import Ollama
+from ollama import AsyncClient, Client
+from utils.cascade import CascadePolicy
+from utils.context_budget import ContextBudget
+from utils.tool_budget import ToolBudget
+from utils.ollama_pool import ollama_pool
+from .budgeted_model import BudgetedOllama
+from .cascade_model import CascadeOllama
 import logging
 
 # Configure Ollama logging
 ollama_logger = logging.getLogger('ollama')
 
-def get_model(model_name: str = "mistral:latest") -> Ollama:
-    """Get configured Ollama model with logging"""
+# Ollama backends. Set OLLAMA_HOSTS (comma-separated) to balance across several
+# inference boxes; OLLAMA_MODEL_HOSTS and OLLAMA_ROUTING tune the pool
+# (see utils/ollama_pool.py).
+OLLAMA_HOST = ollama_pool.primary_host
+OLLAMA_HOSTS = list(ollama_pool.backends)
+
+def get_model(model_name: str = "mistral:latest", agent: Optional[str] = None) -> Ollama:
+    """Get configured Ollama model with logging
+
+    Prompts are fitted into ``AGENT_CONTEXT_BUDGETS[agent]`` (the default
+    budget when ``agent`` is not listed). Agents listed in
+    ``AGENT_CASCADE_MODELS`` try their small model first.
+    """
     ollama_logger.info(f"🔧 Creating Ollama model: {model_name}")
     
-    model = Ollama(
-        id=model_name,
-        host=os.getenv("OLLAMA_HOST", "http://localhost:11434")
-    )
+    # Every request is routed through the shared backend pool (its clients are drop-in look-alikes)
+    host = OLLAMA_HOST
+    client = cast(Client, ollama_pool.client())
+    async_client = cast(AsyncClient, ollama_pool.async_client())
+    budget = context_budget(agent)
+    small_model = AGENT_CASCADE_MODELS.get(agent or "")
+    model: Ollama
+    if small_model and small_model != model_name:
+        ollama_logger.info(f"🪜 Cascade for {agent}: {small_model} first, then {model_name}")
+        model = CascadeOllama(
+            id=model_name,
+            host=host,
+            client=client,
+            async_client=async_client,
+            context_name=agent,
+            context_budget=budget,
+            tool_budget=tool_budget(agent),
+            small_model=BudgetedOllama(id=small_model, host=host, client=client, async_client=async_client,
+                                       context_name=f"{agent}:small", context_budget=budget),
+            cascade_policy=CascadePolicy(min_confidence=CASCADE_MIN_CONFIDENCE)
+        )
+    else:
+        model = BudgetedOllama(id=model_name, host=host, client=client, async_client=async_client,
+                               context_name=agent or model_name, context_budget=budget,
+                               tool_budget=tool_budget(agent))
     
-    ollama_logger.debug(f"🔧 Model config - Host: {model.host}")
+    ollama_logger.debug(f"🔧 Model config - Hosts: {', '.join(OLLAMA_HOSTS)} ({ollama_pool.strategy})")
     ollama_logger.debug(f"🔧 Model config - ID: {model.id}")
     
     return model
 
-# Default model configuration
-DEFAULT_MODEL = get_model()
-
 # Model configurations for each agent type
 AGENT_MODELS = {
     "general": "qwen3:8b",
@@ -35,6 +72,147 @@ AGENT_MODELS = {
     "system": "phi3:mini"
 }
 
+# Prompt token budget per agent (instructions + history + tool results). On CPU
+# prompt length drives latency; override with AGENT_CONTEXT_TOKENS="general=2048,search=6000"
+AGENT_CONTEXT_BUDGETS = {
+    "default": 4096,
+    "general": 3072,
+    "search": 4096,
+    "finance": 4096,
+    "code": 4096,
+    "system": 2048,
+    "whatsapp": 3072
+}
+for _entry in filter(None, os.getenv("AGENT_CONTEXT_TOKENS", "").split(",")):
+    _agent, _, _tokens = _entry.partition("=")
+    AGENT_CONTEXT_BUDGETS[_agent.strip()] = int(_tokens)
+# Longest tool result kept whole, tokens for the summary of dropped turns, and how many
+# turns are dropped at once (larger steps keep the prompt prefix, and Ollama's cache, stable)
+CONTEXT_MAX_TOOL_TOKENS = int(os.getenv("CONTEXT_MAX_TOOL_TOKENS", "1000"))
+CONTEXT_SUMMARY_TOKENS = int(os.getenv("CONTEXT_SUMMARY_TOKENS", "200"))
+CONTEXT_TRIM_STEP_TURNS = int(os.getenv("CONTEXT_TRIM_STEP_TURNS", "4"))
+
+def context_budget(agent: Optional[str] = None) -> ContextBudget:
+    """Prompt budget of ``agent`` from ``AGENT_CONTEXT_BUDGETS``"""
+    max_tokens = AGENT_CONTEXT_BUDGETS.get(agent or "default", AGENT_CONTEXT_BUDGETS["default"])
+    return ContextBudget(
+        max_tokens=max_tokens,
+        max_tool_tokens=min(CONTEXT_MAX_TOOL_TOKENS, max_tokens // 2),
+        summary_tokens=CONTEXT_SUMMARY_TOKENS,
+        trim_step_turns=CONTEXT_TRIM_STEP_TURNS
+    )
+
+# Tool loop budget per agent: model turns after tool results, and seconds per run, before the model
+# has to answer with what it has. Override with AGENT_TOOL_BUDGETS="search=3:60,code=8:180"
+AGENT_TOOL_BUDGETS = {
+    "default": (5, 120.0),
+    "search": (4, 90.0),
+    "finance": (4, 60.0),
+    "code": (6, 180.0),
+    "system": (5, 120.0)
+}
+for _entry in filter(None, os.getenv("AGENT_TOOL_BUDGETS", "").split(",")):
+    _agent, _, _limits = _entry.partition("=")
+    _iterations, _, _seconds = _limits.partition(":")
+    AGENT_TOOL_BUDGETS[_agent.strip()] = (int(_iterations), float(_seconds or AGENT_TOOL_BUDGETS["default"][1]))
+
+def tool_budget(agent: Optional[str] = None) -> ToolBudget:
+    """Tool loop budget of ``agent`` from ``AGENT_TOOL_BUDGETS``"""
+    max_iterations, max_seconds = AGENT_TOOL_BUDGETS.get(agent or "default", AGENT_TOOL_BUDGETS["default"])
+    return ToolBudget(max_iterations=max_iterations, max_seconds=max_seconds)
+
+# Small model tried first per agent; the agent's own model answers only when the small
+# one's reply scores below CASCADE_MIN_CONFIDENCE. Override with AGENT_CASCADE="general=phi3:mini"
+# (an empty model disables the cascade for that agent)
+AGENT_CASCADE_MODELS = {
+    "general": "llama3.2:3b"
+}
+for _entry in filter(None, os.getenv("AGENT_CASCADE", "").split(",")):
+    _agent, _, _model = _entry.partition("=")
+    AGENT_CASCADE_MODELS[_agent.strip()] = _model.strip()
+CASCADE_MIN_CONFIDENCE = float(os.getenv("CASCADE_MIN_CONFIDENCE", "0.6"))
+
+# Default model configuration
+DEFAULT_MODEL = get_model()
+
+# Chat sessions (session_id on /agents/{agent_id}/chat): how long Ollama keeps the model and
+# its cached context loaded between turns, sessions kept in memory, idle seconds before expiry
+SESSION_KEEP_ALIVE = os.getenv("SESSION_KEEP_ALIVE", "30m")
+SESSION_MAX = int(os.getenv("SESSION_MAX", "256"))
+SESSION_IDLE_SECONDS = float(os.getenv("SESSION_IDLE_SECONDS", "1800"))
+
+# Knowledge chunking: "fast" splits on paragraph/sentence boundaries locally,
+# "agentic" asks Mistral for every breakpoint (much slower ingestion)
+KNOWLEDGE_CHUNKING = os.getenv("KNOWLEDGE_CHUNKING", "fast")
+KNOWLEDGE_CHUNK_SIZE = int(os.getenv("KNOWLEDGE_CHUNK_SIZE", "2000"))
+KNOWLEDGE_CHUNK_OVERLAP = int(os.getenv("KNOWLEDGE_CHUNK_OVERLAP", "200"))
+
+# Knowledge vector store: "local" keeps vectors under KNOWLEDGE_DATA_DIR (no server),
+# "pgvector" uses Postgres at KNOWLEDGE_DB_URL
+KNOWLEDGE_VECTOR_DB = os.getenv("KNOWLEDGE_VECTOR_DB", "local")
+KNOWLEDGE_DB_URL = os.getenv("KNOWLEDGE_DB_URL", "postgresql+psycopg://ai:ai@localhost:5532/ai")
+KNOWLEDGE_DATA_DIR = os.getenv("KNOWLEDGE_DATA_DIR", "data")
+# Cached knowledge searches (0 disables the cache)
+RETRIEVAL_CACHE_SIZE = int(os.getenv("RETRIEVAL_CACHE_SIZE", "1024"))
+
+# WhatsApp webhook queue: concurrent senders, backlog before pushing back, remembered message ids
+WHATSAPP_WORKERS = int(os.getenv("WHATSAPP_WORKERS", "4"))
+WHATSAPP_MAX_PENDING = int(os.getenv("WHATSAPP_MAX_PENDING", "1000"))
+WHATSAPP_DEDUP_ITEMS = int(os.getenv("WHATSAPP_DEDUP_ITEMS", "10000"))
+# Senders whose own copy of the WhatsApp agent (run state and session) is kept between messages
+WHATSAPP_SENDER_AGENTS = int(os.getenv("WHATSAPP_SENDER_AGENTS", "256"))
+
+# User memories: tokens injected per prompt, tokens stored per user before compaction, seconds between passes
+MEMORY_PROMPT_BUDGET_TOKENS = int(os.getenv("MEMORY_PROMPT_BUDGET_TOKENS", "300"))
+MEMORY_STORE_BUDGET_TOKENS = int(os.getenv("MEMORY_STORE_BUDGET_TOKENS", "1200"))
+MEMORY_COMPACTION_INTERVAL = float(os.getenv("MEMORY_COMPACTION_INTERVAL", "3600"))
+
+# CodeAgent Python workers: pool size, modules imported before any run, per-run limits
+CODE_WORKERS = int(os.getenv("CODE_WORKERS", "2"))
+CODE_PRELOAD = [m.strip() for m in os.getenv(
+    "CODE_PRELOAD", "math,json,statistics,datetime,decimal,fractions,itertools,collections,random,re,numpy,pandas"
+).split(",") if m.strip()]
+CODE_TIMEOUT = float(os.getenv("CODE_TIMEOUT", "30"))
+CODE_CPU_SECONDS = float(os.getenv("CODE_CPU_SECONDS", "20"))
+CODE_MEMORY_MB = int(os.getenv("CODE_MEMORY_MB", "1024"))
+CODE_MAX_OUTPUT_CHARS = int(os.getenv("CODE_MAX_OUTPUT_CHARS", "20000"))
+CODE_WORKDIR = os.getenv("CODE_WORKDIR", "data/code")
+
+# SystemAgent shell commands: per-command timeout, kept output, commands running at once
+SHELL_TIMEOUT = float(os.getenv("SHELL_TIMEOUT", "60"))
+SHELL_MAX_OUTPUT_CHARS = int(os.getenv("SHELL_MAX_OUTPUT_CHARS", "20000"))
+SHELL_MAX_CONCURRENCY = int(os.getenv("SHELL_MAX_CONCURRENCY", "4"))
+SHELL_WORKDIR = os.getenv("SHELL_WORKDIR") or None
+
+# /agents/auto/chat routing: embedding model, similarity needed to trust it, optional LLM fallback
+ROUTER_EMBED_MODEL = os.getenv("ROUTER_EMBED_MODEL", "nomic-embed-text")
+ROUTER_MIN_SIMILARITY = float(os.getenv("ROUTER_MIN_SIMILARITY", "0.55"))
+ROUTER_LLM_FALLBACK = os.getenv("ROUTER_LLM_FALLBACK", "false").lower() == "true"
+ROUTER_LLM_MODEL = os.getenv("ROUTER_LLM_MODEL", "phi3:mini")
+
+# FinanceAgent fast path: simple lookups answered from YFinance without the agent loop,
+# optionally followed by a one-sentence summary from a small model
+FINANCE_FAST_PATH = os.getenv("FINANCE_FAST_PATH", "true").lower() == "true"
+FINANCE_FAST_PATH_SUMMARY = os.getenv("FINANCE_FAST_PATH_SUMMARY", "false").lower() == "true"
+FINANCE_SUMMARY_MODEL = os.getenv("FINANCE_SUMMARY_MODEL", "phi3:mini")
+
+# Finance watchlist prefetched in the background (empty disables it): data kinds, seconds between
+# refreshes, age after which stored data is fetched live again, and where it is kept
+WATCHLIST = [
+    s.strip().upper() for s in os.getenv("WATCHLIST", "AAPL,MSFT,GOOGL,AMZN,NVDA,TSLA").split(",") if s.strip()
+]
+WATCHLIST_KINDS = [k.strip() for k in os.getenv("WATCHLIST_KINDS", "price,info,news").split(",") if k.strip()]
+WATCHLIST_REFRESH_INTERVAL = float(os.getenv("WATCHLIST_REFRESH_INTERVAL", "300"))
+WATCHLIST_MAX_AGE = float(os.getenv("WATCHLIST_MAX_AGE", "900"))
+WATCHLIST_DB = os.getenv("WATCHLIST_DB", "data/market_data.db")
+
+# SearchAgent: several queries per tool call run concurrently (false restores agno's TavilyTools),
+# queries in flight, content similarity from which two results are duplicates, merged results kept
+SEARCH_MULTI_QUERY = os.getenv("SEARCH_MULTI_QUERY", "true").lower() == "true"
+SEARCH_MAX_CONCURRENCY = int(os.getenv("SEARCH_MAX_CONCURRENCY", "4"))
+SEARCH_DEDUP_SIMILARITY = float(os.getenv("SEARCH_DEDUP_SIMILARITY", "0.8"))
+SEARCH_MAX_RESULTS = int(os.getenv("SEARCH_MAX_RESULTS", "10"))
+
 # Available models on the system
 AVAILABLE_MODELS = [
     "mistral:latest",
@@ -0,0 +1,79 @@
+"""
+Shell tools for SystemAgent backed by the async shell executor
+"""
+
+import logging
+from typing import Callable, List, Optional
+
+from agno.tools import Toolkit
+from utils.cancellation import time_left
+from utils.shell_executor import AsyncShellExecutor
+from .settings import SHELL_MAX_CONCURRENCY, SHELL_MAX_OUTPUT_CHARS, SHELL_TIMEOUT, SHELL_WORKDIR
+
+logger = logging.getLogger(__name__)
+
+class AsyncShellTools(Toolkit):
+    """
+    Replacement for agno's ``ShellTools`` (same ``run_shell_command`` tool)
+
+    Commands run through an ``AsyncShellExecutor``: they are killed after
+    the timeout, their output is capped, independent commands can run
+    concurrently (``run_shell_commands``), and output is passed to
+    ``output_handler(command, chunk)`` while they run. Within a run that has
+    a deadline, the timeout is cut to the time left.
+    """
+
+    def __init__(
+        self,
+        executor: AsyncShellExecutor,
+        output_handler: Optional[Callable[[str, str], None]] = None,
+        **kwargs
+    ):
+        self.executor = executor
+        self.output_handler = output_handler
+        super().__init__(name="shell_tools", tools=[self.run_shell_command, self.run_shell_commands], **kwargs)
+
+    def _stream(self, args: List[str]) -> Optional[Callable[[str], None]]:
+        handler = self.output_handler
+        if handler is None:
+            return None
+        command = " ".join(args)
+        return lambda chunk: handler(command, chunk)
+
+    def run_shell_command(self, args: List[str], tail: int = 100) -> str:
+        """Runs a shell command and returns the output or error.
+
+        Args:
+            args (List[str]): The command to run as a list of strings.
+            tail (int): The number of lines to return from the output.
+
+        Returns:
+            str: The output of the command.
+        """
+        logger.info(f"🐚 Running shell command: {args}")
+        result = self.executor.run(args, timeout=time_left(self.executor.timeout), on_output=self._stream(args))
+        return result.as_text(tail)
+
+    def run_shell_commands(self, commands: List[List[str]], tail: int = 100) -> str:
+        """Runs several independent shell commands at the same time and returns each output or error.
+        Use it instead of successive run_shell_command calls when no command depends on another.
+
+        Args:
+            commands (List[List[str]]): The commands to run, each as a list of strings.
+            tail (int): The number of lines to return from each output.
+
+        Returns:
+            str: The output of every command, in the order given.
+        """
+        logger.info(f"🐚 Running {len(commands)} shell commands concurrently")
+        timeout = time_left(self.executor.timeout)
+        futures = [self.executor.submit(args, timeout, on_output=self._stream(args)) for args in commands]
+        return "\n\n".join(f"$ {future.result().command}\n{future.result().as_text(tail)}" for future in futures)
+
+# Executor shared by every SystemAgent run
+shell_executor = AsyncShellExecutor(
+    timeout=SHELL_TIMEOUT,
+    max_output_chars=SHELL_MAX_OUTPUT_CHARS,
+    max_concurrency=SHELL_MAX_CONCURRENCY,
+    base_dir=SHELL_WORKDIR
+)
@@ -3,19 +3,23 @@ System administration agent using shell tools
 """
 
 from agno.agent import Agent
-from agno.tools.shell import ShellTools
 from .settings import get_model
+from .shell_tools import AsyncShellTools, shell_executor
+
+# Commands run as killable subprocesses; the API streams their output to /ws
+shell_tools = AsyncShellTools(shell_executor)
 
 system_agent = Agent(
     name="SystemAgent",
-    model=get_model(),
-    tools=[ShellTools()],
+    model=get_model(agent="system"),
+    tools=[shell_tools],
     instructions=[
         "Tu es un administrateur système expert et prudent.",
         "Utilise les commandes shell pour des tâches système appropriées.",
         "TOUJOURS expliquer ce que font les commandes avant de les exécuter.",
         "Sois extrêmement prudent avec les commandes destructives.",
         "Propose des alternatives sûres quand possible.",
+        "Lance les commandes indépendantes ensemble avec run_shell_commands.",
         "Vérifie les permissions et la sécurité avant d'agir."
     ],
     markdown=True,
@@ -1,16 +1,33 @@
+import asyncio
+import logging
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Optional
+from typing import Awaitable, Callable, List, Optional, cast
 
 from agno.agent import Agent
-from agno.document.chunking.agentic import AgenticChunking
-from agno.embedder.ollama import OllamaEmbedder
 from agno.knowledge.pdf_url import PDFUrlKnowledgeBase
-from agno.memory.v2.db.sqlite import SqliteMemoryDb
-from agno.memory.v2.memory import Memory
-from agno.models.ollama import Ollama
 from agno.tools.reasoning import ReasoningTools
+from ollama import Client
+from agno.vectordb.base import VectorDb
 from agno.vectordb.pgvector import PgVector, SearchType, HNSW
-from .settings import get_model
+from .chunking import get_chunking_strategy
+from .cached_vector_db import CachedVectorDb
+from .embedder import CachedOllamaEmbedder
+from .local_vector_db import LocalVectorDb
+from .memory_compaction import MemoryCompactor, RankedMemory, current_query
+from .memory_db import CachedSqliteMemoryDb
+from .knowledge_ingestion import KnowledgeIngestion
+from .settings import (
+    get_model, OLLAMA_HOST, KNOWLEDGE_CHUNKING, KNOWLEDGE_CHUNK_SIZE, KNOWLEDGE_CHUNK_OVERLAP,
+    KNOWLEDGE_VECTOR_DB, KNOWLEDGE_DB_URL, KNOWLEDGE_DATA_DIR, RETRIEVAL_CACHE_SIZE,
+    WHATSAPP_WORKERS, WHATSAPP_MAX_PENDING, WHATSAPP_DEDUP_ITEMS, WHATSAPP_SENDER_AGENTS,
+    MEMORY_PROMPT_BUDGET_TOKENS, MEMORY_STORE_BUDGET_TOKENS, MEMORY_COMPACTION_INTERVAL
+)
+from utils.keyed_queue import KeyedWorkQueue
+from utils.ollama_pool import ollama_pool
+from utils.retrieval_cache import RetrievalCache
+
+logger = logging.getLogger(__name__)
 
 @dataclass
 class WhatsAppMessage:
@@ -21,21 +38,32 @@ class WhatsAppMessage:
 
     @classmethod
     def from_webhook(cls, webhook_data: dict) -> Optional['WhatsAppMessage']:
-        try:
-            message = webhook_data['entry'][0]['changes'][0]['value']['messages'][0]
-            return cls(
-                from_number=message['from'],
-                message_id=message['id'],
-                timestamp=message['timestamp'],
-                text=message['text']['body']
-            )
-        except (KeyError, IndexError):
-            return None
+        messages = cls.all_from_webhook(webhook_data)
+        return messages[0] if messages else None
+
+    @classmethod
+    def all_from_webhook(cls, webhook_data: dict) -> List['WhatsAppMessage']:
+        """Every text message of a (possibly batched) delivery, in payload order"""
+        messages = []
+        for entry in webhook_data.get('entry') or []:
+            for change in entry.get('changes') or []:
+                for message in (change.get('value') or {}).get('messages') or []:
+                    try:
+                        messages.append(cls(
+                            from_number=message['from'],
+                            message_id=message['id'],
+                            timestamp=message['timestamp'],
+                            text=message['text']['body']
+                        ))
+                    except (KeyError, TypeError):
+                        # Status updates, media and reactions carry no text body
+                        continue
+        return messages
 
 class WhatsAppAgent:
     name = "whatsapp"
     description = "WhatsApp Agent"
-    model = get_model()
+    model = get_model(agent="whatsapp")
     tools = [
         ReasoningTools(
             add_instructions=True,
@@ -51,47 +79,87 @@ class WhatsAppAgent:
 
     def __init__(
         self,
-        db_url: str = "postgresql+psycopg://ai:ai@localhost:5532/ai",
+        db_url: Optional[str] = None,
+        vector_db: Optional[str] = None,
         memory_path: str = "data/whatsapp_memory.db",
-        knowledge_urls: list[str] = None
+        knowledge_urls: list[str] = None,
+        knowledge_manifest_path: str = "data/whatsapp_knowledge_manifest.json",
+        reply_handler: Optional[Callable[[dict], Awaitable[None]]] = None
     ):
-        # Configure embedder using local Ollama
-        self.embedder = OllamaEmbedder(
+        # Configure embedder using local Ollama; vectors are cached on disk by content hash
+        self.embedder = CachedOllamaEmbedder(
             id="nomic-embed-text",  # Efficient local embedding model
-            host="http://localhost:11434"  # <-- utiliser host, pas base_url
+            dimensions=768,  # nomic-embed-text vector size
+            host=OLLAMA_HOST,  # <-- utiliser host, pas base_url
+            ollama_client=cast(Client, ollama_pool.client())  # Balanced across OLLAMA_HOSTS
         )
         
-        # Configure vector database with HNSW index for better performance
-        self.vector_db = PgVector(
-            table_name="whatsapp_knowledge",
-            schema="public",
-            db_url=db_url,
-            search_type=SearchType.hybrid,
-            embedder=self.embedder,
-            vector_index=HNSW(
-                m=16,  # Number of connections per element
-                ef_construction=100  # Size of dynamic candidate list for construction
-            ),
-            vector_score_weight=0.7,  # Bias towards vector similarity in hybrid search
-            prefix_match=True  # Enable prefix matching for better keyword search
-        )
+        # Configure vector database: embedded store under data/ by default, PgVector on request
+        store: VectorDb
+        if (vector_db or KNOWLEDGE_VECTOR_DB) == "pgvector":
+            store = PgVector(
+                table_name="whatsapp_knowledge",
+                schema="public",
+                db_url=db_url or KNOWLEDGE_DB_URL,
+                search_type=SearchType.hybrid,
+                embedder=self.embedder,
+                vector_index=HNSW(
+                    m=16,  # Number of connections per element
+                    ef_construction=100  # Size of dynamic candidate list for construction
+                ),
+                vector_score_weight=0.7,  # Bias towards vector similarity in hybrid search
+                prefix_match=True  # Enable prefix matching for better keyword search
+            )
+        else:
+            store = LocalVectorDb(
+                table_name="whatsapp_knowledge",
+                path=KNOWLEDGE_DATA_DIR,
+                search_type=SearchType.hybrid,
+                embedder=self.embedder,
+                vector_score_weight=0.7,  # Bias towards vector similarity in hybrid search
+                prefix_match=True  # Enable prefix matching for better keyword search
+            )
+        # Repeated questions skip the query embedding and the search; every ingestion write invalidates it
+        self.retrieval_cache = RetrievalCache(max_items=RETRIEVAL_CACHE_SIZE)
+        self.vector_db = CachedVectorDb(store, cache=self.retrieval_cache)
         
-        # Configure shared memory with SQLite
-        self.memory_db = SqliteMemoryDb(
+        # Configure shared memory with SQLite (WAL, batched write-behind, per-user LRU)
+        self.memory_db = CachedSqliteMemoryDb(
             table_name="whatsapp_memory",
             db_file=memory_path
         )
-        self.memory = Memory(db=self.memory_db)
+        # Only the memories relevant to the current message (within a token budget) reach the prompt
+        self.memory = RankedMemory(db=self.memory_db, prompt_budget_tokens=MEMORY_PROMPT_BUDGET_TOKENS)
+        # Periodically merges and summarizes each user's memories down to a bounded budget
+        self.memory_compactor = MemoryCompactor(
+            self.memory,
+            budget_tokens=MEMORY_STORE_BUDGET_TOKENS,
+            model=self.model,
+            interval=MEMORY_COMPACTION_INTERVAL
+        )
         
-        # Setup knowledge base with Agentic Chunking
+        # Setup knowledge base; KNOWLEDGE_CHUNKING=agentic restores Mistral-chosen breakpoints
         self.knowledge_base = PDFUrlKnowledgeBase(
             urls=knowledge_urls or [],
             vector_db=self.vector_db,
-            chunking_strategy=AgenticChunking(
-                model=Ollama(id="mistral:latest"),  # Use Mistral for chunking
-                max_chunk_size=2000  # Smaller chunks for better context
+            chunking_strategy=get_chunking_strategy(
+                KNOWLEDGE_CHUNKING,
+                chunk_size=KNOWLEDGE_CHUNK_SIZE,  # Smaller chunks for better context
+                overlap=KNOWLEDGE_CHUNK_OVERLAP
             )
         )
+        # Streams PDFs through download → parse → chunk → embed → upsert
+        self.ingestion = KnowledgeIngestion(self.knowledge_base, manifest_path=knowledge_manifest_path)
+        
+        # Webhook messages: ordered per sender, parallel across senders, deduplicated by message id
+        self.reply_handler = reply_handler
+        self.webhook_queue = KeyedWorkQueue(
+            self._process_message,
+            workers=WHATSAPP_WORKERS,
+            max_pending=WHATSAPP_MAX_PENDING,
+            dedup_items=WHATSAPP_DEDUP_ITEMS,
+            name="whatsapp"
+        )
         
         # Initialize the agent with Agentic RAG capabilities
         self.agent = Agent(
@@ -107,36 +175,89 @@ class WhatsAppAgent:
             instructions=self.instructions,
             description="You are a helpful WhatsApp assistant with access to knowledge bases and memory of past interactions."
         )
+        # Senders are answered in parallel: each gets its own copy of the agent (most recent senders kept)
+        self._sender_agents: "OrderedDict[str, Agent]" = OrderedDict()
 
-    async def load_knowledge(self, recreate: bool = False) -> None:
-        """Load or reload the knowledge base asynchronously"""
-        await self.knowledge_base.aload(recreate=recreate)
+    async def load_knowledge(self, recreate: bool = False) -> dict:
+        """Load or reload the knowledge base through the concurrent ingestion pipeline"""
+        return await self.ingestion.run(recreate=recreate)
 
-    async def handle_message(self, message: str, user_id: str) -> str:
-        """Process a message and return the response asynchronously"""
-        return await self.agent.aget_response(
-            message,
-            user_id=user_id,
-            stream=False,
-            show_full_reasoning=True
-        )
+    async def sync_knowledge(self, urls: Optional[list] = None) -> dict:
+        """Re-ingest only new or changed PDFs and drop removed ones; returns what changed"""
+        return await self.ingestion.sync(urls)
 
-    async def handle_webhook(self, webhook_data: dict) -> Optional[dict]:
-        """Handle incoming WhatsApp webhook data and return response asynchronously"""
-        message = WhatsAppMessage.from_webhook(webhook_data)
-        if not message:
-            return None
-            
-        response = await self.handle_message(
-            message.text,
-            user_id=message.from_number
-        )
-        
+    def knowledge_stats(self) -> dict:
+        """Retrieval cache and embedder cache/batching metrics"""
         return {
-            "to": message.from_number,
-            "body": response
+            "retrieval_cache": self.vector_db.stats(),
+            "embedder": self.embedder.stats()
         }
 
+    def memory_stats(self) -> dict:
+        """Memory store cache hit rate, write batching, prompt-token savings and compaction totals"""
+        return {
+            "store": self.memory_db.stats(),
+            "prompt": self.memory.prompt_stats(),
+            "compaction": self.memory_compactor.stats()
+        }
+
+    async def compact_memories(self, user_id: Optional[str] = None) -> list[dict]:
+        """Compact one user's memories (or everyone's) now instead of waiting for the next pass"""
+        if user_id is not None:
+            return [await asyncio.to_thread(self.memory_compactor.compact_user, user_id)]
+        return await asyncio.to_thread(self.memory_compactor.compact_all)
+
+    def agent_for(self, user_id: str) -> Agent:
+        """The sender's copy of the agent: its own run state and session, shared knowledge and memory"""
+        agent = self._sender_agents.get(user_id)
+        if agent is None:
+            agent = self.agent.deep_copy(update={
+                "session_id": user_id, "memory": self.memory, "knowledge": self.knowledge_base
+            })
+            self._sender_agents[user_id] = agent
+            while len(self._sender_agents) > WHATSAPP_SENDER_AGENTS:
+                self._sender_agents.popitem(last=False)
+        else:
+            self._sender_agents.move_to_end(user_id)
+        return agent
+
+    async def handle_message(self, message: str, user_id: str) -> str:
+        """Process a message and return the response asynchronously"""
+        token = current_query.set(message)
+        try:
+            response = await self.agent_for(user_id).arun(message, user_id=user_id, stream=False)
+        finally:
+            current_query.reset(token)
+        return response.content
+
+    async def _process_message(self, from_number: str, message: WhatsAppMessage):
+        response = await self.handle_message(message.text, user_id=from_number)
+        reply = {"to": from_number, "body": response, "reply_to": message.message_id}
+        if self.reply_handler is not None:
+            await self.reply_handler(reply)
+        else:
+            logger.warning(f"⚠️ Reply to {from_number} dropped ({len(response or '')} chars): no reply handler set")
+
+    async def handle_webhook(self, webhook_data: dict) -> dict:
+        """
+        Queue every message of a webhook delivery and return at once
+
+        Messages of one sender are answered in order, different senders in
+        parallel; replies go to ``reply_handler``. Redelivered message ids
+        are ignored, unless answering the first delivery failed.
+
+        Returns:
+            Counts of ``received``, ``queued`` and ``duplicates`` messages
+
+        Raises:
+            asyncio.QueueFull: Too many messages are waiting; the provider should retry later
+        """
+        messages = WhatsAppMessage.all_from_webhook(webhook_data)
+        queued = 0
+        for message in messages:
+            queued += self.webhook_queue.put(message.from_number, message, item_id=message.message_id)
+        return {"received": len(messages), "queued": queued, "duplicates": len(messages) - queued}
+
     def get_user_memories(self, user_id: str) -> list[dict]:
         """Get all memories for a specific user"""
         return self.memory.get_user_memories(user_id=user_id)
@@ -0,0 +1,55 @@
+"""
+Cancellation of agent and team runs when the client disconnects or the deadline passes
+"""
+
+import asyncio
+import logging
+from typing import Any, Callable, Optional
+from fastapi import Request
+from api.settings import API_SETTINGS
+from utils.cancellation import CancelToken, RunCancelled, cancel_scope, cancellation_stats_for
+
+logger = logging.getLogger(__name__)
+
+async def run_cancellable(request: Request, name: str, work: Callable[[], Any], deadline: Optional[float] = None) -> Any:
+    """
+    Run ``work`` in a worker thread until it returns, the client disconnects or ``deadline`` seconds pass
+
+    The run carries a ``CancelToken`` (``utils.cancellation``): the Ollama
+    pool checks it between generated tokens and closes the HTTP stream once
+    it is cancelled, and the models check it before each request and tool
+    call, so the run stops within a token or a tool call. Completed and
+    cancelled runs are counted per ``name``.
+
+    Raises:
+        RunCancelled: the run was cancelled
+    """
+    token = CancelToken.after(deadline)
+
+    def run():
+        with cancel_scope(token):
+            return work()
+
+    task = asyncio.ensure_future(asyncio.to_thread(run))
+    stats = cancellation_stats_for(name)
+    try:
+        while not task.done():
+            await asyncio.wait({task}, timeout=API_SETTINGS.disconnect_poll_interval)
+            if task.done():
+                break
+            if not token.cancelled and await request.is_disconnected():
+                token.cancel("disconnect")
+            if token.cancelled:
+                logger.info(f"🛑 {name}: cancelling run ({token.reason}) after {token.elapsed:.1f}s, {token.tokens} tokens")
+                break
+        # A cancelled run stops at its next token or tool call; wait for it so the agent is free again
+        result = await task
+    except RunCancelled:
+        stats.record_cancelled(token)
+        raise
+    except asyncio.CancelledError:
+        # The server gave up on the request itself; stop the run all the same
+        token.cancel("disconnect")
+        raise
+    stats.record_completed(token)
+    return result
@@ -0,0 +1,199 @@
+"""
+Event-loop lag monitor and blocking-call detector
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional
+from api.settings import API_SETTINGS
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+class LoopMonitor:
+    """
+    Measures event-loop lag continuously and samples the loop thread's stack
+    when a callback blocks it for longer than a threshold.
+
+    A coroutine ticks every ``interval`` seconds and records how late it woke
+    up. A watchdog thread checks the last tick; once the loop has been silent
+    for ``threshold`` seconds it captures the loop thread's stack, and when
+    the loop recovers the episode is attributed to the innermost frame in
+    project code (the "offender").
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.05,
+        threshold: float = 0.2,
+        window: int = 2000,
+        max_offenders: int = 100
+    ):
+        self.interval = interval
+        self.threshold = threshold
+        self.max_offenders = max_offenders
+        self.lag_samples: Deque[float] = deque(maxlen=window)
+        self.offenders: Dict[str, Dict[str, Any]] = {}
+        self.blocked_episodes = 0
+        self.blocked_seconds = 0.0
+
+        self._lock = threading.Lock()
+        self._last_tick = time.monotonic()
+        self._last_lag = 0.0
+        self._episode: Optional[Dict[str, Any]] = None
+        self._loop_thread_id: Optional[int] = None
+        self._lag_task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._lag_task is not None and not self._lag_task.done()
+
+    def start(self):
+        """Start monitoring the running event loop (call from inside the loop)"""
+        if self.running:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._last_tick = time.monotonic()
+        self._stop.clear()
+        self._lag_task = asyncio.get_running_loop().create_task(self._measure_lag())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+        logger.info(f"Loop monitor started (interval={self.interval}s, threshold={self.threshold}s)")
+
+    async def stop(self):
+        """Stop the lag task and the watchdog thread"""
+        self._stop.set()
+        if self._lag_task is not None:
+            self._lag_task.cancel()
+            try:
+                await self._lag_task
+            except asyncio.CancelledError:
+                pass
+            self._lag_task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1)
+            self._watchdog = None
+
+    def reset(self):
+        """Forget collected samples and offenders"""
+        with self._lock:
+            self.lag_samples.clear()
+            self.offenders.clear()
+            self.blocked_episodes = 0
+            self.blocked_seconds = 0.0
+
+    async def _measure_lag(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            self.lag_samples.append(lag)
+            # Publish the lag before the tick so the watchdog reads a matching pair
+            self._last_lag = lag
+            self._last_tick = now
+
+    def _watch(self):
+        sample_interval = min(self.interval, self.threshold / 2)
+        while not self._stop.wait(sample_interval):
+            silent_for = time.monotonic() - self._last_tick
+            if silent_for < self.threshold:
+                if self._episode is not None:
+                    self._finish_episode()
+                continue
+
+            stack = self._sample_stack()
+            if not stack:
+                continue
+            with self._lock:
+                if self._episode is None:
+                    self._episode = {"started_at": datetime.now().isoformat(), "samples": {}, "stack": stack}
+                key = self._offender_key(stack)
+                self._episode["samples"][key] = self._episode["samples"].get(key, 0) + 1
+                self._episode["silent_for"] = silent_for
+                self._episode["stack"] = stack
+
+    def _sample_stack(self) -> List[traceback.FrameSummary]:
+        frame = sys._current_frames().get(self._loop_thread_id) if self._loop_thread_id else None
+        return traceback.extract_stack(frame) if frame is not None else []
+
+    @staticmethod
+    def _offender_key(stack: List[traceback.FrameSummary]) -> str:
+        """Innermost frame in project code, falling back to the innermost frame"""
+        for frame in reversed(stack):
+            path = Path(frame.filename)
+            if PROJECT_ROOT in path.parents and "site-packages" not in path.parts and path.name != "loop_monitor.py":
+                return f"{path.relative_to(PROJECT_ROOT)}:{frame.lineno} in {frame.name}"
+        frame = stack[-1]
+        return f"{frame.filename}:{frame.lineno} in {frame.name}"
+
+    def _finish_episode(self):
+        with self._lock:
+            episode, self._episode = self._episode, None
+            if episode is None:
+                return
+            duration = max(episode.get("silent_for", 0.0), self._last_lag)
+            key = max(episode["samples"], key=episode["samples"].get)
+            formatted = [f"{f.filename}:{f.lineno} in {f.name}" for f in episode["stack"][-15:]]
+
+            self.blocked_episodes += 1
+            self.blocked_seconds += duration
+            offender = self.offenders.setdefault(key, {
+                "location": key,
+                "count": 0,
+                "total_seconds": 0.0,
+                "max_seconds": 0.0
+            })
+            offender["count"] += 1
+            offender["total_seconds"] += duration
+            offender["max_seconds"] = max(offender["max_seconds"], duration)
+            offender["last_seen"] = episode["started_at"]
+            offender["stack"] = formatted
+
+            if len(self.offenders) > self.max_offenders:
+                smallest = min(self.offenders.values(), key=lambda o: o["total_seconds"])
+                del self.offenders[smallest["location"]]
+
+        logger.warning(f"🐢 Event loop blocked for {duration:.3f}s in {key}")
+        logger.debug("🐢 Blocking stack:\n" + "\n".join(formatted))
+
+    def stats(self, top: int = 10) -> Dict[str, Any]:
+        """Lag percentiles and the worst blocking offenders"""
+        with self._lock:
+            samples = sorted(self.lag_samples)
+            offenders = sorted(self.offenders.values(), key=lambda o: o["total_seconds"], reverse=True)[:top]
+            offenders = [{**o, "total_seconds": round(o["total_seconds"], 4), "max_seconds": round(o["max_seconds"], 4)}
+                         for o in offenders]
+
+        def pct(p: float) -> float:
+            return round(samples[min(len(samples) - 1, int(p / 100 * len(samples)))], 4) if samples else 0.0
+
+        return {
+            "running": self.running,
+            "interval": self.interval,
+            "threshold": self.threshold,
+            "samples": len(samples),
+            "lag_p50": pct(50),
+            "lag_p99": pct(99),
+            "lag_max": round(samples[-1], 4) if samples else 0.0,
+            "blocked_now": self._episode is not None,
+            "blocked_episodes": self.blocked_episodes,
+            "blocked_seconds": round(self.blocked_seconds, 4),
+            "offenders": offenders
+        }
+
+# Global loop monitor instance
+loop_monitor = LoopMonitor(
+    interval=API_SETTINGS.loop_lag_interval,
+    threshold=API_SETTINGS.blocking_threshold
+)
@@ -2,13 +2,24 @@
 Main FastAPI application
 """
 
+import asyncio
 import logging
 import sys
 from datetime import datetime
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from api.routes import agents, teams, health, websocket
+from api.routes import agents, teams, health, websocket, webhooks
 from api.settings import API_SETTINGS
+from api.loop_monitor import loop_monitor
+from utils.model_inventory import model_inventory
+from utils.ollama_pool import ollama_pool
+from agents import whatsapp_agent
+from agents.code import code_tools
+from agents.finance import watchlist_prefetcher
+from agents.python_tools import code_workers
+from agents.shell_tools import shell_executor
+from agents.system import shell_tools
+from api.websocket import manager
 
 # Configure detailed logging
 logging.basicConfig(
@@ -61,11 +72,58 @@ async def log_requests(request, call_next):
     
     return response
 
+@app.on_event("startup")
+async def start_background_services():
+    if API_SETTINGS.loop_monitor_enabled:
+        loop_monitor.start()
+    model_inventory.start()
+    ollama_pool.start()
+    whatsapp_agent.webhook_queue.start()
+    whatsapp_agent.memory_compactor.start()
+    watchlist_prefetcher.start()
+    whatsapp_agent.reply_handler = webhooks.deliver_whatsapp_reply
+    if webhooks.whatsapp_sender is None:
+        api_logger.warning(
+            "⚠️ WhatsApp replies are not sent: set WHATSAPP_ACCESS_TOKEN and WHATSAPP_PHONE_NUMBER_ID "
+            "(answers are only broadcast on /ws)"
+        )
+    # Fork the Python workers now rather than on CodeAgent's first run
+    await asyncio.to_thread(code_workers.start)
+    loop = asyncio.get_running_loop()
+
+    def stream_code_output(chunk: str):
+        asyncio.run_coroutine_threadsafe(
+            manager.broadcast({"type": "tool_output", "agent_id": "code", "data": chunk}), loop
+        )
+
+    def stream_shell_output(command: str, chunk: str):
+        asyncio.run_coroutine_threadsafe(
+            manager.broadcast({"type": "tool_output", "agent_id": "system", "command": command, "data": chunk}), loop
+        )
+
+    code_tools.output_handler = stream_code_output
+    shell_tools.output_handler = stream_shell_output
+
+@app.on_event("shutdown")
+async def stop_background_services():
+    # Give in-flight WhatsApp replies a chance to finish
+    await whatsapp_agent.webhook_queue.stop(drain_timeout=API_SETTINGS.webhook_drain_timeout)
+    if webhooks.whatsapp_sender is not None:
+        await webhooks.whatsapp_sender.aclose()
+    await whatsapp_agent.memory_compactor.stop()
+    await watchlist_prefetcher.stop()
+    await ollama_pool.stop()
+    await model_inventory.stop()
+    await loop_monitor.stop()
+    code_workers.close()
+    shell_executor.close()
+
 # Include routers
 app.include_router(health.router, prefix="/health", tags=["Health"])
 app.include_router(agents.router, prefix="/agents", tags=["Agents"])
 app.include_router(teams.router, prefix="/teams", tags=["Teams"])
 app.include_router(websocket.router, prefix="/ws", tags=["WebSocket"])
+app.include_router(webhooks.router, prefix="/webhooks", tags=["Webhooks"])
 
 @app.get("/")
 async def root():
@@ -2,18 +2,32 @@
 Agent routes for the API
 """
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks
-from pydantic import BaseModel
-from typing import Dict, Any, List
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ValidationError
+from typing import Dict, Any, List, Optional, AsyncIterator
+from agno.agent import Agent
+from agno.run.response import RunResponse
 from agents import general_agent, search_agent, finance_agent, code_agent, system_agent, whatsapp_agent
+from agents.finance import finance_fast_path
+from agents.market_tools import track_market_reads
+from agents.router import auto_router
+from agents.settings import FINANCE_FAST_PATH
+from agents.sessions import chat_sessions
 from teams import collaborative_team
 from agents.middleware import track_agent_activity
 from api.websocket import manager
+from api.settings import API_SETTINGS
+from api.disconnect import run_cancellable
+from utils.cancellation import RunCancelled
 import logging
 import time
 import json
 import re
 import asyncio
+from collections import deque
+from contextlib import nullcontext
+from functools import partial
 
 # Create specific loggers
 logger = logging.getLogger(__name__)
@@ -33,10 +47,23 @@ AGENTS = {
     "whatsapp": whatsapp_agent
 }
 
+# Agents whose tools block (code waiting on a Python worker, shell commands); run them off the event loop
+OFFLOADED_AGENTS = {"code", "system"}
+
+# Deterministic answers tried before the agent for sessionless requests
+FAST_PATHS = {"finance": finance_fast_path} if FINANCE_FAST_PATH else {}
+
+# Agno agents keep per-run state, so each shared agent runs one request at a time (sessions have their own copy)
+RUN_LOCKS: Dict[str, asyncio.Lock] = {}
+
 class ChatRequest(BaseModel):
     message: str
     stream: bool = False
     metadata: Dict[str, Any] = {}
+    # Continue a multi-turn conversation; turns of one session reuse Ollama's cached context
+    session_id: Optional[str] = None
+    # Seconds the caller will wait; the run is cancelled past it (at most API_SETTINGS.chat_deadline)
+    timeout: Optional[float] = None
 
 class ChatResponse(BaseModel):
     agent_id: str
@@ -47,6 +74,16 @@ class ChatResponse(BaseModel):
     metadata: Dict[str, Any] = {}
     interaction_id: str = None
 
+class BatchItem(BaseModel):
+    message: str
+    id: Optional[str] = None
+    agent_id: Optional[str] = None
+    metadata: Dict[str, Any] = {}
+
+class BatchChatRequest(BaseModel):
+    items: List[BatchItem]
+    concurrency: Optional[int] = None
+
 class AgentInfo(BaseModel):
     id: str
     name: str
@@ -112,11 +149,29 @@ async def get_agent_info(agent_id: str):
         "instructions": agent.instructions
     }
 
+@router.post("/auto/chat")
+async def chat_with_auto_agent(request: ChatRequest, background_tasks: BackgroundTasks, http_request: Request):
+    """Route the message to a specialist agent (keywords, then embeddings) and chat with it"""
+    decision = await asyncio.to_thread(auto_router.route, request.message)
+    agent_logger.info(
+        f"🧭 AUTO ROUTE - {decision.agent_id} via {decision.method} "
+        f"(confidence {decision.confidence}, {decision.latency_ms:.1f}ms)"
+    )
+    response = await chat_with_agent(decision.agent_id, request, background_tasks, http_request)
+    response.metadata = {**response.metadata, "routing": {
+        "agent_id": decision.agent_id,
+        "method": decision.method,
+        "confidence": decision.confidence,
+        "latency_ms": decision.latency_ms
+    }}
+    return response
+
 @track_agent_activity(agent_id="api")
 @router.post("/{agent_id}/chat")
-async def chat_with_agent(agent_id: str, request: ChatRequest, background_tasks: BackgroundTasks):
-    """Chat with a specific agent"""
+async def chat_with_agent(agent_id: str, request: ChatRequest, background_tasks: BackgroundTasks, http_request: Request):
+    """Chat with a specific agent; the run is cancelled if the client disconnects or the deadline passes"""
     start_time = time.time()
+    deadline = min(request.timeout or API_SETTINGS.chat_deadline, API_SETTINGS.chat_deadline)
     
     agent_logger.info(f"💬 CHAT REQUEST - Agent: {agent_id}")
     agent_logger.info(f"📝 Message: {request.message[:200]}{'...' if len(request.message) > 200 else ''}")
@@ -153,18 +208,48 @@ async def chat_with_agent(agent_id: str, request: ChatRequest, background_tasks:
         ollama_logger.info(f"⚡ Starting Ollama inference...")
         inference_start = time.time()
         
-        response = await run_agent_with_tracking(agent, agent_id, request.message)
+        metadata: Dict[str, Any] = {}
+        market_reads = track_market_reads()
+        fast_path = FAST_PATHS.get(agent_id) if not request.session_id else None
+        answer = await asyncio.to_thread(fast_path.answer, request.message) if fast_path else None
+        if answer is not None:
+            ollama_logger.info(f"⚡ Fast path ({answer.intent} {', '.join(answer.symbols)}) in {answer.latency_ms:.0f}ms, no inference")
+            response = RunResponse(content=answer.content)
+            metadata = {"fast_path": {"intent": answer.intent, "symbols": answer.symbols,
+                                      "latency_ms": answer.latency_ms}}
+        elif request.session_id and isinstance(agent, Agent):
+            session = chat_sessions.get(agent_id, agent, request.session_id)
+            async with session:
+                response = await run_agent_with_tracking(session.agent, agent_id, request.message,
+                                                         offload=agent_id in OFFLOADED_AGENTS,
+                                                         http_request=http_request, deadline=deadline)
+            prompt_tokens, prefill = session.record(response)
+            ollama_logger.info(
+                f"🧵 Session {request.session_id} turn {session.turns}: "
+                f"{prompt_tokens} prompt tokens evaluated, prefill {prefill:.2f}s"
+            )
+            metadata = {"session_id": request.session_id, "turn": session.turns,
+                        "prompt_tokens_evaluated": prompt_tokens, "prefill_seconds": round(prefill, 3)}
+        else:
+            response = await run_agent_with_tracking(agent, agent_id, request.message,
+                                                     offload=agent_id in OFFLOADED_AGENTS,
+                                                     http_request=http_request, deadline=deadline)
+        
+        if market_reads:
+            # Where the market data behind the answer came from, and how old it was
+            metadata["market_data"] = market_reads
         
+        content = response.content or ""
         inference_time = time.time() - inference_start
         ollama_logger.info(f"✅ OLLAMA RESPONSE - Time: {inference_time:.2f}s")
-        ollama_logger.debug(f"📤 Response length: {len(response.content)} chars")
-        ollama_logger.debug(f"📤 Response preview: {response.content[:300]}{'...' if len(response.content) > 300 else ''}")
+        ollama_logger.debug(f"📤 Response length: {len(content)} chars")
+        ollama_logger.debug(f"📤 Response preview: {content[:300]}{'...' if len(content) > 300 else ''}")
         
         # Update agent status
         manager.update_agent_status(agent_id, {
             "status": "idle",
             "last_message": request.message[:100] + "..." if len(request.message) > 100 else request.message,
-            "last_response": response.content[:100] + "..." if len(response.content) > 100 else response.content
+            "last_response": content[:100] + "..." if len(content) > 100 else content
         })
         
         # Record interaction
@@ -172,7 +257,7 @@ async def chat_with_agent(agent_id: str, request: ChatRequest, background_tasks:
             "agent_id": agent_id,
             "type": "chat_response",
             "message": request.message,
-            "response": response.content,
+            "response": content,
             "success": True
         })
         
@@ -182,10 +267,21 @@ async def chat_with_agent(agent_id: str, request: ChatRequest, background_tasks:
         return ChatResponse(
             agent_id=agent_id,
             agent_name=agent.name,
-            response=response.content,
+            response=content,
             success=True,
+            metadata=metadata,
             interaction_id=interaction_id
         )
+    except RunCancelled as e:
+        agent_logger.warning(f"🛑 CHAT CANCELLED - Agent: {agent_id}, {e.reason} after {time.time() - start_time:.2f}s")
+        manager.update_agent_status(agent_id, {"status": "idle", "last_message": "cancelled"})
+        return ChatResponse(
+            agent_id=agent_id,
+            agent_name=getattr(AGENTS[agent_id], "name", agent_id),
+            response="",
+            success=False,
+            error=str(e)
+        )
     except Exception as e:
         error_time = time.time() - start_time
         agent_logger.error(f"❌ CHAT ERROR - Agent: {agent_id}, Error: {str(e)}, Time: {error_time:.2f}s")
@@ -215,8 +311,175 @@ async def chat_with_agent(agent_id: str, request: ChatRequest, background_tasks:
             interaction_id=interaction_id
         )
 
-async def run_agent_with_tracking(agent, agent_id, message):
-    """Run agent with detailed tracking for Ollama interactions"""
+@router.delete("/{agent_id}/sessions/{session_id}")
+async def end_session(agent_id: str, session_id: str):
+    """Forget a chat session and its history"""
+    if not chat_sessions.end(agent_id, session_id):
+        raise HTTPException(status_code=404, detail=f"No session '{session_id}' for agent '{agent_id}'")
+    return {"agent_id": agent_id, "session_id": session_id, "ended": True}
+
+@router.post("/{agent_id}/batch")
+async def batch_chat_with_agent(agent_id: str, request: Request, concurrency: Optional[int] = None):
+    """
+    Run a batch of prompts and stream NDJSON results back as they complete
+    
+    The body is either JSON (``{"items": [...]}`` or a bare list), NDJSON with one
+    item per line, or a multipart upload with an NDJSON ``file`` field. Items may
+    set their own ``agent_id`` and are dispatched grouped by model so each Ollama
+    model stays loaded while its items run. A failing item yields an error line
+    and never aborts the rest of the batch.
+    """
+    if agent_id not in AGENTS:
+        agent_logger.error(f"❌ Agent '{agent_id}' not found")
+        raise HTTPException(status_code=404, detail=f"Agent '{agent_id}' not found")
+    
+    items, body_concurrency = await read_batch_items(request)
+    if len(items) > API_SETTINGS.batch_max_items:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(items)} items (max {API_SETTINGS.batch_max_items})"
+        )
+    
+    requested = concurrency or body_concurrency or API_SETTINGS.batch_default_concurrency
+    limit = max(1, min(requested, API_SETTINGS.batch_max_concurrency))
+    
+    # Model-affinity ordering: same-model items run back to back, input order within a model
+    def affinity_key(entry):
+        index, item = entry
+        target = AGENTS.get(item.agent_id or agent_id) if isinstance(item, BatchItem) else None
+        model = getattr(target, "model", None)
+        model_id = getattr(model, "id", str(model)) if target is not None else ""
+        return (model_id, index)
+    
+    pending = deque(sorted(enumerate(items), key=affinity_key))
+    results: asyncio.Queue = asyncio.Queue()
+    
+    agent_logger.info(f"📦 BATCH REQUEST - Agent: {agent_id}, Items: {len(items)}, Concurrency: {limit}")
+    manager.record_interaction({
+        "agent_id": agent_id,
+        "type": "batch_start",
+        "items": len(items),
+        "concurrency": limit
+    })
+    
+    async def worker():
+        while pending:
+            index, item = pending.popleft()
+            await results.put(await run_batch_item(index, item, agent_id))
+    
+    async def stream_results() -> AsyncIterator[str]:
+        start_time = time.time()
+        succeeded = 0
+        workers = [asyncio.create_task(worker()) for _ in range(min(limit, len(items)))]
+        try:
+            for _ in range(len(items)):
+                result = await results.get()
+                succeeded += 1 if result["success"] else 0
+                yield json.dumps(result, ensure_ascii=False) + "\n"
+            
+            total_time = time.time() - start_time
+            agent_logger.info(
+                f"✅ BATCH DONE - Agent: {agent_id}, {succeeded}/{len(items)} succeeded, Total time: {total_time:.2f}s"
+            )
+            manager.record_interaction({
+                "agent_id": agent_id,
+                "type": "batch_complete",
+                "items": len(items),
+                "succeeded": succeeded,
+                "duration": total_time
+            })
+            yield json.dumps({
+                "type": "summary",
+                "total": len(items),
+                "succeeded": succeeded,
+                "failed": len(items) - succeeded,
+                "duration": round(total_time, 3)
+            }) + "\n"
+        finally:
+            for task in workers:
+                task.cancel()
+    
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+async def read_batch_items(request: Request):
+    """
+    Parse a batch request body
+    
+    Returns:
+        Tuple of (items, concurrency from the body). NDJSON lines that cannot be
+        parsed are returned as error strings so they are reported per item.
+    """
+    content_type = request.headers.get("content-type", "")
+    
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=400, detail="Multipart batch upload requires a 'file' field")
+        lines = (await upload.read()).decode("utf-8").splitlines()
+    elif "ndjson" in content_type or "jsonl" in content_type:
+        lines = (await request.body()).decode("utf-8").splitlines()
+    else:
+        try:
+            payload = await request.json()
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            raise HTTPException(status_code=400, detail="Batch body must be JSON or NDJSON")
+        if isinstance(payload, list):
+            payload = {"items": payload}
+        if not isinstance(payload, dict):
+            raise HTTPException(status_code=422, detail="Batch body must be an object or a list of items")
+        payload["items"] = [{"message": item} if isinstance(item, str) else item for item in payload.get("items", [])]
+        try:
+            batch = BatchChatRequest(**payload)
+        except ValidationError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        return list(batch.items), batch.concurrency
+    
+    items: List[Any] = []
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+            items.append(BatchItem(message=data) if isinstance(data, str) else BatchItem(**data))
+        except (json.JSONDecodeError, ValidationError, TypeError) as e:
+            items.append(f"Invalid batch line {line_number}: {e}")
+    return items, None
+
+async def run_batch_item(index: int, item, default_agent_id: str) -> Dict[str, Any]:
+    """Run one batch item, turning any failure into an error result"""
+    if isinstance(item, str):
+        return {"type": "result", "index": index, "id": None, "agent_id": default_agent_id,
+                "success": False, "error": item, "duration": 0.0}
+    
+    target_id = item.agent_id or default_agent_id
+    result: Dict[str, Any] = {"type": "result", "index": index, "id": item.id, "agent_id": target_id}
+    start_time = time.time()
+    try:
+        if target_id not in AGENTS:
+            raise ValueError(f"Agent '{target_id}' not found")
+        agent = AGENTS[target_id]
+        if hasattr(agent, "deep_copy"):
+            # Agno agents keep per-run state, so parallel items each get their own copy
+            response = await run_agent_with_tracking(agent.deep_copy(), target_id, item.message, offload=True)
+        else:
+            async with RUN_LOCKS.setdefault(target_id, asyncio.Lock()):
+                response = await run_agent_with_tracking(agent, target_id, item.message, offload=True)
+        result.update(success=True, response=response.content)
+    except Exception as e:
+        agent_logger.error(f"❌ BATCH ITEM ERROR - Agent: {target_id}, Index: {index}, Error: {str(e)}")
+        result.update(success=False, error=str(e))
+    
+    result["duration"] = round(time.time() - start_time, 3)
+    return result
+
+async def run_agent_with_tracking(agent, agent_id, message, offload: bool = False,
+                                  http_request: Optional[Request] = None, deadline: Optional[float] = None):
+    """Run agent with detailed tracking for Ollama interactions
+
+    With ``http_request``, the run is cancelled when that client disconnects
+    or after ``deadline`` seconds (see ``api.disconnect.run_cancellable``).
+    """
     agent_logger.debug(f"🔄 Running agent {agent_id} with message: {message[:100]}...")
     
     # Log agent configuration
@@ -227,7 +490,16 @@ async def run_agent_with_tracking(agent, agent_id, message):
     
     try:
         # This is where the actual Ollama call happens
-        response = agent.run(message)
+        if http_request is not None:
+            # The event loop watches the client connection, so the run itself goes to a worker thread
+            shared = agent is AGENTS.get(agent_id)
+            async with RUN_LOCKS.setdefault(agent_id, asyncio.Lock()) if shared else nullcontext():
+                response = await run_cancellable(http_request, agent_id, partial(agent.run, message), deadline)
+        elif offload:
+            # Keep the event loop free while the agent runs in a worker thread
+            response = await asyncio.to_thread(agent.run, message)
+        else:
+            response = agent.run(message)
         
         # Filter think tags if reasoning is disabled
         if hasattr(response, 'content') and hasattr(agent, 'reasoning') and not agent.reasoning:
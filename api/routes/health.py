@@ -4,7 +4,20 @@ Health check routes
 
 from fastapi import APIRouter
 from datetime import datetime
-import ollama
+from agents import whatsapp_agent
+from agents.finance import finance_fast_path, watchlist_prefetcher
+from agents.python_tools import code_workers
+from agents.router import auto_router
+from agents.search_tools import web_searcher
+from agents.shell_tools import shell_executor
+from agents.sessions import chat_sessions
+from api.loop_monitor import loop_monitor
+from utils.cancellation import cancellation_stats
+from utils.cascade import cascade_stats
+from utils.context_budget import context_stats
+from utils.model_inventory import model_inventory
+from utils.ollama_pool import ollama_pool
+from utils.tool_budget import tool_budget_stats
 
 router = APIRouter()
 
@@ -21,17 +34,95 @@ async def health_check():
 async def ollama_health():
     """Check Ollama connection"""
     try:
-        # Try to list models to check if Ollama is running
-        models = ollama.list()
+        # Served from the model inventory cache; refetched at most once per TTL
+        models = await model_inventory.get_models()
         return {
-            "status": "healthy",
-            "ollama_connected": True,
-            "models_count": len(models.get("models", [])),
-            "available_models": [model["name"] for model in models.get("models", [])]
+            "status": "healthy" if model_inventory.last_error is None else "degraded",
+            "ollama_connected": model_inventory.last_error is None,
+            "models_count": len(models),
+            "available_models": [model["name"] for model in models],
+            "inventory": model_inventory.stats(),
+            "backends": ollama_pool.stats()
         }
     except Exception as e:
         return {
             "status": "unhealthy",
             "ollama_connected": False,
             "error": str(e)
-        } 
\ No newline at end of file
+        }
+
+@router.get("/loop")
+async def loop_health(top: int = 10, reset: bool = False):
+    """Event-loop lag and the call sites that blocked the loop the longest"""
+    stats = loop_monitor.stats(top=top)
+    if reset:
+        loop_monitor.reset()
+    return {
+        "status": "degraded" if stats["blocked_now"] or stats["lag_p99"] > loop_monitor.threshold else "healthy",
+        **stats
+    }
+
+@router.get("/knowledge")
+async def knowledge_health():
+    """Hit rates of the WhatsApp knowledge retrieval and embedding caches"""
+    return whatsapp_agent.knowledge_stats()
+
+@router.get("/memory")
+async def memory_health():
+    """WhatsApp user-memory cache hit rate, write batching, prompt-token savings and compaction"""
+    return whatsapp_agent.memory_stats()
+
+@router.get("/context")
+async def context_health():
+    """Prompt sizes per agent after fitting into its token budget"""
+    return {name: stats.as_dict() for name, stats in sorted(context_stats.items())}
+
+@router.get("/sessions")
+async def sessions_health():
+    """Open chat sessions and the prompt tokens Ollama evaluated per turn"""
+    return chat_sessions.stats()
+
+@router.get("/code")
+async def code_health():
+    """CodeAgent Python workers: runs, errors, timeouts, replaced workers and limits"""
+    return code_workers.stats()
+
+@router.get("/shell")
+async def shell_health():
+    """SystemAgent shell commands: runs, failures, timeouts and concurrency"""
+    return shell_executor.stats()
+
+@router.get("/router")
+async def router_health():
+    """/agents/auto/chat routing decisions per stage and agent, and routing latency"""
+    return auto_router.stats()
+
+@router.get("/cascade")
+async def cascade_health():
+    """Model cascade per agent: answers kept from the small model, escalation rate and seconds saved"""
+    return {name: stats.as_dict() for name, stats in sorted(cascade_stats.items())}
+
+@router.get("/finance")
+async def finance_health():
+    """Finance fast path: lookups answered without the agent, passed to it, or failed at the tool"""
+    return finance_fast_path.stats()
+
+@router.get("/watchlist")
+async def watchlist_health():
+    """Prefetched watchlist: refreshes, failures and how often requests were served from the store"""
+    return watchlist_prefetcher.stats()
+
+@router.get("/search")
+async def search_health():
+    """SearchAgent web searches: queries per call, duplicate results removed, errors and latency"""
+    return web_searcher.stats()
+
+@router.get("/tools")
+async def tools_health():
+    """Tool loops per agent: iterations per run, repeated calls served from the run and budgets hit"""
+    return {name: stats.as_dict() for name, stats in sorted(tool_budget_stats.items())}
+
+@router.get("/cancellations")
+async def cancellations_health():
+    """Chat runs per agent and team: completed, cancelled on disconnect or deadline, tokens and seconds saved"""
+    return {name: stats.as_dict() for name, stats in sorted(cancellation_stats.items())}
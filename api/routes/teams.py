@@ -2,9 +2,18 @@
 Team routes for the API
 """
 
-from fastapi import APIRouter, HTTPException
+import asyncio
+import logging
+from functools import partial
+from typing import Dict, Optional
+from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
+from api.disconnect import run_cancellable
+from api.settings import API_SETTINGS
 from teams import collaborative_team
+from utils.cancellation import RunCancelled
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -13,9 +22,14 @@ TEAMS = {
     "collaborative": collaborative_team
 }
 
+# Each team runs one request at a time, in a worker thread so disconnects can be noticed
+RUN_LOCKS: Dict[str, asyncio.Lock] = {}
+
 class TeamChatRequest(BaseModel):
     message: str
     stream: bool = False
+    # Seconds the caller will wait; the run is cancelled past it (at most API_SETTINGS.chat_deadline)
+    timeout: Optional[float] = None
 
 class TeamChatResponse(BaseModel):
     team_name: str
@@ -60,20 +74,31 @@ async def get_team_info(team_id: str):
     }
 
 @router.post("/{team_id}/chat")
-async def chat_with_team(team_id: str, request: TeamChatRequest):
-    """Chat with a specific team"""
+async def chat_with_team(team_id: str, request: TeamChatRequest, http_request: Request):
+    """Chat with a specific team; the run is cancelled if the client disconnects or the deadline passes"""
     if team_id not in TEAMS:
         raise HTTPException(status_code=404, detail=f"Team '{team_id}' not found")
     
+    deadline = min(request.timeout or API_SETTINGS.chat_deadline, API_SETTINGS.chat_deadline)
     try:
         team = TEAMS[team_id]
-        response = team.run(request.message)
+        async with RUN_LOCKS.setdefault(team_id, asyncio.Lock()):
+            response = await run_cancellable(http_request, f"team:{team_id}", partial(team.run, request.message),
+                                             deadline)
         
         return TeamChatResponse(
             team_name=team.name,
             response=response.content,
             success=True
         )
+    except RunCancelled as e:
+        logger.warning(f"🛑 Team {team_id} run cancelled ({e.reason})")
+        return TeamChatResponse(
+            team_name=TEAMS[team_id].name,
+            response="",
+            success=False,
+            error=str(e)
+        )
     except Exception as e:
         return TeamChatResponse(
             team_name=TEAMS[team_id].name,
@@ -0,0 +1,60 @@
+"""
+Messaging provider webhook routes
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+from agents import whatsapp_agent
+from api.settings import API_SETTINGS
+from api.websocket import manager
+from utils.whatsapp_sender import WhatsAppCloudSender
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Sends answers back to WhatsApp users; None until the Cloud API credentials are configured
+whatsapp_sender = WhatsAppCloudSender(
+    API_SETTINGS.whatsapp_access_token,
+    API_SETTINGS.whatsapp_phone_number_id,
+    api_version=API_SETTINGS.whatsapp_api_version
+) if API_SETTINGS.whatsapp_access_token and API_SETTINGS.whatsapp_phone_number_id else None
+
+async def deliver_whatsapp_reply(reply: Dict[str, Any]):
+    """Reply handler of the WhatsApp queue: send the answer to its sender and show it on /ws"""
+    if whatsapp_sender is not None:
+        await whatsapp_sender.send(reply)
+    await manager.broadcast({"type": "whatsapp_reply", **reply})
+
+@router.get("/whatsapp")
+async def verify_whatsapp_webhook(request: Request):
+    """Subscription handshake: echo hub.challenge when the verify token matches"""
+    params = request.query_params
+    if params.get("hub.mode") == "subscribe" and API_SETTINGS.whatsapp_verify_token \
+            and params.get("hub.verify_token") == API_SETTINGS.whatsapp_verify_token:
+        return PlainTextResponse(params.get("hub.challenge", ""))
+    raise HTTPException(status_code=403, detail="Webhook verification failed")
+
+@router.post("/whatsapp")
+async def whatsapp_webhook(request: Request):
+    """Acknowledge a delivery immediately; its messages are answered by the queue workers"""
+    try:
+        payload = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid JSON payload")
+    try:
+        result = await whatsapp_agent.handle_webhook(payload)
+    except asyncio.QueueFull as e:
+        # 503 makes the provider redeliver later; already queued ids are deduplicated then
+        logger.warning(f"⏳ WhatsApp queue full: {e}")
+        raise HTTPException(status_code=503, detail="Message queue is full, retry later")
+    return {"status": "accepted", **result}
+
+@router.get("/whatsapp/queue")
+async def whatsapp_queue_stats():
+    """Pending messages, throughput counters and average wait/handle times"""
+    return whatsapp_agent.webhook_queue.stats()
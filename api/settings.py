@@ -2,6 +2,7 @@
 API settings and configuration
 """
 
+import os
 from dataclasses import dataclass
 from typing import Optional
 
@@ -20,6 +21,28 @@ class APISettings:
     ollama_host: str = "http://localhost:11434"
     ollama_timeout: int = 300
     
+    # Batch settings
+    batch_max_items: int = 5000
+    batch_default_concurrency: int = 2
+    batch_max_concurrency: int = 8
+    
+    # Event-loop monitor settings
+    loop_monitor_enabled: bool = True
+    loop_lag_interval: float = 0.05
+    blocking_threshold: float = 0.2
+    
+    # Cancellation settings: longest a chat run may take, and how often the client connection is checked
+    chat_deadline: float = float(os.getenv("CHAT_DEADLINE", "300"))
+    disconnect_poll_interval: float = 0.25
+    
+    # WhatsApp webhook settings
+    whatsapp_verify_token: str = os.getenv("WHATSAPP_VERIFY_TOKEN", "")
+    # Cloud API credentials used to send the answers back (without them replies only go to /ws)
+    whatsapp_access_token: str = os.getenv("WHATSAPP_ACCESS_TOKEN", "")
+    whatsapp_phone_number_id: str = os.getenv("WHATSAPP_PHONE_NUMBER_ID", "")
+    whatsapp_api_version: str = os.getenv("WHATSAPP_API_VERSION", "v21.0")
+    webhook_drain_timeout: float = 10.0
+    
     # CORS settings
     cors_origins: list[str] = None
     
@@ -11,7 +11,8 @@ from pathlib import Path
 from rich.console import Console
 from rich.panel import Panel
 from rich.progress import Progress, SpinnerColumn, TextColumn
-from utils.model_utils import check_ollama_connection, list_available_models
+from utils.model_utils import check_ollama_connection, check_model_availability
+from utils.model_inventory import model_inventory
 
 console = Console()
 
@@ -77,9 +78,6 @@ def pull_models():
         border_style="blue"
     ))
     
-    # Check which models are already available
-    available_models = [model["name"] for model in list_available_models()]
-    
     required_models = [
         "mistral:latest",      # Main model
         "llama3.2:3b",         # Lightweight alternative
@@ -88,7 +86,7 @@ def pull_models():
     
     success = True
     for model in required_models:
-        if model in available_models:
+        if check_model_availability(model):
             console.print(f"[green]✅ Model {model} already available[/green]")
             continue
             
@@ -96,6 +94,7 @@ def pull_models():
         if not run_command(f"ollama pull {model}", f"Downloading {model}"):
             console.print(f"[yellow]⚠️ Failed to download {model}[/yellow]")
             success = False
+        model_inventory.invalidate()
         time.sleep(1)  # Pause between downloads
     
     return success
@@ -3,13 +3,12 @@ Collaborative team of specialized agents
 """
 
 from agno.team import Team
-from agno.models.ollama import Ollama
 from agents import search_agent, finance_agent, code_agent, system_agent
 from agents.settings import get_model
 
 # Utiliser un modèle plus puissant pour le team leader
 # Essayer llama3.2:latest en alternative
-powerful_model = Ollama(id="llama3.2:latest", host="http://localhost:11434")
+powerful_model = get_model("llama3.2:latest")
 
 collaborative_team = Team(
     name="CollaborativeTeam",
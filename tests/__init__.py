@@ -0,0 +1,3 @@
+"""
+Tests and benchmarks for the Multi-Agent System
+"""
@@ -0,0 +1,3 @@
+"""
+Load and throughput benchmarks
+"""
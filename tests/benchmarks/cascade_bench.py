@@ -0,0 +1,141 @@
+"""
+Model cascade benchmark: latency and escalation rate of the ``general`` agent
+
+Runs the same questions through the ``general`` agent twice:
+
+- ``large``: its own model (``qwen3:8b``) answers everything
+- ``cascade``: the small model (``AGENT_CASCADE_MODELS["general"]``) answers
+  first and the large model only gets what the small answer fails to convince
+
+Without ``--host`` the fake Ollama server stands in, with the small model
+``--small-speed`` times the large one's latency and scripted replies: the
+small model hedges on the questions marked hard and answers the rest. Pass
+``--host`` to measure real models on real answers.
+
+Usage:
+  python -m tests.benchmarks.cascade_bench
+  python -m tests.benchmarks.cascade_bench --host http://localhost:11434 --json cascade.json
+"""
+
+import argparse
+import copy
+import json
+import statistics
+import sys
+import time
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from agno.agent import Agent
+
+from agents import general_agent
+from agents.settings import AGENT_CASCADE_MODELS
+from tests.fake_ollama import FakeOllamaServer
+from utils.cascade import cascade_stats_for
+
+# (question, hard for a small model)
+QUESTIONS = [
+    ("Bonjour ! Comment vas-tu aujourd'hui ?", False),
+    ("Explique-moi la photosynthèse simplement.", False),
+    ("Quelle est la capitale du Canada ?", False),
+    ("Donne-moi trois conseils pour mieux dormir.", False),
+    ("Traduis 'merci beaucoup' en allemand.", False),
+    ("Qu'est-ce qu'une année bissextile ?", False),
+    ("What is the difference between weather and climate?", False),
+    ("Give me a short definition of democracy.", False),
+    ("Pourquoi le ciel est-il bleu ?", False),
+    ("Combien de continents y a-t-il ?", False),
+    ("Compare les philosophies de Spinoza et de Leibniz sur la liberté.", True),
+    ("Quelles sont les implications du théorème d'incomplétude de Gödel pour l'IA ?", True),
+    ("Explain the causes of the 1929 crash and their relevance to 2008.", True),
+    ("Analyse les forces et faiblesses du modèle économique des coopératives.", True),
+]
+HARD = {question for question, hard in QUESTIONS if hard}
+
+ANSWERS = {
+    "fr": "Voici une réponse claire : les points essentiels sont expliqués simplement, avec un exemple concret pour bien comprendre le sujet.",
+    "en": "Here is a clear answer: the key points are explained simply, with a concrete example to understand the topic.",
+    "hedge": "Je ne suis pas sûr de pouvoir répondre précisément à cette question.",
+}
+
+
+def scripted_reply(small_model: str):
+    def reply(model: str, messages: List[Dict[str, Any]]) -> str:
+        question = str(messages[-1].get("content") or "") if messages else ""
+        if model == small_model and question in HARD:
+            return ANSWERS["hedge"]
+        english = question.split()[0] in ("What", "Give", "Explain") if question else False
+        return ANSWERS["en" if english else "fr"]
+    return reply
+
+
+def on_host(agent: Agent, host: str, name: str, cascade: bool) -> Agent:
+    """Copy of ``agent`` talking to ``host`` directly, its stats under ``name``, with or without its small model"""
+    model = copy.deepcopy(agent.model)
+    model.host, model.client, model.async_client = host, None, None
+    model.context_name = name
+    if not cascade:
+        model.small_model = None
+    return agent.deep_copy(update={"model": model})
+
+
+def run_mode(agent: Agent, name: str) -> Dict[str, Any]:
+    latencies = []
+    for question, _ in QUESTIONS:
+        started = time.perf_counter()
+        agent.run(question)
+        latencies.append(time.perf_counter() - started)
+    result = {
+        "avg_latency_s": round(statistics.mean(latencies), 4),
+        "p95_latency_s": round(sorted(latencies)[int(0.95 * (len(latencies) - 1))], 4),
+    }
+    result.update(cascade_stats_for(name).as_dict())
+    return result
+
+
+def run_benchmark(host: Optional[str] = None, small_speed: float = 0.3) -> Dict[str, Any]:
+    small_model = AGENT_CASCADE_MODELS["general"]
+    fake = None if host else FakeOllamaServer(
+        prefill_latency=0.05, token_latency=0.01,
+        model_speed={small_model: small_speed}, responder=scripted_reply(small_model)
+    )
+    results: Dict[str, Any] = {}
+    with fake or nullcontext():
+        url = host or fake.url
+        for mode in ("large", "cascade"):
+            name = f"bench-{mode}-{time.time_ns()}"
+            print(f"🪜 {mode}: {len(QUESTIONS)} questions against {url}")
+            results[mode] = run_mode(on_host(general_agent, url, name, cascade=mode == "cascade"), name)
+    large, cascade = results["large"]["avg_latency_s"], results["cascade"]["avg_latency_s"]
+    results["speedup"] = round(large / cascade, 2) if cascade else None
+    return results
+
+
+def print_report(results: Dict[str, Any]):
+    print(f"\n{'mode':<10}{'avg s':>10}{'p95 s':>10}{'small':>8}{'escalated':>11}{'rate':>8}{'saved s':>10}")
+    for mode in ("large", "cascade"):
+        r = results[mode]
+        print(f"{mode:<10}{r['avg_latency_s']:>10}{r['p95_latency_s']:>10}{r['answered_by_small']:>8}"
+              f"{r['escalated']:>11}{r['escalation_rate']:>8}{r['seconds_saved']:>10}")
+    print(f"⚡ Average latency x{results['speedup']} with the cascade "
+          f"(escalations: {results['cascade']['escalation_reasons'] or 'none'})")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Latency and escalation rate of the general agent's model cascade")
+    parser.add_argument("--host", help="Real Ollama host (default: the fake server with scripted replies)")
+    parser.add_argument("--small-speed", type=float, default=0.3,
+                        help="Fake server only: small model latency relative to the large one")
+    parser.add_argument("--json", dest="json_path", help="Write results as JSON to this path")
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(host=args.host, small_speed=args.small_speed)
+    print_report(results)
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps({"config": vars(args), "results": results}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+"""
+Chunking benchmark: FastChunking vs AgenticChunking on a fixed local corpus
+
+Builds a deterministic corpus of technical sections, each hiding one fact
+sentence among filler, chunks it with every strategy and reports ingestion
+time, chunk counts, how many facts were cut in half by a chunk boundary and
+retrieval hit@k for one question per fact. Retrieval uses TF-IDF by default
+(independent of the embedder) or Ollama embeddings with ``--embed``.
+
+AgenticChunking talks to a fake Ollama server with realistic latency unless
+``--ollama-host`` points at a real one (which also yields real breakpoints).
+
+Usage:
+  python -m tests.benchmarks.chunking_bench
+  python -m tests.benchmarks.chunking_bench --sections 120 --prefill-latency 0.5
+  python -m tests.benchmarks.chunking_bench --ollama-host http://localhost:11434 --embed
+"""
+
+import argparse
+import json
+import math
+import random
+import re
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from agno.document import Document
+from agno.document.chunking.agentic import AgenticChunking
+from agno.document.chunking.strategy import ChunkingStrategy
+from agno.models.ollama import Ollama
+
+from agents.chunking import FastChunking
+from tests.fake_ollama import FakeOllamaServer
+
+NAMES = ["Aurora", "Basalt", "Cobalt", "Dune", "Ember", "Fjord", "Granite", "Harbor", "Iris", "Juniper",
+         "Krypton", "Lagoon", "Meridian", "Nimbus", "Onyx", "Prairie", "Quartz", "Raven", "Sierra", "Tundra"]
+STORES = ["PostgreSQL", "SQLite", "Redis", "object storage", "a local LMDB file", "DuckDB"]
+FILLER = [
+    "Operators should review the deployment checklist before every release.",
+    "The service emits structured logs that are shipped to the central collector.",
+    "Configuration changes are applied through the usual review process.",
+    "Capacity is planned quarterly based on the observed peak traffic.",
+    "Alerts page the on-call engineer when error rates exceed the budget.",
+    "Backups are verified weekly by restoring them into a staging environment.",
+    "Dependencies are pinned and upgraded in small, reviewed batches.",
+    "The team documents every incident with a blameless postmortem.",
+    "Feature flags gate risky changes until they have been validated.",
+    "Health checks run every few seconds from two independent regions.",
+]
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+@dataclass
+class Fact:
+    question: str
+    sentence: str
+
+
+def build_corpus(sections: int = 60, sections_per_page: int = 3, seed: int = 7) -> Tuple[List[Document], List[Fact]]:
+    """Deterministic pages of filler paragraphs, one fact sentence per section"""
+    rng = random.Random(seed)
+    pages: List[Document] = []
+    facts: List[Fact] = []
+    page_sections: List[str] = []
+    for index in range(sections):
+        name = f"{NAMES[index % len(NAMES)]}-{index // len(NAMES) + 1}"
+        port = 4000 + index * 7
+        store = STORES[index % len(STORES)]
+        fact = f"The {name} service listens on port {port} and keeps its state in {store}."
+        facts.append(Fact(question=f"Which port does the {name} service listen on?", sentence=fact))
+
+        paragraphs = []
+        for _ in range(rng.randint(2, 4)):
+            paragraphs.append(" ".join(rng.choice(FILLER) for _ in range(rng.randint(3, 7))))
+        target = rng.randrange(len(paragraphs))
+        sentences = paragraphs[target].split(". ")
+        sentences.insert(rng.randrange(len(sentences) + 1), fact[:-1])
+        paragraphs[target] = ". ".join(sentences)
+        page_sections.append(f"{name} service\n\n" + "\n\n".join(paragraphs))
+
+        if len(page_sections) == sections_per_page or index == sections - 1:
+            number = len(pages) + 1
+            pages.append(Document(name="corpus", id=f"corpus_{number}", meta_data={"page": number},
+                                  content="\n\n".join(page_sections)))
+            page_sections = []
+    return pages, facts
+
+
+def tokenize(text: str) -> List[str]:
+    return WORD_RE.findall(text.lower())
+
+
+def tfidf_ranker(chunks: List[str]) -> Callable[[str], List[int]]:
+    """Build a function ranking chunk indices by TF-IDF cosine similarity to a query"""
+    docs = [Counter(tokenize(chunk)) for chunk in chunks]
+    df = Counter(term for doc in docs for term in doc)
+    idf = {term: math.log((1 + len(docs)) / (1 + count)) + 1 for term, count in df.items()}
+
+    def vector(counts: Counter) -> Dict[str, float]:
+        vec = {term: tf * idf.get(term, 0.0) for term, tf in counts.items()}
+        norm = math.sqrt(sum(v * v for v in vec.values())) or 1.0
+        return {term: v / norm for term, v in vec.items()}
+
+    vectors = [vector(doc) for doc in docs]
+
+    def rank(query: str) -> List[int]:
+        q = vector(Counter(tokenize(query)))
+        scores = [sum(weight * vec.get(term, 0.0) for term, weight in q.items()) for vec in vectors]
+        return sorted(range(len(chunks)), key=lambda i: scores[i], reverse=True)
+
+    return rank
+
+
+def embedding_rank(chunk_vectors: List[List[float]], query_vector: List[float]) -> List[int]:
+    def cosine(a: List[float], b: List[float]) -> float:
+        dot = sum(x * y for x, y in zip(a, b))
+        norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+        return dot / norm if norm else 0.0
+
+    scores = [cosine(vector, query_vector) for vector in chunk_vectors]
+    return sorted(range(len(chunk_vectors)), key=lambda i: scores[i], reverse=True)
+
+
+def evaluate(strategy: ChunkingStrategy, pages: List[Document], facts: List[Fact], k: int = 3,
+             embedder=None) -> Dict[str, float]:
+    """Chunk the corpus and measure time, fact integrity and retrieval hit@k"""
+    started = time.perf_counter()
+    chunks = [chunk for page in pages for chunk in strategy.chunk(page)]
+    chunk_seconds = time.perf_counter() - started
+    texts = [" ".join(chunk.content.split()) for chunk in chunks]
+
+    # Facts with no chunk containing the whole sentence were cut by a boundary
+    split_facts = sum(1 for fact in facts if not any(fact.sentence[:-1] in text for text in texts))
+
+    chunk_vectors = [embedder.get_embedding(text) for text in texts] if embedder else None
+    tfidf_rank = tfidf_ranker(texts)
+    hits = 0
+    for fact in facts:
+        if chunk_vectors is not None:
+            ranking = embedding_rank(chunk_vectors, embedder.get_embedding(fact.question))
+        else:
+            ranking = tfidf_rank(fact.question)
+        if any(fact.sentence[:-1] in texts[i] for i in ranking[:k]):
+            hits += 1
+
+    sizes = [len(text) for text in texts] or [0]
+    return {
+        "chunk_seconds": round(chunk_seconds, 4),
+        "chunks": len(chunks),
+        "avg_chunk_chars": round(sum(sizes) / len(sizes)),
+        "max_chunk_chars": max(sizes),
+        "split_facts": split_facts,
+        f"hit@{k}": round(hits / len(facts), 3) if facts else 0.0,
+    }
+
+
+def run_benchmark(ollama_host: str, sections: int = 60, chunk_size: int = 1000, overlap: int = 100,
+                  model: str = "mistral:latest", k: int = 3, embed: bool = False,
+                  strategies: Optional[List[str]] = None) -> Dict[str, Dict[str, float]]:
+    pages, facts = build_corpus(sections)
+    embedder = None
+    if embed:
+        from agno.embedder.ollama import OllamaEmbedder
+        embedder = OllamaEmbedder(id="nomic-embed-text", host=ollama_host, dimensions=768)
+
+    candidates: Dict[str, ChunkingStrategy] = {
+        "fast": FastChunking(chunk_size=chunk_size, overlap=overlap),
+        "agentic": AgenticChunking(model=Ollama(id=model, host=ollama_host), max_chunk_size=chunk_size),
+    }
+    results = {}
+    for name in strategies or list(candidates):
+        print(f"✂️  Chunking {len(pages)} pages with {name}...")
+        results[name] = evaluate(candidates[name], pages, facts, k=k, embedder=embedder)
+    return results
+
+
+def print_report(results: Dict[str, Dict[str, float]]):
+    columns = list(next(iter(results.values())))
+    print("\n" + f"{'strategy':<10}" + "".join(f"{c:>16}" for c in columns))
+    for name, row in results.items():
+        print(f"{name:<10}" + "".join(f"{row[c]:>16}" for c in columns))
+    if "fast" in results and "agentic" in results and results["fast"]["chunk_seconds"]:
+        speedup = results["agentic"]["chunk_seconds"] / results["fast"]["chunk_seconds"]
+        print(f"\n⚡ fast chunking is {speedup:,.0f}x faster than agentic")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare FastChunking and AgenticChunking")
+    parser.add_argument("--sections", type=int, default=60, help="Corpus sections (three per page)")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--overlap", type=int, default=100)
+    parser.add_argument("--k", type=int, default=3, help="Retrieval depth for hit@k")
+    parser.add_argument("--model", default="mistral:latest", help="Model used by AgenticChunking")
+    parser.add_argument("--strategies", default="fast,agentic")
+    parser.add_argument("--ollama-host", help="Use a real Ollama server instead of the fake one")
+    parser.add_argument("--embed", action="store_true", help="Rank with nomic-embed-text instead of TF-IDF")
+    parser.add_argument("--prefill-latency", type=float, default=0.3, help="Fake Ollama seconds before first token")
+    parser.add_argument("--token-latency", type=float, default=0.02, help="Fake Ollama seconds per token")
+    parser.add_argument("--json", dest="json_path", help="Write results as JSON to this path")
+    args = parser.parse_args(argv)
+
+    fake = None
+    host = args.ollama_host
+    if not host:
+        fake = FakeOllamaServer(prefill_latency=args.prefill_latency, token_latency=args.token_latency,
+                                tokens=4).start()
+        host = fake.url
+        print(f"🦙 Fake Ollama on {host}")
+    try:
+        results = run_benchmark(host, sections=args.sections, chunk_size=args.chunk_size, overlap=args.overlap,
+                                model=args.model, k=args.k, embed=args.embed,
+                                strategies=[s.strip() for s in args.strategies.split(",") if s.strip()])
+    finally:
+        if fake:
+            fake.stop()
+
+    print_report(results)
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps({"config": vars(args), "results": results}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
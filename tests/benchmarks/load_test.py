@@ -0,0 +1,333 @@
+"""
+Load test for the API against the fake Ollama server
+
+Starts the fake Ollama server and ``api.main:app`` under uvicorn, drives
+concurrent chat, team and WebSocket load, and reports latency percentiles,
+throughput and event-loop lag for each scenario.
+
+Usage:
+  python -m tests.benchmarks.load_test
+  python -m tests.benchmarks.load_test --requests 200 --concurrency 16 --token-latency 0.02
+  python -m tests.benchmarks.load_test --json bench.json --max-p95 5 --max-lag 0.5
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+import websockets
+
+from tests.fake_ollama import FakeOllamaServer
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of values (0.0 when empty)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100.0 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+@dataclass
+class ScenarioResult:
+    """Latency, throughput and loop lag measured for one scenario"""
+    name: str
+    requests: int = 0
+    errors: int = 0
+    duration: float = 0.0
+    latencies: List[float] = field(default_factory=list)
+    lag_samples: List[float] = field(default_factory=list)
+    first_error: Optional[str] = None
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "scenario": self.name,
+            "requests": self.requests,
+            "errors": self.errors,
+            "throughput_rps": round(self.requests / self.duration, 2) if self.duration else 0.0,
+            "p50": round(percentile(self.latencies, 50), 4),
+            "p95": round(percentile(self.latencies, 95), 4),
+            "p99": round(percentile(self.latencies, 99), 4),
+            "loop_lag_p50": round(percentile(self.lag_samples, 50), 4),
+            "loop_lag_p99": round(percentile(self.lag_samples, 99), 4),
+            "loop_lag_max": round(max(self.lag_samples, default=0.0), 4),
+            "first_error": self.first_error,
+        }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class ApiServer:
+    """Runs api.main:app in a uvicorn subprocess pointed at a given Ollama host"""
+
+    def __init__(self, ollama_host: str, port: Optional[int] = None):
+        self.port = port or free_port()
+        self.ollama_host = ollama_host
+        self.process: Optional[subprocess.Popen] = None
+        self.workdir = tempfile.TemporaryDirectory(prefix="bench-api-")
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self, timeout: float = 120.0) -> "ApiServer":
+        env = {
+            **os.environ,
+            "OLLAMA_HOST": self.ollama_host,
+            "PYTHONPATH": str(REPO_ROOT) + os.pathsep + os.environ.get("PYTHONPATH", ""),
+        }
+        log_file = open(Path(self.workdir.name) / "api.log", "w")
+        # Run from a scratch directory so the API's log file does not land in the repo
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "api.main:app",
+             "--host", "127.0.0.1", "--port", str(self.port), "--log-level", "warning"],
+            cwd=self.workdir.name,
+            env=env,
+            stdout=log_file,
+            stderr=subprocess.STDOUT,
+        )
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"API exited early, see {log_file.name}")
+            try:
+                if httpx.get(f"{self.url}/health/", timeout=1.0).status_code == 200:
+                    return self
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.25)
+        raise TimeoutError(f"API did not become ready within {timeout}s")
+
+    def stop(self):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self.workdir.cleanup()
+
+    def __enter__(self) -> "ApiServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+async def probe_loop_lag(client: httpx.AsyncClient, samples: List[float], stop: asyncio.Event, interval: float):
+    """
+    Sample event-loop lag as the latency of the trivial /health/ endpoint
+
+    On an idle loop this is a millisecond round trip; while a route blocks the
+    loop it grows to the length of the blocking call.
+    """
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            await client.get("/health/", timeout=60.0)
+            samples.append(time.perf_counter() - started)
+        except httpx.HTTPError:
+            pass
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run_scenario(
+    name: str,
+    base_url: str,
+    total: int,
+    concurrency: int,
+    operation: Callable[[httpx.AsyncClient, int], Awaitable[None]],
+    lag_interval: float = 0.05,
+) -> ScenarioResult:
+    """Run ``operation`` ``total`` times with ``concurrency`` workers while probing loop lag"""
+    result = ScenarioResult(name=name)
+    counter = iter(range(total))
+    stop = asyncio.Event()
+    limits = httpx.Limits(max_connections=concurrency + 2)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=300.0, limits=limits) as client:
+        async def worker():
+            for index in counter:
+                started = time.perf_counter()
+                try:
+                    await operation(client, index)
+                    result.latencies.append(time.perf_counter() - started)
+                except Exception as e:
+                    result.errors += 1
+                    result.first_error = result.first_error or f"{type(e).__name__}: {e}"
+                result.requests += 1
+
+        async with httpx.AsyncClient(base_url=base_url) as probe_client:
+            probe = asyncio.create_task(probe_loop_lag(probe_client, result.lag_samples, stop, lag_interval))
+            started = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+            result.duration = time.perf_counter() - started
+            stop.set()
+            await probe
+
+    return result
+
+
+def chat_operation(agent_id: str):
+    async def operation(client: httpx.AsyncClient, index: int):
+        response = await client.post(f"/agents/{agent_id}/chat", json={"message": f"Benchmark question #{index}"})
+        response.raise_for_status()
+        body = response.json()
+        if not body.get("success"):
+            raise RuntimeError(body.get("error") or "chat failed")
+    return operation
+
+
+def team_operation(team_id: str):
+    async def operation(client: httpx.AsyncClient, index: int):
+        response = await client.post(f"/teams/{team_id}/chat", json={"message": f"Benchmark task #{index}"})
+        response.raise_for_status()
+        body = response.json()
+        if not body.get("success"):
+            raise RuntimeError(body.get("error") or "team chat failed")
+    return operation
+
+
+def websocket_operation(base_url: str, pings: int):
+    ws_url = base_url.replace("http://", "ws://") + "/ws/"
+
+    async def operation(client: httpx.AsyncClient, index: int):
+        async with websockets.connect(ws_url, open_timeout=30) as ws:
+            for _ in range(pings):
+                await ws.send(json.dumps({"type": "ping"}))
+                # Skip initial state, heartbeats and agent updates until our pong arrives
+                while json.loads(await asyncio.wait_for(ws.recv(), timeout=30)).get("type") != "pong":
+                    pass
+    return operation
+
+
+async def run_benchmarks(
+    base_url: str,
+    requests: int,
+    concurrency: int,
+    agent_id: str = "general",
+    team_id: str = "collaborative",
+    scenarios: Optional[List[str]] = None,
+    ws_pings: int = 5,
+) -> List[ScenarioResult]:
+    """Run the selected scenarios sequentially against a running API"""
+    scenarios = scenarios or ["chat", "team", "websocket"]
+    results = []
+    if "chat" in scenarios:
+        results.append(await run_scenario(f"chat:{agent_id}", base_url, requests, concurrency, chat_operation(agent_id)))
+    if "team" in scenarios:
+        team_requests = max(1, requests // 4)
+        results.append(await run_scenario(f"team:{team_id}", base_url, team_requests, concurrency, team_operation(team_id)))
+    if "websocket" in scenarios:
+        results.append(await run_scenario("websocket", base_url, requests, concurrency,
+                                          websocket_operation(base_url, ws_pings)))
+    return results
+
+
+def fetch_loop_report(base_url: str) -> Optional[Dict[str, Any]]:
+    """Server-side loop lag and blocking offenders from /health/loop, if available"""
+    try:
+        response = httpx.get(f"{base_url}/health/loop", timeout=10.0)
+        return response.json() if response.status_code == 200 else None
+    except httpx.HTTPError:
+        return None
+
+
+def print_report(results: List[ScenarioResult], fake: FakeOllamaServer, loop_report: Optional[Dict[str, Any]] = None):
+    header = (f"{'scenario':<22}{'reqs':>6}{'errs':>6}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}"
+              f"{'lag p50':>10}{'lag p99':>10}{'lag max':>10}")
+    print("\n📊 Benchmark results (latencies in seconds)")
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        s = result.summary()
+        print(f"{s['scenario']:<22}{s['requests']:>6}{s['errors']:>6}{s['throughput_rps']:>9}"
+              f"{s['p50']:>9}{s['p95']:>9}{s['p99']:>9}"
+              f"{s['loop_lag_p50']:>10}{s['loop_lag_p99']:>10}{s['loop_lag_max']:>10}")
+        if s["first_error"]:
+            print(f"   ⚠️ first error: {s['first_error'][:200]}")
+    if loop_report:
+        print(f"\n🐢 Server loop: lag p99 {loop_report['lag_p99']}s, max {loop_report['lag_max']}s, "
+              f"{loop_report['blocked_episodes']} blocking episodes ({loop_report['blocked_seconds']}s)")
+        for offender in loop_report.get("offenders", [])[:5]:
+            print(f"   {offender['total_seconds']:>8}s x{offender['count']:<4} {offender['location']}")
+    print(f"\n🦙 Fake Ollama calls: {dict(fake.requests)}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load test the Multi-Agent API against a fake Ollama server")
+    parser.add_argument("--requests", type=int, default=40, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients per scenario")
+    parser.add_argument("--scenarios", default="chat,team,websocket", help="Comma-separated scenarios to run")
+    parser.add_argument("--agent", default="general", help="Agent used by the chat scenario")
+    parser.add_argument("--team", default="collaborative", help="Team used by the team scenario")
+    parser.add_argument("--token-latency", type=float, default=0.01, help="Fake Ollama seconds per token")
+    parser.add_argument("--prefill-latency", type=float, default=0.05, help="Fake Ollama seconds before first token")
+    parser.add_argument("--tokens", type=int, default=32, help="Fake Ollama tokens per response")
+    parser.add_argument("--api-url", help="Benchmark an already running API instead of starting one")
+    parser.add_argument("--json", dest="json_path", help="Write results as JSON to this path")
+    parser.add_argument("--max-p95", type=float, help="Fail if any scenario p95 latency exceeds this (seconds)")
+    parser.add_argument("--max-lag", type=float, help="Fail if any scenario p99 loop lag exceeds this (seconds)")
+    args = parser.parse_args(argv)
+
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    fake = FakeOllamaServer(token_latency=args.token_latency, prefill_latency=args.prefill_latency,
+                            tokens=args.tokens).start()
+    api: Optional[ApiServer] = None
+    try:
+        if args.api_url:
+            base_url = args.api_url.rstrip("/")
+        else:
+            print(f"🦙 Fake Ollama on {fake.url}, starting API...")
+            api = ApiServer(ollama_host=fake.url).start()
+            base_url = api.url
+        print(f"🚀 Benchmarking {base_url}: {args.requests} requests x {args.concurrency} clients per scenario")
+        results = asyncio.run(run_benchmarks(base_url, args.requests, args.concurrency,
+                                             agent_id=args.agent, team_id=args.team, scenarios=scenarios))
+        loop_report = fetch_loop_report(base_url)
+    finally:
+        if api:
+            api.stop()
+        fake.stop()
+
+    print_report(results, fake, loop_report)
+    summaries = [result.summary() for result in results]
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(
+            {"config": vars(args), "results": summaries, "loop": loop_report}, indent=2
+        ))
+
+    failed = False
+    for s in summaries:
+        if args.max_p95 is not None and s["p95"] > args.max_p95:
+            print(f"❌ {s['scenario']}: p95 {s['p95']}s exceeds {args.max_p95}s")
+            failed = True
+        if args.max_lag is not None and s["loop_lag_p99"] > args.max_lag:
+            print(f"❌ {s['scenario']}: loop lag p99 {s['loop_lag_p99']}s exceeds {args.max_lag}s")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""
+Intent routing benchmark: accuracy and latency of /agents/auto/chat's router
+
+Routes a labeled set of messages with three router configurations:
+
+- ``keywords``: keyword rules only, anything ambiguous goes to ``general``
+- ``embeddings``: keyword rules, then similarity to the agent profiles
+- ``llm``: the above, then ``phi3:mini`` for what is still ambiguous
+
+Without ``--host`` the fake Ollama server is used: its embeddings and
+answers carry no meaning, so only the ``keywords`` figures (and the cost of
+the extra calls) are representative. Pass ``--host`` to measure a real box.
+
+Usage:
+  python -m tests.benchmarks.routing_bench
+  python -m tests.benchmarks.routing_bench --host http://localhost:11434 --json routing.json
+"""
+
+import argparse
+import json
+import sys
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from ollama import Client
+
+from agents.embedder import CachedOllamaEmbedder
+from agents.router import agent_profiles, llm_classifier
+from agents.settings import ROUTER_EMBED_MODEL, ROUTER_LLM_MODEL, ROUTER_MIN_SIMILARITY
+from tests.fake_ollama import FakeOllamaServer
+from utils.intent_router import IntentRouter, evaluate
+
+# (message, expected agent)
+LABELED_SET = [
+    ("Bonjour, comment vas-tu ?", "general"),
+    ("Explique-moi la photosynthèse simplement.", "general"),
+    ("Quelle est la différence entre un virus et une bactérie ?", "general"),
+    ("Donne-moi trois idées de cadeau pour un anniversaire.", "general"),
+    ("Traduis 'bonne nuit' en espagnol.", "general"),
+    ("Écris un petit poème sur l'automne.", "general"),
+    ("Qui a écrit Les Misérables ?", "general"),
+    ("How do I politely decline a meeting invitation?", "general"),
+    ("Résume la théorie de la relativité en deux phrases.", "general"),
+    ("Quels sont les bienfaits de la marche ?", "general"),
+    ("Cherche les dernières actualités sur l'intelligence artificielle.", "search"),
+    ("Quelle est la météo à Paris cette semaine ?", "search"),
+    ("Qui a gagné la Ligue des champions en 2024 ?", "search"),
+    ("Trouve des sources récentes sur la fusion nucléaire.", "search"),
+    ("What are the latest news about SpaceX?", "search"),
+    ("Fais une recherche sur les nouveautés de Python 3.13.", "search"),
+    ("Quels sont les résultats des élections européennes ?", "search"),
+    ("Recherche sur le web des avis sur le dernier iPhone.", "search"),
+    ("Search the web for reviews of electric bikes.", "search"),
+    ("Quelles sont les actualités du jour en France ?", "search"),
+    ("Quel est le cours actuel de l'action AAPL ?", "finance"),
+    ("Compare le ratio P/E de MSFT et GOOGL.", "finance"),
+    ("Quel dividende verse TotalEnergies ?", "finance"),
+    ("Donne-moi la capitalisation boursière de Nvidia.", "finance"),
+    ("What do analysts recommend for TSLA stock?", "finance"),
+    ("Comment a évolué le CAC 40 ce mois-ci ?", "finance"),
+    ("Le bitcoin est-il un bon investissement ?", "finance"),
+    ("Montre-moi les données financières d'Amazon.", "finance"),
+    ("Quelle est la performance de mon portefeuille d'actions tech ?", "finance"),
+    ("What is Apple's market cap?", "finance"),
+    ("Écris une fonction Python qui inverse une chaîne.", "code"),
+    ("Calcule la factorielle de 20.", "code"),
+    ("Combien font 1234 * 5678 ?", "code"),
+    ("Génère les 30 premiers nombres de Fibonacci.", "code"),
+    ("Write a script that parses a CSV file with pandas.", "code"),
+    ("Trouve le bug dans ce code: for i in range(10) print(i)", "code"),
+    ("Implémente un algorithme de tri rapide.", "code"),
+    ("Liste les nombres premiers inférieurs à 100.", "code"),
+    ("Écris une regex qui valide une adresse email.", "code"),
+    ("Compute the standard deviation of 3, 7, 9 and 12 with numpy.", "code"),
+    ("Combien d'espace disque reste-t-il ?", "system"),
+    ("Liste les fichiers du répertoire courant.", "system"),
+    ("Quels processus utilisent le plus de CPU ?", "system"),
+    ("Affiche la mémoire vive utilisée par la machine.", "system"),
+    ("Lance la commande df -h.", "system"),
+    ("Show me the system uptime.", "system"),
+    ("Trouve les fichiers de plus de 100 Mo dans mon dossier.", "system"),
+    ("Quel programme écoute sur le port 8000 ?", "system"),
+    ("Vérifie les permissions du dossier data.", "system"),
+    ("How much RAM is free right now?", "system"),
+]
+
+MODES = ("keywords", "embeddings", "llm")
+
+
+def build(mode: str, client: Client, host: str) -> IntentRouter:
+    embedder = None
+    if mode != "keywords":
+        # No on-disk cache: every profile and message is embedded by the server being measured
+        embedder = CachedOllamaEmbedder(id=ROUTER_EMBED_MODEL, dimensions=768, host=host,
+                                        ollama_client=client, cache=None)
+    return IntentRouter(
+        agent_profiles(),
+        embed=embedder.get_embeddings if embedder else None,
+        classify=llm_classifier(client, ROUTER_LLM_MODEL) if mode == "llm" else None,
+        min_similarity=ROUTER_MIN_SIMILARITY
+    )
+
+
+def run_benchmark(host: Optional[str] = None, modes: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+    fake = None if host else FakeOllamaServer(tokens=2)
+    results: Dict[str, Dict[str, Any]] = {}
+    with fake or nullcontext():
+        url = host or fake.url
+        client = Client(host=url)
+        for mode in modes or list(MODES):
+            print(f"🧭 {mode}: {len(LABELED_SET)} messages against {url}")
+            router = build(mode, client, url)
+            router.route("warm-up")  # Profile embeddings are computed once, outside the measurement
+            results[mode] = evaluate(router, LABELED_SET)
+    return results
+
+
+def print_report(results: Dict[str, Dict[str, Any]]):
+    print(f"\n{'mode':<12}{'accuracy':>10}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}  decided by")
+    for mode, result in results.items():
+        latency = result["latency_ms"]
+        methods = ", ".join(f"{name} {m['correct']}/{m['routed']}" for name, m in result["by_method"].items())
+        print(f"{mode:<12}{result['accuracy']:>10}{latency['p50']:>10}{latency['p95']:>10}{latency['max']:>10}  {methods}")
+    for mode, result in results.items():
+        for miss in result["misses"]:
+            print(f"❌ {mode}: {miss['message']!r} → {miss['routed']} ({miss['method']}), expected {miss['expected']}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Accuracy and latency of the /agents/auto/chat router")
+    parser.add_argument("--host", help="Real Ollama host (default: the fake server)")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--json", dest="json_path", help="Write results as JSON to this path")
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(host=args.host, modes=args.modes)
+    print_report(results)
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps({"config": vars(args), "results": results}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
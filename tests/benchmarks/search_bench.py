@@ -0,0 +1,121 @@
+"""
+Multi-query search benchmark: search time, tool calls and duplicates per question
+
+Each question comes with the near-identical queries SearchAgent tends to
+issue for it, searched two ways:
+
+- ``sequential``: one search per query, one after the other (one tool call each)
+- ``multi``: all queries in one ``web_search_many`` call, run concurrently,
+  results merged and deduplicated
+
+The stand-in search backend (``tests/fake_search.py``) answers with
+``--latency`` seconds per search. Pass ``--tavily`` to search Tavily for real
+(needs ``TAVILY_API_KEY``). Every tool call saved is also one model turn saved
+in the agent loop, which this benchmark does not count.
+
+Usage:
+  python -m tests.benchmarks.search_bench
+  python -m tests.benchmarks.search_bench --latency 0.8 --json search.json
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from agents.search_tools import tavily_search
+from tests.fake_search import FakeSearchBackend
+from utils.multi_search import MultiSearch, normalize_url
+
+# Question -> the queries an agent would run for it
+QUESTIONS: Dict[str, List[str]] = {
+    "Le nouveau lanceur européen a-t-il réussi son premier vol ?": [
+        "European launcher first flight",
+        "European launcher first flight result",
+        "ESA launcher first flight satellites orbit",
+    ],
+    "Quelles sont les nouveautés de Python 3.13 ?": [
+        "Python 3.13 new features",
+        "what's new in Python 3.13",
+        "Python 3.13 release free-threaded",
+    ],
+    "Que finance le budget spatial européen ?": [
+        "European space budget",
+        "European space budget launcher satellites",
+    ],
+}
+
+
+def run_sequential(search: Callable[[str, int], Dict[str, Any]], queries: List[str]) -> Dict[str, Any]:
+    started = time.perf_counter()
+    results = [result for query in queries for result in search(query, 5).get("results", [])]
+    return {
+        "seconds": time.perf_counter() - started,
+        "tool_calls": len(queries),
+        "results": len(results),
+        "unique_results": len({normalize_url(r["url"]) for r in results}),
+    }
+
+
+def run_multi(searcher: MultiSearch, queries: List[str]) -> Dict[str, Any]:
+    started = time.perf_counter()
+    merged = searcher.search(queries, 5)
+    return {
+        "seconds": time.perf_counter() - started,
+        "tool_calls": 1,
+        "results": len(merged["results"]),
+        "unique_results": len(merged["results"]),
+    }
+
+
+def summarize(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        "avg_seconds": round(statistics.mean(r["seconds"] for r in runs), 4),
+        "tool_calls": sum(r["tool_calls"] for r in runs),
+        "results_returned": sum(r["results"] for r in runs),
+        "unique_results": sum(r["unique_results"] for r in runs),
+    }
+
+
+def run_benchmark(latency: float = 0.5, tavily: bool = False) -> Dict[str, Any]:
+    backend = None if tavily else FakeSearchBackend(latency=latency)
+    search = tavily_search() if tavily else backend.search
+    searcher = MultiSearch(search, max_concurrency=4)
+    print(f"🔎 {len(QUESTIONS)} questions against {'Tavily' if tavily else f'the fake backend ({latency}s/search)'}")
+    results = {
+        "sequential": summarize([run_sequential(search, queries) for queries in QUESTIONS.values()]),
+        "multi": summarize([run_multi(searcher, queries) for queries in QUESTIONS.values()]),
+    }
+    multi = results["multi"]["avg_seconds"]
+    results["speedup"] = round(results["sequential"]["avg_seconds"] / multi, 2) if multi else None
+    results["duplicates_removed"] = searcher.stats()["duplicates_removed"]
+    return results
+
+
+def print_report(results: Dict[str, Any]):
+    print(f"\n{'mode':<12}{'avg s':>10}{'tool calls':>12}{'results':>10}{'unique':>9}")
+    for mode in ("sequential", "multi"):
+        r = results[mode]
+        print(f"{mode:<12}{r['avg_seconds']:>10}{r['tool_calls']:>12}{r['results_returned']:>10}{r['unique_results']:>9}")
+    print(f"⚡ x{results['speedup']} faster per question, {results['duplicates_removed']} duplicate results removed")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Sequential vs concurrent multi-query web search")
+    parser.add_argument("--latency", type=float, default=0.5, help="Fake backend only: seconds per search")
+    parser.add_argument("--tavily", action="store_true", help="Search Tavily for real (needs TAVILY_API_KEY)")
+    parser.add_argument("--json", dest="json_path", help="Write results as JSON to this path")
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(latency=args.latency, tavily=args.tavily)
+    print_report(results)
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps({"config": vars(args), "results": results}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+"""
+Session prefill benchmark: per-turn prompt evaluation with and without context reuse
+
+Runs the same multi-turn conversation through the ``general`` and ``finance``
+agents twice via ``SessionManager``:
+
+- ``reuse``: the session keeps the model loaded (``keep_alive``), so Ollama
+  only evaluates what was appended since the previous turn
+- ``no-reuse``: ``keep_alive=0`` unloads the model after every turn, so the
+  whole prompt (instructions, tool schemas, history) is evaluated again
+
+Prefill time and evaluated prompt tokens come from Ollama's own response
+metrics (``prompt_eval_duration`` / ``prompt_eval_count``). Without ``--host``
+the fake Ollama server is used, with its prompt cache and a per-token prefill
+cost standing in for a CPU box.
+
+Usage:
+  python -m tests.benchmarks.session_reuse_bench
+  python -m tests.benchmarks.session_reuse_bench --turns 8 --prefill-token-latency 0.001
+  python -m tests.benchmarks.session_reuse_bench --host http://localhost:11434 --json sessions.json
+"""
+
+import argparse
+import asyncio
+import copy
+import json
+import sys
+import time
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from agno.agent import Agent
+
+from agents import finance_agent, general_agent
+from agents.sessions import SessionManager
+from tests.fake_ollama import FakeOllamaServer
+
+CONVERSATIONS = {
+    "general": [
+        "Explique-moi la photosynthèse simplement.",
+        "Quel rôle joue la chlorophylle ?",
+        "Et que se passe-t-il la nuit ?",
+        "Donne un exemple de plante CAM.",
+        "Résume notre échange en trois points.",
+        "Propose une question de quiz sur le sujet.",
+    ],
+    "finance": [
+        "Quel est le cours actuel d'AAPL ?",
+        "Et celui de MSFT ?",
+        "Compare leurs ratios P/E.",
+        "Lequel a le meilleur rendement du dividende ?",
+        "Quels risques vois-tu pour les deux ?",
+        "Fais une synthèse pour un investisseur prudent.",
+    ],
+}
+
+AGENTS = {"general": general_agent, "finance": finance_agent}
+
+
+def on_host(agent: Agent, host: str) -> Agent:
+    """Copy of ``agent`` whose model talks to ``host`` directly (outside the shared pool)"""
+    model = copy.deepcopy(agent.model)
+    model.host, model.client, model.async_client = host, None, None
+    return agent.deep_copy(update={"model": model})
+
+
+async def run_conversation(agent_id: str, agent: Agent, messages: List[str], keep_alive: Any) -> List[Dict[str, Any]]:
+    """One session through ``messages``; returns per-turn prefill seconds, evaluated tokens and latency"""
+    manager = SessionManager(keep_alive=keep_alive)
+    turns = []
+    for n, message in enumerate(messages, start=1):
+        session = manager.get(agent_id, agent, f"bench-{keep_alive}")
+        started = time.perf_counter()
+        async with session:
+            response = await session.agent.arun(message)
+        tokens, prefill = session.record(response)
+        turns.append({
+            "turn": n,
+            "prompt_tokens_evaluated": tokens,
+            "prefill_s": round(prefill, 4),
+            "latency_s": round(time.perf_counter() - started, 4),
+        })
+    return turns
+
+
+def summarize(turns: List[Dict[str, Any]]) -> Dict[str, Any]:
+    # The first turn is cold either way; reuse shows from the second one on
+    later = turns[1:] or turns
+    return {
+        "turns": turns,
+        "avg_prefill_s": round(sum(t["prefill_s"] for t in later) / len(later), 4),
+        "avg_prompt_tokens_evaluated": round(sum(t["prompt_tokens_evaluated"] for t in later) / len(later), 1),
+    }
+
+
+def run_benchmark(host: Optional[str] = None, agents: Optional[List[str]] = None, turns: int = 6,
+                  prefill_token_latency: float = 0.0005, keep_alive: str = "30m") -> Dict[str, Dict[str, Any]]:
+    fake = None if host else FakeOllamaServer(tokens=16, prompt_cache=True,
+                                              prefill_token_latency=prefill_token_latency)
+    results: Dict[str, Dict[str, Any]] = {}
+    with fake or nullcontext():
+        url = host or fake.url
+        for agent_id in agents or list(AGENTS):
+            agent = on_host(AGENTS[agent_id], url)
+            messages = (CONVERSATIONS[agent_id] * (turns // len(CONVERSATIONS[agent_id]) + 1))[:turns]
+            print(f"🧵 {agent_id}: {turns} turns against {url}")
+            results[agent_id] = {
+                "no-reuse": summarize(asyncio.run(run_conversation(agent_id, agent, messages, 0))),
+                "reuse": summarize(asyncio.run(run_conversation(agent_id, agent, messages, keep_alive))),
+            }
+            cold, warm = results[agent_id]["no-reuse"]["avg_prefill_s"], results[agent_id]["reuse"]["avg_prefill_s"]
+            results[agent_id]["prefill_speedup"] = round(cold / warm, 2) if warm else None
+    return results
+
+
+def print_report(results: Dict[str, Dict[str, Any]]):
+    for agent_id, modes in results.items():
+        print(f"\n{agent_id}")
+        print(f"{'turn':>6}" + "".join(f"{mode + ' prefill':>20}{mode + ' tokens':>20}" for mode in ("no-reuse", "reuse")))
+        for cold, warm in zip(modes["no-reuse"]["turns"], modes["reuse"]["turns"]):
+            print(f"{cold['turn']:>6}{cold['prefill_s']:>19}s{cold['prompt_tokens_evaluated']:>20}"
+                  f"{warm['prefill_s']:>19}s{warm['prompt_tokens_evaluated']:>20}")
+        print(f"⚡ Turns 2+: prefill {modes['no-reuse']['avg_prefill_s']}s → {modes['reuse']['avg_prefill_s']}s "
+              f"(x{modes['prefill_speedup']})")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Per-turn prefill with and without session context reuse")
+    parser.add_argument("--host", help="Real Ollama host (default: the fake server with a prompt cache)")
+    parser.add_argument("--agents", nargs="+", choices=list(AGENTS), default=list(AGENTS))
+    parser.add_argument("--turns", type=int, default=6)
+    parser.add_argument("--keep-alive", default="30m", help="keep_alive sent by reusing sessions")
+    parser.add_argument("--prefill-token-latency", type=float, default=0.0005,
+                        help="Fake server only: seconds per evaluated prompt word")
+    parser.add_argument("--json", dest="json_path", help="Write results as JSON to this path")
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(host=args.host, agents=args.agents, turns=args.turns,
+                            prefill_token_latency=args.prefill_token_latency, keep_alive=args.keep_alive)
+    print_report(results)
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps({"config": vars(args), "results": results}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,21 @@
+"""
+Benchmark smoke test: the cascade answers easy questions with the small model and is faster on average
+
+Run with: python -m pytest -m benchmark
+"""
+
+import pytest
+
+from tests.benchmarks.cascade_bench import HARD, QUESTIONS, run_benchmark
+
+
+@pytest.mark.benchmark
+def test_cascade_escalates_hard_questions_only_and_saves_latency():
+    results = run_benchmark(small_speed=0.2)
+
+    cascade = results["cascade"]
+    assert cascade["escalated"] == len(HARD)
+    assert cascade["answered_by_small"] == len(QUESTIONS) - len(HARD)
+    assert cascade["seconds_saved"] > 0
+    assert results["large"]["answered_by_small"] == 0
+    assert results["speedup"] > 1.2
@@ -0,0 +1,21 @@
+"""
+Benchmark smoke test: FastChunking must beat AgenticChunking on time without losing recall
+
+Run with: python -m pytest -m benchmark
+"""
+
+import pytest
+
+from tests.benchmarks.chunking_bench import run_benchmark
+from tests.fake_ollama import FakeOllamaServer
+
+
+@pytest.mark.benchmark
+def test_fast_chunking_is_faster_with_comparable_recall():
+    with FakeOllamaServer(prefill_latency=0.02, tokens=2) as fake:
+        results = run_benchmark(fake.url, sections=9)
+
+    fast, agentic = results["fast"], results["agentic"]
+    assert fast["chunk_seconds"] * 10 < agentic["chunk_seconds"]
+    assert fast["split_facts"] == 0
+    assert fast["hit@3"] >= agentic["hit@3"]
@@ -0,0 +1,34 @@
+"""
+Benchmark smoke test: run a small load against the API and check nothing fails
+
+Run with: python -m pytest -m benchmark
+"""
+
+import asyncio
+
+import pytest
+
+from tests.benchmarks.load_test import ApiServer, percentile, run_benchmarks
+from tests.fake_ollama import FakeOllamaServer
+
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([], 99) == 0.0
+
+
+@pytest.mark.benchmark
+def test_chat_and_websocket_load():
+    with FakeOllamaServer(token_latency=0.001, tokens=8) as fake, ApiServer(ollama_host=fake.url) as api:
+        results = asyncio.run(run_benchmarks(api.url, requests=8, concurrency=4, scenarios=["chat", "websocket"]))
+
+    for result in results:
+        summary = result.summary()
+        assert summary["errors"] == 0, summary["first_error"]
+        assert summary["requests"] == 8
+        assert summary["p99"] >= summary["p50"] > 0
+    assert fake.requests["/api/chat"] >= 8
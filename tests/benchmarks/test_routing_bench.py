@@ -0,0 +1,21 @@
+"""
+Benchmark smoke test: keyword routing gets the labeled set right in well under a millisecond
+
+Run with: python -m pytest -m benchmark
+"""
+
+import pytest
+
+from tests.benchmarks.routing_bench import LABELED_SET, run_benchmark
+
+
+@pytest.mark.benchmark
+def test_keyword_routing_accuracy_and_latency():
+    results = run_benchmark(modes=["keywords", "embeddings"])
+
+    keywords = results["keywords"]
+    assert keywords["messages"] == len(LABELED_SET)
+    assert keywords["accuracy"] >= 0.9
+    assert keywords["latency_ms"]["p95"] < 5
+    # Messages the rules decide never reach the embedding stage
+    assert results["embeddings"]["by_method"]["keywords"] == keywords["by_method"]["keywords"]
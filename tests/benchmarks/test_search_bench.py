@@ -0,0 +1,21 @@
+"""
+Benchmark smoke test: one concurrent multi-query search beats sequential searches and returns no duplicates
+
+Run with: python -m pytest -m benchmark
+"""
+
+import pytest
+
+from tests.benchmarks.search_bench import QUESTIONS, run_benchmark
+
+
+@pytest.mark.benchmark
+def test_multi_query_search_is_faster_with_fewer_calls_and_no_duplicates():
+    results = run_benchmark(latency=0.2)
+
+    multi, sequential = results["multi"], results["sequential"]
+    assert multi["tool_calls"] == len(QUESTIONS) < sequential["tool_calls"]
+    assert multi["results_returned"] == multi["unique_results"]
+    assert sequential["results_returned"] > sequential["unique_results"]
+    assert results["duplicates_removed"] > 0
+    assert results["speedup"] > 1.8
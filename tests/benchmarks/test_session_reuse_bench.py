@@ -0,0 +1,19 @@
+"""
+Benchmark smoke test: session turns after the first only prefill what was appended
+
+Run with: python -m pytest -m benchmark
+"""
+
+import pytest
+
+from tests.benchmarks.session_reuse_bench import run_benchmark
+
+
+@pytest.mark.benchmark
+def test_reuse_cuts_prefill_for_general_and_finance():
+    results = run_benchmark(turns=4, prefill_token_latency=0.0002)
+
+    for agent_id in ("general", "finance"):
+        cold, warm = results[agent_id]["no-reuse"], results[agent_id]["reuse"]
+        assert warm["avg_prompt_tokens_evaluated"] < cold["avg_prompt_tokens_evaluated"] / 2
+        assert results[agent_id]["prefill_speedup"] > 2
@@ -0,0 +1,19 @@
+"""
+Benchmark smoke test: the local vector store stays accurate with and without its IVF index
+
+Run with: python -m pytest -m benchmark
+"""
+
+import pytest
+
+from tests.benchmarks.vector_store_bench import run_benchmark
+
+
+@pytest.mark.benchmark
+def test_local_store_hit_rate_and_ivf_recall():
+    results = run_benchmark(docs=3000, queries=50, k=10, ivf_threshold=1000, nprobe=16)
+
+    local = results["local"]
+    assert local["hybrid"]["hit@10"] >= 0.8
+    assert local["keyword"]["hit@10"] >= 0.8
+    assert local["ivf_recall@10"] >= 0.75
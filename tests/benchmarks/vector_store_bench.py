@@ -0,0 +1,190 @@
+"""
+Vector store benchmark: LocalVectorDb vs PgVector on a synthetic corpus
+
+Generates a deterministic corpus of short knowledge snippets, embeds them with
+a hashed bag-of-words embedder (no model server needed, identical vectors for
+every store), then reports insert throughput, query latency p50/p95 for each
+search type, hit@k (the snippet a query was written from is in the top k) and,
+for the local store, recall@k of the IVF index against an exhaustive scan.
+
+PgVector is only measured when ``--pg-url`` points at a running database.
+
+Usage:
+  python -m tests.benchmarks.vector_store_bench
+  python -m tests.benchmarks.vector_store_bench --docs 50000 --ivf-threshold 20000
+  python -m tests.benchmarks.vector_store_bench --pg-url postgresql+psycopg://ai:ai@localhost:5532/ai
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from agno.document import Document
+from agno.embedder.base import Embedder
+from agno.vectordb.base import VectorDb
+from agno.vectordb.search import SearchType
+
+from agents.local_vector_db import LocalVectorDb
+from utils.vector_index import tokenize
+
+SUBJECTS = ["invoice", "parcel", "refund", "warranty", "subscription", "password", "delivery", "voucher",
+            "appointment", "order", "account", "payment", "exchange", "pickup", "catalogue", "loyalty"]
+ACTIONS = ["renewed", "cancelled", "shipped", "delayed", "approved", "reset", "scheduled", "confirmed",
+           "updated", "returned", "charged", "activated"]
+PLACES = ["Lyon", "Paris", "Nantes", "Lille", "Bordeaux", "Marseille", "Toulouse", "Nice", "Rennes", "Grenoble"]
+DETAILS = ["within two business days", "after manager review", "by email", "over WhatsApp", "at the front desk",
+           "before the end of the month", "once the receipt is checked", "with a tracking number"]
+
+
+@dataclass
+class HashedEmbedder(Embedder):
+    """Hashed bag-of-words vectors: cheap, deterministic and similar for overlapping text"""
+
+    dimensions: Optional[int] = 768
+
+    def get_embedding(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimensions
+        for word in tokenize(text):
+            digest = hashlib.md5(word.encode()).digest()
+            vector[int.from_bytes(digest[:4], "little") % self.dimensions] += 1.0
+            vector[int.from_bytes(digest[4:8], "little") % self.dimensions] -= 0.5
+        return vector
+
+    def get_embedding_and_usage(self, text: str) -> Tuple[List[float], Optional[Dict]]:
+        return self.get_embedding(text), None
+
+
+def build_corpus(docs: int, queries: int, seed: int = 7) -> Tuple[List[Document], List[Tuple[str, str]]]:
+    """Snippets plus (query, source id) pairs; each query reuses words of its source"""
+    rng = random.Random(seed)
+    documents = []
+    for i in range(docs):
+        words = [rng.choice(SUBJECTS), rng.choice(ACTIONS), rng.choice(PLACES), rng.choice(DETAILS)]
+        content = (f"Case {i}: the {words[0]} for customer {rng.randrange(10 ** 6)} was {words[1]} in {words[2]} "
+                   f"{words[3]} (ticket {rng.randrange(10 ** 6):06d}).")
+        documents.append(Document(id=f"doc-{i}", name=f"doc-{i}", content=content))
+    pairs = []
+    for doc in rng.sample(documents, min(queries, len(documents))):
+        words = tokenize(doc.content)
+        pairs.append((" ".join(rng.sample(words, min(6, len(words)))), doc.id))
+    return documents, pairs
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))] if ordered else 0.0
+
+
+def measure_store(db: VectorDb, documents: List[Document], pairs: List[Tuple[str, str]], k: int,
+                  batch_size: int = 500) -> Dict[str, Any]:
+    db.create()
+    started = time.perf_counter()
+    for i in range(0, len(documents), batch_size):
+        db.insert(documents[i:i + batch_size])
+    insert_seconds = time.perf_counter() - started
+    result: Dict[str, Any] = {
+        "insert_seconds": round(insert_seconds, 3),
+        "insert_per_s": round(len(documents) / insert_seconds, 1) if insert_seconds else 0.0
+    }
+
+    for search_type in (SearchType.vector, SearchType.keyword, SearchType.hybrid):
+        db.search_type = search_type
+        latencies, hits = [], 0
+        for query, source in pairs:
+            started = time.perf_counter()
+            found = db.search(query, limit=k)
+            latencies.append((time.perf_counter() - started) * 1000)
+            hits += any(doc.id == source or doc.name == source for doc in found)
+        result[search_type.value] = {
+            "p50_ms": round(percentile(latencies, 50), 2),
+            "p95_ms": round(percentile(latencies, 95), 2),
+            f"hit@{k}": round(hits / len(pairs), 3) if pairs else 0.0
+        }
+    return result
+
+
+def ivf_recall(db: LocalVectorDb, pairs: List[Tuple[str, str]], k: int) -> Optional[float]:
+    """Average overlap between IVF and exhaustive top-k, or None when IVF is not active"""
+    index = db._vectors
+    if index.count < index.ivf_threshold:
+        return None
+    recalls = []
+    for query, _ in pairs:
+        embedding = db._embed_query(query)
+        exact = {row for row, _ in index.search(embedding, limit=k, exact=True)}
+        approximate = {row for row, _ in index.search(embedding, limit=k)}
+        recalls.append(len(exact & approximate) / max(1, len(exact)))
+    return round(sum(recalls) / len(recalls), 3) if recalls else None
+
+
+def run_benchmark(docs: int = 5000, queries: int = 200, k: int = 10, ivf_threshold: int = 20000, nprobe: int = 8,
+                  pg_url: Optional[str] = None, data_dir: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    documents, pairs = build_corpus(docs, queries)
+    embedder = HashedEmbedder()
+    results: Dict[str, Dict[str, Any]] = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        local = LocalVectorDb(table_name="vector_store_bench", embedder=embedder, path=data_dir or tmp,
+                              vector_score_weight=0.7, prefix_match=True, ivf_threshold=ivf_threshold, nprobe=nprobe)
+        local.drop()
+        print(f"📦 LocalVectorDb: {len(documents)} documents, {len(pairs)} queries")
+        results["local"] = measure_store(local, documents, pairs, k)
+        results["local"][f"ivf_recall@{k}"] = ivf_recall(local, pairs, k)
+        local.drop()
+
+    if pg_url:
+        from agno.vectordb.pgvector import HNSW, PgVector
+
+        pg = PgVector(table_name="vector_store_bench", db_url=pg_url, embedder=embedder,
+                      vector_index=HNSW(m=16, ef_construction=100), vector_score_weight=0.7, prefix_match=True)
+        pg.drop()
+        print(f"🐘 PgVector: {len(documents)} documents, {len(pairs)} queries")
+        results["pgvector"] = measure_store(pg, documents, pairs, k)
+        pg.drop()
+    return results
+
+
+def print_report(results: Dict[str, Dict[str, Any]], k: int):
+    header = f"{'store':<10}{'insert/s':>12}" + "".join(
+        f"{t + ' p50':>14}{t + ' p95':>14}{f'hit@{k}':>8}" for t in ("vector", "keyword", "hybrid"))
+    print("\n" + header)
+    for name, row in results.items():
+        line = f"{name:<10}{row['insert_per_s']:>12}"
+        for search_type in ("vector", "keyword", "hybrid"):
+            stats = row[search_type]
+            line += f"{stats['p50_ms']:>12}ms{stats['p95_ms']:>12}ms{stats[f'hit@{k}']:>8}"
+        print(line)
+    recall = results.get("local", {}).get(f"ivf_recall@{k}")
+    if recall is not None:
+        print(f"\n🧭 IVF recall@{k} vs exhaustive scan: {recall}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark LocalVectorDb (and optionally PgVector)")
+    parser.add_argument("--docs", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--ivf-threshold", type=int, default=20000, help="Vectors before the IVF index kicks in")
+    parser.add_argument("--nprobe", type=int, default=8)
+    parser.add_argument("--pg-url", help="Also benchmark PgVector at this SQLAlchemy URL")
+    parser.add_argument("--data-dir", help="Directory for the local store (default: a temporary directory)")
+    parser.add_argument("--json", dest="json_path", help="Write results as JSON to this path")
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(docs=args.docs, queries=args.queries, k=args.k, ivf_threshold=args.ivf_threshold,
+                            nprobe=args.nprobe, pg_url=args.pg_url, data_dir=args.data_dir)
+    print_report(results, args.k)
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps({"config": vars(args), "results": results}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
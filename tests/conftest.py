@@ -0,0 +1,14 @@
+"""
+Shared pytest fixtures
+"""
+
+import pytest
+
+from tests.fake_ollama import FakeOllamaServer
+
+
+@pytest.fixture
+def fake_ollama():
+    """A fake Ollama server with no artificial latency"""
+    with FakeOllamaServer(tokens=8) as server:
+        yield server
@@ -0,0 +1,332 @@
+"""
+Stand-in Ollama HTTP server for tests and benchmarks
+
+Implements the subset of the Ollama REST API used by the agents (chat, generate,
+embeddings, tags, ps, version) with configurable prefill and per-token latency,
+so the API can be exercised end to end without a real inference box. With
+``prompt_cache`` it also mimics Ollama's per-model KV cache: only the part of a
+prompt after the prefix shared with the model's previous prompt is evaluated,
+and ``keep_alive: 0`` unloads the model (and its cache) after the request.
+``model_speed`` makes some models faster than others and ``responder`` scripts
+the reply per model and conversation: a text, or a dict with ``content`` and
+``tool_calls`` (Ollama's format) to drive an agent's tool loop. Streams the
+client dropped before the end are counted in ``streams_aborted``.
+
+Run standalone with: python -m tests.fake_ollama --port 11434 --token-latency 0.02
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Union
+
+DEFAULT_MODELS = [
+    "qwen3:8b",
+    "qwen2.5-coder:7b",
+    "mistral:latest",
+    "llama3.2:latest",
+    "llama3.2:3b",
+    "phi3:mini",
+    "nomic-embed-text:latest",
+]
+
+FILLER_WORDS = ["the", "agent", "answers", "with", "local", "data", "and", "clear", "steps", "quickly"]
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class FakeOllamaServer:
+    """Threaded fake Ollama server with latency knobs and request counters"""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        token_latency: float = 0.0,
+        prefill_latency: float = 0.0,
+        tokens: int = 16,
+        embedding_dim: int = 768,
+        models: Optional[List[str]] = None,
+        prefill_token_latency: float = 0.0,
+        prompt_cache: bool = False,
+        model_speed: Optional[Dict[str, float]] = None,
+        responder: Optional[Callable[[str, List[Dict[str, Any]]], Optional[Union[str, Dict[str, Any]]]]] = None,
+    ):
+        self.token_latency = token_latency
+        self.prefill_latency = prefill_latency
+        self.prefill_token_latency = prefill_token_latency
+        self.prompt_cache = prompt_cache
+        # Latency multiplier per model (e.g. 0.3 for a small model) and scripted replies
+        self.model_speed = dict(model_speed or {})
+        self.responder = responder
+        # Prompt words last evaluated per loaded model
+        self.cached_prompts: Dict[str, List[str]] = {}
+        self.tokens = tokens
+        self.embedding_dim = embedding_dim
+        self.models = list(models or DEFAULT_MODELS)
+        # Set to an HTTP status (e.g. 503) to make every request fail
+        self.fail_status: Optional[int] = None
+        self.loaded_models: Dict[str, float] = {}
+        self.requests: Counter = Counter()
+        self.chat_payloads: List[Dict[str, Any]] = []
+        self.streams_aborted = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeOllamaServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-ollama", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> "FakeOllamaServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def embed(self, text: str) -> List[float]:
+        """Deterministic unit vector derived from the text hash"""
+        seed = hashlib.sha256(text.encode("utf-8")).digest()
+        values = [((seed[i % len(seed)] ^ (i * 31)) % 255) / 127.0 - 1.0 for i in range(self.embedding_dim)]
+        norm = math.sqrt(sum(v * v for v in values)) or 1.0
+        return [v / norm for v in values]
+
+    def _record(self, path: str, payload: Dict[str, Any]):
+        with self._lock:
+            self.requests[path] += 1
+            if path == "/api/chat":
+                self.chat_payloads.append(payload)
+            model = payload.get("model")
+            if model and path in ("/api/chat", "/api/generate", "/api/embed", "/api/embeddings"):
+                self.loaded_models[model] = time.time()
+
+    def evaluate_prompt(self, model: str, words: List[str]) -> int:
+        """Number of prompt words to evaluate, given the model's cached prompt"""
+        with self._lock:
+            cached = self.cached_prompts.get(model, []) if self.prompt_cache else []
+            shared = 0
+            for cached_word, word in zip(cached, words):
+                if cached_word != word:
+                    break
+                shared += 1
+            if self.prompt_cache:
+                self.cached_prompts[model] = words
+        return max(1, len(words) - shared)
+
+    def unload(self, model: str):
+        with self._lock:
+            self.loaded_models.pop(model, None)
+            self.cached_prompts.pop(model, None)
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status: int, body: Dict[str, Any]):
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _start_stream(self):
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+
+            def _write_chunk(self, body: Dict[str, Any]):
+                data = json.dumps(body).encode("utf-8") + b"\n"
+                self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+                self.wfile.flush()
+
+            def _end_stream(self):
+                self.wfile.write(b"0\r\n\r\n")
+                self.wfile.flush()
+
+            def _read_payload(self) -> Dict[str, Any]:
+                length = int(self.headers.get("Content-Length") or 0)
+                if not length:
+                    return {}
+                try:
+                    return json.loads(self.rfile.read(length))
+                except json.JSONDecodeError:
+                    return {}
+
+            def do_GET(self):
+                server._record(self.path, {})
+                if server.fail_status:
+                    return self._send_json(server.fail_status, {"error": "unavailable"})
+                if self.path == "/api/tags":
+                    return self._send_json(200, {"models": [
+                        {
+                            "name": name,
+                            "model": name,
+                            "modified_at": _now(),
+                            "size": 4_000_000_000,
+                            "digest": hashlib.sha256(name.encode()).hexdigest(),
+                            "details": {"format": "gguf", "family": name.split(":")[0]},
+                        }
+                        for name in server.models
+                    ]})
+                if self.path == "/api/ps":
+                    return self._send_json(200, {"models": [
+                        {"name": name, "model": name, "size": 4_000_000_000, "size_vram": 0}
+                        for name in list(server.loaded_models)
+                    ]})
+                if self.path == "/api/version":
+                    return self._send_json(200, {"version": "0.0.0-fake"})
+                if self.path in ("/", ""):
+                    body = b"Ollama is running"
+                    self.send_response(200)
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    return self.wfile.write(body)
+                self._send_json(404, {"error": f"unknown path {self.path}"})
+
+            def do_HEAD(self):
+                self.send_response(200)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def do_POST(self):
+                payload = self._read_payload()
+                server._record(self.path, payload)
+                if server.fail_status:
+                    return self._send_json(server.fail_status, {"error": "unavailable"})
+                model = payload.get("model", "")
+                if self.path in ("/api/chat", "/api/generate"):
+                    return self._generate(model, payload)
+                if self.path == "/api/embed":
+                    inputs = payload.get("input", "")
+                    inputs = [inputs] if isinstance(inputs, str) else list(inputs)
+                    time.sleep(server.prefill_latency)
+                    return self._send_json(200, {
+                        "model": model,
+                        "embeddings": [server.embed(text) for text in inputs],
+                        "prompt_eval_count": sum(len(text.split()) for text in inputs),
+                    })
+                if self.path == "/api/embeddings":
+                    time.sleep(server.prefill_latency)
+                    return self._send_json(200, {"embedding": server.embed(payload.get("prompt", ""))})
+                if self.path == "/api/show":
+                    return self._send_json(200, {"modelfile": "", "parameters": "", "details": {}, "model_info": {}})
+                self._send_json(404, {"error": f"unknown path {self.path}"})
+
+            def _generate(self, model: str, payload: Dict[str, Any]):
+                chat = self.path == "/api/chat"
+                messages = payload.get("messages") or []
+                prompt_text = payload.get("prompt") or " ".join(str(m.get("content") or "") for m in messages)
+                if payload.get("tools"):
+                    prompt_text = json.dumps(payload["tools"], sort_keys=True) + " " + prompt_text
+                prompt_tokens = server.evaluate_prompt(model, prompt_text.split())
+                reply = server.responder(model, messages) if server.responder else None
+                tool_calls = None
+                if isinstance(reply, dict):
+                    reply, tool_calls = reply.get("content") or "", reply.get("tool_calls")
+                words = reply.split() if reply or tool_calls else [
+                    FILLER_WORDS[i % len(FILLER_WORDS)] for i in range(server.tokens)
+                ]
+                speed = server.model_speed.get(model, 1.0)
+                token_latency = server.token_latency * speed
+                started = time.perf_counter()
+                prefill = (server.prefill_latency + server.prefill_token_latency * prompt_tokens) * speed
+                time.sleep(prefill)
+                stats = {
+                    "prompt_eval_count": prompt_tokens,
+                    "eval_count": len(words),
+                    "load_duration": 0,
+                    "prompt_eval_duration": int(prefill * 1e9),
+                }
+                if str(payload.get("keep_alive")) in ("0", "0.0", "0s", "0m"):
+                    server.unload(model)
+
+                def frame(text: str, done: bool) -> Dict[str, Any]:
+                    body: Dict[str, Any] = {"model": model, "created_at": _now(), "done": done}
+                    if chat:
+                        body["message"] = {"role": "assistant", "content": text}
+                        if done and tool_calls:
+                            body["message"]["tool_calls"] = tool_calls
+                    else:
+                        body["response"] = text
+                    if done:
+                        body.update(stats, done_reason="stop",
+                                    total_duration=int((time.perf_counter() - started) * 1e9),
+                                    eval_duration=int(token_latency * len(words) * 1e9))
+                    return body
+
+                if payload.get("stream", True):
+                    self._start_stream()
+                    try:
+                        for word in words:
+                            time.sleep(token_latency)
+                            self._write_chunk(frame(word + " ", False))
+                        self._write_chunk(frame("", True))
+                        self._end_stream()
+                    except (BrokenPipeError, ConnectionResetError):
+                        with server._lock:
+                            server.streams_aborted += 1
+                    return
+                time.sleep(token_latency * len(words))
+                self._send_json(200, frame(" ".join(words), True))
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Ollama server for tests and benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--token-latency", type=float, default=0.02, help="Seconds per generated token")
+    parser.add_argument("--prefill-latency", type=float, default=0.1, help="Seconds before the first token")
+    parser.add_argument("--tokens", type=int, default=32, help="Tokens per response")
+    parser.add_argument("--prefill-token-latency", type=float, default=0.0,
+                        help="Seconds per evaluated prompt word")
+    parser.add_argument("--prompt-cache", action="store_true", help="Reuse the shared prefix of consecutive prompts")
+    args = parser.parse_args()
+
+    server = FakeOllamaServer(
+        host=args.host,
+        port=args.port,
+        token_latency=args.token_latency,
+        prefill_latency=args.prefill_latency,
+        tokens=args.tokens,
+        prefill_token_latency=args.prefill_token_latency,
+        prompt_cache=args.prompt_cache,
+    )
+    print(f"🦙 Fake Ollama listening on {server.url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Fake Ollama stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Stand-in web search backend for tests and benchmarks
+
+Answers like Tavily's ``client.search`` (``query``, ``answer``, ``results``
+with ``title``, ``url``, ``content`` and ``score``) from a small in-memory
+corpus, scored by word overlap with the query. The default corpus has the
+duplicates real searches return: the same article behind tracking
+parameters or ``www.``, and syndicated copies of one dispatch on other
+sites. ``latency`` delays every search, and calls and peak concurrency are
+counted.
+"""
+
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+DISPATCH = (
+    "The European Space Agency confirmed on Tuesday that its new launcher completed a first full "
+    "flight, placing two satellites into orbit after several delays and a long test campaign."
+)
+
+DEFAULT_CORPUS = [
+    {"title": "ESA launcher completes first flight", "url": "https://news.example.com/space/launcher-first-flight",
+     "content": DISPATCH},
+    {"title": "ESA launcher completes first flight",
+     "url": "https://www.news.example.com/space/launcher-first-flight/?utm_source=feed",
+     "content": DISPATCH},
+    {"title": "New European rocket reaches orbit", "url": "https://wire.example.org/europe-rocket-orbit",
+     "content": DISPATCH + " Reporting by the wire desk."},
+    {"title": "Launcher first flight: what it means for Europe", "url": "https://analysis.example.net/launcher",
+     "content": "Analysts say the first flight of the European launcher restores independent access to space "
+                "for Europe, though the launch cadence will decide its commercial success."},
+    {"title": "European space budget 2025", "url": "https://budget.example.eu/space-2025",
+     "content": "Member states agreed on the European space budget, funding the launcher, earth observation "
+                "programmes and the next generation of navigation satellites."},
+    {"title": "Satellite orbit basics", "url": "https://learn.example.com/orbits",
+     "content": "A satellite stays in orbit because its horizontal speed balances the pull of gravity; low "
+                "orbits need about 7.8 km per second."},
+    {"title": "Python 3.13 released", "url": "https://blog.example.dev/python-313",
+     "content": "Python 3.13 ships an experimental free-threaded build, a new interactive interpreter and "
+                "a JIT compiler preview."},
+    {"title": "What's new in Python 3.13", "url": "https://docs.example.dev/whatsnew/3.13",
+     "content": "The release notes list the free-threaded build, the improved REPL, removed dead batteries "
+                "and typing improvements in Python 3.13."},
+]
+
+def _words(text: str) -> List[str]:
+    return re.findall(r"\w+", text.lower())
+
+
+class FakeSearchBackend:
+    """In-memory search engine with Tavily's response shape, latency and call counters"""
+
+    def __init__(self, corpus: Optional[List[Dict[str, str]]] = None, latency: float = 0.0):
+        self.corpus = corpus if corpus is not None else DEFAULT_CORPUS
+        self.latency = latency
+        self.calls: List[str] = []
+        self.active = 0
+        self.peak_concurrency = 0
+        self._lock = threading.Lock()
+
+    def search(self, query: str, max_results: int = 5, **kwargs: Any) -> Dict[str, Any]:
+        with self._lock:
+            self.calls.append(query)
+            self.active += 1
+            self.peak_concurrency = max(self.peak_concurrency, self.active)
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+            terms = set(_words(query))
+            scored = []
+            for doc in self.corpus:
+                words = set(_words(doc["title"] + " " + doc["content"]))
+                overlap = len(terms & words) / len(terms) if terms else 0.0
+                if overlap > 0:
+                    scored.append({**doc, "score": round(overlap, 4)})
+            scored.sort(key=lambda r: r["score"], reverse=True)
+            results = scored[:max_results]
+            return {"query": query, "answer": results[0]["content"][:120] if results else None, "results": results}
+        finally:
+            with self._lock:
+                self.active -= 1
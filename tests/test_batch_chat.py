@@ -0,0 +1,150 @@
+"""
+Tests for the NDJSON batch chat endpoint
+"""
+
+import asyncio
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from agno.run.response import RunResponse
+from fastapi import FastAPI
+
+from api.routes import agents as agent_routes
+
+
+class EchoAgent:
+    """Stands in for an agno agent: echoes the message after ``delay`` seconds, recording concurrency"""
+
+    running = 0
+    max_running = 0
+    lock = threading.Lock()
+
+    def __init__(self, name: str, model: str, delay: float = 0.0):
+        self.name = name
+        self.description = None
+        self.model = SimpleNamespace(id=model)
+        self.instructions = []
+        self.tools = []
+        self.delay = delay
+
+    def run(self, message: str) -> RunResponse:
+        with EchoAgent.lock:
+            EchoAgent.running += 1
+            EchoAgent.max_running = max(EchoAgent.max_running, EchoAgent.running)
+        try:
+            time.sleep(self.delay)
+            if message == "boom":
+                raise RuntimeError("model crashed")
+            return RunResponse(content=f"{self.name}: {message}")
+        finally:
+            with EchoAgent.lock:
+                EchoAgent.running -= 1
+
+
+@pytest.fixture
+def stub_agents(monkeypatch):
+    EchoAgent.running = EchoAgent.max_running = 0
+    stubs = {name: EchoAgent(name, f"model-{name}", delay=0.05) for name in ("general", "search", "finance", "code")}
+    monkeypatch.setattr(agent_routes, "AGENTS", stubs)
+    monkeypatch.setattr(agent_routes, "RUN_LOCKS", {})
+    return stubs
+
+
+def client() -> httpx.AsyncClient:
+    app = FastAPI()
+    app.include_router(agent_routes.router, prefix="/agents")
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+def post_batch(path: str, **kwargs):
+    async def send():
+        async with client() as http:
+            return await http.post(path, **kwargs)
+
+    response = asyncio.run(send())
+    lines = [json.loads(line) for line in response.text.splitlines() if line.strip()]
+    return response, lines
+
+
+def test_json_list_streams_every_result_then_the_summary(stub_agents):
+    items = ["bonjour", {"message": "prix AAPL", "agent_id": "finance"}]
+    response, lines = post_batch("/agents/general/batch", json=items)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    results, summary = lines[:-1], lines[-1]
+    assert all(line["type"] == "result" for line in results)
+    assert {r["index"]: r["response"] for r in results} == {0: "general: bonjour", 1: "finance: prix AAPL"}
+    assert summary["type"] == "summary"
+    assert (summary["total"], summary["succeeded"], summary["failed"]) == (2, 2, 0)
+
+
+def test_ndjson_bad_lines_and_unknown_agents_fail_per_item(stub_agents):
+    body = "\n".join([
+        json.dumps({"message": "salut", "id": "a"}),
+        "{not json",
+        json.dumps({"message": "hello", "id": "c", "agent_id": "nope"}),
+        json.dumps({"message": "boom", "id": "d"}),
+        "",
+        json.dumps("dernier"),
+    ])
+    _, lines = post_batch("/agents/general/batch", content=body, headers={"content-type": "application/x-ndjson"})
+
+    results = {r["index"]: r for r in lines[:-1]}
+    assert results[0]["success"] and results[0]["id"] == "a"
+    assert not results[1]["success"] and "Invalid batch line 2" in results[1]["error"]
+    assert not results[2]["success"] and results[2]["error"] == "Agent 'nope' not found"
+    assert not results[3]["success"] and results[3]["error"] == "model crashed"
+    assert results[4]["response"] == "general: dernier"
+    assert (lines[-1]["type"], lines[-1]["succeeded"], lines[-1]["failed"]) == ("summary", 2, 3)
+
+
+def test_multipart_upload(stub_agents):
+    body = "\n".join(json.dumps({"message": f"q{n}"}) for n in range(3)).encode()
+    _, lines = post_batch("/agents/search/batch", files={"file": ("items.ndjson", body, "application/x-ndjson")})
+
+    assert sorted(r["response"] for r in lines[:-1]) == ["search: q0", "search: q1", "search: q2"]
+    assert lines[-1]["succeeded"] == 3
+
+
+def test_rejects_batches_over_the_item_limit(stub_agents, monkeypatch):
+    monkeypatch.setattr(agent_routes.API_SETTINGS, "batch_max_items", 2)
+    response, _ = post_batch("/agents/general/batch", json=["a", "b", "c"])
+
+    assert response.status_code == 413
+    assert post_batch("/agents/unknown/batch", json=["a"])[0].status_code == 404
+
+
+def test_concurrency_is_capped(stub_agents, monkeypatch):
+    monkeypatch.setattr(agent_routes.API_SETTINGS, "batch_max_concurrency", 3)
+    names = ["general", "search", "finance", "code"] * 2
+    items = [{"message": f"q{n}", "agent_id": name} for n, name in enumerate(names)]
+
+    _, lines = post_batch("/agents/general/batch?concurrency=2", json={"items": items})
+    assert lines[-1]["succeeded"] == 8
+    assert EchoAgent.max_running == 2
+
+    EchoAgent.max_running = 0
+    agent_routes.RUN_LOCKS.clear()  # bound to the previous event loop
+    _, lines = post_batch("/agents/general/batch", json={"items": items, "concurrency": 50})
+    assert lines[-1]["succeeded"] == 8
+    assert EchoAgent.max_running == 3
+
+
+def test_a_shared_agent_runs_one_request_at_a_time(stub_agents):
+    async def scenario():
+        async with client() as http:
+            return await asyncio.gather(
+                *(http.post("/agents/code/chat", json={"message": f"q{n}"}) for n in range(3)),
+                http.post("/agents/code/batch", json=["b0", "b1"])
+            )
+
+    *chats, batch = asyncio.run(scenario())
+
+    assert all(chat.json()["success"] for chat in chats)
+    assert json.loads(batch.text.splitlines()[-1])["succeeded"] == 2
+    assert EchoAgent.max_running == 1
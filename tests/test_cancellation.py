@@ -0,0 +1,95 @@
+"""
+Tests for cancelling agent runs mid-generation
+"""
+
+import asyncio
+import threading
+import time
+from functools import partial
+
+import pytest
+from agno.agent import Agent
+
+from agents.budgeted_model import BudgetedOllama
+from api.disconnect import run_cancellable
+from tests.fake_ollama import FakeOllamaServer
+from utils.cancellation import CancelToken, RunCancelled, cancel_scope, cancellation_stats_for
+from utils.ollama_pool import OllamaBackendPool
+
+
+class DisconnectingClient:
+    """Stands in for the Starlette request of a client that goes away after ``seconds``"""
+
+    def __init__(self, seconds: float):
+        self.gone_at = time.monotonic() + seconds
+
+    async def is_disconnected(self) -> bool:
+        return time.monotonic() >= self.gone_at
+
+
+def pooled_agent(fake):
+    pool = OllamaBackendPool([fake.url])
+    model = BudgetedOllama(id="qwen3:8b", host=fake.url, client=pool.client(), async_client=pool.async_client())
+    return Agent(model=model, telemetry=False)
+
+
+def run_with(token, agent, message):
+    with cancel_scope(token):
+        return agent.run(message)
+
+
+def test_cancelling_a_run_closes_the_ollama_stream():
+    with FakeOllamaServer(token_latency=0.05, tokens=60) as fake:
+        agent = pooled_agent(fake)
+        token = CancelToken()
+        threading.Timer(0.4, token.cancel, args=("disconnect",)).start()
+        started = time.perf_counter()
+        with pytest.raises(RunCancelled):
+            run_with(token, agent, "Explique la relativité")
+        elapsed = time.perf_counter() - started
+
+        for _ in range(50):
+            if fake.streams_aborted:
+                break
+            time.sleep(0.02)
+
+    assert elapsed < 1.5
+    assert 0 < token.tokens < 60
+    assert fake.streams_aborted == 1
+
+
+def test_deadline_cancels_and_savings_are_estimated_from_completed_runs():
+    stats = cancellation_stats_for("test-deadline")
+    with FakeOllamaServer(token_latency=0.02, tokens=40) as fake:
+        agent = pooled_agent(fake)
+        token = CancelToken.after(10)
+        response = run_with(token, agent, "Bonjour")
+        stats.record_completed(token)
+        assert response.content.split() == ["the", "agent", "answers", "with", "local", "data", "and", "clear",
+                                            "steps", "quickly"] * 4
+
+        token = CancelToken.after(0.3)
+        with pytest.raises(RunCancelled) as raised:
+            run_with(token, agent, "Bonjour encore")
+        stats.record_cancelled(token)
+
+    assert raised.value.reason == "deadline"
+    result = stats.as_dict()
+    assert result["completed"] == 1 and result["cancelled"] == {"deadline": 1}
+    assert 0 < result["tokens_discarded"] < 40
+    assert result["estimated_tokens_saved"] == 40 - result["tokens_discarded"]
+    assert result["estimated_seconds_saved"] > 0.3
+
+
+def test_client_disconnect_cancels_the_run():
+    with FakeOllamaServer(token_latency=0.05, tokens=60) as fake:
+        agent = pooled_agent(fake)
+        started = time.perf_counter()
+        with pytest.raises(RunCancelled) as raised:
+            asyncio.run(run_cancellable(DisconnectingClient(0.3), "test-disconnect",
+                                        partial(agent.run, "Raconte une longue histoire")))
+        elapsed = time.perf_counter() - started
+
+    assert raised.value.reason == "disconnect"
+    assert elapsed < 1.5
+    assert cancellation_stats_for("test-disconnect").as_dict()["cancelled"] == {"disconnect": 1}
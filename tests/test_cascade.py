@@ -0,0 +1,54 @@
+"""
+Tests for the small-model-first cascade
+"""
+
+import copy
+
+from agents import general_agent
+from tests.fake_ollama import FakeOllamaServer
+from utils.cascade import CascadePolicy, cascade_stats_for
+
+
+def test_policy_keeps_good_answers_and_flags_weak_ones():
+    policy = CascadePolicy(min_confidence=0.6)
+    question = "Explique-moi pourquoi le ciel est bleu, avec un exemple."
+
+    good = policy.judge(question, "Le ciel est bleu car la lumière bleue est plus diffusée par l'air que la rouge.")
+    assert good.accept and good.confidence == 1.0
+
+    assert policy.judge(question, "Je ne suis pas sûr.").reasons == ["too short", "hedging"]
+    assert policy.judge(question, "").reasons == ["empty answer"]
+    assert not policy.judge(question, "", tool_calls=True).accept
+    assert "cut off" in policy.judge(question, "Le ciel est bleu car la lumière", done_reason="length").reasons
+    english = policy.judge(question, "The sky is blue because the air scatters blue light more than red light.")
+    assert english.reasons == ["wrong language"] and english.accept
+    loop = "Le ciel est bleu à cause de la diffusion.\n" * 5
+    assert "repetitive" in policy.judge(question, loop).reasons
+
+    assert policy.should_skip("Quel est le cours d'AAPL aujourd'hui ?", has_tools=True) == "needs a tool"
+    assert policy.should_skip("Quel est le cours d'AAPL aujourd'hui ?") is None
+    assert policy.should_skip("x" * 5000) == "long question"
+
+
+def test_general_agent_escalates_only_unconvincing_small_answers():
+    def reply(model, messages):
+        question = messages[-1]["content"]
+        if model == "llama3.2:3b" and "Gödel" in question:
+            return "Je ne sais pas."
+        return "Voici une réponse claire et complète à la question posée, avec un exemple."
+
+    with FakeOllamaServer(responder=reply) as fake:
+        model = copy.deepcopy(general_agent.model)
+        model.host, model.client, model.async_client = fake.url, None, None
+        model.context_name = "test-cascade"
+        agent = general_agent.deep_copy(update={"model": model})
+
+        assert "réponse claire" in agent.run("Quelle est la capitale du Canada ?").content
+        assert "réponse claire" in agent.run("Que dit le théorème de Gödel sur la cohérence ?").content
+
+        models = [payload["model"] for payload in fake.chat_payloads]
+        assert models == ["llama3.2:3b", "llama3.2:3b", "qwen3:8b"]
+
+    stats = cascade_stats_for("test-cascade").as_dict()
+    assert stats["answered_by_small"] == 1 and stats["escalated"] == 1
+    assert stats["escalation_rate"] == 0.5 and stats["escalation_reasons"] == {"too short": 1, "hedging": 1}
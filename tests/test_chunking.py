@@ -0,0 +1,38 @@
+"""
+Tests for the fast structure-aware chunker
+"""
+
+from agno.document import Document
+
+from agents.chunking import FastChunking, get_chunking_strategy
+from tests.benchmarks.chunking_bench import build_corpus, evaluate
+
+
+def test_chunks_respect_size_and_prefer_paragraph_breaks():
+    paragraphs = [" ".join(f"Sentence {p}.{s} has a few words." for s in range(6)) for p in range(8)]
+    document = Document(name="doc", id="doc_1", meta_data={"page": 1}, content="\n\n".join(paragraphs))
+
+    chunks = FastChunking(chunk_size=500, overlap=0).chunk(document)
+
+    assert all(len(chunk.content) <= 500 for chunk in chunks)
+    assert [chunk.id for chunk in chunks] == [f"doc_1_{n}" for n in range(1, len(chunks) + 1)]
+    assert all(chunk.meta_data["page"] == 1 for chunk in chunks)
+    # Every paragraph fits in a chunk, so no paragraph is ever split
+    assert all(any(p in chunk.content for chunk in chunks) for p in paragraphs)
+
+
+def test_overlap_starts_on_a_sentence_and_keeps_facts_whole():
+    pages, facts = build_corpus(sections=12)
+    strategy = FastChunking(chunk_size=400, overlap=120)
+
+    chunks = [chunk for page in pages for chunk in strategy.chunk(page)]
+    result = evaluate(strategy, pages, facts)
+
+    assert all(chunk.content[0].isupper() for chunk in chunks)
+    assert result["split_facts"] == 0
+    assert result["hit@3"] >= 0.9
+
+
+def test_strategy_selection():
+    assert isinstance(get_chunking_strategy("fast", chunk_size=800), FastChunking)
+    assert get_chunking_strategy("agentic").__class__.__name__ == "AgenticChunking"
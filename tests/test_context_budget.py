@@ -0,0 +1,77 @@
+"""
+Tests for fitting agent prompts into their token budget
+"""
+
+from agno.models.message import Message
+
+from agents.budgeted_model import BudgetedOllama
+from utils.context_budget import ContextBudget, context_stats, message_tokens
+
+SYSTEM = "You are a helpful assistant. " * 20
+
+
+def conversation(turns: int, tool_chars: int = 0):
+    messages = [("system", SYSTEM)]
+    for n in range(turns):
+        messages.append(("user", f"Question {n}: what about topic {n}? " + "details " * 40))
+        if tool_chars:
+            messages.append(("assistant", ""))
+            messages.append(("tool", f"result {n} " + "x" * tool_chars + f" end {n}"))
+        messages.append(("assistant", f"Answer {n}. " + "explanation " * 40))
+    messages.append(("user", "And the latest question?"))
+    return messages
+
+
+def test_small_prompts_are_untouched():
+    plan = ContextBudget(max_tokens=4096).fit(conversation(2))
+    assert plan.keep == list(range(len(conversation(2))))
+    assert not plan.trimmed and plan.summary is None
+    assert plan.tokens_before == plan.tokens_after
+
+
+def test_old_turns_are_summarized_and_tool_results_shortened():
+    messages = conversation(10, tool_chars=20000)
+    budget = ContextBudget(max_tokens=1500, max_tool_tokens=300, summary_tokens=150)
+
+    plan = budget.fit(messages)
+
+    assert plan.tokens_before > 10000
+    assert plan.tokens_after <= 1500
+    # System prompt and the current question survive, the oldest turn does not
+    assert plan.keep[0] == 0 and plan.keep[-1] == len(messages) - 1
+    assert 1 not in plan.keep
+    assert plan.summary.startswith("Summary of earlier conversation:")
+    kept_tools = [i for i in plan.keep if messages[i][0] == "tool"]
+    for i in kept_tools:
+        text = plan.replacements[i]
+        assert "tokens omitted" in text and text.startswith("result") and text.endswith(messages[i][1][-6:])
+        assert message_tokens(text) <= 300 + 4
+    sent = sum(message_tokens(plan.replacements.get(i, messages[i][1])) for i in plan.keep)
+    assert sent + message_tokens(plan.summary) == plan.tokens_after
+
+
+def test_budgeted_model_sends_trimmed_copy():
+    model = BudgetedOllama(id="qwen3:8b", context_budget=ContextBudget(max_tokens=800, max_tool_tokens=200),
+                           context_name="test-agent")
+    messages = [Message(role=role, content=content) for role, content in conversation(6, tool_chars=4000)]
+
+    fitted = model.fit_messages(messages)
+
+    assert fitted[0] is messages[0]
+    assert fitted[1].role == "system" and fitted[1].content.startswith("Summary")
+    assert fitted[-1].content == "And the latest question?"
+    assert len(fitted) < len(messages)
+    # The run's own messages are left as they were
+    assert all(len(m.content) > 4000 for m in messages if m.role == "tool")
+    stats = context_stats["test-agent"].as_dict()
+    assert stats["prompts"] == 1 and stats["trimmed"] == 1 and stats["tokens_saved"] > 0
+
+
+def test_trimming_in_steps_keeps_the_prefix_stable():
+    budget = ContextBudget(max_tokens=1200, trim_step_turns=4)
+    plans = [budget.fit(conversation(turns)) for turns in range(8, 12)]
+
+    # Over budget each time, but the same turns are dropped for several turns in a row
+    assert all(plan.dropped for plan in plans)
+    assert len({plan.summary for plan in plans}) < len(plans)
+    assert all(plan.tokens_after <= 1200 for plan in plans)
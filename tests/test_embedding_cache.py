@@ -0,0 +1,60 @@
+"""
+Tests for the embedding cache and the cached, batched Ollama embedder
+"""
+
+import threading
+
+from agents.embedder import CachedOllamaEmbedder
+from utils.embedding_cache import EmbeddingCache, MicroBatcher
+
+
+def test_cache_persists_vectors_per_model(tmp_path):
+    path = str(tmp_path / "embeddings.db")
+    cache = EmbeddingCache(path)
+    cache.put_many("nomic-embed-text", ["alpha", "beta"], [[0.5, 0.25], [1.0, -1.0]])
+    cache.close()
+
+    reopened = EmbeddingCache(path)
+    assert reopened.get_many("nomic-embed-text", ["beta", "gamma", "alpha"]) == [[1.0, -1.0], None, [0.5, 0.25]]
+    assert reopened.get("other-model", "alpha") is None
+    assert reopened.stats()["hits"] == 2
+
+
+def test_embedder_batches_misses_and_reuses_cached_vectors(fake_ollama, tmp_path):
+    embedder = CachedOllamaEmbedder(host=fake_ollama.url, cache=EmbeddingCache(str(tmp_path / "e.db")), batch_size=8)
+    texts = [f"chunk number {i}" for i in range(20)] + ["chunk number 0"]
+
+    first = embedder.get_embeddings(texts)
+    requests_after_first = fake_ollama.requests["/api/embed"]
+    second = embedder.get_embeddings(texts)
+
+    assert requests_after_first == 3  # 20 unique texts in batches of 8
+    assert fake_ollama.requests["/api/embed"] == requests_after_first
+    assert first == second
+    assert all(len(vector) == 768 for vector in first)
+    assert embedder.get_embedding("chunk number 5") == first[5]
+
+
+def test_concurrent_single_calls_are_coalesced():
+    calls = []
+
+    def embed(items):
+        calls.append(list(items))
+        return [item.upper() for item in items]
+
+    batcher = MicroBatcher(embed, max_batch=16, max_wait=0.05)
+    results = {}
+    start = threading.Barrier(10)
+
+    def worker(i):
+        start.wait()
+        results[i] = batcher.submit(f"text {i}")
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == {i: f"TEXT {i}" for i in range(10)}
+    assert len(calls) < 10
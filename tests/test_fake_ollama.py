@@ -0,0 +1,36 @@
+"""
+Tests for the stand-in Ollama server used by the benchmarks
+"""
+
+import ollama
+
+
+def test_chat_non_streaming(fake_ollama):
+    client = ollama.Client(host=fake_ollama.url)
+    response = client.chat(model="qwen3:8b", messages=[{"role": "user", "content": "hello there"}])
+
+    assert response["done"] is True
+    assert len(response["message"]["content"].split()) == 8
+    assert response["prompt_eval_count"] == 2
+    assert fake_ollama.requests["/api/chat"] == 1
+
+
+def test_chat_streaming_yields_tokens(fake_ollama):
+    client = ollama.Client(host=fake_ollama.url)
+    chunks = list(client.chat(model="qwen3:8b", messages=[{"role": "user", "content": "hi"}], stream=True))
+
+    assert len(chunks) == 9
+    assert chunks[-1]["done"] is True
+    assert "qwen3:8b" in fake_ollama.loaded_models
+
+
+def test_list_and_embed(fake_ollama):
+    client = ollama.Client(host=fake_ollama.url)
+    names = [model["model"] for model in client.list()["models"]]
+    embeddings = client.embed(model="nomic-embed-text", input=["a", "b", "a"])["embeddings"]
+
+    assert "qwen3:8b" in names
+    assert len(embeddings) == 3
+    assert len(embeddings[0]) == 768
+    assert embeddings[0] == embeddings[2]
+    assert embeddings[0] != embeddings[1]
@@ -0,0 +1,84 @@
+"""
+Tests for the deterministic finance fast path
+"""
+
+import json
+
+from utils.finance_fast_path import FinanceFastPath, parse_finance_intent
+from utils.market_store import KIND_METHODS
+
+
+class StaticYFinance:
+    """Same methods and output formats as agno's YFinanceTools, from fixed data"""
+
+    prices = {"AAPL": "189.2500", "MSFT": "415.1000"}
+
+    def __init__(self):
+        self.calls = []
+
+    def fetch(self, kind, symbol):
+        return getattr(self, KIND_METHODS[kind])(symbol)
+
+    def get_current_stock_price(self, symbol):
+        self.calls.append(("price", symbol))
+        return self.prices.get(symbol, f"Could not fetch current price for {symbol}")
+
+    def get_company_info(self, symbol):
+        return json.dumps({"Name": "Apple Inc.", "Symbol": symbol, "Current Stock Price": "189.25 USD",
+                           "Market Cap": "2950000000000 USD", "Sector": "Technology", "P/E Ratio": 29.4})
+
+    def get_analyst_recommendations(self, symbol):
+        return json.dumps({"0": {"period": "0m", "strongBuy": 12, "buy": 20, "hold": 8, "sell": 1, "strongSell": 0},
+                           "1": {"period": "-1m", "strongBuy": 11, "buy": 21, "hold": 8, "sell": 1, "strongSell": 0}})
+
+    def get_company_news(self, symbol, num_stories=3):
+        return json.dumps([{"content": {"title": "Apple unveils new chips", "provider": {"displayName": "Reuters"},
+                                        "canonicalUrl": {"url": "https://example.com/chips"}}}])
+
+
+def test_parses_simple_lookups_and_leaves_the_rest_to_the_agent():
+    intent = parse_finance_intent("Quel est le cours de l'action AAPL ?")
+    assert (intent.kind, intent.symbols) == ("price", ["AAPL"])
+    assert parse_finance_intent("price of $MSFT and TSLA").symbols == ["MSFT", "TSLA"]
+    assert parse_finance_intent("What is Apple's market cap?").kind == "info"
+    assert parse_finance_intent("Donne-moi les recommandations des analystes pour TSLA").kind == "recommendations"
+    assert parse_finance_intent("Actualités LVMH").symbols == ["MC.PA"]
+
+    assert parse_finance_intent("Compare le ratio P/E de MSFT et GOOGL.") is None  # needs reasoning
+    assert parse_finance_intent("Dois-je acheter AAPL au prix actuel ?") is None
+    assert parse_finance_intent("Quel est le cours de l'action ?") is None  # no symbol
+    assert parse_finance_intent("Prix de AAPL, MSFT, NVDA et TSLA") is None  # too many symbols
+    assert parse_finance_intent("Explique-moi la photosynthèse.") is None
+    # Counts, sales or valuations are not stock quotes
+    assert parse_finance_intent("Combien de salariés a Apple ?") is None
+    assert parse_finance_intent("Combien Tesla a-t-elle vendu de voitures en 2023 ?") is None
+    assert parse_finance_intent("How much is Tesla worth as a brand?") is None
+    assert parse_finance_intent("Combien vaut l'action Apple ?").kind == "price"
+    assert parse_finance_intent("Combien coûte une action NVDA ?").symbols == ["NVDA"]
+
+
+def test_answers_from_the_tools_and_falls_through_on_errors():
+    tools = StaticYFinance()
+    fast_path = FinanceFastPath(tools.fetch)
+
+    answer = fast_path.answer("prix de AAPL et MSFT")
+    assert answer.intent == "price" and answer.symbols == ["AAPL", "MSFT"]
+    assert "**AAPL** : 189.25" in answer.content and "**MSFT** : 415.10" in answer.content
+    assert "Capitalisation : 2 950.0 Md USD" in fast_path.answer("Infos sur Apple").content
+    assert "Achat fort 12, Achat 20" in fast_path.answer("Consensus des analystes sur AAPL").content
+    assert "[Apple unveils new chips](https://example.com/chips) — Reuters" in fast_path.answer("news AAPL").content
+
+    assert fast_path.answer("prix de ZZZZ") is None  # "Could not fetch ..." goes to the agent
+    assert fast_path.answer("Pourquoi AAPL a baissé ?") is None
+    stats = fast_path.stats()
+    assert (stats["answered"], stats["tool_errors"], stats["passed_to_agent"]) == (4, 1, 1)
+
+    def unreachable(kind, symbol):
+        raise ConnectionError("Yahoo Finance unreachable")
+
+    failing = FinanceFastPath(unreachable)
+    assert failing.answer("cours AAPL") is None  # a raising fetch also goes to the agent
+    assert failing.stats()["tool_errors"] == 1
+
+    summarized = FinanceFastPath(tools.fetch, summarize=lambda question, text: "Apple cote 189,25 USD.")
+    assert summarized.answer("cours AAPL").content.endswith("\n\nApple cote 189,25 USD.")
@@ -0,0 +1,68 @@
+"""
+Tests for the intent router behind /agents/auto/chat
+"""
+
+import re
+
+from utils.intent_router import IntentRouter, evaluate
+
+PROFILES = {
+    "general": ["conversation and general knowledge"],
+    "finance": ["stock prices and company financials"],
+    "code": ["python programs and calculations"],
+    "cooking": ["recipes ingredients oven baking"],
+}
+VOCABULARY = sorted({word for texts in PROFILES.values() for text in texts for word in text.split()})
+
+
+def bag_of_words(texts):
+    """Toy embedder: one dimension per profile word"""
+    calls.append(len(texts))
+    return [[float(word in re.findall(r"\w+", text.lower())) for word in VOCABULARY] for text in texts]
+
+
+calls = []
+
+
+def test_keywords_then_embeddings_then_fallback():
+    calls.clear()
+    asked = []
+
+    def classify(message, agent_ids):
+        asked.append(message)
+        return "finance" if "money" in message else "nonsense"
+
+    router = IntentRouter(PROFILES, embed=bag_of_words, classify=classify, min_similarity=0.3)
+
+    decision = router.route("Quel est le cours de l'action AAPL ?")
+    assert (decision.agent_id, decision.method) == ("finance", "keywords")
+    assert calls == []  # Keywords decided: nothing embedded
+
+    decision = router.route("any baking recipes with an oven?")
+    assert (decision.agent_id, decision.method) == ("cooking", "embedding")
+    assert calls == [4, 1]  # Profiles embedded once, then the message
+
+    assert router.route("where did my money go").method == "llm"
+    decision = router.route("hello there")
+    assert (decision.agent_id, decision.method) == ("general", "default")
+    assert asked == ["where did my money go", "hello there"]
+    assert calls == [4, 1, 1, 1]
+
+    stats = router.stats()
+    assert stats["routes"] == 4
+    assert stats["by_method"] == {"keywords": 1, "embedding": 1, "llm": 1, "default": 1}
+
+
+def test_ties_are_not_decided_by_keywords_and_evaluate_reports_misses():
+    router = IntentRouter(PROFILES)
+    # One finance hit ("bourse") and one code hit ("python"): ambiguous
+    decision = router.route("script python pour la bourse")
+    assert decision.method == "keywords" and decision.agent_id == "code"
+    assert router.route("python et bourse").method == "default"
+
+    report = evaluate(router, [("Calcule 12 * 7", "code"), ("Bonjour", "general"), ("python et bourse", "finance")])
+    assert report["messages"] == 3 and report["accuracy"] == 0.667
+    assert report["by_method"]["keywords"] == {"routed": 1, "correct": 1}
+    assert report["misses"] == [{"message": "python et bourse", "expected": "finance", "routed": "general",
+                                 "method": "default"}]
+    assert report["latency_ms"]["max"] < 50
@@ -0,0 +1,132 @@
+"""
+Tests for the keyed work queue behind the WhatsApp webhook
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from agents.whatsapp import WhatsAppAgent, WhatsAppMessage
+from utils.keyed_queue import KeyedWorkQueue
+
+
+def webhook(*messages):
+    """Delivery with one entry per (from, id, text) triple, plus a status update"""
+    return {"entry": [
+        {"changes": [{"value": {
+            "messages": [{"from": sender, "id": message_id, "timestamp": "1", "text": {"body": text}}],
+        }}]}
+        for sender, message_id, text in messages
+    ] + [{"changes": [{"value": {"statuses": [{"id": "wamid.status"}]}}]}]}
+
+
+def test_per_key_order_cross_key_parallelism_and_dedup():
+    handled = []
+
+    async def handler(key, item):
+        await asyncio.sleep(0.05)
+        handled.append((key, item))
+
+    async def scenario():
+        queue = KeyedWorkQueue(handler, workers=4)
+        started = time.monotonic()
+        for n in range(3):
+            for user in ("alice", "bob", "carol"):
+                assert queue.put(user, n, item_id=f"{user}-{n}")
+        assert not queue.put("alice", 0, item_id="alice-0")
+        await queue.join()
+        elapsed = time.monotonic() - started
+        await queue.stop()
+        return elapsed, queue.stats()
+
+    elapsed, stats = asyncio.run(scenario())
+
+    for user in ("alice", "bob", "carol"):
+        assert [n for key, n in handled if key == user] == [0, 1, 2]
+    # Three users in parallel: about 3 x 0.05s, not 9 x 0.05s
+    assert elapsed < 0.3
+    assert (stats["processed"], stats["duplicates"], stats["pending"]) == (9, 1, 0)
+
+
+def test_full_queue_pushes_back():
+    async def scenario():
+        queue = KeyedWorkQueue(lambda key, item: asyncio.sleep(1), workers=1, max_pending=2)
+        queue.put("a", 1)
+        queue.put("b", 2)
+        with pytest.raises(asyncio.QueueFull):
+            queue.put("c", 3, item_id="c-3")
+        # A rejected message can be redelivered
+        assert "c-3" not in queue._seen
+        await queue.stop()
+
+    asyncio.run(scenario())
+
+
+def test_failed_item_is_handled_when_redelivered():
+    attempts = []
+
+    async def handler(key, item):
+        attempts.append(item)
+        if len(attempts) == 1:
+            raise RuntimeError("reply failed")
+
+    async def scenario():
+        queue = KeyedWorkQueue(handler, workers=1)
+        assert queue.put("alice", "hi", item_id="wamid.1")
+        await queue.join()
+        redelivered = queue.put("alice", "hi", item_id="wamid.1")
+        await queue.join()
+        duplicate = queue.put("alice", "hi", item_id="wamid.1")
+        await queue.stop()
+        return redelivered, duplicate, queue.stats()
+
+    redelivered, duplicate, stats = asyncio.run(scenario())
+
+    assert (redelivered, duplicate) == (True, False)
+    assert attempts == ["hi", "hi"]
+    assert (stats["failed"], stats["processed"], stats["duplicates"]) == (1, 1, 1)
+
+
+def test_each_sender_runs_on_its_own_agent(tmp_path):
+    agent = WhatsAppAgent(memory_path=str(tmp_path / "memory.db"),
+                          knowledge_manifest_path=str(tmp_path / "manifest.json"))
+
+    alice, bob = agent.agent_for("33600"), agent.agent_for("33611")
+
+    assert alice is not bob and alice is not agent.agent
+    assert agent.agent_for("33600") is alice
+    assert (alice.session_id, bob.session_id) == ("33600", "33611")
+    assert alice.memory is agent.memory and alice.knowledge is agent.knowledge_base
+
+
+def test_webhook_queues_every_message_and_answers_in_order(tmp_path):
+    agent = WhatsAppAgent(memory_path=str(tmp_path / "memory.db"),
+                          knowledge_manifest_path=str(tmp_path / "manifest.json"))
+    replies = []
+
+    async def handle_message(message, user_id):
+        await asyncio.sleep(0.01)
+        return f"echo {message}"
+
+    async def reply_handler(reply):
+        replies.append(reply)
+
+    agent.handle_message = handle_message
+    agent.reply_handler = reply_handler
+    payload = webhook(("33600", "wamid.1", "hi"), ("33611", "wamid.2", "hello"), ("33600", "wamid.3", "again"))
+
+    async def scenario():
+        first = await agent.handle_webhook(payload)
+        retried = await agent.handle_webhook(payload)
+        await agent.webhook_queue.join()
+        await agent.webhook_queue.stop()
+        return first, retried
+
+    first, retried = asyncio.run(scenario())
+
+    assert len(WhatsAppMessage.all_from_webhook(payload)) == 3
+    assert first == {"received": 3, "queued": 3, "duplicates": 0}
+    assert retried == {"received": 3, "queued": 0, "duplicates": 3}
+    assert [r["body"] for r in replies if r["to"] == "33600"] == ["echo hi", "echo again"]
+    assert {r["reply_to"] for r in replies} == {"wamid.1", "wamid.2", "wamid.3"}
@@ -0,0 +1,210 @@
+"""
+Tests for the concurrent PDF knowledge ingestion pipeline
+"""
+
+import asyncio
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+from agno.document import Document
+from agno.document.chunking.fixed import FixedSizeChunking
+from agno.embedder.ollama import OllamaEmbedder
+from agno.knowledge.pdf_url import PDFUrlKnowledgeBase
+from agno.vectordb.base import VectorDb
+
+from agents.knowledge_ingestion import KnowledgeIngestion
+
+
+def make_pdf(pages: List[str]) -> bytes:
+    """Minimal PDF with one line of Helvetica text per page"""
+    page_ids = [4 + 2 * i for i in range(len(pages))]
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % i for i in page_ids) + b"] /Count %d >>" % len(pages),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for page_id, text in zip(page_ids, pages):
+        stream = b"BT /F1 12 Tf 72 720 Td (" + text.encode("latin-1") + b") Tj ET"
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (page_id + 1))
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+class MemoryVectorDb(VectorDb):
+    """In-memory vector DB that records what it was given"""
+
+    def __init__(self, embedder):
+        self.embedder = embedder
+        self.rows: Dict[str, Document] = {}
+        self.created = False
+        self.embed_calls_on_insert = 0
+
+    def create(self) -> None:
+        self.created = True
+
+    async def async_create(self) -> None:
+        self.create()
+
+    def exists(self) -> bool:
+        return self.created
+
+    async def async_exists(self) -> bool:
+        return self.exists()
+
+    def drop(self) -> None:
+        self.rows.clear()
+        self.created = False
+
+    async def async_drop(self) -> None:
+        self.drop()
+
+    def doc_exists(self, document: Document) -> bool:
+        return any(row.content == document.content for row in self.rows.values())
+
+    async def async_doc_exists(self, document: Document) -> bool:
+        return self.doc_exists(document)
+
+    def name_exists(self, name: str) -> bool:
+        return any(row.name == name for row in self.rows.values())
+
+    def async_name_exists(self, name: str) -> bool:
+        return self.name_exists(name)
+
+    def insert(self, documents: List[Document], filters: Optional[Dict[str, Any]] = None) -> None:
+        for doc in documents:
+            had_embedding = doc.embedding is not None
+            doc.embed(embedder=self.embedder)
+            self.embed_calls_on_insert += 0 if had_embedding and doc.embedding is not None else 1
+            self.rows[doc.id] = doc
+
+    async def async_insert(self, documents: List[Document], filters: Optional[Dict[str, Any]] = None) -> None:
+        self.insert(documents, filters)
+
+    def upsert(self, documents: List[Document], filters: Optional[Dict[str, Any]] = None) -> None:
+        self.insert(documents, filters)
+
+    async def async_upsert(self, documents: List[Document], filters: Optional[Dict[str, Any]] = None) -> None:
+        self.insert(documents, filters)
+
+    def search(self, query: str, limit: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[Document]:
+        return []
+
+    async def async_search(self, query: str, limit: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[Document]:
+        return []
+
+    def delete(self) -> bool:
+        self.rows.clear()
+        return True
+
+    def delete_by_ids(self, ids: List[str]) -> int:
+        return sum(1 for id in ids if self.rows.pop(id, None) is not None)
+
+
+def serve_files(files: Dict[str, bytes]) -> ThreadingHTTPServer:
+    """Static file server with ETag revalidation; ``files`` may be changed between requests"""
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            body = files.get(self.path)
+            if body is None:
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            etag = '"' + hashlib.md5(body).hexdigest() + '"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd
+
+
+def test_ingests_pdfs_through_every_stage(fake_ollama):
+    files = {f"/doc{i}.pdf": make_pdf([f"Document {i} page {p} about local agents" for p in range(1, 4)])
+             for i in range(3)}
+    httpd = serve_files(files)
+    base = f"http://127.0.0.1:{httpd.server_address[1]}"
+    try:
+        embedder = OllamaEmbedder(id="nomic-embed-text", host=fake_ollama.url, dimensions=768)
+        vector_db = MemoryVectorDb(embedder)
+        knowledge_base = PDFUrlKnowledgeBase(
+            urls=[f"{base}{path}" for path in files] + [f"{base}/missing.pdf"],
+            vector_db=vector_db,
+            chunking_strategy=FixedSizeChunking(chunk_size=5000)
+        )
+        ingestion = KnowledgeIngestion(knowledge_base, progress_interval=0.01)
+
+        stats = asyncio.run(ingestion.run())
+        again = asyncio.run(ingestion.run())
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+    assert stats["completed"] == 9
+    assert [s["items_out"] for s in stats["stages"]] == [3, 9, 9, 9, 9]
+    assert stats["stages"][0]["errors"] == 1
+    assert sorted(vector_db.rows) == sorted(f"doc{i}_{p}_1" for i in range(3) for p in range(1, 4))
+    assert all(len(doc.embedding) == 768 for doc in vector_db.rows.values())
+    # Embeddings computed by the pipeline are not recomputed by the vector DB
+    assert vector_db.embed_calls_on_insert == 0
+    assert fake_ollama.requests["/api/embed"] == 9
+    # A second run skips chunks that are already stored
+    assert again["completed"] == 0
+
+
+def test_sync_only_touches_changed_sources(fake_ollama, tmp_path):
+    files = {f"/doc{i}.pdf": make_pdf([f"Document {i} page {p}" for p in range(1, 3)]) for i in range(3)}
+    httpd = serve_files(files)
+    base = f"http://127.0.0.1:{httpd.server_address[1]}"
+    try:
+        embedder = OllamaEmbedder(id="nomic-embed-text", host=fake_ollama.url, dimensions=768)
+        vector_db = MemoryVectorDb(embedder)
+        knowledge_base = PDFUrlKnowledgeBase(urls=[f"{base}{path}" for path in files], vector_db=vector_db)
+        ingestion = KnowledgeIngestion(knowledge_base, manifest_path=str(tmp_path / "manifest.json"))
+
+        first = asyncio.run(ingestion.sync())
+        embeds_after_first = fake_ollama.requests["/api/embed"]
+        noop = asyncio.run(ingestion.sync())
+
+        files["/doc1.pdf"] = make_pdf(["Document 1 rewritten"])
+        urls = [f"{base}/doc0.pdf", f"{base}/doc1.pdf", f"{base}/doc3.pdf"]
+        files["/doc3.pdf"] = make_pdf(["Document 3 page 1"])
+        changed = asyncio.run(ingestion.sync(urls))
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+    assert len(first["added"]) == 3 and first["completed"] == 6
+    assert len(noop["unchanged"]) == 3 and noop["completed"] == 0
+    assert fake_ollama.requests["/api/embed"] == embeds_after_first + 2
+    assert changed["added"] == [f"{base}/doc3.pdf"]
+    assert changed["updated"] == [f"{base}/doc1.pdf"]
+    assert changed["unchanged"] == [f"{base}/doc0.pdf"]
+    assert changed["removed"] == [f"{base}/doc2.pdf"]
+    assert changed["chunks_deleted"] == 4
+    assert sorted(vector_db.rows) == ["doc0_1_1", "doc0_2_1", "doc1_1_1", "doc3_1_1"]
+    assert vector_db.rows["doc1_1_1"].content == "Document 1 rewritten"
@@ -0,0 +1,110 @@
+"""
+Tests for the embedded vector store and its indexes
+"""
+
+import hashlib
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from agno.document import Document
+from agno.embedder.base import Embedder
+from agno.vectordb.search import SearchType
+
+from agents.local_vector_db import LocalVectorDb
+from utils.vector_index import BM25Index, VectorIndex, tokenize
+
+
+@dataclass
+class BagOfWordsEmbedder(Embedder):
+    """Deterministic embedder: hashed word counts, so shared words mean similar vectors"""
+
+    dimensions: Optional[int] = 64
+
+    def get_embedding(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimensions
+        for word in tokenize(text):
+            vector[int(hashlib.md5(word.encode()).hexdigest(), 16) % self.dimensions] += 1.0
+        return vector
+
+    def get_embedding_and_usage(self, text: str) -> Tuple[List[float], Optional[Dict]]:
+        return self.get_embedding(text), None
+
+
+DOCS = [
+    ("billing", "Invoices are sent on the first day of every month by email"),
+    ("shipping", "Parcels ship within two business days from the Lyon warehouse"),
+    ("returns", "Returns are accepted for thirty days with the original receipt"),
+    ("support", "Support answers WhatsApp messages between nine and six"),
+]
+
+
+def make_db(tmp_path, **kwargs) -> LocalVectorDb:
+    db = LocalVectorDb(table_name="kb", embedder=BagOfWordsEmbedder(), path=str(tmp_path), **kwargs)
+    db.create()
+    db.insert([Document(id=name, name=name, content=content, meta_data={"topic": name}) for name, content in DOCS])
+    return db
+
+
+def test_search_types_and_filters(tmp_path):
+    db = make_db(tmp_path, search_type=SearchType.hybrid, vector_score_weight=0.7, prefix_match=True)
+
+    assert db.get_count() == 4
+    assert db.search("when do parcels ship", limit=1)[0].name == "shipping"
+    assert db.keyword_search("receipt", limit=1)[0].name == "returns"
+    # Prefix matching: "invoic" finds "invoices"
+    assert db.keyword_search("invoic", limit=1)[0].name == "billing"
+    assert db.vector_search("whatsapp support messages", limit=1)[0].name == "support"
+    assert [d.name for d in db.search("days", limit=4, filters={"topic": "returns"})] == ["returns"]
+
+    # Insert skips known ids, upsert replaces their content
+    db.insert([Document(id="billing", name="billing", content="ignored")])
+    db.upsert([Document(id="billing", name="billing", content="Invoices are now sent weekly")])
+    assert db.get_count() == 4
+    assert db.keyword_search("weekly", limit=1)[0].id == "billing"
+    assert db.keyword_search("email", limit=4) == []
+
+
+def test_store_persists_across_reopen_and_deletes_by_id(tmp_path):
+    make_db(tmp_path)
+
+    reopened = LocalVectorDb(table_name="kb", embedder=BagOfWordsEmbedder(), path=str(tmp_path))
+    assert reopened.exists()
+    assert reopened.name_exists("returns")
+    assert reopened.doc_exists(Document(content=DOCS[1][1]))
+    assert reopened.vector_search("parcels warehouse", limit=1)[0].id == "shipping"
+
+    assert reopened.delete_by_ids(["shipping", "missing"]) == 1
+    assert not reopened.id_exists("shipping")
+    assert all(d.id != "shipping" for d in reopened.search("parcels warehouse", limit=4))
+
+    reopened.drop()
+    assert not reopened.exists()
+
+
+def test_ivf_recall_matches_exhaustive_search(tmp_path):
+    rng = np.random.default_rng(7)
+    centers = rng.normal(size=(20, 32))
+    vectors = (centers[rng.integers(0, 20, 4000)] + 0.3 * rng.normal(size=(4000, 32))).tolist()
+    index = VectorIndex(str(tmp_path / "vectors.f32"), dimensions=32, ivf_threshold=1000, nprobe=8)
+    index.add(vectors)
+
+    recall = []
+    for query in rng.normal(size=(20, 32)) * 0.1 + centers[:20]:
+        exact = {row for row, _ in index.search(query, limit=10, exact=True)}
+        approximate = {row for row, _ in index.search(query, limit=10)}
+        recall.append(len(exact & approximate) / 10)
+
+    assert index._centroids is not None
+    assert sum(recall) / len(recall) >= 0.9
+
+
+def test_bm25_ranks_rare_terms_higher():
+    index = BM25Index()
+    index.add(0, "local agent local agent")
+    index.add(1, "local agent with pgvector")
+    index.add(2, "nothing relevant here")
+
+    assert [row for row, _ in index.search("pgvector agent")] == [1, 0]
+    index.remove(1, "local agent with pgvector")
+    assert index.search("pgvector") == []
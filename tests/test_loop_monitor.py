@@ -0,0 +1,47 @@
+"""
+Tests for the event-loop lag monitor
+"""
+
+import asyncio
+import time
+
+from api.loop_monitor import LoopMonitor
+
+
+def blocking_handler(seconds: float):
+    time.sleep(seconds)
+
+
+def test_detects_blocking_call_and_attributes_offender():
+    async def scenario():
+        monitor = LoopMonitor(interval=0.01, threshold=0.05)
+        monitor.start()
+        await asyncio.sleep(0.05)
+        blocking_handler(0.3)
+        await asyncio.sleep(0.1)
+        await monitor.stop()
+        return monitor.stats()
+
+    stats = asyncio.run(scenario())
+
+    assert stats["blocked_episodes"] == 1
+    assert stats["lag_max"] >= 0.25
+    offender = stats["offenders"][0]
+    assert offender["location"].startswith("tests/test_loop_monitor.py")
+    assert offender["location"].endswith("in blocking_handler")
+    assert offender["max_seconds"] >= 0.25
+
+
+def test_idle_loop_has_no_offenders():
+    async def scenario():
+        monitor = LoopMonitor(interval=0.01, threshold=0.1)
+        monitor.start()
+        await asyncio.sleep(0.2)
+        await monitor.stop()
+        return monitor.stats()
+
+    stats = asyncio.run(scenario())
+
+    assert stats["samples"] > 5
+    assert stats["blocked_episodes"] == 0
+    assert stats["offenders"] == []
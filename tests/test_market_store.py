@@ -0,0 +1,61 @@
+"""
+Tests for the prefetched watchlist store
+"""
+
+import time
+
+from agents.market_tools import WatchlistYFinanceTools, track_market_reads
+from utils.finance_fast_path import FinanceFastPath
+from utils.market_store import MarketDataStore, WatchlistPrefetcher
+
+
+class OfflineWatchlistTools(WatchlistYFinanceTools):
+    """Watchlist tools whose live YFinance calls return fixed data"""
+
+    def __init__(self, store):
+        super().__init__(store, stock_price=True, company_info=True, company_news=True)
+        self.live_calls = []
+
+    def live(self, kind, symbol):
+        self.live_calls.append((kind, symbol))
+        if symbol == "FAIL":
+            return f"Could not fetch current price for {symbol}"
+        return "101.5000" if kind == "price" else '{"Name": "Live Corp"}'
+
+
+def test_prefetcher_fills_the_store_and_keeps_entries_when_a_fetch_fails(tmp_path):
+    path = str(tmp_path / "market.db")
+    store = MarketDataStore(path, max_age=60)
+    tools = OfflineWatchlistTools(store)
+    prefetcher = WatchlistPrefetcher(store, tools.live, ["aapl", "MSFT"], kinds=["price", "info"])
+
+    assert prefetcher.refresh_all() == {"stored": 4, "failed": 0}
+    assert store.get("AAPL", "price").payload == "101.5000"
+
+    prefetcher.symbols.append("FAIL")
+    prefetcher.kinds = ["price"]
+    assert prefetcher.refresh_all() == {"stored": 2, "failed": 1}
+    assert "FAIL:price" in prefetcher.stats()["last_errors"]
+
+    # Entries survive a restart, and are ignored once older than max_age
+    reopened = MarketDataStore(path, max_age=60)
+    assert len(reopened.entries()) == 4
+    reopened.put("AAPL", "price", "99.0000", fetched_at=time.time() - 120)
+    assert reopened.get("AAPL", "price") is None
+    assert reopened.stats()["stale"] == 1
+
+
+def test_tools_serve_fresh_watchlist_data_and_report_its_age():
+    store = MarketDataStore(":memory:", max_age=60)
+    tools = OfflineWatchlistTools(store)
+    store.put("AAPL", "price", "189.2500", fetched_at=time.time() - 30)
+    reads = track_market_reads()
+
+    assert tools.get_current_stock_price("AAPL").startswith("189.2500\n\n(Données de la watchlist du ")
+    assert tools.get_current_stock_price("TSLA") == "101.5000"
+    assert tools.live_calls == [("price", "TSLA")]
+    assert [(r["symbol"], r["source"]) for r in reads] == [("AAPL", "watchlist"), ("TSLA", "live")]
+    assert 29 <= reads[0]["age_seconds"] <= 31
+
+    answer = FinanceFastPath(tools.fetch).answer("cours de AAPL")
+    assert "**AAPL** : 189.25" in answer.content and len(reads) == 3
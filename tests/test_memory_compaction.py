@@ -0,0 +1,88 @@
+"""
+Tests for query-time memory ranking and memory compaction
+"""
+
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from agno.memory.v2.schema import UserMemory
+
+from agents.memory_compaction import MemoryCompactor, RankedMemory, current_query
+from agents.memory_db import CachedSqliteMemoryDb
+from utils.memory_compaction import group_near_duplicates, rank_by_relevance
+from utils.tokens import estimate_total_tokens
+
+FACTS = [
+    "Is allergic to peanuts and shellfish",
+    "Works as a nurse at the Lyon hospital",
+    "Prefers answers in French",
+    "Has two cats named Miso and Tofu",
+    "Usually orders the vegetarian menu",
+]
+
+
+def make_memory(tmp_path, extra: int = 0, **kwargs) -> RankedMemory:
+    memory = RankedMemory(db=CachedSqliteMemoryDb(db_file=str(tmp_path / "memory.db")), **kwargs)
+    start = datetime(2024, 1, 1)
+    facts = FACTS + [f"Asked about order number {1000 + n} and its delivery slot" for n in range(extra)]
+    for n, fact in enumerate(facts):
+        memory.add_user_memory(UserMemory(memory=fact, last_updated=start + timedelta(days=n)), user_id="33600")
+    return memory
+
+
+def test_ranking_and_duplicate_grouping():
+    order = rank_by_relevance("any peanuts in this dish?", FACTS, recency=list(range(len(FACTS))))
+    assert order[0] == 0
+    # Without overlap the newest come first
+    assert rank_by_relevance("hello", FACTS, recency=list(range(len(FACTS))))[0] == len(FACTS) - 1
+    groups = group_near_duplicates(["Lives in Lyon, France", "lives in Lyon France!", "Has a dog"])
+    assert groups == [[0, 1], [2]]
+
+
+def test_prompt_gets_relevant_memories_within_budget(tmp_path):
+    memory = make_memory(tmp_path, extra=40, prompt_budget_tokens=40)
+
+    assert len(memory.get_user_memories("33600")) == 45
+    token = current_query.set("Can I eat the peanut sauce?")
+    try:
+        injected = memory.get_user_memories("33600")
+    finally:
+        current_query.reset(token)
+
+    assert injected[0].memory == FACTS[0]
+    assert estimate_total_tokens(m.memory for m in injected) <= 40
+    stats = memory.prompt_stats()
+    assert stats["memory_tokens_saved"] > 0 and stats["prompts"] == 1
+
+
+def test_compaction_merges_duplicates_and_bounds_storage(tmp_path):
+    memory = make_memory(tmp_path, extra=40)
+    memory.add_user_memory(UserMemory(memory="is allergic to peanuts and shellfish!", topics=["health"]),
+                           user_id="33600")
+    compactor = MemoryCompactor(memory, budget_tokens=150)
+
+    result = compactor.compact_user("33600")
+
+    assert result["merged_duplicates"] == 1
+    assert result["summarized"] == 1
+    assert result["tokens_after"] <= 150 < result["tokens_before"]
+    stored = memory.get_user_memories("33600")
+    assert len(stored) == result["memories_after"]
+    assert any(m.memory.startswith("Earlier: ") for m in stored)
+    assert compactor.compact_user("33600")["memories_after"] == len(stored)  # already within budget
+    assert compactor.stats()["stored_tokens_saved"] > 0
+
+
+def test_compaction_uses_model_summary_when_available(tmp_path):
+    memory = make_memory(tmp_path, extra=40)
+
+    class SummaryModel:
+        def response(self, messages):
+            assert "peanuts" in messages[-1].content
+            return SimpleNamespace(content="- Allergic to peanuts and shellfish\n- Nurse in Lyon\n")
+
+    MemoryCompactor(memory, budget_tokens=150, model=SummaryModel()).compact_all()
+
+    texts = [m.memory for m in memory.get_user_memories("33600")]
+    assert "Allergic to peanuts and shellfish" in texts
+    assert estimate_total_tokens(texts) <= 150
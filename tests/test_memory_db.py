@@ -0,0 +1,69 @@
+"""
+Tests for the cached, write-behind SQLite memory store
+"""
+
+import threading
+
+from agno.memory.v2.db.schema import MemoryRow
+from agno.memory.v2.db.sqlite import SqliteMemoryDb
+from agno.memory.v2.memory import Memory
+from agno.memory.v2.schema import UserMemory
+
+from agents.memory_db import CachedSqliteMemoryDb
+
+
+def test_reads_see_writes_and_are_served_from_cache(tmp_path):
+    db = CachedSqliteMemoryDb(table_name="memory", db_file=str(tmp_path / "memory.db"))
+    memory = Memory(db=db)
+
+    first = memory.add_user_memory(UserMemory(memory="Prefers French"), user_id="33600")
+    memory.add_user_memory(UserMemory(memory="Lives in Lyon", topics=["location"]), user_id="33600")
+    memory.add_user_memory(UserMemory(memory="Likes tea"), user_id="33611")
+    memory.delete_user_memory(first, user_id="33600")
+
+    for _ in range(3):
+        assert [m.memory for m in memory.get_user_memories("33600")] == ["Lives in Lyon"]
+    stats = db.stats()
+    assert stats["cache_hits"] >= 3
+    db.flush()
+    assert db.stats()["commits"] < 4  # writes were batched
+    db.close()
+
+    # Same file, same layout: agno's own SqliteMemoryDb reads it
+    plain = SqliteMemoryDb(table_name="memory", db_file=str(tmp_path / "memory.db"))
+    rows = plain.read_memories(user_id="33600")
+    assert [row.memory["memory"] for row in rows] == ["Lives in Lyon"]
+    assert rows[0].memory["topics"] == ["location"]
+
+
+def test_uncached_reads_wait_for_pending_writes(tmp_path):
+    db = CachedSqliteMemoryDb(db_file=str(tmp_path / "memory.db"), cache_users=1, batch_wait=0.05)
+
+    def write(user: str):
+        for n in range(20):
+            db.upsert_memory(MemoryRow(id=f"{user}-{n}", user_id=user, memory={"memory": f"fact {n}"}))
+
+    threads = [threading.Thread(target=write, args=(f"user-{i}",)) for i in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Only one user fits in the cache, so most of these go to SQLite
+    for i in range(5):
+        rows = db.read_memories(user_id=f"user-{i}", limit=3)
+        assert len(rows) == 3
+    assert len(db.read_memories()) == 100
+    assert db.stats()["avg_batch_size"] > 1
+    db.clear()
+    assert db.read_memories(user_id="user-0") == []
+    db.close()
+
+
+def test_file_is_opened_on_first_use(tmp_path):
+    path = tmp_path / "store" / "memory.db"
+    db = CachedSqliteMemoryDb(db_file=str(path))
+    assert not path.parent.exists()
+    assert db.read_memories(user_id="33600") == []
+    assert path.exists() and db.table_exists()
+    db.close()
@@ -0,0 +1,84 @@
+"""
+Tests for the cached Ollama model inventory
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from utils.model_inventory import ModelInventory
+
+
+class CountingClient:
+    def __init__(self, names, delay=0.0):
+        self.names = names
+        self.delay = delay
+        self.calls = 0
+
+    async def list(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return {"models": [{"model": name, "size": 1} for name in self.names]}
+
+
+def test_lookup_is_indexed_and_cached_within_ttl():
+    client = CountingClient(["mistral:latest", "qwen3:8b"])
+    inventory = ModelInventory(ttl=60, client=client)
+
+    async def scenario():
+        first = await inventory.get("qwen3:8b")
+        alias = await inventory.get("mistral")
+        missing = await inventory.get("phi3:mini")
+        return first, alias, missing
+
+    first, alias, missing = asyncio.run(scenario())
+
+    assert first["name"] == "qwen3:8b"
+    assert alias["name"] == "mistral:latest"
+    assert missing is None
+    assert client.calls == 1
+
+
+def test_concurrent_refreshes_share_one_request():
+    client = CountingClient(["qwen3:8b"], delay=0.05)
+    inventory = ModelInventory(ttl=0, client=client)
+
+    async def scenario():
+        await asyncio.gather(*(inventory.refresh() for _ in range(10)))
+
+    asyncio.run(scenario())
+
+    assert client.calls == 1
+
+
+def test_serves_stale_models_when_refresh_fails(fake_ollama):
+    inventory = ModelInventory(host=fake_ollama.url, ttl=0)
+    assert inventory.get_models_sync()
+
+    fake_ollama.fail_status = 503
+    models = inventory.get_models_sync()
+
+    assert [m["name"] for m in models] == fake_ollama.models
+    assert inventory.last_error is not None
+
+
+def test_failed_refresh_is_not_retried_within_the_error_ttl():
+    class DownClient:
+        calls = 0
+
+        def list(self):
+            DownClient.calls += 1
+            raise ConnectionError("Ollama is down")
+
+    inventory = ModelInventory(ttl=0, error_ttl=0.2, sync_client=DownClient())
+
+    assert inventory.get_sync("qwen3:8b") is None
+    assert inventory.get_sync("qwen3:8b") is None
+    with pytest.raises(ConnectionError):
+        inventory.get_models_sync()
+    assert DownClient.calls == 1
+
+    time.sleep(0.25)
+    assert inventory.get_sync("qwen3:8b") is None
+    assert DownClient.calls == 2
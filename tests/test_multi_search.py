@@ -0,0 +1,55 @@
+"""
+Tests for concurrent multi-query search and result deduplication
+"""
+
+import time
+
+from agents.search_tools import MultiSearchTools
+from tests.fake_search import FakeSearchBackend
+from utils.multi_search import MultiSearch, merge_results, normalize_url
+
+
+def test_merge_removes_url_and_content_duplicates_and_ranks_shared_hits_first():
+    assert normalize_url("https://www.Example.com/a/?utm_source=x&id=2#top") == normalize_url("http://example.com/a?id=2")
+
+    article = "the launcher completed a first full flight placing two satellites into orbit after delays"
+    hits = merge_results({
+        "launcher flight": [
+            {"title": "A", "url": "https://a.example/launch", "content": article, "score": 0.6},
+            {"title": "B", "url": "https://b.example/other", "content": "unrelated page about budgets", "score": 0.5},
+        ],
+        "rocket orbit": [
+            {"title": "A copy", "url": "https://mirror.example/launch", "content": article, "score": 0.9},
+            {"title": "A", "url": "https://www.a.example/launch/?utm_medium=rss", "content": article, "score": 0.4},
+        ],
+    })
+    assert [hit.title for hit in hits] == ["A", "B"]
+    assert hits[0].queries == ["launcher flight", "rocket orbit"] and hits[0].score == 0.9
+    assert hits[0].duplicates == ["https://mirror.example/launch"]
+
+
+def test_queries_run_concurrently_and_failures_stay_isolated():
+    backend = FakeSearchBackend(latency=0.3)
+
+    def search(query, max_results):
+        if query == "broken":
+            raise RuntimeError("quota exceeded")
+        return backend.search(query, max_results)
+
+    searcher = MultiSearch(search, max_concurrency=4)
+    started = time.perf_counter()
+    merged = searcher.search(["European launcher first flight", "european  LAUNCHER first flight",
+                              "rocket orbit satellites", "launcher Europe analysis", "broken"])
+    assert time.perf_counter() - started < 0.55
+    assert backend.peak_concurrency == 3 and len(backend.calls) == 3  # the case-only variant is sent once
+    assert merged["errors"] == {"broken": "quota exceeded"}
+
+    urls = [result["url"] for result in merged["results"]]
+    assert len(urls) == len(set(urls))
+    assert sum("launcher-first-flight" in url or "europe-rocket-orbit" in url for url in urls) == 1
+    stats = searcher.stats()
+    assert stats["duplicate_queries_skipped"] == 1 and stats["duplicates_removed"] > 0 and stats["errors"] == 1
+
+    text = MultiSearchTools(searcher).web_search_many(["Python 3.13 release", "what's new Python 3.13"])
+    assert "### [Python 3.13 released](https://blog.example.dev/python-313)" in text
+    assert "(Trouvé par 2 requêtes)" in text
@@ -0,0 +1,109 @@
+"""
+Tests for the Ollama backend pool
+"""
+
+import asyncio
+
+import pytest
+
+from tests.fake_ollama import FakeOllamaServer
+from utils.ollama_pool import OllamaBackendPool, affinity_key, parse_model_hosts
+
+MESSAGES = [{"role": "user", "content": "hello"}]
+
+
+@pytest.fixture
+def two_backends():
+    with FakeOllamaServer(tokens=4) as first, FakeOllamaServer(tokens=4) as second:
+        yield first, second
+
+
+def test_fails_over_and_ejects_unhealthy_host(two_backends):
+    first, second = two_backends
+    first.fail_status = 503
+    pool = OllamaBackendPool([first.url, second.url], strategy="least_outstanding", eject_after=2)
+    client = pool.client()
+
+    for _ in range(4):
+        assert client.chat(model="qwen3:8b", messages=MESSAGES)["done"]
+
+    stats = {b["host"]: b for b in pool.stats()["backends"]}
+    assert stats[first.url]["healthy"] is False
+    assert first.requests["/api/chat"] == 2
+    assert second.requests["/api/chat"] == 4
+    assert pool.retries == 2
+
+
+def test_residency_keeps_model_on_the_same_host(two_backends):
+    first, second = two_backends
+    pool = OllamaBackendPool([first.url, second.url], strategy="residency")
+    client = pool.client()
+
+    for _ in range(3):
+        client.chat(model="qwen3:8b", messages=MESSAGES)
+    client.chat(model="phi3:mini", messages=MESSAGES)
+
+    assert sorted([first.requests["/api/chat"], second.requests["/api/chat"]]) == [1, 3]
+    assert first.chat_payloads[-1]["model"] != second.chat_payloads[-1]["model"]
+
+
+def test_session_affinity_pins_a_key_to_one_host(two_backends):
+    first, second = two_backends
+    pool = OllamaBackendPool([first.url, second.url], strategy="least_outstanding")
+    client = pool.client()
+
+    for session in ("alice", "bob", "alice", "bob", "alice"):
+        token = affinity_key.set(session)
+        try:
+            client.chat(model="qwen3:8b", messages=MESSAGES)
+        finally:
+            affinity_key.reset(token)
+
+    # Without a key least_outstanding alternates; each session stays on its host
+    assert sorted([first.requests["/api/chat"], second.requests["/api/chat"]]) == [2, 3]
+    assert pool.stats()["affinity_hits"] == 3
+
+
+def test_concurrent_calls_spread_by_outstanding_requests(two_backends):
+    first, second = two_backends
+    first.token_latency = second.token_latency = 0.02
+    pool = OllamaBackendPool([first.url, second.url], strategy="least_outstanding")
+    client = pool.async_client()
+
+    async def scenario():
+        await asyncio.gather(*(client.chat(model="qwen3:8b", messages=MESSAGES) for _ in range(6)))
+
+    asyncio.run(scenario())
+
+    assert first.requests["/api/chat"] == 3
+    assert second.requests["/api/chat"] == 3
+    assert all(b["outstanding"] == 0 for b in pool.stats()["backends"])
+
+
+def test_stream_retries_before_first_chunk(two_backends):
+    first, second = two_backends
+    first.fail_status = 503
+    pool = OllamaBackendPool([first.url, second.url], strategy="least_outstanding")
+
+    chunks = list(pool.client().chat(model="qwen3:8b", messages=MESSAGES, stream=True))
+
+    assert chunks[-1]["done"] is True
+    assert second.requests["/api/chat"] == 1
+
+
+def test_list_merges_models_across_hosts(two_backends):
+    first, second = two_backends
+    second.models = ["only-here:latest"]
+    pool = OllamaBackendPool([first.url, second.url])
+
+    models = {m["model"]: m["hosts"] for m in pool.client().list()["models"]}
+
+    assert models["only-here:latest"] == [second.url]
+    assert models["qwen3:8b"] == [first.url]
+
+
+def test_parse_model_hosts():
+    assert parse_model_hosts("qwen3:8b=http://a|http://b; phi3:mini=http://c") == {
+        "qwen3:8b": ["http://a", "http://b"],
+        "phi3:mini": ["http://c"],
+    }
@@ -0,0 +1,57 @@
+"""
+Tests for the staged async pipeline
+"""
+
+import asyncio
+import time
+
+from utils.pipeline import Stage, StagePipeline
+
+
+def test_stages_overlap_and_fan_out():
+    async def slow_double(x):
+        await asyncio.sleep(0.05)
+        return [x, x]
+
+    async def slow_square(x):
+        await asyncio.sleep(0.05)
+        return x * x
+
+    pipeline = StagePipeline([
+        Stage("split", slow_double, workers=4, fan_out=True),
+        Stage("square", slow_square, workers=8),
+    ])
+
+    started = time.perf_counter()
+    stats = asyncio.run(pipeline.run(range(8)))
+    elapsed = time.perf_counter() - started
+
+    assert stats.completed == 16
+    assert [s.items_in for s in stats.stages] == [8, 16]
+    # Sequential stages would need 8 * 0.05 + 16 * 0.05 = 1.2s
+    assert elapsed < 0.6
+
+
+def test_failures_are_isolated_and_batches_respect_size():
+    seen_batches = []
+
+    async def check(x):
+        if x == 3:
+            raise ValueError("bad item")
+        return x
+
+    async def collect(batch):
+        seen_batches.append(list(batch))
+        return batch
+
+    pipeline = StagePipeline([
+        Stage("check", check),
+        Stage("collect", collect, batch_size=4, fan_out=True),
+    ])
+    stats = asyncio.run(pipeline.run(range(10)))
+
+    assert stats.stages[0].errors == 1
+    assert stats.errors[0]["stage"] == "check"
+    assert stats.completed == 9
+    assert all(len(batch) <= 4 for batch in seen_batches)
+    assert sorted(x for batch in seen_batches for x in batch) == [0, 1, 2, 4, 5, 6, 7, 8, 9]
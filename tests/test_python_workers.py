@@ -0,0 +1,47 @@
+"""
+Tests for the warm Python worker pool behind CodeAgent
+"""
+
+import pytest
+
+from utils.python_workers import PythonWorkerPool
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = PythonWorkerPool(size=1, workdir=str(tmp_path), preload=["math"], timeout=3,
+                            cpu_seconds=1, memory_mb=64, max_output_chars=200)
+    pool.start()
+    yield pool
+    pool.close()
+
+
+def test_streams_output_returns_variable_and_isolates_runs(pool, tmp_path):
+    chunks = []
+    result = pool.run("import math\nprint('hello')\nx = math.factorial(5)", variable_to_return="x",
+                      on_output=chunks.append)
+    assert result.ok
+    assert chunks == ["hello\n"] and result.output == "hello\n"
+    assert result.value == "120"
+
+    # Same worker, fresh namespace
+    assert pool.run("y = 1", variable_to_return="x").value == "Variable x not found"
+    assert "ZeroDivisionError" in pool.run("1 / 0").error
+
+    assert pool.run("print(open('data.txt', 'w').write('ok'))", file_name="script.py").ok
+    assert (tmp_path / "script.py").exists() and (tmp_path / "data.txt").read_text() == "ok"
+
+
+def test_limits_are_enforced_and_workers_replaced(pool):
+    spin = pool.run("while True:\n    pass")
+    assert "CPU time limit" in spin.error or spin.timed_out
+
+    hog = pool.run("data = bytearray(256 * 1024 * 1024)")
+    assert "Memory limit" in hog.error
+
+    chatty = pool.run("for i in range(1000):\n    print(i)")
+    assert chatty.ok and chatty.truncated and len(chatty.output) == 200
+
+    assert pool.run("z = 2 + 2", variable_to_return="z").value == "4"
+    stats = pool.stats()
+    assert stats["runs"] == 4 and stats["errors"] == 2 and stats["workers_killed"] == 2
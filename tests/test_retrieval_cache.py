@@ -0,0 +1,73 @@
+"""
+Tests for the knowledge retrieval cache
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from agno.document import Document
+from agno.embedder.base import Embedder
+from agno.vectordb.search import SearchType
+
+from agents.cached_vector_db import CachedVectorDb
+from agents.local_vector_db import LocalVectorDb
+from utils.retrieval_cache import RetrievalCache, normalize_query
+from utils.vector_index import tokenize
+
+
+@dataclass
+class CountingEmbedder(Embedder):
+    dimensions: Optional[int] = 32
+    calls: int = field(default=0)
+
+    def get_embedding(self, text: str) -> List[float]:
+        self.calls += 1
+        vector = [0.0] * self.dimensions
+        for word in tokenize(text):
+            vector[sum(map(ord, word)) % self.dimensions] += 1.0
+        return vector
+
+    def get_embedding_and_usage(self, text: str) -> Tuple[List[float], Optional[Dict]]:
+        return self.get_embedding(text), None
+
+
+def test_normalize_query_and_lru_bounds():
+    assert normalize_query("  What are your  Opening hours?? ") == "what are your opening hours"
+    assert normalize_query("¿Horarios?") == "horarios"
+
+    cache = RetrievalCache(max_items=2)
+    for query in ("a", "b", "c"):
+        cache.put(query, 5, None, [query], cache.version)
+    assert cache.get("a", 5) is None
+    assert cache.get("C!", 5) == ["c"]
+    assert cache.get("c", 3) is None  # limit is part of the key
+    # Results computed before an invalidation are never stored
+    stale = cache.version
+    cache.invalidate()
+    cache.put("b", 5, None, ["b"], stale)
+    assert cache.get("b", 5) is None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_repeated_questions_skip_embedding_until_ingestion(tmp_path):
+    embedder = CountingEmbedder()
+    store = LocalVectorDb(table_name="faq", embedder=embedder, path=str(tmp_path), search_type=SearchType.hybrid)
+    db = CachedVectorDb(store, cache=RetrievalCache(max_items=16))
+    db.create()
+    db.insert([Document(id="hours", name="hours", content="We are open from nine to six on weekdays")])
+
+    calls = embedder.calls
+    first = db.search("When are you open?", limit=3)
+    assert embedder.calls == calls + 1
+    assert db.search("when are you OPEN", limit=3)[0].content == first[0].content
+    assert embedder.calls == calls + 1
+
+    db.insert([Document(id="weekend", name="weekend", content="On weekends we are open from ten to four")])
+    assert len(db.search("when are you open", limit=3)) == 2
+    db.delete_by_ids(["weekend"])
+    assert len(db.search("when are you open", limit=3)) == 1
+
+    stats = db.stats()
+    assert stats["store"] == "LocalVectorDb"
+    assert (stats["hits"], stats["misses"], stats["invalidations"]) == (1, 3, 3)
+    assert db.search_type == SearchType.hybrid
@@ -0,0 +1,66 @@
+"""
+Tests for multi-turn chat sessions and prompt-cache reuse
+"""
+
+import asyncio
+import copy
+
+from agents import finance_agent, general_agent
+from agents.sessions import SessionManager
+from tests.fake_ollama import FakeOllamaServer
+
+
+def on_host(agent, url):
+    """Copy of ``agent`` whose model talks to ``url`` directly"""
+    model = copy.deepcopy(agent.model)
+    model.host, model.client, model.async_client = url, None, None
+    return agent.deep_copy(update={"model": model})
+
+
+def chat(manager, agent_id, agent, session_id, messages):
+    async def scenario():
+        results = []
+        for message in messages:
+            session = manager.get(agent_id, agent, session_id)
+            async with session:
+                response = await session.agent.arun(message)
+            results.append(session.record(response))
+        return results
+
+    return asyncio.run(scenario())
+
+
+def test_session_prompts_are_prefix_stable_and_reuse_the_cache():
+    with FakeOllamaServer(tokens=4, prompt_cache=True) as fake:
+        manager = SessionManager(keep_alive="10m")
+        base = on_host(finance_agent, fake.url)
+
+        turns = chat(manager, "finance", base, "s1",
+                     ["Price of AAPL?", "And MSFT?", "Compare both please"])
+
+        payloads = fake.chat_payloads
+        assert [p["keep_alive"] for p in payloads] == ["10m"] * 3
+        for before, after in zip(payloads, payloads[1:]):
+            assert after["messages"][:len(before["messages"])] == before["messages"]
+        first_tokens = turns[0][0]
+        # Later turns only evaluate what was appended since the previous prompt
+        assert all(tokens < first_tokens / 2 for tokens, _ in turns[1:])
+        assert manager.stats()["turns"] == 3
+
+
+def test_sessions_are_isolated_and_bounded():
+    with FakeOllamaServer(tokens=4) as fake:
+        manager = SessionManager(max_sessions=2)
+        base = on_host(general_agent, fake.url)
+
+        chat(manager, "general", base, "a", ["Bonjour"])
+        chat(manager, "general", base, "b", ["Hello"])
+        chat(manager, "general", base, "a", ["Encore"])
+        contents = [m["content"] for m in fake.chat_payloads[-1]["messages"] if m["role"] == "user"]
+        assert contents == ["Bonjour", "Encore"]
+
+        chat(manager, "general", base, "c", ["Hi"])
+        stats = manager.stats()
+        assert stats["open_sessions"] == 2 and stats["expired"] == 1
+        assert not manager.end("general", "b")  # least recently used, already dropped
+        assert manager.end("general", "a")
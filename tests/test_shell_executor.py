@@ -0,0 +1,85 @@
+"""
+Tests for the async shell executor behind SystemAgent
+"""
+
+import asyncio
+import sys
+import time
+
+import pytest
+
+from agents.shell_tools import AsyncShellTools
+from utils.shell_executor import AsyncShellExecutor
+
+
+@pytest.fixture
+def executor():
+    executor = AsyncShellExecutor(timeout=5, max_output_chars=100, max_concurrency=3)
+    yield executor
+    executor.close()
+
+
+def python(code):
+    return [sys.executable, "-c", code]
+
+
+def test_streams_output_before_the_command_ends(executor):
+    seen = []
+
+    def on_output(chunk):
+        seen.append((time.monotonic(), chunk))
+
+    started = time.monotonic()
+    result = executor.run(python("import time\nprint('a', flush=True)\ntime.sleep(0.5)\nprint('b')"),
+                          on_output=on_output)
+    assert result.ok and result.output == "a\nb\n"
+    assert "".join(chunk for at, chunk in seen if at - started < 0.4) == "a\n"
+
+    failed = executor.run(python("import sys; print('boom'); sys.exit(3)"))
+    assert failed.returncode == 3 and failed.as_text() == "Error: exit code 3\nboom\n"
+    assert "No such file" in executor.run(["definitely-not-a-command"]).as_text()
+
+
+def test_timeout_kills_the_whole_process_group(executor, tmp_path):
+    marker = tmp_path / "child-survived"
+    child = f"import time; time.sleep(1); open({str(marker)!r}, 'w')"
+    code = f"import subprocess, sys, time\nsubprocess.Popen([sys.executable, '-c', {child!r}])\ntime.sleep(30)"
+    started = time.monotonic()
+    result = executor.run(python(code), timeout=0.5)
+    assert result.timed_out and "timed out" in result.as_text()
+    assert time.monotonic() - started < 3
+    time.sleep(1.2)
+    assert not marker.exists()
+
+
+def test_output_is_capped_head_and_tail(executor):
+    streamed = []
+    result = executor.run(python("for i in range(1000): print(i)"), on_output=streamed.append)
+    assert result.ok and result.omitted_chars > 0
+    assert result.output.startswith("0\n1\n") and result.output.endswith("998\n999\n")
+    assert "characters omitted" in result.output
+    assert sum(len(chunk) for chunk in streamed) == 100
+
+
+def test_commands_run_concurrently_up_to_the_limit(executor):
+    sleep = ["sleep", "0.5"]
+    started = time.monotonic()
+    futures = [executor.submit(sleep) for _ in range(6)]
+    assert all(future.result().ok for future in futures)
+    elapsed = time.monotonic() - started
+    assert 0.95 < elapsed < 1.45
+    assert executor.stats()["max_running"] == 3
+
+    async def from_a_coroutine():
+        return await asyncio.wrap_future(executor.submit(python("print('async')")))
+
+    assert asyncio.run(from_a_coroutine()).output == "async\n"
+
+
+def test_toolkit_runs_independent_commands_together(executor):
+    streamed = []
+    tools = AsyncShellTools(executor, output_handler=lambda command, chunk: streamed.append(command))
+    report = tools.run_shell_commands([python("print('one')"), python("print('two')")])
+    assert "one" in report and "two" in report and report.count("$ ") == 2
+    assert len(set(streamed)) == 2
+    assert tools.run_shell_command(python("for i in range(5): print(i)"), tail=2) == "3\n4"
@@ -0,0 +1,87 @@
+"""
+Tests for tool-loop budgets and repeated tool calls
+"""
+
+import asyncio
+import time
+
+from agno.agent import Agent
+
+from agents.budgeted_model import BudgetedOllama
+from tests.fake_ollama import FakeOllamaServer
+from utils.context_budget import ContextBudget
+from utils.tool_budget import ToolBudget, tool_budget_stats_for
+
+
+def looping_model(arguments):
+    """Calls ``lookup`` until told the budget is spent, like a small model stuck in its tool loop"""
+    def reply(model, messages):
+        if "Budget d'outils atteint" in str(messages[-1].get("content")):
+            return "Voici la réponse avec les données obtenues."
+        return {"tool_calls": [{"function": {"name": "lookup", "arguments": arguments(messages)}}]}
+    return reply
+
+
+def budgeted_agent(fake, name, budget, tool, context_budget=None):
+    model = BudgetedOllama(id="qwen3:8b", host=fake.url, context_name=name, tool_budget=budget,
+                           context_budget=context_budget)
+    return Agent(model=model, tools=[tool], telemetry=False)
+
+
+def test_repeated_calls_are_served_from_the_run_and_iterations_are_capped():
+    calls = []
+
+    def lookup(symbol: str) -> str:
+        """Look up a symbol"""
+        calls.append(symbol)
+        return f"{symbol}: 189.25"
+
+    with FakeOllamaServer(responder=looping_model(lambda messages: {"symbol": "AAPL"})) as fake:
+        agent = budgeted_agent(fake, "test-repeats", ToolBudget(max_iterations=3, max_seconds=60), lookup)
+        response = agent.run("Prix de AAPL ?")
+
+    assert response.content == "Voici la réponse avec les données obtenues."
+    assert calls == ["AAPL"]
+    stats = tool_budget_stats_for("test-repeats").as_dict()
+    assert stats["repeated_calls_served"] == 3 and stats["repeats_by_tool"] == {"lookup": 3}
+    assert (stats["iteration_limit_hits"], stats["time_limit_hits"], stats["max_iterations"]) == (1, 0, 4)
+
+
+def test_wall_clock_budget_stops_a_slow_loop():
+    def lookup(page: int) -> str:
+        """Read one page"""
+        time.sleep(0.2)
+        return f"page {page}"
+
+    def next_page(messages):
+        return {"page": sum(1 for m in messages if m.get("role") == "tool") + 1}
+
+    with FakeOllamaServer(responder=looping_model(next_page)) as fake:
+        agent = budgeted_agent(fake, "test-time", ToolBudget(max_iterations=50, max_seconds=0.5), lookup)
+        started = time.perf_counter()
+        response = asyncio.run(agent.arun("Lis tout le document"))
+
+    assert response.content == "Voici la réponse avec les données obtenues."
+    assert time.perf_counter() - started < 2
+    stats = tool_budget_stats_for("test-time").as_dict()
+    assert (stats["time_limit_hits"], stats["iteration_limit_hits"], stats["repeated_calls_served"]) == (1, 0, 0)
+
+
+def test_budget_note_keeps_the_question_and_tool_results_within_the_prompt_budget():
+    def lookup(page: int) -> str:
+        """Read one page"""
+        return f"page {page}: " + "chiffre d'affaires en hausse " * 20
+
+    def next_page(messages):
+        return {"page": sum(1 for m in messages if m.get("role") == "tool") + 1}
+
+    with FakeOllamaServer(responder=looping_model(next_page)) as fake:
+        agent = budgeted_agent(fake, "test-both-budgets", ToolBudget(max_iterations=2, max_seconds=60), lookup,
+                               context_budget=ContextBudget(max_tokens=400))
+        response = agent.run("Résume le rapport annuel")
+        last = fake.chat_payloads[-1]["messages"]
+
+    assert response.content == "Voici la réponse avec les données obtenues."
+    assert "Budget d'outils atteint" in last[-1]["content"]
+    assert any(m["role"] == "user" and m["content"] == "Résume le rapport annuel" for m in last)
+    assert [m["content"].split(":")[0] for m in last if m["role"] == "tool"] == ["page 1", "page 2", "page 3"]
@@ -0,0 +1,79 @@
+"""
+Tests for delivering WhatsApp answers back to their senders
+"""
+
+import asyncio
+import json
+
+import httpx
+from fastapi import FastAPI
+
+from agents.whatsapp import WhatsAppAgent
+from api.routes import webhooks
+from tests.test_keyed_queue import webhook
+from utils.whatsapp_sender import WhatsAppCloudSender
+
+
+def test_webhook_post_delivers_a_reply_for_each_message(tmp_path, monkeypatch):
+    agent = WhatsAppAgent(memory_path=str(tmp_path / "memory.db"),
+                          knowledge_manifest_path=str(tmp_path / "manifest.json"))
+    sent, broadcast = [], []
+
+    async def handle_message(message, user_id):
+        return f"echo {message}"
+
+    def graph_api(request: httpx.Request) -> httpx.Response:
+        sent.append((request.url.path, request.headers["authorization"], json.loads(request.content)))
+        return httpx.Response(200, json={"messages": [{"id": f"wamid.out{len(sent)}"}]})
+
+    async def record_broadcast(message):
+        broadcast.append(message)
+
+    sender = WhatsAppCloudSender("token", "12345", client=httpx.AsyncClient(transport=httpx.MockTransport(graph_api)))
+    agent.handle_message = handle_message
+    agent.reply_handler = webhooks.deliver_whatsapp_reply
+    monkeypatch.setattr(webhooks, "whatsapp_agent", agent)
+    monkeypatch.setattr(webhooks, "whatsapp_sender", sender)
+    monkeypatch.setattr(webhooks.manager, "broadcast", record_broadcast)
+
+    app = FastAPI()
+    app.include_router(webhooks.router, prefix="/webhooks")
+    payload = webhook(("33600", "wamid.1", "hi"), ("33611", "wamid.2", "hello"), ("33600", "wamid.3", "again"))
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            response = await http.post("/webhooks/whatsapp", json=payload)
+        await agent.webhook_queue.join()
+        await agent.webhook_queue.stop()
+        await sender.aclose()
+        return response
+
+    response = asyncio.run(scenario())
+
+    assert response.json() == {"status": "accepted", "received": 3, "queued": 3, "duplicates": 0}
+    assert all(path == "/v21.0/12345/messages" and auth == "Bearer token" for path, auth, _ in sent)
+    delivered = sorted((body["to"], body["text"]["body"], body["context"]["message_id"]) for _, _, body in sent)
+    assert delivered == [("33600", "echo again", "wamid.3"), ("33600", "echo hi", "wamid.1"),
+                         ("33611", "echo hello", "wamid.2")]
+    assert [m["body"] for m in broadcast if m["to"] == "33600"] == ["echo hi", "echo again"]
+    assert all(m["type"] == "whatsapp_reply" for m in broadcast)
+    assert sender.stats()["sent"] == 3
+
+
+def test_rejected_sends_raise_and_long_bodies_are_cut():
+    sender = WhatsAppCloudSender("token", "12345", max_chars=10, client=httpx.AsyncClient(
+        transport=httpx.MockTransport(lambda request: httpx.Response(401, json={"error": "bad token"}))
+    ))
+
+    async def scenario():
+        try:
+            await sender.send({"to": "33600", "body": "a long answer"})
+        except httpx.HTTPStatusError as e:
+            return e.response.status_code
+        finally:
+            await sender.aclose()
+
+    assert asyncio.run(scenario()) == 401
+    assert sender.payload({"to": "33600", "body": "a long answer"})["text"]["body"] == "a long an…"
+    assert sender.stats()["failed"] == 1
@@ -4,9 +4,17 @@ Shared utilities for the Multi-Agent System
 
 from .logging_config import setup_logging
 from .model_utils import check_ollama_connection, list_available_models
+from .model_inventory import ModelInventory, model_inventory
+from .embedding_cache import EmbeddingCache, embedding_cache
+from .retrieval_cache import RetrievalCache
 
 __all__ = [
     "setup_logging",
     "check_ollama_connection", 
-    "list_available_models"
+    "list_available_models",
+    "ModelInventory",
+    "model_inventory",
+    "EmbeddingCache",
+    "embedding_cache",
+    "RetrievalCache"
 ] 
\ No newline at end of file
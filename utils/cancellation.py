@@ -0,0 +1,137 @@
+"""
+Cancellation of in-flight agent runs: disconnects, deadlines and what they saved
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, Optional
+
+class RunCancelled(Exception):
+    """Raised inside a run whose client went away or whose deadline passed"""
+
+    def __init__(self, reason: str):
+        super().__init__(f"Run cancelled ({reason})")
+        self.reason = reason
+
+@dataclass
+class CancelToken:
+    """
+    Cancellation state of one run, shared by the request handler and the run's thread
+
+    The handler calls ``cancel``; the run calls ``check`` between model
+    tokens and before tool calls. Past ``deadline`` (``time.monotonic``) the
+    token cancels itself. ``tokens`` counts the tokens generated for the run.
+    """
+    deadline: Optional[float] = None
+    started_at: float = field(default_factory=time.monotonic)
+    tokens: int = 0
+    reason: Optional[str] = None
+    _event: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @classmethod
+    def after(cls, seconds: Optional[float]) -> "CancelToken":
+        return cls(deadline=time.monotonic() + seconds if seconds else None)
+
+    def cancel(self, reason: str):
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        if not self._event.is_set() and self.deadline is not None and time.monotonic() >= self.deadline:
+            self.cancel("deadline")
+        return self._event.is_set()
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    def remaining(self) -> Optional[float]:
+        return None if self.deadline is None else max(0.0, self.deadline - time.monotonic())
+
+    def check(self):
+        if self.cancelled:
+            raise RunCancelled(self.reason or "cancelled")
+
+# Token of the run executing in the current context (copied into the run's worker thread)
+current_cancel: ContextVar[Optional[CancelToken]] = ContextVar("cancel_token", default=None)
+
+@contextmanager
+def cancel_scope(token: CancelToken) -> Iterator[CancelToken]:
+    reset = current_cancel.set(token)
+    try:
+        yield token
+    finally:
+        current_cancel.reset(reset)
+
+def check_cancelled():
+    """Raise ``RunCancelled`` if the current run was cancelled"""
+    token = current_cancel.get()
+    if token is not None:
+        token.check()
+
+def count_token():
+    token = current_cancel.get()
+    if token is not None:
+        token.tokens += 1
+
+def time_left(default: float) -> float:
+    """``default`` seconds, capped to what is left before the current run's deadline"""
+    token = current_cancel.get()
+    remaining = token.remaining() if token is not None else None
+    return default if remaining is None else max(0.1, min(default, remaining))
+
+@dataclass
+class CancellationStats:
+    """
+    Runs of one agent or team, and what cancelling some of them saved
+
+    Savings are estimated against the runs that completed: a run cancelled
+    after ``elapsed`` seconds and ``tokens`` tokens would have taken about the
+    average completed run, so the difference is what was not generated.
+    """
+    completed: int = 0
+    completed_seconds: float = 0.0
+    completed_tokens: int = 0
+    cancelled: Dict[str, int] = field(default_factory=dict)
+    tokens_discarded: int = 0
+    tokens_saved: float = 0.0
+    seconds_saved: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record_completed(self, token: CancelToken):
+        with self._lock:
+            self.completed += 1
+            self.completed_seconds += token.elapsed
+            self.completed_tokens += token.tokens
+
+    def record_cancelled(self, token: CancelToken):
+        with self._lock:
+            reason = token.reason or "cancelled"
+            self.cancelled[reason] = self.cancelled.get(reason, 0) + 1
+            self.tokens_discarded += token.tokens
+            if self.completed:
+                self.tokens_saved += max(0.0, self.completed_tokens / self.completed - token.tokens)
+                self.seconds_saved += max(0.0, self.completed_seconds / self.completed - token.elapsed)
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "completed": self.completed,
+                "cancelled": dict(self.cancelled),
+                "avg_completed_seconds": round(self.completed_seconds / self.completed, 3) if self.completed else 0.0,
+                "avg_completed_tokens": round(self.completed_tokens / self.completed, 1) if self.completed else 0.0,
+                "tokens_discarded": self.tokens_discarded,
+                "estimated_tokens_saved": round(self.tokens_saved),
+                "estimated_seconds_saved": round(self.seconds_saved, 2)
+            }
+
+# Cancellation statistics per agent or team, filled by the API routes
+cancellation_stats: Dict[str, CancellationStats] = {}
+
+def cancellation_stats_for(name: str) -> CancellationStats:
+    return cancellation_stats.setdefault(name, CancellationStats())
@@ -0,0 +1,174 @@
+"""
+Model cascade policy: when a small model's answer is good enough to keep
+"""
+
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+# Phrases of a model that does not know (French and English)
+HEDGES = [
+    r"je ne (sais|suis) pas", r"je n'ai pas (acc[èe]s|d'information|la possibilit)", r"je ne peux pas",
+    r"impossible (de|pour moi)", r"pas (s[ûu]r|certain)", r"en tant qu'(ia|intelligence artificielle)",
+    r"i (don't|do not) know", r"i'm not sure", r"i am not sure", r"i (can't|cannot)", r"as an ai",
+    r"i don't have access", r"my knowledge cutoff"
+]
+
+# Questions that need fresh data or a tool: not worth trying without tools
+TOOL_HINTS = [
+    r"\baujourd'hui\b", r"\bactuel", r"\ben ce moment\b", r"\bderni[èe]res?\b", r"\bcette semaine\b",
+    r"\bcours\b", r"\bprix\b", r"\bm[ée]t[ée]o\b", r"\blatest\b", r"\btoday\b", r"\bcurrent\b",
+    r"\bex[ée]cute\b", r"\bcalcule\b", r"\bcompute\b", r"\bhttps?://"
+]
+
+_FRENCH_WORDS = {"le", "la", "les", "des", "est", "une", "un", "et", "que", "qui", "pour", "dans", "pas", "du",
+                 "sur", "avec", "ce", "il", "elle", "vous", "je", "tu", "quel", "quelle", "comment", "pourquoi"}
+_ENGLISH_WORDS = {"the", "is", "are", "and", "of", "to", "in", "that", "it", "for", "with", "this", "you",
+                  "what", "how", "why", "which", "can", "be", "on"}
+
+@dataclass
+class Verdict:
+    """Whether to keep the small model's answer, with the reasons it lost confidence"""
+    accept: bool
+    confidence: float
+    reasons: List[str] = field(default_factory=list)
+
+def _language(text: str) -> Optional[str]:
+    words = re.findall(r"[a-zà-ÿ']+", text.lower())
+    french = sum(w in _FRENCH_WORDS for w in words)
+    english = sum(w in _ENGLISH_WORDS for w in words)
+    if french + english < 3:
+        return None
+    return "fr" if french > english else "en"
+
+def _repetition(text: str) -> float:
+    """Share of repeated sentences/lines, a sign of a small model looping"""
+    parts = [p.strip().lower() for p in re.split(r"[\n.!?]+", text) if len(p.strip()) > 15]
+    return 1 - len(set(parts)) / len(parts) if len(parts) >= 4 else 0.0
+
+class CascadePolicy:
+    """
+    Scores a small model's answer with cheap heuristics
+
+    The answer starts at confidence 1 and loses points for being empty or
+    much too short for the question, hedging, being cut off by the token
+    limit, looping, answering in another language, or calling a tool (small
+    models are unreliable at it). It is kept at ``min_confidence`` or more;
+    otherwise the large model answers. ``should_skip`` sends questions that
+    obviously need a tool or long context straight to the large model.
+    """
+
+    def __init__(self, min_confidence: float = 0.6, max_question_chars: int = 2000):
+        self.min_confidence = min_confidence
+        self.max_question_chars = max_question_chars
+        self.hedges = [re.compile(p, re.IGNORECASE) for p in HEDGES]
+        self.tool_hints = [re.compile(p, re.IGNORECASE) for p in TOOL_HINTS]
+
+    def should_skip(self, question: str, has_tools: bool = False) -> Optional[str]:
+        """Reason to go straight to the large model, or None to try the small one"""
+        if not question.strip():
+            return "no question"
+        if len(question) > self.max_question_chars:
+            return "long question"
+        if has_tools and any(p.search(question) for p in self.tool_hints):
+            return "needs a tool"
+        return None
+
+    def judge(self, question: str, answer: str, done_reason: Optional[str] = None,
+              tool_calls: bool = False) -> Verdict:
+        """Confidence in ``answer`` to ``question``
+
+        Args:
+            question: Last user message
+            answer: Small model's reply
+            done_reason: Ollama's ``done_reason`` ("length" when cut off)
+            tool_calls: Whether the small model asked for a tool
+
+        Returns:
+            Verdict; ``accept`` when confidence reaches ``min_confidence``
+        """
+        confidence, reasons = 1.0, []
+
+        def penalize(amount: float, reason: str):
+            nonlocal confidence
+            confidence -= amount
+            reasons.append(reason)
+
+        text = answer.strip()
+        if tool_calls:
+            penalize(1.0, "tool call")
+        if not text and not tool_calls:
+            penalize(1.0, "empty answer")
+        elif text and len(text) < min(40, len(question) // 2):
+            penalize(0.5, "too short")
+        hedges = sum(1 for p in self.hedges if p.search(text))
+        if hedges:
+            penalize(min(0.5 * hedges, 1.0), "hedging")
+        if done_reason == "length":
+            penalize(0.4, "cut off")
+        if _repetition(text) > 0.3:
+            penalize(0.5, "repetitive")
+        asked, answered = _language(question), _language(text)
+        if asked and answered and asked != answered:
+            penalize(0.4, "wrong language")
+
+        confidence = round(max(confidence, 0.0), 3)
+        return Verdict(confidence >= self.min_confidence, confidence, reasons)
+
+@dataclass
+class CascadeStats:
+    """Small-model attempts, escalations and the latency they saved for one agent"""
+    requests: int = 0
+    skipped: int = 0
+    accepted: int = 0
+    escalated: int = 0
+    small_seconds: float = 0.0
+    large_seconds: float = 0.0
+    large_calls: int = 0
+    reasons: Dict[str, int] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @property
+    def avg_large_seconds(self) -> float:
+        return self.large_seconds / self.large_calls if self.large_calls else 0.0
+
+    def record_small(self, verdict: Verdict, seconds: float):
+        with self._lock:
+            self.requests += 1
+            self.small_seconds += seconds
+            if verdict.accept:
+                self.accepted += 1
+            else:
+                self.escalated += 1
+                for reason in verdict.reasons:
+                    self.reasons[reason] = self.reasons.get(reason, 0) + 1
+
+    def record_large(self, seconds: float, skipped: bool = False):
+        with self._lock:
+            if skipped:
+                self.requests += 1
+                self.skipped += 1
+            self.large_calls += 1
+            self.large_seconds += seconds
+
+    def as_dict(self) -> Dict[str, Any]:
+        tried = self.accepted + self.escalated
+        return {
+            "requests": self.requests,
+            "skipped": self.skipped,
+            "answered_by_small": self.accepted,
+            "escalated": self.escalated,
+            "escalation_rate": round(self.escalated / tried, 3) if tried else 0.0,
+            "avg_small_seconds": round(self.small_seconds / tried, 3) if tried else 0.0,
+            "avg_large_seconds": round(self.avg_large_seconds, 3),
+            # Large-model time the kept answers would have cost, minus every small-model attempt
+            "seconds_saved": round(self.accepted * self.avg_large_seconds - self.small_seconds, 3),
+            "escalation_reasons": dict(self.reasons)
+        }
+
+# Cascade statistics per agent, filled by the cascade models
+cascade_stats: Dict[str, CascadeStats] = {}
+
+def cascade_stats_for(name: str) -> CascadeStats:
+    return cascade_stats.setdefault(name, CascadeStats())
@@ -0,0 +1,201 @@
+"""
+Fitting a conversation into a prompt token budget
+"""
+
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .tokens import CHARS_PER_TOKEN, estimate_tokens
+
+# Role/formatting tokens the chat template adds around every message
+MESSAGE_OVERHEAD_TOKENS = 4
+
+def message_tokens(content: Any) -> int:
+    """Approximate prompt tokens of one message with the given content"""
+    text = content if isinstance(content, str) else str(content or "")
+    return estimate_tokens(text) + MESSAGE_OVERHEAD_TOKENS
+
+def truncate_middle(text: str, max_tokens: int) -> str:
+    """Keep the head and tail of ``text`` within ``max_tokens``, noting what was cut"""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    # The marker line costs about eight tokens
+    limit = int(max(0, max_tokens - 8) * CHARS_PER_TOKEN)
+    head, tail = text[:limit * 2 // 3], text[-(limit // 3):] if limit >= 3 else ""
+    omitted = estimate_tokens(text) - estimate_tokens(head) - estimate_tokens(tail)
+    return f"{head.rstrip()}\n[… {omitted} tokens omitted …]\n{tail.lstrip()}"
+
+def _gist(text: str, max_chars: int = 160) -> str:
+    line = " ".join(text.split())
+    return line if len(line) <= max_chars else line[:max_chars - 1].rstrip() + "…"
+
+@dataclass
+class ContextPlan:
+    """What to send: indices kept, replaced contents and an optional summary of dropped turns"""
+    keep: List[int]
+    replacements: Dict[int, str]
+    summary: Optional[str]
+    summary_at: int
+    tokens_before: int
+    tokens_after: int
+    dropped: int = 0
+    truncated: int = 0
+
+    @property
+    def trimmed(self) -> bool:
+        return bool(self.dropped or self.truncated)
+
+@dataclass
+class ContextBudget:
+    """
+    Per-agent prompt budget
+
+    ``fit`` first shortens tool results above ``max_tool_tokens`` (keeping
+    their head and tail). If the prompt is still above ``max_tokens``, the
+    oldest whole turns (a user message and everything answering it) are
+    dropped and replaced by a one-line-per-message summary of at most
+    ``summary_tokens``. Leading system messages and the last
+    ``keep_last_turns`` turns are never dropped; as a last resort their tool
+    results are shortened further.
+
+    Turns are dropped in multiples of ``trim_step_turns``, so once a long chat
+    is trimmed the same prefix is sent for several turns in a row and Ollama
+    can keep reusing its cached context.
+    """
+    max_tokens: int = 4096
+    max_tool_tokens: int = 1000
+    keep_last_turns: int = 1
+    summary_tokens: int = 200
+    trim_step_turns: int = 1
+
+    def fit(self, messages: Sequence[Tuple[str, Any]]) -> ContextPlan:
+        """Plan how to send ``(role, content)`` messages within the budget
+
+        Args:
+            messages: Conversation in prompt order
+
+        Returns:
+            ContextPlan; apply it with ``keep``/``replacements``/``summary``
+        """
+        sizes = [message_tokens(content) for _, content in messages]
+        before = sum(sizes)
+        replacements: Dict[int, str] = {}
+
+        def shorten(index: int, limit: int) -> bool:
+            content = replacements.get(index, messages[index][1])
+            if not isinstance(content, str) or estimate_tokens(content) <= limit:
+                return False
+            replacements[index] = truncate_middle(content, limit)
+            sizes[index] = message_tokens(replacements[index])
+            return True
+
+        for i, (role, _) in enumerate(messages):
+            if role == "tool":
+                shorten(i, self.max_tool_tokens)
+
+        # Leading system messages, then turns starting at each user message
+        start = 0
+        while start < len(messages) and messages[start][0] == "system":
+            start += 1
+        turn_starts = [i for i in range(start, len(messages)) if messages[i][0] == "user"] or [start]
+        if turn_starts[0] != start:
+            turn_starts.insert(0, start)
+        protected_from = turn_starts[max(0, len(turn_starts) - self.keep_last_turns)]
+
+        dropped: set = set()
+        summary: Optional[str] = None
+        if sum(sizes) > self.max_tokens:
+            lines: List[str] = []
+            for t, turn_start in enumerate(turn_starts):
+                if turn_start >= protected_from:
+                    break
+                turn_end = turn_starts[t + 1]
+                for i in range(turn_start, turn_end):
+                    role, content = messages[i]
+                    if role in ("user", "assistant") and isinstance(content, str) and content.strip():
+                        lines.append(f"- {role}: {_gist(content)}")
+                dropped.update(range(turn_start, turn_end))
+                summary = self._summary(lines)
+                remaining = sum(s for i, s in enumerate(sizes) if i not in dropped)
+                fits = remaining + message_tokens(summary) <= self.max_tokens
+                if fits and (t + 1) % max(1, self.trim_step_turns) == 0:
+                    break
+
+        total = sum(s for i, s in enumerate(sizes) if i not in dropped)
+        total += message_tokens(summary) if summary else 0
+        if total > self.max_tokens:
+            # Still over: shrink the largest remaining tool results
+            tools = sorted((i for i, (role, _) in enumerate(messages) if role == "tool" and i not in dropped),
+                           key=lambda i: sizes[i], reverse=True)
+            for i in tools:
+                excess = total - self.max_tokens
+                if excess <= 0:
+                    break
+                old = sizes[i]
+                if shorten(i, max(32, old - excess - MESSAGE_OVERHEAD_TOKENS - 16)):
+                    total -= old - sizes[i]
+
+        keep = [i for i in range(len(messages)) if i not in dropped]
+        return ContextPlan(
+            keep=keep,
+            replacements={i: text for i, text in replacements.items() if i not in dropped},
+            summary=summary,
+            summary_at=start,
+            tokens_before=before,
+            tokens_after=total,
+            dropped=len(dropped),
+            truncated=sum(1 for i in replacements if i not in dropped)
+        )
+
+    def _summary(self, lines: List[str]) -> str:
+        # Most recent lines first when the summary itself is over budget
+        header = "Summary of earlier conversation:"
+        kept: List[str] = []
+        used = estimate_tokens(header)
+        for line in reversed(lines):
+            cost = estimate_tokens(line) + 1
+            if used + cost > self.summary_tokens:
+                break
+            kept.insert(0, line)
+            used += cost
+        return "\n".join([header] + kept)
+
+@dataclass
+class ContextStats:
+    """Prompt sizes seen by one agent"""
+    prompts: int = 0
+    trimmed: int = 0
+    tokens_before: int = 0
+    tokens_after: int = 0
+    max_prompt_tokens: int = 0
+    dropped_messages: int = 0
+    truncated_tool_results: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, plan: ContextPlan):
+        with self._lock:
+            self.prompts += 1
+            self.trimmed += int(plan.trimmed)
+            self.tokens_before += plan.tokens_before
+            self.tokens_after += plan.tokens_after
+            self.max_prompt_tokens = max(self.max_prompt_tokens, plan.tokens_after)
+            self.dropped_messages += plan.dropped
+            self.truncated_tool_results += plan.truncated
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "prompts": self.prompts,
+            "trimmed": self.trimmed,
+            "avg_prompt_tokens": round(self.tokens_after / self.prompts, 1) if self.prompts else 0.0,
+            "max_prompt_tokens": self.max_prompt_tokens,
+            "tokens_saved": self.tokens_before - self.tokens_after,
+            "dropped_messages": self.dropped_messages,
+            "truncated_tool_results": self.truncated_tool_results
+        }
+
+# Prompt statistics per agent, filled by the budgeted models
+context_stats: Dict[str, ContextStats] = {}
+
+def stats_for(name: str) -> ContextStats:
+    return context_stats.setdefault(name, ContextStats())
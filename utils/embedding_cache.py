@@ -0,0 +1,226 @@
+"""
+Content-addressed embedding cache and request micro-batching
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+def content_hash(text: str) -> str:
+    """Stable key for a piece of text"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+class EmbeddingCache:
+    """
+    Embeddings keyed by (model id, content hash), kept in SQLite as float32 blobs
+
+    A small in-memory LRU sits in front of the database so hot vectors
+    (repeated queries) never touch disk. Safe to share between threads.
+    """
+
+    def __init__(self, path: str = "data/embedding_cache.db", memory_items: int = 4096):
+        self.path = path
+        self.memory_items = memory_items
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+        self._memory: "OrderedDict[Tuple[str, str], List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if self.path != ":memory:":
+                Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "model TEXT NOT NULL, hash TEXT NOT NULL, dim INTEGER NOT NULL, "
+                "vector BLOB NOT NULL, created_at REAL NOT NULL, PRIMARY KEY (model, hash))"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _remember(self, key: Tuple[str, str], vector: List[float]):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """Cached vectors for ``texts`` in order, ``None`` where missing"""
+        hashes = [content_hash(text) for text in texts]
+        found: Dict[str, List[float]] = {}
+        with self._lock:
+            missing = []
+            for h in hashes:
+                vector = self._memory.get((model, h))
+                if vector is not None:
+                    self._memory.move_to_end((model, h))
+                    found[h] = vector
+                else:
+                    missing.append(h)
+
+            unique = list(dict.fromkeys(missing))
+            conn = self._connect()
+            # Stay below SQLite's bound-parameter limit
+            for i in range(0, len(unique), 500):
+                part = unique[i:i + 500]
+                rows = conn.execute(
+                    f"SELECT hash, vector FROM embeddings WHERE model = ? AND hash IN ({','.join('?' * len(part))})",
+                    [model, *part]
+                ).fetchall()
+                for h, blob in rows:
+                    floats = array("f")
+                    floats.frombytes(blob)
+                    found[h] = floats.tolist()
+                    self._remember((model, h), found[h])
+
+            result = [found.get(h) for h in hashes]
+            hit_count = sum(1 for v in result if v is not None)
+            self.hits += hit_count
+            self.misses += len(result) - hit_count
+        return result
+
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        return self.get_many(model, [text])[0]
+
+    def put_many(self, model: str, texts: Sequence[str], vectors: Sequence[List[float]]) -> List[List[float]]:
+        """
+        Store vectors; empty vectors (failed embeddings) are not stored
+
+        Returns the vectors as they will be served from the cache (float32
+        precision), so fresh and cached results compare equal.
+        """
+        rows = []
+        stored: List[List[float]] = []
+        now = time.time()
+        for text, vector in zip(texts, vectors):
+            if not vector:
+                stored.append([])
+                continue
+            blob = array("f", vector).tobytes()
+            as_float32 = array("f")
+            as_float32.frombytes(blob)
+            stored.append(as_float32.tolist())
+            rows.append((model, content_hash(text), len(as_float32), blob, now, stored[-1]))
+        if not rows:
+            return stored
+        with self._lock:
+            conn = self._connect()
+            conn.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?, ?)", [row[:5] for row in rows])
+            conn.commit()
+            for model_id, h, _, _, _, vector in rows:
+                self._remember((model_id, h), vector)
+            self.writes += len(rows)
+        return stored
+
+    def clear(self, model: Optional[str] = None):
+        """Forget every vector, or only those of one model"""
+        with self._lock:
+            conn = self._connect()
+            if model is None:
+                conn.execute("DELETE FROM embeddings")
+                self._memory.clear()
+            else:
+                conn.execute("DELETE FROM embeddings WHERE model = ?", (model,))
+                for key in [k for k in self._memory if k[0] == model]:
+                    del self._memory[key]
+            conn.commit()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            rows = self._connect().execute("SELECT model, COUNT(*) FROM embeddings GROUP BY model").fetchall()
+        lookups = self.hits + self.misses
+        return {
+            "path": self.path,
+            "vectors": dict(rows),
+            "memory_items": len(self._memory),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "writes": self.writes
+        }
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-item calls into batched calls
+
+    The first caller of a batch waits up to ``max_wait`` seconds (or until
+    ``max_batch`` items are queued) for other threads to join, then runs
+    ``func`` once for the whole batch and hands every caller its result.
+    """
+
+    def __init__(self, func: Callable[[List[Any]], List[Any]], max_batch: int = 32, max_wait: float = 0.005):
+        self.func = func
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.batches = 0
+        self.items = 0
+
+        self._lock = threading.Lock()
+        self._full = threading.Event()
+        self._pending: List[Tuple[Any, Future]] = []
+
+    def submit(self, item: Any) -> Any:
+        """Process ``item`` as part of the next batch and return its result"""
+        future: Future = Future()
+        with self._lock:
+            self._pending.append((item, future))
+            leader = len(self._pending) == 1
+            if len(self._pending) >= self.max_batch:
+                self._full.set()
+
+        if leader:
+            self._full.wait(self.max_wait)
+            with self._lock:
+                pending, self._pending = self._pending, []
+                self._full.clear()
+            for i in range(0, len(pending), self.max_batch):
+                self._run(pending[i:i + self.max_batch])
+        return future.result()
+
+    def _run(self, batch: List[Tuple[Any, Future]]):
+        self.batches += 1
+        self.items += len(batch)
+        try:
+            results = self.func([item for item, _ in batch])
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0
+        }
+
+# Global embedding cache shared by every embedder in the process
+embedding_cache = EmbeddingCache(
+    path=os.getenv("EMBEDDING_CACHE_PATH", "data/embedding_cache.db"),
+    memory_items=int(os.getenv("EMBEDDING_CACHE_MEMORY_ITEMS", "4096"))
+)
@@ -0,0 +1,219 @@
+"""
+Deterministic answers to simple finance lookups (price, company info, analyst ratings, news)
+"""
+
+import contextvars
+import json
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+# Intent -> patterns (French and English); a message must match exactly one intent
+INTENT_PATTERNS: Dict[str, List[str]] = {
+    # "combien"/"vaut"/"worth" alone also ask for head counts, sales or valuations: only with a price word
+    "price": [r"\bprix\b", r"\bcours\b", r"\bcote\b", r"\bcotation\b", r"\bcombien (co[ûu]te|vaut)\b",
+              r"\b(l'action|le titre|une action)\b.{0,40}\bvaut\b", r"\bprice\b", r"\bquote\b",
+              r"\btrading at\b", r"\b(stock|share)s? (is |are )?worth\b"],
+    "info": [r"\binfos?\b(?! r[ée]centes)", r"\binformations?\b", r"\bprofil\b", r"\bfiche\b", r"\bpr[ée]sente",
+             r"\bsecteur\b", r"\bcapitalisation\b", r"\bmarket cap\b", r"\bcompany info\b", r"\boverview\b",
+             r"\bprofile\b"],
+    "recommendations": [r"\brecommandations?\b", r"\banalystes?\b", r"\banalysts?\b", r"\bconsensus\b",
+                        r"\bratings?\b", r"\brecommendations?\b"],
+    "news": [r"\bactualit[ée]s?\b", r"\bnews\b", r"\bnouvelles\b", r"\bcommuniqu[ée]s?\b", r"\binfos r[ée]centes\b",
+             r"\bheadlines\b"],
+}
+
+# Anything that asks for reasoning goes to the agent
+COMPLEX_PATTERNS = [
+    r"\bcompar", r"\banaly[sz](e|er|ez|is)\b", r"\bpourquoi\b", r"\bwhy\b", r"\bshould\b", r"\bdois-je\b", r"\bdevrais",
+    r"\brisques?\b", r"\bpr[ée]vision", r"\bforecast", r"\bpredict", r"\bstrat[ée]gie", r"\bmeilleur",
+    r"\bbetter\b", r"\bvs\.?\b", r"\bversus\b", r"\bexplique", r"\bexplain\b", r"\bhistorique\b", r"\bhistory\b"
+]
+
+COMPANY_TICKERS = {
+    "apple": "AAPL", "microsoft": "MSFT", "google": "GOOGL", "alphabet": "GOOGL", "amazon": "AMZN",
+    "tesla": "TSLA", "nvidia": "NVDA", "meta": "META", "facebook": "META", "netflix": "NFLX",
+    "lvmh": "MC.PA", "totalenergies": "TTE.PA", "airbus": "AIR.PA", "l'oréal": "OR.PA", "loreal": "OR.PA",
+    "sanofi": "SAN.PA", "bitcoin": "BTC-USD", "ethereum": "ETH-USD",
+}
+
+# Upper-case words that are not tickers
+NOT_TICKERS = {
+    "PER", "PE", "ETF", "CEO", "PDG", "USD", "EUR", "IA", "AI", "OK", "US", "USA", "UE", "EU", "CA", "LE", "LA",
+    "LES", "DE", "DES", "DU", "ET", "UN", "THE", "OF", "AND", "IS", "WHAT", "QUEL", "EPS", "CAC", "NASDAQ", "SP",
+    "BTC", "ETH", "IPO", "PIB", "GDP", "FR"
+}
+TICKER = re.compile(r"(?<![\w$])\$?([A-Z]{2,5}(?:[.-][A-Z]{1,3})?)\b")
+
+@dataclass
+class FinanceIntent:
+    """A simple lookup: one intent for one to ``max_symbols`` symbols"""
+    kind: str
+    symbols: List[str]
+
+def parse_finance_intent(message: str, max_chars: int = 160, max_symbols: int = 3) -> Optional[FinanceIntent]:
+    """The lookup ``message`` asks for, or None if it is not a simple lookup
+
+    Args:
+        message: User message
+        max_chars: Longer messages are left to the agent
+        max_symbols: Messages naming more symbols are left to the agent
+
+    Returns:
+        FinanceIntent, or None when the message needs the agent
+    """
+    if len(message) > max_chars or any(re.search(p, message, re.IGNORECASE) for p in COMPLEX_PATTERNS):
+        return None
+    kinds = [kind for kind, patterns in INTENT_PATTERNS.items()
+             if any(re.search(p, message, re.IGNORECASE) for p in patterns)]
+    if len(kinds) != 1:
+        return None
+
+    # Upper-case company names ("LVMH") are resolved by the aliases below
+    symbols = [s for s in TICKER.findall(message) if s not in NOT_TICKERS and s.lower() not in COMPANY_TICKERS]
+    lowered = message.lower()
+    symbols += [ticker for name, ticker in COMPANY_TICKERS.items() if re.search(rf"\b{re.escape(name)}\b", lowered)]
+    symbols = list(dict.fromkeys(symbols))
+    if not symbols or len(symbols) > max_symbols:
+        return None
+    return FinanceIntent(kinds[0], symbols)
+
+def _number(value: Any) -> str:
+    if isinstance(value, (int, float)):
+        if abs(value) >= 1e9:
+            return f"{value / 1e9:,.1f} Md".replace(",", " ")
+        if abs(value) >= 1e6:
+            return f"{value / 1e6:,.1f} M".replace(",", " ")
+        return f"{value:,.2f}".replace(",", " ")
+    return str(value)
+
+def _render_price(symbol: str, raw: str) -> str:
+    return f"- **{symbol}** : {float(raw):,.2f}".replace(",", " ")
+
+def _render_info(symbol: str, raw: str) -> str:
+    info = json.loads(raw)
+    lines = [f"**{info.get('Name') or symbol}** ({info.get('Symbol') or symbol})"]
+    fields = [("Cours", "Current Stock Price"), ("Capitalisation", "Market Cap"), ("Secteur", "Sector"),
+              ("Industrie", "Industry"), ("P/E", "P/E Ratio"), ("BPA", "EPS"), ("Plus bas 52 sem.", "52 Week Low"),
+              ("Plus haut 52 sem.", "52 Week High"), ("Recommandation", "Analyst Recommendation"),
+              ("Site", "Website")]
+    for label, key in fields:
+        value = info.get(key)
+        if value in (None, "", "None USD", "None"):
+            continue
+        if isinstance(value, str) and " " in value and value.split(" ", 1)[0].replace(".", "", 1).isdigit():
+            amount, currency = value.split(" ", 1)
+            value = f"{_number(float(amount))} {currency}"
+        lines.append(f"- {label} : {_number(value)}")
+    return "\n".join(lines)
+
+def _render_recommendations(symbol: str, raw: str) -> str:
+    rows = sorted(json.loads(raw).values(), key=lambda row: str(row.get("period")), reverse=True)
+    latest = next((row for row in rows if row.get("period") == "0m"), rows[0] if rows else None)
+    if latest is None:
+        raise ValueError("no recommendations")
+    counts = [("Achat fort", "strongBuy"), ("Achat", "buy"), ("Conserver", "hold"), ("Vente", "sell"),
+              ("Vente forte", "strongSell")]
+    return f"- **{symbol}** : " + ", ".join(f"{label} {int(latest.get(key) or 0)}" for label, key in counts)
+
+def _render_news(symbol: str, raw: str) -> str:
+    lines = [f"**{symbol}**"]
+    for item in json.loads(raw):
+        content = item.get("content") or item
+        title = content.get("title")
+        link = (content.get("canonicalUrl") or {}).get("url") or content.get("link")
+        source = (content.get("provider") or {}).get("displayName") or content.get("publisher")
+        if title:
+            lines.append(f"- [{title}]({link})" if link else f"- {title}")
+            if source:
+                lines[-1] += f" — {source}"
+    if len(lines) == 1:
+        raise ValueError("no news")
+    return "\n".join(lines)
+
+TEMPLATES: Dict[str, Any] = {
+    "price": ("Cours actuel :", _render_price),
+    "info": ("Informations société :", _render_info),
+    "recommendations": ("Recommandations des analystes (mois en cours) :", _render_recommendations),
+    "news": ("Dernières actualités :", _render_news),
+}
+
+@dataclass
+class FastPathAnswer:
+    """Templated answer and how it was produced"""
+    content: str
+    intent: str
+    symbols: List[str]
+    latency_ms: float
+    data: Dict[str, str] = field(default_factory=dict)
+
+class FinanceFastPath:
+    """
+    Answers simple finance lookups without an LLM
+
+    ``parse_finance_intent`` recognizes a price, company info, analyst
+    recommendation or news request for a few symbols; ``fetch(kind, symbol)``
+    returns the matching YFinance tool output for each symbol (called
+    concurrently) and the results are rendered from a template. Anything
+    else, or any tool error, returns None so the agent handles the message.
+    ``summarize`` (message, answer) -> text may append a short LLM summary.
+    """
+
+    def __init__(self, fetch: Callable[[str, str], str],
+                 summarize: Optional[Callable[[str, str], Optional[str]]] = None, max_workers: int = 4):
+        self.fetch = fetch
+        self.summarize = summarize
+        self.hits = 0
+        self.passed = 0
+        self.errors = 0
+        self.total_latency_ms = 0.0
+        self.by_intent: Dict[str, int] = {}
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="finance-fast-path")
+        self._lock = threading.Lock()
+
+    def _count(self, **increments: int):
+        with self._lock:
+            for name, value in increments.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def answer(self, message: str) -> Optional[FastPathAnswer]:
+        """Templated answer to ``message``, or None when the agent should answer"""
+        intent = parse_finance_intent(message)
+        if intent is None:
+            self._count(passed=1)
+            return None
+        started = time.perf_counter()
+        title, render = TEMPLATES[intent.kind]
+        # Each fetch sees the caller's context variables (request tracking)
+        futures = [self._pool.submit(contextvars.copy_context().run, self.fetch, intent.kind, symbol)
+                   for symbol in intent.symbols]
+        try:
+            results = {symbol: future.result() for symbol, future in zip(intent.symbols, futures)}
+            content = "\n".join([title] + [render(symbol, raw) for symbol, raw in results.items()])
+        except Exception:
+            # A fetch that raised (network, yfinance), "Could not fetch...", "Error fetching..." or an unexpected payload
+            self._count(errors=1)
+            return None
+        if self.summarize is not None:
+            summary = self.summarize(message, content)
+            if summary:
+                content += f"\n\n{summary.strip()}"
+
+        latency_ms = round((time.perf_counter() - started) * 1000, 2)
+        with self._lock:
+            self.hits += 1
+            self.total_latency_ms += latency_ms
+            self.by_intent[intent.kind] = self.by_intent.get(intent.kind, 0) + 1
+        return FastPathAnswer(content, intent.kind, intent.symbols, latency_ms, results)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "answered": self.hits,
+            "passed_to_agent": self.passed,
+            "tool_errors": self.errors,
+            "by_intent": dict(self.by_intent),
+            "avg_latency_ms": round(self.total_latency_ms / self.hits, 2) if self.hits else 0.0
+        }
@@ -0,0 +1,206 @@
+"""
+Cheap intent routing: keyword rules, then embedding similarity, then an optional LLM
+"""
+
+import math
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Patterns matched case-insensitively against the message (French and English)
+DEFAULT_KEYWORDS: Dict[str, List[str]] = {
+    "finance": [
+        r"\bactions?\b", r"\bbourse\b", r"\bcours\b", r"\bcotation", r"\bdividende", r"\bp/e\b", r"\bper\b",
+        r"\bstocks?\b", r"\bshares?\b", r"\bmarket cap", r"\bcapitalisation", r"\bticker", r"\bnasdaq\b",
+        r"\bcac ?40\b", r"\bs&p\b", r"\bcrypto", r"\bbitcoin\b", r"\binvestiss", r"\bportefeuille\b",
+        r"\banalystes?\b", r"\bfinanci"
+    ],
+    "code": [
+        r"\bpython\b", r"\bcode\b", r"\bscript\b", r"\bfonction\b", r"\bfunction\b", r"\balgorithme?",
+        r"\bcalcul", r"\bcompute\b", r"\bfactorielle?\b", r"\bfibonacci\b", r"\bnombres? premiers?\b",
+        r"\bprimes?\b", r"\bregex\b", r"\bbug\b", r"\bdebug", r"\bpandas\b", r"\bnumpy\b",
+        r"\d+(\.\d+)?\s*[-+*/^%]\s*\d+", r"\btri(er)?\b.*\bliste\b", r"\bsort\b"
+    ],
+    "system": [
+        r"\bshell\b", r"\bcommande\b", r"\bterminal\b", r"\bdisque\b", r"\bdisk\b", r"\bespace libre\b",
+        r"\bprocessus\b", r"\bprocess(es)?\b", r"\bcpu\b", r"\bram\b", r"\bm[ée]moire (vive|utilis)",
+        r"\bfichiers?\b", r"\bfiles?\b", r"\br[ée]pertoire", r"\bdossier", r"\bdirectory\b",
+        r"\b(ls|df|ps|htop|grep|chmod|uptime)\b", r"\b(du|find|top) -", r"\bsyst[èe]me\b", r"\bport\b"
+    ],
+    "search": [
+        r"\brecherche", r"\bcherche\b", r"\bsearch\b", r"\bactualit", r"\bnews\b", r"\bderni[èe]res?\b",
+        r"\blatest\b", r"\baujourd'hui\b", r"\bcette semaine\b", r"\bm[ée]t[ée]o\b", r"\bweather\b",
+        r"\bsur (le )?web\b", r"\bsur internet\b", r"\bqui a gagn", r"\br[ée]sultats? (du|des|de la)\b",
+        r"\bsources?\b", r"\ben 20\d\d\b"
+    ],
+}
+
+@dataclass
+class RouteDecision:
+    """Where a message goes and why"""
+    agent_id: str
+    method: str
+    confidence: float
+    latency_ms: float = 0.0
+    scores: Dict[str, float] = field(default_factory=dict)
+
+def _cosine(a: Sequence[float], b: Sequence[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+class IntentRouter:
+    """
+    Picks the agent for a message without calling a chat model
+
+    1. Keyword rules: the agent with the most matching patterns wins if it
+       leads the runner-up by ``keyword_margin`` hits.
+    2. Embeddings: the message is compared with each agent's profile texts
+       (description, instructions, examples), embedded once; the best agent
+       wins if its similarity reaches ``min_similarity`` and leads the
+       runner-up by ``similarity_margin``.
+    3. ``classify`` (a small LLM) if given, else ``default``.
+    """
+
+    def __init__(
+        self,
+        profiles: Dict[str, List[str]],
+        embed: Optional[Callable[[List[str]], List[List[float]]]] = None,
+        classify: Optional[Callable[[str, List[str]], Optional[str]]] = None,
+        keywords: Optional[Dict[str, List[str]]] = None,
+        default: str = "general",
+        keyword_margin: int = 1,
+        min_similarity: float = 0.55,
+        similarity_margin: float = 0.02
+    ):
+        self.profiles = profiles
+        self.embed = embed
+        self.classify = classify
+        self.default = default
+        self.keyword_margin = keyword_margin
+        self.min_similarity = min_similarity
+        self.similarity_margin = similarity_margin
+        self.patterns = {
+            agent_id: [re.compile(p, re.IGNORECASE) for p in patterns]
+            for agent_id, patterns in (DEFAULT_KEYWORDS if keywords is None else keywords).items()
+            if agent_id in profiles
+        }
+
+        self.routes = 0
+        self.methods: Counter = Counter()
+        self.agents: Counter = Counter()
+        self.total_latency_ms = 0.0
+        self._profile_vectors: Optional[List[Tuple[str, List[float]]]] = None
+        self._lock = threading.Lock()
+
+    def keyword_scores(self, message: str) -> Dict[str, float]:
+        return {agent_id: float(sum(1 for p in patterns if p.search(message)))
+                for agent_id, patterns in self.patterns.items()}
+
+    def _vectors(self, embed: Callable[[List[str]], List[List[float]]]) -> List[Tuple[str, List[float]]]:
+        with self._lock:
+            if self._profile_vectors is None:
+                pairs = [(agent_id, text) for agent_id, texts in self.profiles.items() for text in texts]
+                embedded = embed([text for _, text in pairs])
+                vectors = [(agent_id, vector) for (agent_id, _), vector in zip(pairs, embedded) if vector]
+                if not vectors:
+                    return []  # Embedder unavailable; try again next time
+                self._profile_vectors = vectors
+            return self._profile_vectors
+
+    def similarity_scores(self, message: str) -> Dict[str, float]:
+        """Best similarity between ``message`` and each agent's profile texts (empty without embeddings)"""
+        embed = self.embed
+        if embed is None:
+            return {}
+        profile_vectors = self._vectors(embed)
+        vector = embed([message])[0] if profile_vectors else []
+        if not vector:
+            return {}
+        scores: Dict[str, float] = {}
+        for agent_id, profile_vector in profile_vectors:
+            scores[agent_id] = max(scores.get(agent_id, -1.0), _cosine(vector, profile_vector))
+        return scores
+
+    @staticmethod
+    def _top_two(scores: Dict[str, float]) -> Tuple[Optional[str], float, float]:
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        if not ranked:
+            return None, 0.0, 0.0
+        return ranked[0][0], ranked[0][1], ranked[1][1] if len(ranked) > 1 else 0.0
+
+    def _decide(self, message: str) -> RouteDecision:
+        scores = self.keyword_scores(message)
+        best, top, second = self._top_two(scores)
+        if best is not None and top > 0 and top - second >= self.keyword_margin:
+            return RouteDecision(best, "keywords", round(top / (top + second), 3), scores=scores)
+
+        similarities = self.similarity_scores(message)
+        best, top, second = self._top_two(similarities)
+        if best is not None and top >= self.min_similarity and top - second >= self.similarity_margin:
+            return RouteDecision(best, "embedding", round(top, 3), scores=similarities)
+
+        if self.classify is not None:
+            choice = self.classify(message, list(self.profiles))
+            if choice in self.profiles:
+                return RouteDecision(choice, "llm", 0.5, scores=similarities or scores)
+        return RouteDecision(self.default, "default", 0.0, scores=similarities or scores)
+
+    def route(self, message: str) -> RouteDecision:
+        """Choose the agent for ``message``
+
+        Args:
+            message: User message
+
+        Returns:
+            RouteDecision with the agent id, the stage that decided and its scores
+        """
+        started = time.perf_counter()
+        decision = self._decide(message)
+        decision.latency_ms = round((time.perf_counter() - started) * 1000, 3)
+        self.routes += 1
+        self.methods[decision.method] += 1
+        self.agents[decision.agent_id] += 1
+        self.total_latency_ms += decision.latency_ms
+        return decision
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "routes": self.routes,
+            "by_method": dict(self.methods),
+            "by_agent": dict(self.agents),
+            "avg_latency_ms": round(self.total_latency_ms / self.routes, 3) if self.routes else 0.0
+        }
+
+def evaluate(router: IntentRouter, labeled: Sequence[Tuple[str, str]]) -> Dict[str, Any]:
+    """Accuracy and routing latency of ``router`` on (message, expected agent) pairs"""
+    latencies: List[float] = []
+    correct = 0
+    by_method: Dict[str, Dict[str, int]] = {}
+    misses: List[Dict[str, str]] = []
+    for message, expected in labeled:
+        decision = router.route(message)
+        latencies.append(decision.latency_ms)
+        hit = decision.agent_id == expected
+        correct += hit
+        method = by_method.setdefault(decision.method, {"routed": 0, "correct": 0})
+        method["routed"] += 1
+        method["correct"] += hit
+        if not hit:
+            misses.append({"message": message, "expected": expected, "routed": decision.agent_id,
+                           "method": decision.method})
+    latencies.sort()
+
+    def percentile(p: float) -> float:
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))] if latencies else 0.0
+
+    return {
+        "messages": len(labeled),
+        "accuracy": round(correct / len(labeled), 3) if labeled else 0.0,
+        "by_method": by_method,
+        "latency_ms": {"p50": percentile(0.5), "p95": percentile(0.95), "max": latencies[-1] if latencies else 0.0},
+        "misses": misses
+    }
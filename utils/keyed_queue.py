@@ -0,0 +1,158 @@
+"""
+Async work queue with per-key ordering, cross-key parallelism and deduplication
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+class KeyedWorkQueue:
+    """
+    Runs ``handler(key, item)`` on a pool of workers
+
+    Items sharing a key are handled one at a time in arrival order; different
+    keys are handled in parallel, round-robin, so one busy key cannot starve
+    the others. Items carrying an ``item_id`` already seen (among the last
+    ``dedup_items``) are dropped, which absorbs redelivered webhooks; an item
+    whose handler fails is forgotten, so its redelivery is handled. Once
+    ``max_pending`` items are waiting, ``put`` raises ``asyncio.QueueFull``
+    so the caller can push back on the producer.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[Any, Any], Awaitable[Any]],
+        workers: int = 4,
+        max_pending: int = 1000,
+        dedup_items: int = 10000,
+        name: str = "queue"
+    ):
+        self.handler = handler
+        self.workers = workers
+        self.max_pending = max_pending
+        self.dedup_items = dedup_items
+        self.name = name
+
+        self.processed = 0
+        self.failed = 0
+        self.duplicates = 0
+        self.rejected = 0
+        self.wait_seconds = 0.0
+        self.handle_seconds = 0.0
+
+        self._pending: Dict[Hashable, Deque[Tuple[Any, float, Optional[str]]]] = {}
+        self._scheduled: Set[Hashable] = set()
+        self._ready: "asyncio.Queue[Hashable]" = asyncio.Queue()
+        self._seen: "OrderedDict[str, None]" = OrderedDict()
+        self._size = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def pending(self) -> int:
+        """Items queued or being handled"""
+        return self._size
+
+    def start(self):
+        """Start the worker pool on the running event loop"""
+        if not any(not task.done() for task in self._tasks):
+            loop = asyncio.get_running_loop()
+            self._tasks = [loop.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self, drain_timeout: float = 0.0):
+        """Stop the workers, first waiting up to ``drain_timeout`` seconds for queued items"""
+        if drain_timeout > 0 and self._size:
+            try:
+                await asyncio.wait_for(self.join(), drain_timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"⏹️ Stopping {self.name} with {self._size} items still queued")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def join(self):
+        """Wait until every queued item has been handled"""
+        await self._idle.wait()
+
+    def _remember(self, item_id: str):
+        self._seen[item_id] = None
+        while len(self._seen) > self.dedup_items:
+            self._seen.popitem(last=False)
+
+    def put(self, key: Hashable, item: Any, item_id: Optional[str] = None) -> bool:
+        """
+        Queue ``item`` behind earlier items of the same ``key``
+
+        Returns:
+            False when ``item_id`` was already queued (a duplicate), True otherwise
+
+        Raises:
+            asyncio.QueueFull: ``max_pending`` items are already waiting
+        """
+        if item_id is not None and item_id in self._seen:
+            self.duplicates += 1
+            self._seen.move_to_end(item_id)
+            return False
+        if self._size >= self.max_pending:
+            self.rejected += 1
+            raise asyncio.QueueFull(f"{self.name} has {self._size} pending items")
+        if item_id is not None:
+            self._remember(item_id)
+
+        self.start()
+        self._pending.setdefault(key, deque()).append((item, time.monotonic(), item_id))
+        self._size += 1
+        self._idle.clear()
+        if key not in self._scheduled:
+            self._scheduled.add(key)
+            self._ready.put_nowait(key)
+        return True
+
+    async def _work(self):
+        while True:
+            key = await self._ready.get()
+            item, queued_at, item_id = self._pending[key].popleft()
+            started = time.monotonic()
+            self.wait_seconds += started - queued_at
+            try:
+                await self.handler(key, item)
+                self.processed += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"❌ {self.name} handler failed for {key}: {e}")
+                if item_id is not None:
+                    # Not handled: a redelivery of this item must not be dropped as a duplicate
+                    self._seen.pop(item_id, None)
+            finally:
+                self.handle_seconds += time.monotonic() - started
+                self._size -= 1
+                if self._pending[key]:
+                    # Back of the line: other keys get a turn before this one's next item
+                    self._ready.put_nowait(key)
+                else:
+                    del self._pending[key]
+                    self._scheduled.discard(key)
+                if self._size == 0:
+                    self._idle.set()
+
+    def stats(self) -> Dict[str, Any]:
+        handled = self.processed + self.failed
+        return {
+            "workers": self.workers,
+            "pending": self._size,
+            "keys": len(self._pending),
+            "processed": self.processed,
+            "failed": self.failed,
+            "duplicates": self.duplicates,
+            "rejected": self.rejected,
+            "avg_wait_seconds": round(self.wait_seconds / handled, 3) if handled else 0.0,
+            "avg_handle_seconds": round(self.handle_seconds / handled, 3) if handled else 0.0
+        }
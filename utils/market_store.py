@@ -0,0 +1,236 @@
+"""
+Local store of market data and the background prefetcher that keeps a watchlist in it
+"""
+
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Data kind -> YFinance tool method producing it
+KIND_METHODS = {
+    "price": "get_current_stock_price",
+    "info": "get_company_info",
+    "recommendations": "get_analyst_recommendations",
+    "news": "get_company_news",
+}
+
+# YFinance tools report failures as text rather than raising
+TOOL_ERROR_PREFIXES = ("Error fetching", "Could not fetch")
+
+def is_tool_error(payload: str) -> bool:
+    return not payload or payload.startswith(TOOL_ERROR_PREFIXES)
+
+@dataclass
+class MarketEntry:
+    """One tool output for one symbol, as fetched at ``fetched_at`` (epoch seconds)"""
+    symbol: str
+    kind: str
+    payload: str
+    fetched_at: float
+
+    @property
+    def age(self) -> float:
+        return max(time.time() - self.fetched_at, 0.0)
+
+    def freshness(self) -> Dict[str, Any]:
+        return {
+            "symbol": self.symbol,
+            "kind": self.kind,
+            "source": "watchlist",
+            "fetched_at": datetime.fromtimestamp(self.fetched_at, timezone.utc).isoformat(timespec="seconds"),
+            "age_seconds": round(self.age, 1)
+        }
+
+class MarketDataStore:
+    """
+    Latest tool output per (symbol, kind), in memory and in SQLite
+
+    Entries survive restarts, so a freshly started API serves the previous
+    prefetch until the next one lands. ``get`` ignores entries older than
+    ``max_age`` seconds. Safe to share between threads.
+    """
+
+    def __init__(self, path: str = "data/market_data.db", max_age: float = 900.0):
+        self.path = path
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+        self._entries: Optional[Dict[Tuple[str, str], MarketEntry]] = None
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _load(self) -> Dict[Tuple[str, str], MarketEntry]:
+        if self._entries is None:
+            if self.path != ":memory:":
+                Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS market_data ("
+                "symbol TEXT NOT NULL, kind TEXT NOT NULL, payload TEXT NOT NULL, "
+                "fetched_at REAL NOT NULL, PRIMARY KEY (symbol, kind))"
+            )
+            conn.commit()
+            self._conn = conn
+            rows = conn.execute("SELECT symbol, kind, payload, fetched_at FROM market_data").fetchall()
+            self._entries = {(row[0], row[1]): MarketEntry(*row) for row in rows}
+        return self._entries
+
+    def put(self, symbol: str, kind: str, payload: str, fetched_at: Optional[float] = None) -> MarketEntry:
+        entry = MarketEntry(symbol.upper(), kind, payload, fetched_at if fetched_at is not None else time.time())
+        with self._lock:
+            self._load()[(entry.symbol, kind)] = entry
+            conn = self._conn
+            assert conn is not None, "opened by _load"
+            conn.execute(
+                "INSERT OR REPLACE INTO market_data (symbol, kind, payload, fetched_at) VALUES (?, ?, ?, ?)",
+                (entry.symbol, kind, payload, entry.fetched_at)
+            )
+            conn.commit()
+        return entry
+
+    def get(self, symbol: str, kind: str, max_age: Optional[float] = None) -> Optional[MarketEntry]:
+        """Stored entry if it is at most ``max_age`` (default: the store's) seconds old"""
+        with self._lock:
+            entry = self._load().get((symbol.upper(), kind))
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.age > (self.max_age if max_age is None else max_age):
+                self.stale += 1
+                return None
+            self.hits += 1
+            return entry
+
+    def entries(self) -> List[MarketEntry]:
+        with self._lock:
+            return list(self._load().values())
+
+    def stats(self) -> Dict[str, Any]:
+        entries = self.entries()
+        lookups = self.hits + self.misses + self.stale
+        return {
+            "entries": len(entries),
+            "max_age_seconds": self.max_age,
+            "oldest_age_seconds": round(max((e.age for e in entries), default=0.0), 1),
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+        }
+
+class WatchlistPrefetcher:
+    """
+    Refreshes ``kinds`` of data for every watchlist symbol into a store
+
+    ``fetch(kind, symbol)`` returns the live tool output; all pairs of a
+    refresh run concurrently on ``max_workers`` threads and failed fetches
+    keep the previous entry. Once ``start()`` has been called, a refresh runs
+    immediately and then every ``interval`` seconds on the running event loop.
+    """
+
+    def __init__(
+        self,
+        store: MarketDataStore,
+        fetch: Callable[[str, str], str],
+        symbols: Sequence[str],
+        kinds: Sequence[str] = ("price", "info", "news"),
+        interval: float = 300.0,
+        max_workers: int = 8
+    ):
+        self.store = store
+        self.fetch = fetch
+        self.symbols = [s.upper() for s in symbols]
+        self.kinds = list(kinds)
+        self.interval = interval
+        self.max_workers = max_workers
+        self.refreshes = 0
+        self.fetched = 0
+        self.failed = 0
+        self.last_refresh_at: Optional[float] = None
+        self.last_duration = 0.0
+        self.last_errors: Dict[str, str] = {}
+
+        self._task: Optional[asyncio.Task] = None
+
+    def _fetch_one(self, symbol: str, kind: str) -> Optional[str]:
+        try:
+            payload = self.fetch(kind, symbol)
+        except Exception as e:
+            payload = f"Error fetching {kind} for {symbol}: {e}"
+        if is_tool_error(payload):
+            self.last_errors[f"{symbol}:{kind}"] = payload[:200]
+            return None
+        self.last_errors.pop(f"{symbol}:{kind}", None)
+        return payload
+
+    def refresh_all(self) -> Dict[str, int]:
+        """Fetch every (symbol, kind) pair once; returns how many were stored and failed"""
+        started = time.perf_counter()
+        pairs = [(symbol, kind) for symbol in self.symbols for kind in self.kinds]
+        stored = failed = 0
+        if pairs:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(pairs)),
+                                    thread_name_prefix="watchlist") as pool:
+                for (symbol, kind), payload in zip(pairs, pool.map(lambda p: self._fetch_one(*p), pairs)):
+                    if payload is None:
+                        failed += 1
+                    else:
+                        self.store.put(symbol, kind, payload)
+                        stored += 1
+        self.refreshes += 1
+        self.fetched += stored
+        self.failed += failed
+        self.last_refresh_at = time.time()
+        self.last_duration = time.perf_counter() - started
+        logger.info(f"📈 Watchlist refreshed: {stored} stored, {failed} failed in {self.last_duration:.2f}s")
+        return {"stored": stored, "failed": failed}
+
+    async def _refresh_periodically(self):
+        while True:
+            try:
+                await asyncio.to_thread(self.refresh_all)
+            except Exception as e:
+                logger.error(f"❌ Watchlist refresh failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        """Refresh now, then every ``interval`` seconds, on the running event loop"""
+        if not self.symbols or not self.kinds:
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._refresh_periodically())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "symbols": self.symbols,
+            "kinds": self.kinds,
+            "interval_seconds": self.interval,
+            "refreshes": self.refreshes,
+            "fetched": self.fetched,
+            "failed": self.failed,
+            "last_refresh_at": datetime.fromtimestamp(self.last_refresh_at, timezone.utc).isoformat(timespec="seconds")
+            if self.last_refresh_at else None,
+            "last_duration_seconds": round(self.last_duration, 3),
+            "last_errors": dict(self.last_errors),
+            "store": self.store.stats()
+        }
@@ -0,0 +1,72 @@
+"""
+Relevance ranking, budgeting and near-duplicate grouping for user memories
+"""
+
+import math
+import re
+from collections import Counter
+from typing import List, Optional, Sequence, Set
+
+from .tokens import estimate_tokens
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+# Words that say nothing about what a memory is about
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have", "i", "in", "is", "it", "my",
+    "of", "on", "or", "that", "the", "their", "they", "this", "to", "user", "was", "with", "you", "your",
+    "de", "des", "du", "et", "la", "le", "les", "un", "une", "est", "en", "pour", "je", "il", "elle",
+}
+
+def _stem(word: str) -> str:
+    # Plural folding is enough for short memory facts ("peanuts" matches "peanut")
+    return word[:-1] if len(word) > 3 and word.endswith("s") and not word.endswith("ss") else word
+
+def terms(text: str) -> Set[str]:
+    return {_stem(word) for word in _WORD.findall(text.lower()) if word not in _STOPWORDS}
+
+def similarity(a: str, b: str) -> float:
+    """Jaccard overlap of the content words of two texts"""
+    ta, tb = terms(a), terms(b)
+    if not ta or not tb:
+        return 0.0
+    return len(ta & tb) / len(ta | tb)
+
+def rank_by_relevance(query: str, texts: Sequence[str], recency: Optional[Sequence[float]] = None) -> List[int]:
+    """
+    Indices of ``texts`` ordered by relevance to ``query``
+
+    Relevance is the IDF-weighted overlap of content words; ``recency``
+    (larger is newer) breaks ties, so without any overlap the newest come first.
+    """
+    doc_terms = [terms(text) for text in texts]
+    document_frequency = Counter(term for words in doc_terms for term in words)
+    n = len(texts)
+    query_terms = terms(query)
+
+    def score(i: int) -> float:
+        return sum(math.log(1 + n / document_frequency[term]) for term in query_terms & doc_terms[i])
+
+    recency = recency or [0.0] * n
+    return sorted(range(n), key=lambda i: (score(i), recency[i]), reverse=True)
+
+def select_within_budget(order: Sequence[int], texts: Sequence[str], budget_tokens: int) -> List[int]:
+    """Walk ``order`` and keep every text that still fits in ``budget_tokens``"""
+    selected, used = [], 0
+    for i in order:
+        cost = estimate_tokens(texts[i])
+        if used + cost <= budget_tokens:
+            selected.append(i)
+            used += cost
+    return selected
+
+def group_near_duplicates(texts: Sequence[str], threshold: float = 0.8) -> List[List[int]]:
+    """Greedy groups of texts whose content words overlap at least ``threshold``"""
+    groups: List[List[int]] = []
+    for i, text in enumerate(texts):
+        for group in groups:
+            if similarity(texts[group[0]], text) >= threshold:
+                group.append(i)
+                break
+        else:
+            groups.append([i])
+    return groups
@@ -0,0 +1,244 @@
+"""
+Cached Ollama model inventory
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import ollama
+from .ollama_pool import ollama_pool
+
+logger = logging.getLogger(__name__)
+
+def normalize_model(model: Any) -> Dict[str, Any]:
+    """
+    Convert an Ollama list entry (dict or pydantic model) to a plain dict
+
+    Newer Ollama clients report the model name under ``model`` while older
+    ones use ``name``; both keys are always set on the result.
+    """
+    data = model.model_dump(mode="json") if hasattr(model, "model_dump") else dict(model)
+    name = data.get("model") or data.get("name") or ""
+    data["name"] = name
+    data["model"] = name
+    return data
+
+def index_keys(name: str) -> List[str]:
+    """Lookup keys for a model name: ``mistral`` and ``mistral:latest`` are the same model"""
+    if name.endswith(":latest"):
+        return [name, name[: -len(":latest")]]
+    if ":" not in name:
+        return [name, f"{name}:latest"]
+    return [name]
+
+class ModelInventory:
+    """
+    TTL-cached, name-indexed view of the models installed on an Ollama host
+
+    Lookups are served from an in-memory index; the index is refreshed when it
+    is older than ``ttl`` (one request in flight at a time) and, once
+    ``start()`` has been called, periodically in the background. After a
+    failed refresh, lookups wait ``error_ttl`` seconds before trying again
+    instead of each paying for a request to a host that is down.
+    """
+
+    def __init__(
+        self,
+        host: Optional[str] = None,
+        ttl: float = 30.0,
+        refresh_interval: float = 60.0,
+        client: Any = None,
+        sync_client: Any = None,
+        error_ttl: float = 5.0
+    ):
+        self.host = host
+        self.ttl = ttl
+        self.error_ttl = error_ttl
+        self.refresh_interval = refresh_interval
+        self.models: List[Dict[str, Any]] = []
+        self.index: Dict[str, Dict[str, Any]] = {}
+        self.refreshed_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.failed_at: Optional[float] = None
+        self._error: Optional[Exception] = None
+        self.refresh_count = 0
+        self.hits = 0
+        self.misses = 0
+
+        self._client = client
+        self._sync_client = sync_client
+        self._listeners: List[Callable[["ModelInventory"], None]] = []
+        self._inflight: Optional[asyncio.Future] = None
+        self._background: Optional[asyncio.Task] = None
+        self._sync_lock = threading.Lock()
+
+    @property
+    def age(self) -> Optional[float]:
+        return time.monotonic() - self.refreshed_at if self.refreshed_at is not None else None
+
+    @property
+    def fresh(self) -> bool:
+        return self.age is not None and self.age < self.ttl
+
+    @property
+    def due(self) -> bool:
+        """Whether a lookup should refetch: the cache is stale and no recent refresh failed"""
+        if self.fresh:
+            return False
+        return self.failed_at is None or time.monotonic() - self.failed_at >= self.error_ttl
+
+    def _raise_if_empty(self):
+        # Within error_ttl of a failure, with nothing ever fetched: the same error, without a request
+        if not self.models and self._error is not None:
+            raise self._error
+
+    def add_listener(self, callback: Callable[["ModelInventory"], None]):
+        """Call ``callback(inventory)`` after every successful refresh"""
+        self._listeners.append(callback)
+
+    def invalidate(self):
+        """Force the next lookup to refetch (e.g. after pulling a model)"""
+        self.refreshed_at = None
+        self.failed_at = None
+
+    def _store(self, response: Any):
+        models = [normalize_model(m) for m in response.get("models", [])]
+        index: Dict[str, Dict[str, Any]] = {}
+        for model in models:
+            for key in index_keys(model["name"]):
+                index.setdefault(key, model)
+        # Swap both references at once so readers never see a half-built index
+        self.models, self.index = models, index
+        self.refreshed_at = time.monotonic()
+        self.refresh_count += 1
+        self.last_error = None
+        self.failed_at = self._error = None
+        for callback in self._listeners:
+            try:
+                callback(self)
+            except Exception as e:
+                logger.error(f"Model inventory listener failed: {e}")
+
+    def _fail(self, error: Exception):
+        self.last_error = str(error)
+        self.failed_at, self._error = time.monotonic(), error
+        logger.error(f"Failed to list models: {error}")
+        if not self.models:
+            raise error
+
+    async def _fetch(self):
+        client = self._client or ollama.AsyncClient(host=self.host)
+        try:
+            self._store(await client.list())
+        except Exception as e:
+            self._fail(e)
+
+    async def refresh(self):
+        """Refetch the model list; concurrent callers share one request"""
+        task = self._inflight
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            task = self._inflight = asyncio.ensure_future(self._fetch())
+        await asyncio.shield(task)
+
+    def refresh_sync(self):
+        """Blocking refresh for scripts and code running outside the event loop"""
+        with self._sync_lock:
+            client = self._sync_client or ollama.Client(host=self.host)
+            try:
+                self._store(client.list())
+            except Exception as e:
+                self._fail(e)
+
+    async def get_models(self, force: bool = False) -> List[Dict[str, Any]]:
+        """
+        All installed models, refreshed when the cache is older than the TTL
+
+        Stale data is served if a refresh fails; an error is raised only when
+        nothing has ever been fetched.
+        """
+        if force or self.due:
+            await self.refresh()
+        self._raise_if_empty()
+        return self.models
+
+    def get_models_sync(self, force: bool = False) -> List[Dict[str, Any]]:
+        if force or self.due:
+            self.refresh_sync()
+        self._raise_if_empty()
+        return self.models
+
+    async def get(self, name: str) -> Optional[Dict[str, Any]]:
+        """Model info by name, refreshing a stale cache first"""
+        if self.due:
+            try:
+                await self.refresh()
+            except Exception:
+                return None
+        return self.lookup(name)
+
+    def get_sync(self, name: str) -> Optional[Dict[str, Any]]:
+        if self.due:
+            try:
+                self.refresh_sync()
+            except Exception:
+                return None
+        return self.lookup(name)
+
+    def lookup(self, name: str) -> Optional[Dict[str, Any]]:
+        """Model info from the current index without any I/O"""
+        model = self.index.get(name)
+        if model is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return model
+
+    async def _refresh_periodically(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception:
+                pass
+            await asyncio.sleep(self.refresh_interval)
+
+    def start(self):
+        """Start background refreshes on the running event loop"""
+        if self._background is None or self._background.done():
+            self._background = asyncio.get_running_loop().create_task(self._refresh_periodically())
+
+    async def stop(self):
+        if self._background is not None:
+            self._background.cancel()
+            try:
+                await self._background
+            except asyncio.CancelledError:
+                pass
+            self._background = None
+
+    def stats(self) -> Dict[str, Any]:
+        age = self.age
+        return {
+            "models_count": len(self.models),
+            "age_seconds": round(age, 3) if age is not None else None,
+            "fresh": self.fresh,
+            "ttl": self.ttl,
+            "error_ttl": self.error_ttl,
+            "refresh_count": self.refresh_count,
+            "lookup_hits": self.hits,
+            "lookup_misses": self.misses,
+            "last_error": self.last_error
+        }
+
+# Global inventory: the union of models installed on every pooled Ollama host
+model_inventory = ModelInventory(
+    host=ollama_pool.primary_host,
+    client=ollama_pool.async_client(),
+    sync_client=ollama_pool.client(),
+    ttl=float(os.getenv("MODEL_INVENTORY_TTL", "30")),
+    refresh_interval=float(os.getenv("MODEL_INVENTORY_REFRESH", "60")),
+    error_ttl=float(os.getenv("MODEL_INVENTORY_ERROR_TTL", "5"))
+)
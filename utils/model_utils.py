@@ -5,6 +5,7 @@ Model and Ollama utilities
 import ollama
 from typing import List, Dict, Any, Optional
 import logging
+from .model_inventory import model_inventory
 
 logger = logging.getLogger(__name__)
 
@@ -26,12 +27,13 @@ def list_available_models() -> List[Dict[str, Any]]:
     """
     List all available models in Ollama
     
+    Served from the shared model inventory, which refetches at most once per TTL.
+    
     Returns:
         List of model information dictionaries
     """
     try:
-        response = ollama.list()
-        return response.get("models", [])
+        return model_inventory.get_models_sync()
     except Exception as e:
         logger.error(f"Failed to list models: {e}")
         return []
@@ -41,16 +43,12 @@ def get_model_info(model_name: str) -> Optional[Dict[str, Any]]:
     Get information about a specific model
     
     Args:
-        model_name: Name of the model
+        model_name: Name of the model (``mistral`` and ``mistral:latest`` are equivalent)
         
     Returns:
         Model information dictionary or None if not found
     """
-    models = list_available_models()
-    for model in models:
-        if model.get("name") == model_name:
-            return model
-    return None
+    return model_inventory.get_sync(model_name)
 
 def check_model_availability(model_name: str) -> bool:
     """
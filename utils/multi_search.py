@@ -0,0 +1,207 @@
+"""
+Concurrent multi-query web search with result deduplication and merged ranking
+"""
+
+import logging
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+logger = logging.getLogger(__name__)
+
+# Query parameters that only track the visitor
+TRACKING_PARAMS = re.compile(r"^(utm_\w+|fbclid|gclid|mc_cid|mc_eid|ref|ref_src|igshid)$", re.IGNORECASE)
+
+def normalize_url(url: str) -> str:
+    """Key under which two links to the same page compare equal"""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if host.endswith(":80") or host.endswith(":443"):
+        host = host.rsplit(":", 1)[0]
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query) if not TRACKING_PARAMS.match(k)))
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(("", host, path, query, ""))
+
+def shingles(text: str, size: int = 3) -> Set[str]:
+    """Word ``size``-grams of ``text``, lower-cased"""
+    words = re.findall(r"\w+", text.lower())
+    if len(words) < size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+def similarity(a: Set[str], b: Set[str]) -> float:
+    """Jaccard similarity of two shingle sets"""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+@dataclass
+class SearchHit:
+    """One merged result and the queries that found it"""
+    title: str
+    url: str
+    content: str
+    score: float
+    queries: List[str] = field(default_factory=list)
+    rank_score: float = 0.0
+    duplicates: List[str] = field(default_factory=list)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "title": self.title,
+            "url": self.url,
+            "content": self.content,
+            "score": round(self.score, 4),
+            "rank_score": round(self.rank_score, 4),
+            "queries": self.queries,
+            "duplicates": self.duplicates
+        }
+
+def merge_results(
+    results_by_query: Dict[str, List[Dict[str, Any]]],
+    min_similarity: float = 0.8,
+    max_results: Optional[int] = 10,
+    rrf_k: int = 60
+) -> List[SearchHit]:
+    """Deduplicate the results of several queries and rank them together
+
+    Results with the same normalized URL, or whose content shingles are at
+    least ``min_similarity`` alike (mirrors, syndicated copies), are merged.
+    Merged results are ranked by reciprocal rank fusion over the queries that
+    found them, so a page found by several queries rises; the backend score
+    breaks ties.
+
+    Args:
+        results_by_query: Backend results (``title``, ``url``, ``content``, ``score``) per query, best first
+        min_similarity: Content similarity from which two results are the same
+        max_results: Merged results kept (None keeps them all)
+        rrf_k: Reciprocal rank fusion constant
+
+    Returns:
+        Merged results, best first
+    """
+    hits: List[SearchHit] = []
+    by_url: Dict[str, SearchHit] = {}
+    fingerprints: List[Set[str]] = []
+    for query, results in results_by_query.items():
+        for rank, result in enumerate(results):
+            url = result.get("url") or ""
+            key = normalize_url(url) if url else None
+            content = result.get("content") or ""
+            fingerprint = shingles(content)
+            hit = by_url.get(key) if key else None
+            if hit is None and fingerprint:
+                hit = next((h for h, f in zip(hits, fingerprints) if similarity(fingerprint, f) >= min_similarity),
+                           None)
+            score = float(result.get("score") or 0.0)
+            if hit is None:
+                hit = SearchHit(result.get("title") or url, url, content, score)
+                hits.append(hit)
+                fingerprints.append(fingerprint)
+            else:
+                if url and normalize_url(hit.url) != key and url not in hit.duplicates:
+                    hit.duplicates.append(url)
+                if score > hit.score:
+                    hit.score = score
+                if len(content) > len(hit.content):
+                    hit.content = content
+            if key:
+                by_url.setdefault(key, hit)
+            if query not in hit.queries:
+                hit.queries.append(query)
+                hit.rank_score += 1.0 / (rrf_k + rank + 1)
+    hits.sort(key=lambda h: (h.rank_score, h.score), reverse=True)
+    return hits[:max_results] if max_results is not None else hits
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+class MultiSearch:
+    """
+    Runs several search queries concurrently and merges their results
+
+    ``search(query, max_results)`` is the backend call (Tavily's
+    ``client.search`` response shape: ``results`` and optionally ``answer``).
+    Queries that only differ in case or spacing are sent once, at most
+    ``max_concurrency`` run at a time, and a failing query does not fail the
+    others.
+    """
+
+    def __init__(
+        self,
+        search: Callable[[str, int], Dict[str, Any]],
+        max_concurrency: int = 4,
+        min_similarity: float = 0.8,
+        max_results: int = 10
+    ):
+        self.backend = search
+        self.min_similarity = min_similarity
+        self.max_results = max_results
+        self.searches = 0
+        self.queries_sent = 0
+        self.queries_skipped = 0
+        self.results_received = 0
+        self.duplicates_removed = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="multi-search")
+        self._lock = threading.Lock()
+
+    def _run(self, query: str, max_results: int) -> Dict[str, Any]:
+        try:
+            return self.backend(query, max_results)
+        except Exception as e:
+            logger.warning(f"⚠️ Search failed for {query!r}: {e}")
+            return {"error": str(e)}
+
+    def search(self, queries: Sequence[str], max_results_per_query: int = 5) -> Dict[str, Any]:
+        """Merged, deduplicated results of ``queries``
+
+        Returns:
+            ``results`` (merged hits as dicts), ``answers`` per query when the
+            backend gives one, ``errors`` per failed query and ``stats``
+        """
+        started = time.perf_counter()
+        unique = list({normalize_query(q): q.strip() for q in queries if q.strip()}.values())
+        responses = dict(zip(unique, self._pool.map(lambda q: self._run(q, max_results_per_query), unique)))
+
+        errors = {q: r["error"] for q, r in responses.items() if "error" in r}
+        results_by_query = {q: list(r.get("results") or []) for q, r in responses.items() if "error" not in r}
+        received = sum(len(results) for results in results_by_query.values())
+        merged = merge_results(results_by_query, self.min_similarity, max_results=None)
+        hits = merged[:self.max_results]
+        seconds = time.perf_counter() - started
+
+        with self._lock:
+            self.searches += 1
+            self.queries_sent += len(unique)
+            self.queries_skipped += len(queries) - len(unique)
+            self.results_received += received
+            self.duplicates_removed += received - len(merged)
+            self.errors += len(errors)
+            self.total_seconds += seconds
+        return {
+            "results": [hit.as_dict() for hit in hits],
+            "answers": {q: r["answer"] for q, r in responses.items() if r.get("answer")},
+            "errors": errors,
+            "stats": {"queries": len(unique), "results_received": received,
+                      "duplicates_removed": received - len(merged), "seconds": round(seconds, 3)}
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "searches": self.searches,
+            "queries_sent": self.queries_sent,
+            "duplicate_queries_skipped": self.queries_skipped,
+            "avg_queries_per_search": round(self.queries_sent / self.searches, 2) if self.searches else 0.0,
+            "results_received": self.results_received,
+            "duplicates_removed": self.duplicates_removed,
+            "errors": self.errors,
+            "avg_seconds": round(self.total_seconds / self.searches, 3) if self.searches else 0.0
+        }
@@ -0,0 +1,564 @@
+"""
+Load-balanced pool of Ollama backends
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import AbstractSet, Any, AsyncIterator, Dict, Iterator, List, Optional, Set, Tuple
+
+import httpx
+import ollama
+from utils.cancellation import RunCancelled, check_cancelled, count_token, current_cancel
+
+logger = logging.getLogger(__name__)
+
+STRATEGIES = ("residency", "least_outstanding")
+
+# Calls that generate tokens; inside a cancellable run they are streamed so they can be dropped mid-generation
+GENERATION_METHODS = ("chat", "generate")
+
+# Set around a chat session's turns so they stay on the host holding its cached context
+affinity_key: ContextVar[Optional[str]] = ContextVar("ollama_affinity_key", default=None)
+
+@dataclass
+class Backend:
+    """Routing state for one Ollama host"""
+    host: str
+    outstanding: int = 0
+    consecutive_failures: int = 0
+    ejected_until: float = 0.0
+    resident_models: Set[str] = field(default_factory=set)
+    total_requests: int = 0
+    total_errors: int = 0
+
+    def is_ejected(self, now: Optional[float] = None) -> bool:
+        return (now or time.monotonic()) < self.ejected_until
+
+def classify_error(error: Exception) -> Tuple[bool, bool]:
+    """
+    Decide how the pool reacts to a failed call
+
+    Returns:
+        (retry on another host, count against the host's health)
+    """
+    if isinstance(error, ollama.ResponseError):
+        # 404: model missing on this host, another host may have it
+        return error.status_code >= 500 or error.status_code == 404, error.status_code >= 500
+    if isinstance(error, (ConnectionError, httpx.TransportError)):
+        return True, True
+    return False, False
+
+def parse_model_hosts(spec: str) -> Dict[str, List[str]]:
+    """
+    Parse ``model=host|host;model=host`` into a model -> hosts mapping
+
+    Example: ``qwen3:8b=http://a:11434|http://b:11434;phi3:mini=http://c:11434``
+    """
+    mapping: Dict[str, List[str]] = {}
+    for entry in spec.split(";"):
+        if "=" not in entry:
+            continue
+        model, hosts = entry.split("=", 1)
+        mapping[model.strip()] = [h.strip() for h in hosts.split("|") if h.strip()]
+    return mapping
+
+class OllamaBackendPool:
+    """
+    Routes Ollama calls across several hosts
+
+    Each call picks a host that serves the model, preferring hosts where the
+    model is already resident (``residency``) and then the fewest requests in
+    flight (``least_outstanding``). Hosts that fail ``eject_after`` times in a
+    row are ejected for ``eject_seconds`` and the call is retried on another
+    host. Streams are only retried before their first chunk. Calls made while
+    ``affinity_key`` is set go back to the host that served that key last, as
+    long as it is healthy, so a session keeps hitting Ollama's prompt cache.
+
+    Inside a cancellable run (``utils.cancellation.current_cancel``), chat
+    and generate calls are streamed even when the caller asked for a single
+    response: the run's token is checked between chunks, and once it is
+    cancelled the HTTP stream is closed, which stops the generation in Ollama.
+    """
+
+    def __init__(
+        self,
+        hosts: List[str],
+        model_hosts: Optional[Dict[str, List[str]]] = None,
+        strategy: str = "residency",
+        max_attempts: int = 2,
+        eject_after: int = 3,
+        eject_seconds: float = 30.0,
+        probe_interval: float = 15.0,
+        client_kwargs: Optional[Dict[str, Any]] = None,
+        max_affinity_keys: int = 4096
+    ):
+        if not hosts:
+            raise ValueError("At least one Ollama host is required")
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown routing strategy '{strategy}', expected one of {STRATEGIES}")
+
+        self.backends: Dict[str, Backend] = {host: Backend(host=host) for host in hosts}
+        self.model_hosts = model_hosts or {}
+        for model_hosts_list in self.model_hosts.values():
+            for host in model_hosts_list:
+                self.backends.setdefault(host, Backend(host=host))
+        self.strategy = strategy
+        self.max_attempts = max(1, max_attempts)
+        self.eject_after = eject_after
+        self.eject_seconds = eject_seconds
+        self.probe_interval = probe_interval
+        self.client_kwargs = client_kwargs or {}
+        self.max_affinity_keys = max_affinity_keys
+        self.retries = 0
+        self.affinity_hits = 0
+        self._affinity: "OrderedDict[str, str]" = OrderedDict()
+
+        self._lock = threading.Lock()
+        self._clients: Dict[str, ollama.Client] = {}
+        # Async clients are bound to the event loop that created them
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, ollama.AsyncClient]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._probe_task: Optional[asyncio.Task] = None
+
+    @property
+    def primary_host(self) -> str:
+        return next(iter(self.backends))
+
+    # Routing
+
+    def hosts_for(self, model: Optional[str]) -> List[str]:
+        if model:
+            for key in (model, model.split(":")[0]):
+                if key in self.model_hosts:
+                    return self.model_hosts[key]
+        return list(self.backends)
+
+    def acquire(self, model: Optional[str], exclude: AbstractSet[str] = frozenset()) -> Optional[Backend]:
+        """Pick a backend for ``model`` and count the request as outstanding"""
+        now = time.monotonic()
+        with self._lock:
+            candidates = [self.backends[h] for h in self.hosts_for(model) if h not in exclude]
+            if not candidates:
+                return None
+            healthy = [b for b in candidates if not b.is_ejected(now)]
+            # With every candidate ejected, fail open on the one that comes back first
+            pool = healthy or [min(candidates, key=lambda b: b.ejected_until)]
+
+            def score(backend: Backend):
+                cold = model not in backend.resident_models if self.strategy == "residency" else False
+                return (cold, backend.outstanding, backend.total_requests)
+
+            key = affinity_key.get()
+            pinned = self.backends.get(self._affinity.get(key, "")) if key is not None else None
+            if pinned is not None and pinned in pool:
+                backend = pinned
+                self.affinity_hits += 1
+            else:
+                backend = min(pool, key=score)
+            if key is not None:
+                self._affinity[key] = backend.host
+                self._affinity.move_to_end(key)
+                while len(self._affinity) > self.max_affinity_keys:
+                    self._affinity.popitem(last=False)
+            backend.outstanding += 1
+            backend.total_requests += 1
+            return backend
+
+    def release(self, backend: Backend, model: Optional[str], error: Optional[Exception] = None):
+        with self._lock:
+            backend.outstanding = max(0, backend.outstanding - 1)
+            if error is None:
+                backend.consecutive_failures = 0
+                backend.ejected_until = 0.0
+                if model:
+                    backend.resident_models.add(model)
+                return
+
+            backend.total_errors += 1
+            _, unhealthy = classify_error(error)
+            if isinstance(error, ollama.ResponseError) and error.status_code == 404 and model:
+                backend.resident_models.discard(model)
+            if unhealthy:
+                backend.consecutive_failures += 1
+                if backend.consecutive_failures >= self.eject_after:
+                    backend.ejected_until = time.monotonic() + self.eject_seconds
+                    logger.warning(
+                        f"Ejecting Ollama backend {backend.host} for {self.eject_seconds}s "
+                        f"after {backend.consecutive_failures} failures: {error}"
+                    )
+
+    def _attempts(self, model: Optional[str]) -> Iterator[Backend]:
+        tried: Set[str] = set()
+        for _ in range(self.max_attempts):
+            backend = self.acquire(model, exclude=tried)
+            if backend is None:
+                return
+            tried.add(backend.host)
+            yield backend
+
+    def _give_up(self, error: Exception, backend: Backend, attempt: int, model: Optional[str]) -> bool:
+        """Release after a failure; return True when the error must be raised"""
+        self.release(backend, model, error)
+        retry, _ = classify_error(error)
+        if not retry or attempt + 1 >= min(self.max_attempts, len(self.hosts_for(model))):
+            return True
+        self.retries += 1
+        logger.info(f"Retrying Ollama {model or 'call'} on another host after error on {backend.host}: {error}")
+        return False
+
+    # Clients
+
+    def _client(self, host: str) -> ollama.Client:
+        if host not in self._clients:
+            self._clients[host] = ollama.Client(host=host, **self.client_kwargs)
+        return self._clients[host]
+
+    def _async_client(self, host: str) -> ollama.AsyncClient:
+        clients = self._async_clients.setdefault(asyncio.get_running_loop(), {})
+        if host not in clients:
+            clients[host] = ollama.AsyncClient(host=host, **self.client_kwargs)
+        return clients[host]
+
+    def client(self) -> "PooledClient":
+        """Drop-in replacement for ``ollama.Client`` routed through the pool"""
+        return PooledClient(self)
+
+    def async_client(self) -> "AsyncPooledClient":
+        """Drop-in replacement for ``ollama.AsyncClient`` routed through the pool"""
+        return AsyncPooledClient(self)
+
+    def call(self, method: str, *args, **kwargs) -> Any:
+        model = kwargs.get("model")
+        if kwargs.get("stream"):
+            return self._stream(method, model, args, kwargs)
+        check_cancelled()
+        if method in GENERATION_METHODS and current_cancel.get() is not None:
+            return collect_stream(list(self._stream(method, model, args, {**kwargs, "stream": True})))
+        for attempt, backend in enumerate(self._attempts(model)):
+            try:
+                result = getattr(self._client(backend.host), method)(*args, **kwargs)
+            except Exception as e:
+                if self._give_up(e, backend, attempt, model):
+                    raise
+                continue
+            self.release(backend, model)
+            return result
+        raise ConnectionError(f"No Ollama backend available for {model or method}")
+
+    def _stream(self, method: str, model: Optional[str], args, kwargs) -> Iterator[Any]:
+        check_cancelled()
+        for attempt, backend in enumerate(self._attempts(model)):
+            try:
+                stream = iter(getattr(self._client(backend.host), method)(*args, **kwargs))
+                first = next(stream)
+            except StopIteration:
+                self.release(backend, model)
+                return
+            except Exception as e:
+                if self._give_up(e, backend, attempt, model):
+                    raise
+                continue
+            error: Optional[Exception] = None
+            try:
+                chunk = first
+                while True:
+                    if not getattr(chunk, "done", False):
+                        count_token()
+                    check_cancelled()
+                    yield chunk
+                    chunk = next(stream)
+            except StopIteration:
+                pass
+            except RunCancelled:
+                raise
+            except Exception as e:
+                error = e
+                raise
+            finally:
+                # Closing the response drops the connection, and Ollama stops generating
+                stream.close()
+                self.release(backend, model, error)
+            return
+        raise ConnectionError(f"No Ollama backend available for {model or method}")
+
+    async def acall(self, method: str, *args, **kwargs) -> Any:
+        model = kwargs.get("model")
+        if kwargs.get("stream"):
+            return self._astream(method, model, args, kwargs)
+        check_cancelled()
+        if method in GENERATION_METHODS and current_cancel.get() is not None:
+            chunks = self._astream(method, model, args, {**kwargs, "stream": True})
+            return collect_stream([chunk async for chunk in chunks])
+        for attempt, backend in enumerate(self._attempts(model)):
+            try:
+                result = await getattr(self._async_client(backend.host), method)(*args, **kwargs)
+            except Exception as e:
+                if self._give_up(e, backend, attempt, model):
+                    raise
+                continue
+            self.release(backend, model)
+            return result
+        raise ConnectionError(f"No Ollama backend available for {model or method}")
+
+    async def _astream(self, method: str, model: Optional[str], args, kwargs) -> AsyncIterator[Any]:
+        check_cancelled()
+        for attempt, backend in enumerate(self._attempts(model)):
+            try:
+                stream = (await getattr(self._async_client(backend.host), method)(*args, **kwargs)).__aiter__()
+                first = await stream.__anext__()
+            except StopAsyncIteration:
+                self.release(backend, model)
+                return
+            except Exception as e:
+                if self._give_up(e, backend, attempt, model):
+                    raise
+                continue
+            error: Optional[Exception] = None
+            try:
+                chunk = first
+                while True:
+                    if not getattr(chunk, "done", False):
+                        count_token()
+                    check_cancelled()
+                    yield chunk
+                    chunk = await stream.__anext__()
+            except StopAsyncIteration:
+                pass
+            except RunCancelled:
+                raise
+            except Exception as e:
+                error = e
+                raise
+            finally:
+                await stream.aclose()
+                self.release(backend, model, error)
+            return
+        raise ConnectionError(f"No Ollama backend available for {model or method}")
+
+    # Inventory across hosts
+
+    @staticmethod
+    def _merge_models(responses: List[Tuple[str, Any]]) -> Dict[str, Any]:
+        merged: Dict[str, Dict[str, Any]] = {}
+        for host, response in responses:
+            for model in response.get("models", []):
+                data = model.model_dump(mode="json") if hasattr(model, "model_dump") else dict(model)
+                name = data.get("model") or data.get("name")
+                if not name:
+                    continue
+                entry = merged.setdefault(name, {**data, "hosts": []})
+                entry["hosts"].append(host)
+        return {"models": list(merged.values())}
+
+    def list_all(self) -> Dict[str, Any]:
+        """Union of the models installed on every healthy host"""
+        responses, last_error = [], None
+        for backend in self.backends.values():
+            if backend.is_ejected():
+                continue
+            try:
+                responses.append((backend.host, self._client(backend.host).list()))
+            except Exception as e:
+                last_error = e
+                self.release_probe(backend, e)
+        if not responses and last_error is not None:
+            raise last_error
+        return self._merge_models(responses)
+
+    async def alist_all(self) -> Dict[str, Any]:
+        backends = [b for b in self.backends.values() if not b.is_ejected()]
+        results = await asyncio.gather(
+            *(self._async_client(b.host).list() for b in backends), return_exceptions=True
+        )
+        responses, last_error = [], None
+        for backend, result in zip(backends, results):
+            if isinstance(result, Exception):
+                last_error = result
+                self.release_probe(backend, result)
+            else:
+                responses.append((backend.host, result))
+        if not responses and last_error is not None:
+            raise last_error
+        return self._merge_models(responses)
+
+    # Health probing
+
+    def release_probe(self, backend: Backend, error: Optional[Exception]):
+        """Account for a health probe the same way as a routed request"""
+        with self._lock:
+            backend.outstanding += 1
+        self.release(backend, None, error)
+
+    async def probe(self):
+        """Check every host with /api/ps: refresh resident models and re-admit recovered hosts"""
+        backends = list(self.backends.values())
+        results = await asyncio.gather(*(self._async_client(b.host).ps() for b in backends), return_exceptions=True)
+        for backend, result in zip(backends, results):
+            if isinstance(result, Exception):
+                self.release_probe(backend, result)
+                continue
+            if isinstance(result, BaseException):
+                raise result
+            resident: Set[str] = set()
+            for model in result.get("models", []):
+                data = model.model_dump(mode="json") if hasattr(model, "model_dump") else dict(model)
+                name = data.get("model") or data.get("name")
+                if name:
+                    resident.add(name)
+            with self._lock:
+                backend.resident_models = resident
+            self.release_probe(backend, None)
+
+    async def _probe_periodically(self):
+        while True:
+            try:
+                await self.probe()
+            except Exception as e:
+                logger.error(f"Ollama backend probe failed: {e}")
+            await asyncio.sleep(self.probe_interval)
+
+    def start(self):
+        """Start periodic health and residency probes on the running event loop"""
+        if self._probe_task is None or self._probe_task.done():
+            self._probe_task = asyncio.get_running_loop().create_task(self._probe_periodically())
+
+    async def stop(self):
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            try:
+                await self._probe_task
+            except asyncio.CancelledError:
+                pass
+            self._probe_task = None
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "strategy": self.strategy,
+                "retries": self.retries,
+                "affinity_keys": len(self._affinity),
+                "affinity_hits": self.affinity_hits,
+                "backends": [
+                    {
+                        "host": b.host,
+                        "healthy": not b.is_ejected(now),
+                        "ejected_for": round(max(0.0, b.ejected_until - now), 1),
+                        "outstanding": b.outstanding,
+                        "consecutive_failures": b.consecutive_failures,
+                        "resident_models": sorted(b.resident_models),
+                        "total_requests": b.total_requests,
+                        "total_errors": b.total_errors
+                    }
+                    for b in self.backends.values()
+                ]
+            }
+
+def collect_stream(chunks: List[Any]) -> Any:
+    """The single response Ollama would have returned for these streamed chunks"""
+    if not chunks:
+        raise ConnectionError("Ollama stream ended without a response")
+    last = chunks[-1]
+    if getattr(last, "message", None) is not None:
+        messages = [chunk.message for chunk in chunks]
+        tool_calls = [call for message in messages for call in (message.tool_calls or [])]
+        message = last.message.model_copy(update={
+            "content": "".join(m.content or "" for m in messages),
+            "thinking": "".join(m.thinking or "" for m in messages) or None,
+            "tool_calls": tool_calls or None
+        })
+        return last.model_copy(update={"message": message})
+    return last.model_copy(update={
+        "response": "".join(chunk.response or "" for chunk in chunks),
+        "thinking": "".join(chunk.thinking or "" for chunk in chunks) or None
+    })
+
+class PooledClient:
+    """``ollama.Client`` look-alike whose calls are routed by an OllamaBackendPool"""
+
+    def __init__(self, pool: OllamaBackendPool):
+        self.pool = pool
+
+    def __deepcopy__(self, memo):
+        # Routing facades are shared: copied agents must keep using the same pool
+        return self
+
+    def chat(self, *args, **kwargs):
+        return self.pool.call("chat", *args, **kwargs)
+
+    def generate(self, *args, **kwargs):
+        return self.pool.call("generate", *args, **kwargs)
+
+    def embed(self, *args, **kwargs):
+        return self.pool.call("embed", *args, **kwargs)
+
+    def embeddings(self, *args, **kwargs):
+        return self.pool.call("embeddings", *args, **kwargs)
+
+    def list(self):
+        return self.pool.list_all()
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.pool._client(self.pool.primary_host), name)
+
+class AsyncPooledClient:
+    """``ollama.AsyncClient`` look-alike whose calls are routed by an OllamaBackendPool"""
+
+    def __init__(self, pool: OllamaBackendPool):
+        self.pool = pool
+
+    def __deepcopy__(self, memo):
+        return self
+
+    async def chat(self, *args, **kwargs):
+        return await self.pool.acall("chat", *args, **kwargs)
+
+    async def generate(self, *args, **kwargs):
+        return await self.pool.acall("generate", *args, **kwargs)
+
+    async def embed(self, *args, **kwargs):
+        return await self.pool.acall("embed", *args, **kwargs)
+
+    async def embeddings(self, *args, **kwargs):
+        return await self.pool.acall("embeddings", *args, **kwargs)
+
+    async def list(self):
+        return await self.pool.alist_all()
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.pool._async_client(self.pool.primary_host), name)
+
+def pool_from_env() -> OllamaBackendPool:
+    """
+    Build the pool from environment variables
+
+    OLLAMA_HOSTS: comma-separated hosts (defaults to OLLAMA_HOST)
+    OLLAMA_MODEL_HOSTS: optional ``model=host|host;model=host`` restrictions
+    OLLAMA_ROUTING: ``residency`` (default) or ``least_outstanding``
+    """
+    default_host = os.getenv("OLLAMA_HOST", "http://localhost:11434")
+    hosts = [h.strip() for h in os.getenv("OLLAMA_HOSTS", default_host).split(",") if h.strip()]
+    return OllamaBackendPool(
+        hosts=hosts,
+        model_hosts=parse_model_hosts(os.getenv("OLLAMA_MODEL_HOSTS", "")),
+        strategy=os.getenv("OLLAMA_ROUTING", "residency"),
+        max_attempts=int(os.getenv("OLLAMA_MAX_ATTEMPTS", "2")),
+        eject_after=int(os.getenv("OLLAMA_EJECT_AFTER", "3")),
+        eject_seconds=float(os.getenv("OLLAMA_EJECT_SECONDS", "30")),
+        client_kwargs={"timeout": float(os.environ["OLLAMA_TIMEOUT"])} if os.getenv("OLLAMA_TIMEOUT") else None
+    )
+
+# Global pool shared by every agent, team and embedder
+ollama_pool = pool_from_env()
@@ -0,0 +1,208 @@
+"""
+Bounded, staged async pipeline
+"""
+
+import asyncio
+import inspect
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+@dataclass
+class Stage:
+    """
+    One step of a ``StagePipeline``
+
+    ``func`` is an async callable taking one item (or a list of up to
+    ``batch_size`` items when ``batch_size > 1``). It returns the item for the
+    next stage, ``None`` to drop it, or - with ``fan_out`` - an iterable of
+    items that are forwarded one by one.
+    """
+    name: str
+    func: Callable[[Any], Awaitable[Any]]
+    workers: int = 1
+    queue_size: int = 16
+    fan_out: bool = False
+    batch_size: int = 1
+
+@dataclass
+class StageStats:
+    name: str
+    workers: int
+    items_in: int = 0
+    items_out: int = 0
+    errors: int = 0
+    busy_seconds: float = 0.0
+    queued: int = 0
+
+    def to_dict(self, elapsed: float) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "workers": self.workers,
+            "items_in": self.items_in,
+            "items_out": self.items_out,
+            "errors": self.errors,
+            "queued": self.queued,
+            "busy_seconds": round(self.busy_seconds, 3),
+            # Share of the wall clock the stage's workers spent working
+            "utilization": round(self.busy_seconds / (elapsed * self.workers), 3) if elapsed else 0.0,
+            "throughput_per_s": round(self.items_out / elapsed, 2) if elapsed else 0.0
+        }
+
+@dataclass
+class PipelineStats:
+    stages: List[StageStats]
+    started_at: float = field(default_factory=time.monotonic)
+    finished_at: Optional[float] = None
+    errors: List[Dict[str, str]] = field(default_factory=list)
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    @property
+    def completed(self) -> int:
+        return self.stages[-1].items_out if self.stages else 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        elapsed = self.elapsed
+        return {
+            "elapsed_seconds": round(elapsed, 3),
+            "completed": self.completed,
+            "throughput_per_s": round(self.completed / elapsed, 2) if elapsed else 0.0,
+            "stages": [s.to_dict(elapsed) for s in self.stages],
+            "errors": self.errors
+        }
+
+    def summary(self) -> str:
+        parts = [f"{s.name} {s.items_out}/{s.items_in}" + (f" ({s.errors} err)" if s.errors else "")
+                 for s in self.stages]
+        return f"{' → '.join(parts)} in {self.elapsed:.1f}s"
+
+class StagePipeline:
+    """
+    Streams items through a chain of stages connected by bounded queues
+
+    Every stage runs ``workers`` concurrent tasks, so slow stages overlap
+    with fast ones instead of each stage waiting for the previous one to
+    finish the whole input. Bounded queues apply back-pressure: a fast
+    producer blocks once the next stage is ``queue_size`` items behind.
+    A failing item is logged, counted and dropped; the rest keep flowing.
+    """
+
+    def __init__(
+        self,
+        stages: List[Stage],
+        on_progress: Optional[Callable[[PipelineStats], Any]] = None,
+        progress_interval: float = 2.0,
+        on_error: Optional[Callable[[str, Any, Exception], None]] = None
+    ):
+        if not stages:
+            raise ValueError("A pipeline needs at least one stage")
+        self.stages = stages
+        self.on_progress = on_progress
+        self.progress_interval = progress_interval
+        # Called as on_error(stage_name, item, error) for every failed item
+        self.on_error = on_error
+
+    async def run(self, items: Iterable[Any]) -> PipelineStats:
+        """Feed ``items`` through every stage and return the run statistics"""
+        stats = PipelineStats(stages=[StageStats(name=s.name, workers=s.workers) for s in self.stages])
+        queues: List[asyncio.Queue] = [asyncio.Queue(maxsize=s.queue_size) for s in self.stages]
+        remaining = [s.workers for s in self.stages]
+
+        async def forward(index: int, item: Any):
+            if index + 1 < len(queues):
+                await queues[index + 1].put(item)
+
+        async def worker(index: int):
+            stage, stage_stats, queue = self.stages[index], stats.stages[index], queues[index]
+            done = False
+            while not done:
+                batch = []
+                item = await queue.get()
+                while item is not _DONE:
+                    batch.append(item)
+                    if len(batch) >= stage.batch_size or queue.empty():
+                        break
+                    item = queue.get_nowait()
+                if item is _DONE:
+                    # Let sibling workers see the sentinel too
+                    await queue.put(_DONE)
+                    done = True
+                if not batch:
+                    continue
+
+                stage_stats.items_in += len(batch)
+                started = time.perf_counter()
+                try:
+                    result = await stage.func(batch if stage.batch_size > 1 else batch[0])
+                except Exception as e:
+                    stage_stats.errors += len(batch)
+                    stats.errors.append({"stage": stage.name, "item": repr(batch[0])[:200], "error": str(e)})
+                    logger.error(f"Pipeline stage '{stage.name}' failed: {e}")
+                    if self.on_error:
+                        self.on_error(stage.name, batch if stage.batch_size > 1 else batch[0], e)
+                    continue
+                finally:
+                    stage_stats.busy_seconds += time.perf_counter() - started
+
+                if result is None:
+                    continue
+                if stage.fan_out:
+                    if inspect.isasyncgen(result):
+                        async for out in result:
+                            stage_stats.items_out += 1
+                            await forward(index, out)
+                        continue
+                    result = list(result)
+                else:
+                    result = [result]
+                for out in result:
+                    stage_stats.items_out += 1
+                    await forward(index, out)
+
+            remaining[index] -= 1
+            if remaining[index] == 0 and index + 1 < len(queues):
+                await queues[index + 1].put(_DONE)
+
+        async def feed():
+            for item in items:
+                await queues[0].put(item)
+            await queues[0].put(_DONE)
+
+        async def report(on_progress: Callable[[PipelineStats], Any]):
+            while True:
+                await asyncio.sleep(self.progress_interval)
+                for stage_stats, queue in zip(stats.stages, queues):
+                    stage_stats.queued = queue.qsize()
+                result = on_progress(stats)
+                if inspect.isawaitable(result):
+                    await result
+
+        tasks = [asyncio.create_task(feed())]
+        for index, stage in enumerate(self.stages):
+            tasks.extend(asyncio.create_task(worker(index)) for _ in range(stage.workers))
+        reporter = asyncio.create_task(report(self.on_progress)) if self.on_progress else None
+
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            if reporter is not None:
+                reporter.cancel()
+                try:
+                    await reporter
+                except asyncio.CancelledError:
+                    pass
+            stats.finished_at = time.monotonic()
+            for stage_stats in stats.stages:
+                stage_stats.queued = 0
+
+        return stats
@@ -0,0 +1,358 @@
+"""
+Pool of warm, resource-limited Python processes for running generated code
+"""
+
+import atexit
+import logging
+import multiprocessing
+import os
+import queue
+import resource
+import runpy
+import signal
+import sys
+import threading
+import time
+import traceback
+from dataclasses import dataclass
+from multiprocessing.context import ForkServerContext, SpawnContext
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+logger = logging.getLogger(__name__)
+
+# Imported once by the fork server, so every worker starts with them loaded
+DEFAULT_PRELOAD = ("math", "json", "statistics", "datetime", "decimal", "fractions", "itertools",
+                   "collections", "random", "re", "numpy", "pandas")
+
+class CpuLimitExceeded(BaseException):
+    """Raised inside a worker when a run uses up its CPU seconds (not caught by ``except Exception``)"""
+
+@dataclass
+class ExecutionResult:
+    """Outcome of one run"""
+    output: str = ""
+    value: Optional[str] = None
+    error: Optional[str] = None
+    timed_out: bool = False
+    truncated: bool = False
+    duration: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def as_text(self) -> str:
+        """Compact report for a model: output, then the requested variable or the error"""
+        parts = []
+        if self.output:
+            parts.append("Output:\n" + self.output + ("\n[output truncated]" if self.truncated else ""))
+        if self.error:
+            parts.append("Error:\n" + self.error)
+        elif self.value is not None:
+            parts.append(f"Value:\n{self.value}")
+        return "\n\n".join(parts) or "Code ran successfully (no output)"
+
+# Worker process side
+
+class _StreamWriter:
+    """``sys.stdout`` replacement sending text to the parent, line by line"""
+
+    def __init__(self, conn, limit: int):
+        self.conn = conn
+        self.limit = limit
+        self.sent = 0
+        self.buffer = ""
+
+    def write(self, text: str) -> int:
+        self.buffer += text
+        if "\n" in self.buffer or len(self.buffer) >= 1024:
+            self.flush()
+        return len(text)
+
+    def flush(self):
+        if self.buffer and self.sent < self.limit:
+            chunk = self.buffer[:self.limit - self.sent]
+            self.conn.send(("output", chunk))
+            self.sent += len(chunk)
+        self.buffer = ""
+
+    def isatty(self) -> bool:
+        return False
+
+def _raise_cpu_limit(signum, frame):
+    raise CpuLimitExceeded("CPU time limit exceeded")
+
+def _address_space_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
+
+def _worker_main(conn, workdir: str, preload: Sequence[str], cpu_seconds: float, memory_mb: int, max_output: int):
+    for module in preload:
+        try:
+            __import__(module)
+        except ImportError:
+            pass
+    os.chdir(workdir)
+    if memory_mb:
+        # On top of what the warm interpreter (numpy, pandas...) already maps
+        limit = _address_space_bytes() + memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, resource.getrlimit(resource.RLIMIT_AS)[1]))
+    signal.signal(signal.SIGXCPU, _raise_cpu_limit)
+    conn.send(("ready", os.getpid()))
+
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+        writer = _StreamWriter(conn, max_output)
+        stdout, stderr = sys.stdout, sys.stderr
+        sys.stdout = sys.stderr = writer
+        value, error, fatal = None, None, False
+        try:
+            if cpu_seconds:
+                usage = resource.getrusage(resource.RUSAGE_SELF)
+                soft = int(usage.ru_utime + usage.ru_stime + cpu_seconds) + 1
+                resource.setrlimit(resource.RLIMIT_CPU, (soft, resource.getrlimit(resource.RLIMIT_CPU)[1]))
+            os.chdir(workdir)
+            if task.get("file_name"):
+                path = Path(workdir, task["file_name"])
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_text(task["code"], encoding="utf-8")
+                namespace = runpy.run_path(str(path), run_name="__main__")
+            else:
+                namespace = {"__name__": "__main__"}
+                exec(compile(task["code"], "<code>", "exec"), namespace)
+            name = task.get("variable_to_return")
+            if name:
+                value = str(namespace[name]) if name in namespace else f"Variable {name} not found"
+        except CpuLimitExceeded:
+            error, fatal = f"CPU time limit of {cpu_seconds:g}s exceeded", True
+        except MemoryError:
+            error, fatal = f"Memory limit of {memory_mb} MB exceeded", True
+        except BaseException:
+            error = traceback.format_exc(limit=-3)
+        finally:
+            sys.stdout, sys.stderr = stdout, stderr
+            if cpu_seconds:
+                hard = resource.getrlimit(resource.RLIMIT_CPU)[1]
+                resource.setrlimit(resource.RLIMIT_CPU, (hard, hard))
+        try:
+            writer.flush()
+            conn.send(("done", {"value": value, "error": error, "truncated": writer.sent >= max_output,
+                                "recycle": fatal}))
+        except MemoryError:
+            return
+        if fatal:
+            return
+
+# Parent side
+
+class _Worker:
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+        self.tasks = 0
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=5)
+        self.conn.close()
+
+class PythonWorkerPool:
+    """
+    Runs code in ``size`` pre-started worker processes
+
+    Workers are forked from a fork server that has already imported
+    ``preload`` (numpy, pandas...), so neither the fork nor ``import numpy``
+    in user code costs anything at run time. Each run gets a fresh namespace,
+    ``cpu_seconds`` of CPU, ``memory_mb`` of extra address space and
+    ``timeout`` seconds of wall time; stdout/stderr are streamed back as they
+    are written. A worker that hits a limit is killed and replaced, and every
+    worker is recycled after ``max_tasks_per_worker`` runs.
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        workdir: str = "data/code",
+        preload: Sequence[str] = DEFAULT_PRELOAD,
+        timeout: float = 30.0,
+        cpu_seconds: float = 20.0,
+        memory_mb: int = 1024,
+        max_output_chars: int = 20000,
+        max_tasks_per_worker: int = 50
+    ):
+        self.size = size
+        self.workdir = str(Path(workdir).resolve())
+        self.preload = list(preload)
+        self.timeout = timeout
+        self.cpu_seconds = cpu_seconds
+        self.memory_mb = memory_mb
+        self.max_output_chars = max_output_chars
+        self.max_tasks_per_worker = max_tasks_per_worker
+
+        self.runs = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.killed = 0
+        self.total_duration = 0.0
+        self.total_wait = 0.0
+
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._workers: List[_Worker] = []
+        self._started = False
+        self._closed = False
+        self._context: Optional[Union[ForkServerContext, SpawnContext]] = None
+
+    def _ctx(self) -> Union[ForkServerContext, SpawnContext]:
+        if self._context is None:
+            if "forkserver" in multiprocessing.get_all_start_methods():
+                forkserver = multiprocessing.get_context("forkserver")
+                forkserver.set_forkserver_preload([__name__] + self.preload)
+                self._context = forkserver
+            else:
+                self._context = multiprocessing.get_context("spawn")
+        return self._context
+
+    def start(self):
+        """Start the workers now instead of on the first run"""
+        with self._lock:
+            if self._started or self._closed:
+                return
+            self._started = True
+            Path(self.workdir).mkdir(parents=True, exist_ok=True)
+        for _ in range(self.size):
+            self._spawn()
+        atexit.register(self.close)
+        logger.info(f"🐍 Started {self.size} Python workers (preloaded: {', '.join(self.preload)})")
+
+    def _spawn(self):
+        if self._closed:
+            return
+        parent_conn, child_conn = self._ctx().Pipe()
+        process = self._ctx().Process(
+            target=_worker_main,
+            args=(child_conn, self.workdir, self.preload, self.cpu_seconds, self.memory_mb, self.max_output_chars),
+            name="python-worker",
+            daemon=True
+        )
+        process.start()
+        child_conn.close()
+        worker = _Worker(process, parent_conn)
+        with self._lock:
+            self._workers.append(worker)
+        self._idle.put(worker)
+
+    def _retire(self, worker: _Worker):
+        worker.kill()
+        with self._lock:
+            if worker in self._workers:
+                self._workers.remove(worker)
+        # Replace it off the caller's path
+        threading.Thread(target=self._spawn, name="python-worker-spawn", daemon=True).start()
+
+    def run(
+        self,
+        code: str,
+        variable_to_return: Optional[str] = None,
+        file_name: Optional[str] = None,
+        on_output: Optional[Callable[[str], None]] = None
+    ) -> ExecutionResult:
+        """Run ``code`` in an idle worker and wait for it
+
+        Args:
+            code: Python source
+            variable_to_return: Name of a global whose ``str()`` is returned
+            file_name: Save the code under the work directory and run that file
+            on_output: Called with each chunk of stdout/stderr as it arrives
+
+        Returns:
+            ExecutionResult; limits and exceptions are reported in ``error``
+        """
+        if not self._started:
+            self.start()
+        waited = time.monotonic()
+        try:
+            worker = self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            return ExecutionResult(error="No Python worker available", timed_out=True)
+        started = time.monotonic()
+        self.total_wait += started - waited
+
+        result = ExecutionResult()
+        output: List[str] = []
+        deadline = started + self.timeout
+        healthy = True
+        try:
+            worker.conn.send({"code": code, "variable_to_return": variable_to_return, "file_name": file_name})
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not worker.conn.poll(remaining):
+                    result.timed_out, healthy = True, False
+                    result.error = f"Timed out after {self.timeout:g}s"
+                    break
+                kind, payload = worker.conn.recv()
+                if kind == "ready":
+                    continue
+                if kind == "output":
+                    output.append(payload)
+                    if on_output is not None:
+                        on_output(payload)
+                    continue
+                result.value, result.error = payload["value"], payload["error"]
+                result.truncated = payload["truncated"]
+                healthy = not payload["recycle"]
+                break
+        except (EOFError, OSError, BrokenPipeError):
+            healthy = False
+            worker.process.join(timeout=1)
+            result.error = f"Python worker died (exit code {worker.process.exitcode})"
+        result.output = "".join(output)
+        result.duration = time.monotonic() - started
+
+        self.runs += 1
+        self.total_duration += result.duration
+        self.errors += int(not result.ok)
+        self.timeouts += int(result.timed_out)
+        worker.tasks += 1
+        if not healthy or worker.tasks >= self.max_tasks_per_worker:
+            self.killed += int(not healthy)
+            self._retire(worker)
+        else:
+            self._idle.put(worker)
+        return result
+
+    def close(self):
+        """Stop every worker"""
+        self._closed = True
+        with self._lock:
+            workers, self._workers = self._workers, []
+        for worker in workers:
+            try:
+                worker.conn.send(None)
+            except (OSError, BrokenPipeError):
+                pass
+            worker.process.join(timeout=1)
+            worker.kill()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": len(self._workers),
+            "idle": self._idle.qsize(),
+            "runs": self.runs,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "workers_killed": self.killed,
+            "avg_run_seconds": round(self.total_duration / self.runs, 4) if self.runs else 0.0,
+            "avg_wait_seconds": round(self.total_wait / self.runs, 4) if self.runs else 0.0,
+            "limits": {"timeout": self.timeout, "cpu_seconds": self.cpu_seconds, "memory_mb": self.memory_mb}
+        }
@@ -0,0 +1,97 @@
+"""
+LRU cache of knowledge search results, invalidated when the knowledge base changes
+"""
+
+import json
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+_SPACES = re.compile(r"\s+")
+_EDGE_PUNCTUATION = re.compile(r"^[\W_]+|[\W_]+$", re.UNICODE)
+
+def normalize_query(query: str) -> str:
+    """Case-, whitespace- and edge-punctuation-insensitive form of a query"""
+    text = unicodedata.normalize("NFKC", query).casefold()
+    text = _SPACES.sub(" ", text).strip()
+    return _EDGE_PUNCTUATION.sub("", text)
+
+class RetrievalCache:
+    """
+    Search results keyed by (knowledge version, normalized query, limit, filters)
+
+    Every write to the knowledge base calls ``invalidate()``, which bumps the
+    version: entries from older versions can never be served again and are
+    dropped. ``max_items`` bounds the cache (least recently used goes first);
+    ``max_items=0`` disables it.
+    """
+
+    def __init__(self, max_items: int = 1024):
+        self.max_items = max_items
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+        self._entries: "OrderedDict[Tuple[Hashable, ...], List[Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, query: str, limit: int, filters: Optional[Dict[str, Any]] = None) -> Tuple[Hashable, ...]:
+        filters_key = json.dumps(filters, sort_keys=True, default=str) if filters else ""
+        return (self.version, normalize_query(query), limit, filters_key)
+
+    def get(self, query: str, limit: int, filters: Optional[Dict[str, Any]] = None) -> Optional[List[Any]]:
+        """Cached results (a new list each time) or ``None``"""
+        if self.max_items <= 0:
+            return None
+        with self._lock:
+            key = self.key(query, limit, filters)
+            results = self._entries.get(key)
+            if results is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return list(results)
+
+    def put(self, query: str, limit: int, filters: Optional[Dict[str, Any]], results: List[Any], version: int):
+        """
+        Store results computed while the knowledge base was at ``version``
+
+        Results of a search that raced with an ingestion (version moved on
+        meanwhile) are not stored.
+        """
+        if self.max_items <= 0:
+            return
+        with self._lock:
+            if version != self.version:
+                return
+            key = self.key(query, limit, filters)
+            self._entries[key] = list(results)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_items:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self):
+        """Forget every entry; called whenever the knowledge base changes"""
+        with self._lock:
+            self.version += 1
+            self.invalidations += 1
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "version": self.version,
+            "items": len(self._entries),
+            "max_items": self.max_items,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations
+        }
@@ -0,0 +1,271 @@
+"""
+Asynchronous shell command execution with timeouts, output caps and streaming
+"""
+
+import asyncio
+import codecs
+import concurrent.futures
+import logging
+import os
+import shlex
+import signal
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class CommandResult:
+    """Outcome of one command (stdout and stderr are merged in ``output``)"""
+    command: str
+    returncode: Optional[int] = None
+    output: str = ""
+    error: Optional[str] = None
+    timed_out: bool = False
+    omitted_chars: int = 0
+    duration: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0 and not self.timed_out and self.error is None
+
+    def as_text(self, tail: Optional[int] = None) -> str:
+        """Report for a model: the status if the command failed, then the last ``tail`` lines of output"""
+        output = self.output
+        if tail:
+            output = "\n".join(output.rstrip("\n").split("\n")[-tail:])
+        if self.error:
+            status = f"Error: {self.error}"
+        elif self.timed_out:
+            status = f"Error: timed out after {self.duration:.0f}s, command killed"
+        elif self.returncode != 0:
+            status = f"Error: exit code {self.returncode}"
+        else:
+            return output or "(no output)"
+        return f"{status}\n{output}" if output else status
+
+class _CappedOutput:
+    """Keeps the first and last ``limit / 2`` characters of a stream"""
+
+    def __init__(self, limit: int):
+        self.head_limit = limit // 2
+        self.tail_limit = limit - self.head_limit
+        self.head = ""
+        self.tail = ""
+        self.total = 0
+
+    def add(self, text: str):
+        self.total += len(text)
+        if len(self.head) < self.head_limit:
+            take = self.head_limit - len(self.head)
+            self.head, text = self.head + text[:take], text[take:]
+        if text and self.tail_limit:
+            self.tail = (self.tail + text)[-self.tail_limit:]
+
+    @property
+    def omitted(self) -> int:
+        return self.total - len(self.head) - len(self.tail)
+
+    def text(self) -> str:
+        if self.omitted:
+            return f"{self.head}\n[... {self.omitted} characters omitted ...]\n{self.tail}"
+        return self.head + self.tail
+
+class AsyncShellExecutor:
+    """
+    Runs commands as asyncio subprocesses on a private event loop
+
+    Commands run concurrently, at most ``max_concurrency`` at a time, each
+    in its own process group so a timeout kills everything it started.
+    Output is passed to ``on_output`` as it is produced; only the first and
+    last ``max_output_chars / 2`` characters are kept for the result (and at
+    most ``max_output_chars`` are streamed). The private loop lets blocking
+    callers (agno tool calls) and coroutines share the same limits.
+    """
+
+    def __init__(
+        self,
+        timeout: float = 60.0,
+        max_output_chars: int = 20000,
+        max_concurrency: int = 4,
+        base_dir: Optional[str] = None
+    ):
+        self.timeout = timeout
+        self.max_output_chars = max_output_chars
+        self.max_concurrency = max_concurrency
+        self.base_dir = base_dir
+
+        self.runs = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.running = 0
+        self.max_running = 0
+        self.total_duration = 0.0
+        self.total_wait = 0.0
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._processes: Set[asyncio.subprocess.Process] = set()
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+
+                def serve():
+                    asyncio.set_event_loop(loop)
+                    self._semaphore = asyncio.Semaphore(self.max_concurrency)
+                    loop.call_soon(ready.set)
+                    loop.run_forever()
+
+                threading.Thread(target=serve, name="shell-executor", daemon=True).start()
+                ready.wait()
+                self._loop = loop
+            return self._loop
+
+    def submit(
+        self,
+        args: Sequence[str],
+        timeout: Optional[float] = None,
+        on_output: Optional[Callable[[str], None]] = None
+    ) -> "concurrent.futures.Future[CommandResult]":
+        """Start ``args`` and return a future for its result
+
+        ``on_output`` is called from the executor's thread. Coroutines can
+        ``await asyncio.wrap_future(executor.submit(...))``.
+        """
+        return asyncio.run_coroutine_threadsafe(
+            self._run(list(args), timeout or self.timeout, on_output), self._ensure_loop()
+        )
+
+    def run(
+        self,
+        args: Sequence[str],
+        timeout: Optional[float] = None,
+        on_output: Optional[Callable[[str], None]] = None
+    ) -> CommandResult:
+        """Run ``args`` and wait for it
+
+        Args:
+            args: Command and arguments (no shell is involved)
+            timeout: Seconds before the command is killed (default ``self.timeout``)
+            on_output: Called with each chunk of output as it arrives
+
+        Returns:
+            CommandResult; a command that cannot start is reported in ``error``
+        """
+        return self.submit(args, timeout, on_output).result()
+
+    async def _run(self, args: List[str], timeout: float, on_output: Optional[Callable[[str], None]]) -> CommandResult:
+        queued = time.monotonic()
+        assert self._semaphore is not None, "created with the executor loop"
+        async with self._semaphore:
+            started = time.monotonic()
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+            try:
+                result = await self._execute(args, timeout, on_output)
+            finally:
+                self.running -= 1
+        result.duration = time.monotonic() - started
+
+        self.runs += 1
+        self.failures += int(not result.ok)
+        self.timeouts += int(result.timed_out)
+        self.total_duration += result.duration
+        self.total_wait += started - queued
+        status = "✅" if result.ok else "⏱️" if result.timed_out else "❌"
+        logger.info(f"{status} {result.command[:80]} in {result.duration:.2f}s (exit {result.returncode})")
+        return result
+
+    async def _execute(
+        self,
+        args: List[str],
+        timeout: float,
+        on_output: Optional[Callable[[str], None]]
+    ) -> CommandResult:
+        result = CommandResult(command=shlex.join(args))
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *args,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+                cwd=self.base_dir,
+                start_new_session=True
+            )
+        except (OSError, ValueError) as e:
+            result.error = str(e)
+            return result
+
+        self._processes.add(process)
+        stdout = process.stdout
+        assert stdout is not None, "spawned with stdout=PIPE"
+        output = _CappedOutput(self.max_output_chars)
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        streamed = 0
+
+        async def pump():
+            nonlocal streamed
+            while True:
+                data = await stdout.read(4096)
+                text = decoder.decode(data, final=not data)
+                if text:
+                    output.add(text)
+                    if on_output is not None and streamed < self.max_output_chars:
+                        chunk = text[:self.max_output_chars - streamed]
+                        streamed += len(chunk)
+                        try:
+                            on_output(chunk)
+                        except Exception as e:
+                            logger.warning(f"⚠️ Shell output handler failed: {e}")
+                if not data:
+                    return
+
+        try:
+            await asyncio.wait_for(asyncio.gather(pump(), process.wait()), timeout)
+        except asyncio.TimeoutError:
+            result.timed_out = True
+            self._kill(process)
+            await process.wait()
+        finally:
+            self._processes.discard(process)
+        result.returncode = process.returncode
+        result.output = output.text()
+        result.omitted_chars = output.omitted
+        return result
+
+    @staticmethod
+    def _kill(process: asyncio.subprocess.Process):
+        # The command leads its own process group; take its children with it
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+    def close(self):
+        """Kill running commands and stop the executor's loop"""
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        for process in list(self._processes):
+            self._kill(process)
+        loop.call_soon_threadsafe(loop.stop)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "running": self.running,
+            "max_running": self.max_running,
+            "avg_run_seconds": round(self.total_duration / self.runs, 4) if self.runs else 0.0,
+            "avg_wait_seconds": round(self.total_wait / self.runs, 4) if self.runs else 0.0,
+            "limits": {"timeout": self.timeout, "max_output_chars": self.max_output_chars,
+                       "max_concurrency": self.max_concurrency}
+        }
@@ -0,0 +1,16 @@
+"""
+Cheap token estimates for prompt budgeting
+"""
+
+import math
+from typing import Iterable
+
+# Llama/Qwen/Mistral tokenizers average about four characters per token on English and French text
+CHARS_PER_TOKEN = 4.0
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of ``text`` without loading a tokenizer"""
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+def estimate_total_tokens(texts: Iterable[str]) -> int:
+    return sum(estimate_tokens(text) for text in texts)
@@ -0,0 +1,118 @@
+"""
+Tool-loop budgets: model turns and seconds per agent run, and repeated tool calls
+"""
+
+import json
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+# Added to the conversation when a run is out of budget; the model then answers without tools
+BUDGET_NOTE = (
+    "Budget d'outils atteint ({reason}). N'appelle plus d'outil : réponds maintenant avec les "
+    "informations déjà obtenues, en signalant ce qui manque éventuellement."
+)
+
+def call_key(name: str, arguments: Optional[Dict[str, Any]]) -> Tuple[str, str]:
+    """Identity of a tool call: its name and canonical JSON arguments"""
+    return name, json.dumps(arguments or {}, sort_keys=True, default=str)
+
+@dataclass
+class ToolBudget:
+    """Limits of one agent run: model turns after tool results, and wall-clock seconds"""
+    max_iterations: int = 5
+    max_seconds: float = 120.0
+
+@dataclass
+class ToolLoopRun:
+    """State of one agent run: its tool iterations and the results of the calls made so far"""
+    budget: ToolBudget
+    started_at: float = field(default_factory=time.monotonic)
+    iterations: int = 0
+    results: Dict[Tuple[str, str], Any] = field(default_factory=dict)
+    exhausted: Optional[str] = None
+
+    def next_iteration(self) -> Optional[str]:
+        """Count a model turn following tool results; the budget that ran out, if any"""
+        self.iterations += 1
+        if self.exhausted is None:
+            if self.iterations > self.budget.max_iterations:
+                self.exhausted = "iterations"
+            elif time.monotonic() - self.started_at > self.budget.max_seconds:
+                self.exhausted = "time"
+        return self.exhausted
+
+    def seen(self, name: str, arguments: Optional[Dict[str, Any]]) -> Tuple[bool, Any]:
+        key = call_key(name, arguments)
+        return key in self.results, self.results.get(key)
+
+    def remember(self, name: str, arguments: Optional[Dict[str, Any]], result: Any):
+        self.results[call_key(name, arguments)] = result
+
+# Runs in progress in the current context, per model (nested agent runs keep their own)
+current_runs: ContextVar[Optional[Dict[int, ToolLoopRun]]] = ContextVar("tool_loop_runs", default=None)
+
+def start_run(owner: Any, budget: ToolBudget) -> ToolLoopRun:
+    run = ToolLoopRun(budget)
+    runs = dict(current_runs.get() or {})
+    runs[id(owner)] = run
+    current_runs.set(runs)
+    return run
+
+def run_of(owner: Any) -> Optional[ToolLoopRun]:
+    return (current_runs.get() or {}).get(id(owner))
+
+@dataclass
+class ToolBudgetStats:
+    """Tool loops of one agent: iterations, repeated calls served from the run, budgets hit"""
+    runs: int = 0
+    tool_calls: int = 0
+    iterations: int = 0
+    max_iterations: int = 0
+    repeated_calls: int = 0
+    iteration_limit_hits: int = 0
+    time_limit_hits: int = 0
+    repeats_by_tool: Dict[str, int] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record_run(self):
+        with self._lock:
+            self.runs += 1
+
+    def record_iteration(self, run: ToolLoopRun, exhausted_now: Optional[str]):
+        with self._lock:
+            self.iterations += 1
+            self.max_iterations = max(self.max_iterations, run.iterations)
+            if exhausted_now == "iterations":
+                self.iteration_limit_hits += 1
+            elif exhausted_now == "time":
+                self.time_limit_hits += 1
+
+    def record_calls(self, executed: int, repeated: Dict[str, int]):
+        with self._lock:
+            self.tool_calls += executed
+            for name, count in repeated.items():
+                self.repeated_calls += count
+                self.repeats_by_tool[name] = self.repeats_by_tool.get(name, 0) + count
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "tool_calls": self.tool_calls,
+            "avg_iterations": round(self.iterations / self.runs, 2) if self.runs else 0.0,
+            "max_iterations": self.max_iterations,
+            "repeated_calls_served": self.repeated_calls,
+            "repeats_by_tool": dict(self.repeats_by_tool),
+            "iteration_limit_hits": self.iteration_limit_hits,
+            "time_limit_hits": self.time_limit_hits,
+            "budget_hit_rate": round((self.iteration_limit_hits + self.time_limit_hits) / self.runs, 3)
+            if self.runs else 0.0
+        }
+
+# Tool-loop statistics per agent, filled by the budgeted models
+tool_budget_stats: Dict[str, ToolBudgetStats] = {}
+
+def tool_budget_stats_for(name: str) -> ToolBudgetStats:
+    return tool_budget_stats.setdefault(name, ToolBudgetStats())
@@ -0,0 +1,294 @@
+"""
+In-process vector and keyword indexes backed by memory-mapped files
+"""
+
+import logging
+import math
+import re
+import threading
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(text.lower())
+
+class VectorIndex:
+    """
+    Row-addressed float32 matrix in a growable memory-mapped file
+
+    Vectors are L2-normalised on insert so cosine similarity is a single
+    matrix-vector product. Small collections are searched exhaustively (one
+    BLAS call); once ``ivf_threshold`` live rows exist, an inverted-file
+    index (k-means coarse quantiser) restricts each query to the ``nprobe``
+    closest clusters.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        dimensions: int,
+        ivf_threshold: int = 20000,
+        nprobe: int = 8,
+        initial_capacity: int = 1024
+    ):
+        self.path = Path(path)
+        self.dimensions = dimensions
+        self.ivf_threshold = ivf_threshold
+        self.nprobe = nprobe
+        self.size = 0
+        self.live = np.zeros(0, dtype=bool)
+
+        self._lock = threading.RLock()
+        self._centroids: Optional[np.ndarray] = None
+        self._lists: List[List[int]] = []
+        self._built_at = 0
+        self._matrix = self._open(initial_capacity)
+
+    def _open(self, capacity: int) -> np.memmap:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        row_bytes = self.dimensions * 4
+        existing = self.path.stat().st_size // row_bytes if self.path.exists() else 0
+        capacity = max(capacity, existing)
+        if existing and existing < capacity:
+            with open(self.path, "r+b") as f:
+                f.truncate(capacity * row_bytes)
+        if len(self.live) < capacity:
+            self.live = np.concatenate([self.live, np.zeros(capacity - len(self.live), dtype=bool)])
+        return np.memmap(self.path, dtype=np.float32, mode="r+" if existing else "w+",
+                         shape=(capacity, self.dimensions))
+
+    @property
+    def capacity(self) -> int:
+        return self._matrix.shape[0]
+
+    @property
+    def count(self) -> int:
+        return int(self.live[:self.size].sum())
+
+    def _grow(self, needed: int):
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        self._matrix.flush()
+        del self._matrix
+        with open(self.path, "r+b") as f:
+            f.truncate(capacity * self.dimensions * 4)
+        self._matrix = self._open(capacity)
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def restore(self, rows: Iterable[int]):
+        """Mark rows as live after reopening a persisted matrix"""
+        with self._lock:
+            rows = list(rows)
+            if rows:
+                self.size = max(self.size, max(rows) + 1)
+                if self.size > self.capacity:
+                    self._grow(self.size)
+                self.live[rows] = True
+
+    def add(self, vectors: List[List[float]]) -> List[int]:
+        """Append vectors and return their row numbers"""
+        if not vectors:
+            return []
+        array = np.asarray(vectors, dtype=np.float32).reshape(len(vectors), self.dimensions)
+        with self._lock:
+            start = self.size
+            if start + len(array) > self.capacity:
+                self._grow(start + len(array))
+            self._matrix[start:start + len(array)] = self._normalize(array)
+            self.live[start:start + len(array)] = True
+            self.size += len(array)
+            rows = list(range(start, self.size))
+            if self._centroids is not None:
+                assignments = np.argmax(self._matrix[start:self.size] @ self._centroids.T, axis=1)
+                for row, cluster in zip(rows, assignments):
+                    self._lists[cluster].append(row)
+            return rows
+
+    def remove(self, rows: Iterable[int]):
+        with self._lock:
+            rows = [row for row in rows if row < self.size]
+            self.live[rows] = False
+
+    def clear(self):
+        with self._lock:
+            self.live[:] = False
+            self.size = 0
+            self._centroids = None
+            self._lists = []
+            self._built_at = 0
+
+    def flush(self):
+        self._matrix.flush()
+
+    def vector(self, row: int) -> List[float]:
+        return self._matrix[row].tolist()
+
+    def build_ivf(self, iterations: int = 8, sample_size: int = 50000, seed: int = 0):
+        """Cluster live rows with k-means (on a sample) into ~sqrt(n) inverted lists"""
+        with self._lock:
+            rows = np.flatnonzero(self.live[:self.size])
+            if len(rows) == 0:
+                return
+            rng = np.random.default_rng(seed)
+            nlist = max(1, int(math.sqrt(len(rows))))
+            sample = rows if len(rows) <= sample_size else rng.choice(rows, sample_size, replace=False)
+            data = np.asarray(self._matrix[sample])
+            centroids = data[rng.choice(len(data), nlist, replace=False)].copy()
+            for _ in range(iterations):
+                assignments = np.argmax(data @ centroids.T, axis=1)
+                for cluster in range(nlist):
+                    members = data[assignments == cluster]
+                    if len(members):
+                        centroids[cluster] = members.mean(axis=0)
+                centroids = self._normalize(centroids)
+
+            lists: List[List[int]] = [[] for _ in range(nlist)]
+            for start in range(0, len(rows), 65536):
+                block = rows[start:start + 65536]
+                for row, cluster in zip(block, np.argmax(self._matrix[block] @ centroids.T, axis=1)):
+                    lists[cluster].append(int(row))
+            self._centroids, self._lists, self._built_at = centroids, lists, len(rows)
+            logger.info(f"🧭 Built IVF index: {len(rows)} vectors in {nlist} lists")
+
+    def search(
+        self,
+        query: Union[List[float], np.ndarray],
+        limit: int = 5,
+        allowed: Optional[np.ndarray] = None,
+        exact: bool = False
+    ) -> List[Tuple[int, float]]:
+        """
+        Top ``limit`` (row, cosine similarity) pairs
+
+        Args:
+            query: Query vector
+            limit: Number of results
+            allowed: Optional boolean mask over rows (metadata filters)
+            exact: Force an exhaustive scan even when the IVF index is active
+        """
+        q = np.asarray(query, dtype=np.float32)
+        norm = np.linalg.norm(q)
+        if norm == 0 or self.size == 0:
+            return []
+        q = q / norm
+
+        with self._lock:
+            count = self.count
+            if not exact and count >= self.ivf_threshold and (self._centroids is None or count > 2 * self._built_at):
+                self.build_ivf()
+            mask = self.live[:self.size].copy()
+            if allowed is not None:
+                mask &= allowed[:self.size]
+
+            if exact or self._centroids is None or count < self.ivf_threshold:
+                scores = np.asarray(self._matrix[:self.size]) @ q
+                scores[~mask] = -np.inf
+                candidates = np.arange(self.size)
+            else:
+                probes = np.argsort(-(self._centroids @ q))[:self.nprobe]
+                candidates = np.fromiter((row for p in probes for row in self._lists[p]), dtype=np.int64)
+                candidates = candidates[mask[candidates]]
+                if len(candidates) == 0:
+                    return []
+                scores = np.asarray(self._matrix[candidates]) @ q
+
+        limit = min(limit, len(scores))
+        if limit <= 0:
+            return []
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top])]
+        return [(int(candidates[i]), float(scores[i])) for i in top if np.isfinite(scores[i])]
+
+class BM25Index:
+    """In-memory Okapi BM25 inverted index over row numbers, with optional prefix matching"""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+        self.lengths: Dict[int, int] = {}
+        self.total_length = 0
+        self._vocabulary: Optional[List[str]] = None
+        self._lock = threading.RLock()
+
+    def add(self, row: int, text: str):
+        tokens = tokenize(text)
+        with self._lock:
+            for term, tf in Counter(tokens).items():
+                self.postings[term][row] = tf
+            self.lengths[row] = len(tokens)
+            self.total_length += len(tokens)
+            self._vocabulary = None
+
+    def remove(self, row: int, text: str):
+        with self._lock:
+            if row not in self.lengths:
+                return
+            for term in set(tokenize(text)):
+                posting = self.postings.get(term)
+                if posting is not None:
+                    posting.pop(row, None)
+                    if not posting:
+                        del self.postings[term]
+            self.total_length -= self.lengths.pop(row)
+            self._vocabulary = None
+
+    def clear(self):
+        with self._lock:
+            self.postings.clear()
+            self.lengths.clear()
+            self.total_length = 0
+            self._vocabulary = None
+
+    def _expand(self, term: str) -> List[str]:
+        """Vocabulary terms starting with ``term``"""
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self.postings)
+        vocabulary = self._vocabulary
+        i = bisect_left(vocabulary, term)
+        matches: List[str] = []
+        while i < len(vocabulary) and vocabulary[i].startswith(term) and len(matches) < 50:
+            matches.append(vocabulary[i])
+            i += 1
+        return matches
+
+    def search(
+        self,
+        query: str,
+        limit: int = 5,
+        prefix_match: bool = False,
+        allowed: Optional[Set[int]] = None
+    ) -> List[Tuple[int, float]]:
+        """Top ``limit`` (row, BM25 score) pairs for ``query``"""
+        with self._lock:
+            n = len(self.lengths)
+            if n == 0:
+                return []
+            avgdl = self.total_length / n
+            scores: Dict[int, float] = defaultdict(float)
+            for term in set(tokenize(query)):
+                for expanded in (self._expand(term) if prefix_match else [term]):
+                    posting = self.postings.get(expanded)
+                    if not posting:
+                        continue
+                    idf = math.log(1 + (n - len(posting) + 0.5) / (len(posting) + 0.5))
+                    for row, tf in posting.items():
+                        if allowed is not None and row not in allowed:
+                            continue
+                        norm = tf + self.k1 * (1 - self.b + self.b * self.lengths[row] / avgdl)
+                        scores[row] += idf * tf * (self.k1 + 1) / norm
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
@@ -0,0 +1,71 @@
+"""
+Sends WhatsApp replies through the WhatsApp Business Cloud API
+"""
+
+import logging
+from typing import Any, Dict, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+class WhatsAppCloudSender:
+    """
+    Posts text replies to ``/{phone_number_id}/messages`` of the Graph API
+
+    Each reply is a dict with ``to``, ``body`` and optionally ``reply_to``
+    (the id of the message answered, shown as a quote on the user's side).
+    Long bodies are cut to WhatsApp's ``max_chars`` limit. A rejected send
+    raises ``httpx.HTTPStatusError``.
+    """
+
+    def __init__(
+        self,
+        access_token: str,
+        phone_number_id: str,
+        api_version: str = "v21.0",
+        base_url: str = "https://graph.facebook.com",
+        timeout: float = 15.0,
+        max_chars: int = 4096,
+        client: Optional[httpx.AsyncClient] = None
+    ):
+        self.url = f"{base_url.rstrip('/')}/{api_version}/{phone_number_id}/messages"
+        self.max_chars = max_chars
+        self.sent = 0
+        self.failed = 0
+        self._headers = {"Authorization": f"Bearer {access_token}"}
+        self._client = client or httpx.AsyncClient(timeout=timeout)
+
+    def payload(self, reply: Dict[str, Any]) -> Dict[str, Any]:
+        body = reply.get("body") or ""
+        if len(body) > self.max_chars:
+            body = body[:self.max_chars - 1].rstrip() + "…"
+        payload: Dict[str, Any] = {
+            "messaging_product": "whatsapp",
+            "recipient_type": "individual",
+            "to": reply["to"],
+            "type": "text",
+            "text": {"preview_url": False, "body": body}
+        }
+        if reply.get("reply_to"):
+            payload["context"] = {"message_id": reply["reply_to"]}
+        return payload
+
+    async def send(self, reply: Dict[str, Any]) -> Dict[str, Any]:
+        """Send one reply; returns the API response (message ids)"""
+        try:
+            response = await self._client.post(self.url, json=self.payload(reply), headers=self._headers)
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            self.failed += 1
+            logger.error(f"❌ WhatsApp reply to {reply.get('to')} failed: {e}")
+            raise
+        self.sent += 1
+        logger.info(f"📤 WhatsApp reply sent to {reply['to']} ({len(reply.get('body') or '')} chars)")
+        return response.json()
+
+    async def aclose(self):
+        await self._client.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"url": self.url, "sent": self.sent, "failed": self.failed}